@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-from replit import db
+from utils.storage import get_storage
 import asyncio
 import logging
 from datetime import datetime, timedelta
@@ -9,11 +9,18 @@ from config import COLORS, get_server_config, update_server_config, user_has_per
 from utils.database import get_guild_data, update_guild_data, get_user_data, update_user_data
 from utils.helpers import format_duration
 from rpg_data.game_data import ITEMS # Corrected import path
+from utils.leaderboard import leaderboard_index
+from utils.dispatch import message_dispatcher
+from utils.sessions import session_registry
+from utils.edit_scheduler import edit_scheduler
+from utils.matchmaking import matchmaker
 import psutil
 import os
+import io
 import json
 import sys
 import gc
+import time
 from typing import Optional, Dict, Any, List, Union
 import traceback
 
@@ -33,10 +40,10 @@ try:
     from config import get_prefix
 except ImportError:
     logger.warning("Could not import 'get_prefix' from config.py. Using default prefix function.")
-    def get_prefix(bot, message):
+    async def get_prefix(bot, message):
         guild_id = getattr(message.guild, 'id', None)
         if guild_id:
-            guild_data = get_guild_data(str(guild_id)) or {}
+            guild_data = await get_guild_data(str(guild_id)) or {}
             return guild_data.get('prefix', '$')
         return '$'
 
@@ -62,7 +69,7 @@ class SingleStatModal(discord.ui.Modal):
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            player_data = self.rpg_core.get_player_data(self.user_id)
+            player_data = await self.rpg_core.get_player_data(self.user_id)
             if not player_data:
                 await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
                 return
@@ -116,7 +123,7 @@ class SingleStatModal(discord.ui.Modal):
                     return
 
             # Save data
-            success = self.rpg_core.save_player_data(self.user_id, player_data)
+            success = await self.rpg_core.save_player_data(self.user_id, player_data)
             if not success:
                 await interaction.response.send_message("❌ Failed to save data!", ephemeral=True)
                 return
@@ -162,7 +169,7 @@ class ItemSelectModal(discord.ui.Modal):
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            player_data = self.rpg_core.get_player_data(self.user_id)
+            player_data = await self.rpg_core.get_player_data(self.user_id)
             if not player_data:
                 await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
                 return
@@ -201,7 +208,7 @@ class ItemSelectModal(discord.ui.Modal):
                 current_qty = player_data['inventory'].get(item_key, 0)
                 player_data['inventory'][item_key] = current_qty + qty
 
-                success = self.rpg_core.save_player_data(self.user_id, player_data)
+                success = await self.rpg_core.save_player_data(self.user_id, player_data)
                 if success:
                     user = interaction.guild.get_member(int(self.user_id))
                     username = user.display_name if user else "that player"
@@ -240,7 +247,7 @@ class ItemCategorySelect(discord.ui.Select):
     async def callback(self, interaction: discord.Interaction):
         category = self.values[0]
         view = ItemSelectionView(self.user_id, self.rpg_core, category)
-        embed = view.create_embed()
+        embed = await view.create_embed()
         await interaction.response.edit_message(embed=embed, view=view)
 
 class ItemSelectionDropdown(discord.ui.Select):
@@ -320,7 +327,7 @@ class StatSelectionDropdown(discord.ui.Select):
         stat_name = self.values[0]
 
         # Get current value
-        player_data = self.rpg_core.get_player_data(str(self.target_member.id))
+        player_data = await self.rpg_core.get_player_data(str(self.target_member.id))
         if not player_data:
             await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
             return
@@ -350,7 +357,7 @@ class BaseAdminView(discord.ui.View):
             return False
         return True
 
-    def create_embed(self):
+    async def create_embed(self):
         raise NotImplementedError("Subclasses must implement create_embed()")
 
     @discord.ui.button(label="Back", style=discord.ButtonStyle.danger, emoji="🔙", row=4)
@@ -366,7 +373,7 @@ class ItemSelectionView(BaseAdminView):
         self.category = category
         self.add_item(ItemSelectionDropdown(user_id, bot.get_cog('RPGCore'), category))
 
-    def create_embed(self):
+    async def create_embed(self):
         category_names = {
             "weapon": "⚔️ Weapons", "armor": "🛡️ Armor", "consumable": "🧪 Consumables",
             "accessory": "💎 Accessories", "artifact": "✨ Artifacts", 
@@ -450,7 +457,7 @@ class ItemActionView(BaseAdminView):
         # This would need to be passed from the parent view
         target_id = self.user_id  # Placeholder - should be target user ID
 
-        player_data = rpg_core.get_player_data(target_id)
+        player_data = await rpg_core.get_player_data(target_id)
         if not player_data:
             await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
             return
@@ -461,7 +468,7 @@ class ItemActionView(BaseAdminView):
         current_qty = player_data['inventory'].get(self.item_key, 0)
         player_data['inventory'][self.item_key] = current_qty + quantity
 
-        success = rpg_core.save_player_data(target_id, player_data)
+        success = await rpg_core.save_player_data(target_id, player_data)
         if success:
             item_name = self.item_data.get('name', self.item_key)
             response = f"I gave them {quantity}x {item_name}. There, can I get back to my cheese now?"
@@ -488,7 +495,7 @@ class ManageUserView(BaseAdminView):
         return button
 
     async def grant_infinite_power(self, interaction: discord.Interaction):
-        user_data = get_user_data(str(self.target_member.id)) or {}
+        user_data = await get_user_data(str(self.target_member.id)) or {}
         user_data.update({ 
             'level': 999, 
             'gold': 999999999999, 
@@ -502,12 +509,12 @@ class ManageUserView(BaseAdminView):
                 'charisma': 999
             } 
         })
-        update_user_data(str(self.target_member.id), user_data)
-        await interaction.response.edit_message(embed=self.create_embed(), view=self)
+        await update_user_data(str(self.target_member.id), user_data)
+        await interaction.response.edit_message(embed=await self.create_embed(), view=self)
         await interaction.followup.send(f"🧀 Wow, look at you with the 'infinite power' button. I gave {self.target_member.mention} god-mode stats. Are you going to create a block of cheese so big you can't eat it? No? Then what's the point of infinite power?", ephemeral=True)
 
-    def create_embed(self):
-        user_data = get_user_data(str(self.target_member.id)) or {}
+    async def create_embed(self):
+        user_data = await get_user_data(str(self.target_member.id)) or {}
         stats = user_data.get('stats', {})
         embed = discord.Embed(
             title=f"👤 Staring at {self.target_member.display_name}'s Stats", 
@@ -526,7 +533,7 @@ class ManageUserView(BaseAdminView):
     @discord.ui.button(label="Give Items", style=discord.ButtonStyle.primary, emoji="🎁", row=3)
     async def give_items(self, interaction: discord.Interaction, button: discord.ui.Button):
         view = ItemCategorySelectionView(self.user_id, self.guild_id, self.bot, self.target_member)
-        embed = view.create_embed()
+        embed = await view.create_embed()
         await interaction.response.edit_message(embed=embed, view=view)
 
 class ItemCategorySelectionView(BaseAdminView):
@@ -536,7 +543,7 @@ class ItemCategorySelectionView(BaseAdminView):
         self.target_member = target_member
         self.add_item(ItemCategorySelect(str(target_member.id), bot.get_cog('RPGCore')))
 
-    def create_embed(self):
+    async def create_embed(self):
         return discord.Embed(
             title=f"🎁 Give Items to {self.target_member.display_name}",
             description="*Ugh, more gift-giving. Select a category from the dropdown below.*\n\n*Just pick something so I can get back to my nap.*",
@@ -544,7 +551,7 @@ class ItemCategorySelectionView(BaseAdminView):
         )
 
 class UserManagementView(BaseAdminView):
-    def create_embed(self):
+    async def create_embed(self):
         return discord.Embed(
             title="👥 Picking on Players", 
             description="*Sigh...* So you want to mess with someone's profile? Fine. Pick a victim from the list or use the button to find them. Just get it over with so I can get back to my cheese wheel.\n\n*Don't blame me if you make the game boring.*", 
@@ -567,19 +574,16 @@ class UserManagementView(BaseAdminView):
             description="Top players across different categories.",
             color=COLORS['legendary']
         )
-        players = []
-        for key in db.keys():
-            if key.startswith(f'player_{self.guild_id}_'):
-                try:
-                    player_data = db[key]
-                    if isinstance(player_data, dict) and 'level' in player_data:
-                        user_id = key.split('_')[-1]
-                        players.append((user_id, player_data['level'], player_data.get('gold', 0)))
-                except:
-                    continue
-
-        players.sort(key=lambda x: x[1], reverse=True)
-        top_players = players[:5]
+        if not leaderboard_index.ready:
+            await leaderboard_index.rebuild()
+
+        guild = interaction.guild
+        top_players = [
+            (entry['user_id'], entry['value'], leaderboard_index.score('gold', entry['user_id']) or 0)
+            for entry in leaderboard_index.top(
+                'level', 5, predicate=lambda user_id: guild.get_member(int(user_id)) is not None
+            )
+        ]
 
         if top_players:
             leaderboard = ""
@@ -620,15 +624,15 @@ class UserSearchModal(discord.ui.Modal, title="🔎 Search for User"):
 
         if member:
             view = ManageUserView(self.user_id, self.guild_id, self.bot, member)
-            embed = view.create_embed()
+            embed = await view.create_embed()
             await interaction.response.edit_message(embed=embed, view=view)
         else:
             await interaction.response.send_message(f"❌ Could not find a member matching `{query}`.", ephemeral=True)
 
 # Continue with other views and Admin class...
 class DatabaseToolsView(BaseAdminView):
-    def create_embed(self):
-        guild_data = get_guild_data(str(self.guild_id)) or {}
+    async def create_embed(self):
+        guild_data = await get_guild_data(str(self.guild_id)) or {}
         xp_rate = guild_data.get('xp_multiplier', 1.0)
         gold_rate = guild_data.get('gold_multiplier', 1.0)
         embed = discord.Embed(
@@ -643,10 +647,11 @@ class DatabaseToolsView(BaseAdminView):
     @discord.ui.button(label="Make Numbers Bigger", style=discord.ButtonStyle.primary, emoji="⚙️", row=1)
     async def set_multipliers(self, interaction: discord.Interaction, button: discord.ui.Button):
         from cogs.admin import MultiplierModal
-        await interaction.response.send_modal(MultiplierModal(self.guild_id))
+        guild_data = await get_guild_data(str(self.guild_id)) or {}
+        await interaction.response.send_modal(MultiplierModal(self.guild_id, guild_data))
 
 class CustomizationView(BaseAdminView):
-    def create_embed(self):
+    async def create_embed(self):
         return discord.Embed(
             title="🎨 Playing Interior Decorator",
             description="*Time to play interior decorator? How thrilling.* Here you can change colors and make everything look... different.",
@@ -676,7 +681,7 @@ class ConfigMainView(discord.ui.View):
             color=COLORS['primary']
         )
 
-        guild_data = get_guild_data(str(self.guild_id)) or {}
+        guild_data = await get_guild_data(str(self.guild_id)) or {}
         embed.add_field(
             name="🎮 RPG Settings",
             value=f"**XP Multiplier:** {guild_data.get('xp_multiplier', 1.0)}x\n"
@@ -689,29 +694,28 @@ class ConfigMainView(discord.ui.View):
     @discord.ui.button(label="User Management", style=discord.ButtonStyle.primary, emoji="👥", row=0)
     async def user_management(self, interaction: discord.Interaction, button: discord.ui.Button):
         view = UserManagementView(str(interaction.user.id), self.guild_id, interaction.client)
-        embed = view.create_embed()
+        embed = await view.create_embed()
         await interaction.response.edit_message(embed=embed, view=view)
 
     @discord.ui.button(label="Database Tools", style=discord.ButtonStyle.secondary, emoji="💾", row=0)
     async def database_tools(self, interaction: discord.Interaction, button: discord.ui.Button):
         view = DatabaseToolsView(str(interaction.user.id), self.guild_id, interaction.client)
-        embed = view.create_embed()
+        embed = await view.create_embed()
         await interaction.response.edit_message(embed=embed, view=view)
 
     @discord.ui.button(label="Customization", style=discord.ButtonStyle.secondary, emoji="🎨", row=0)
     async def customization(self, interaction: discord.Interaction, button: discord.ui.Button):
         view = CustomizationView(str(interaction.user.id), self.guild_id, interaction.client)
-        embed = view.create_embed()
+        embed = await view.create_embed()
         await interaction.response.edit_message(embed=embed, view=view)
 
 class MultiplierModal(discord.ui.Modal, title="⚙️ Set Server Multipliers"):
     xp_multiplier = discord.ui.TextInput(label="XP Multiplier", placeholder="e.g., 1.5 for 150% XP", required=True)
     gold_multiplier = discord.ui.TextInput(label="Gold Multiplier", placeholder="e.g., 2.0 for 200% Gold", required=True)
 
-    def __init__(self, guild_id: int):
+    def __init__(self, guild_id: int, guild_data: dict):
         super().__init__()
         self.guild_id = guild_id
-        guild_data = get_guild_data(str(guild_id)) or {}
         self.xp_multiplier.default = str(guild_data.get('xp_multiplier', 1.0))
         self.gold_multiplier.default = str(guild_data.get('gold_multiplier', 1.0))
 
@@ -720,10 +724,10 @@ class MultiplierModal(discord.ui.Modal, title="⚙️ Set Server Multipliers"):
             xp_rate = float(self.xp_multiplier.value)
             gold_rate = float(self.gold_multiplier.value)
 
-            guild_data = get_guild_data(str(self.guild_id)) or {}
+            guild_data = await get_guild_data(str(self.guild_id)) or {}
             guild_data['xp_multiplier'] = xp_rate
             guild_data['gold_multiplier'] = gold_rate
-            update_guild_data(str(self.guild_id), guild_data)
+            await update_guild_data(str(self.guild_id), guild_data)
 
             await interaction.response.send_message(f"✅ Multipliers updated: XP `x{xp_rate}`, Gold `x{gold_rate}`.", ephemeral=True)
         except ValueError:
@@ -963,7 +967,7 @@ class AdminCog(commands.Cog):
             return
 
         # Apply the change directly to player data
-        player_data = rpg_core.get_player_data(user_id)
+        player_data = await rpg_core.get_player_data(user_id)
         if not player_data:
             await interaction.response.send_message("❌ Player not found!", ephemeral=True)
             return
@@ -990,7 +994,7 @@ class AdminCog(commands.Cog):
         # Update derived stats
         self.update_derived_stats(player_data)
 
-        success = rpg_core.save_player_data(user_id, player_data)
+        success = await rpg_core.save_player_data(user_id, player_data)
         if not success:
             await interaction.response.send_message("❌ Failed to save changes!", ephemeral=True)
             return
@@ -1045,8 +1049,6 @@ class AdminCog(commands.Cog):
             return
 
         # Create or modify character with test data
-        user_data = get_user_data(str(target.id)) or {}
-
         test_character = {
             'level': level,
             'xp': 1000 * level,
@@ -1119,8 +1121,15 @@ class AdminCog(commands.Cog):
             'chosen_path': None
         }
 
-        user_data['rpg_data'] = test_character
-        update_user_data(str(target.id), user_data)
+        # Replacing an existing character has to carry its version, or the save is rejected as stale
+        existing = await rpg_core.get_player_data(str(target.id))
+        if existing:
+            test_character['_version'] = existing.get('_version', 0)
+
+        success = await rpg_core.save_player_data(str(target.id), test_character)
+        if not success:
+            await ctx.send(f"❌ Failed to save the test character for {target.display_name}. Try again!")
+            return
 
         embed = discord.Embed(
             title="🧪 Test Character Created!",
@@ -1237,18 +1246,52 @@ class AdminCog(commands.Cog):
         )
 
         # Database statistics
-        total_players = len([k for k in db.keys() if k.startswith('player_')])
-        total_guilds = len([k for k in db.keys() if k.startswith('guild_')])
+        storage = get_storage()
+        all_keys = await storage.keys()
+        total_players = len([k for k in all_keys if k.startswith('player_')])
+        total_guilds = len([k for k in all_keys if k.startswith('guild_')])
         
         embed.add_field(
             name="💾 Database Stats",
             value=f"**Player Records:** {format_number(total_players)}\n"
                   f"**Guild Records:** {format_number(total_guilds)}\n"
-                  f"**Total Keys:** {format_number(len(db.keys()))}\n"
+                  f"**Total Keys:** {format_number(len(all_keys))}\n"
                   f"**Status:** 🟢 Connected",
             inline=True
         )
 
+        # Message dispatch statistics
+        dispatch_stats = message_dispatcher.stats
+        handled = ", ".join(f"{name}: {format_number(count)}" for name, count in dispatch_stats['handled'].items())
+        embed.add_field(
+            name="📨 Message Dispatch",
+            value=f"**Messages:** {format_number(dispatch_stats['messages'])}\n"
+                  f"**Short-circuited:** {format_number(dispatch_stats['short_circuited'])}\n"
+                  f"**Commands:** {format_number(dispatch_stats['commands'])}\n"
+                  f"**Handlers:** {handled or 'none'}",
+            inline=True
+        )
+
+        live_sessions = session_registry.counts()
+        if len(matchmaker):
+            live_sessions['arena_queue'] = len(matchmaker)
+        embed.add_field(
+            name="🎮 Live Sessions",
+            value="\n".join(f"**{kind.replace('_', ' ').title()}:** {format_number(count)}"
+                            for kind, count in sorted(live_sessions.items())) or "None",
+            inline=True
+        )
+
+        edits = edit_scheduler.stats
+        embed.add_field(
+            name="✏️ View Edits",
+            value=f"**Sent:** {format_number(edits['sent'])} / {format_number(edits['submitted'])}\n"
+                  f"**Superseded:** {format_number(edits['superseded'])}\n"
+                  f"**Throttled:** {format_number(edits['throttled'])} | **429s:** {format_number(edits['rate_limited'])}\n"
+                  f"**Pending:** {edit_scheduler.pending()}",
+            inline=True
+        )
+
         await ctx.send(embed=embed)
 
     @commands.command(name="maintenance", hidden=True)
@@ -1259,7 +1302,7 @@ class AdminCog(commands.Cog):
             return
 
         if action.lower() == "on":
-            db['maintenance_mode'] = True
+            await get_storage().set('maintenance_mode', True)
             embed = discord.Embed(
                 title="🔧 Maintenance Mode Activated",
                 description="**The bot is now in maintenance mode.**\n\n"
@@ -1269,8 +1312,7 @@ class AdminCog(commands.Cog):
                 color=COLORS['warning']
             )
         elif action.lower() == "off":
-            if 'maintenance_mode' in db:
-                del db['maintenance_mode']
+            await get_storage().delete('maintenance_mode')
             embed = discord.Embed(
                 title="✅ Maintenance Mode Deactivated",
                 description="**The bot is now fully operational.**\n\n"
@@ -1279,7 +1321,7 @@ class AdminCog(commands.Cog):
                 color=COLORS['success']
             )
         else:
-            is_maintenance = db.get('maintenance_mode', False)
+            is_maintenance = await get_storage().get('maintenance_mode', False)
             status = "🔧 ACTIVE" if is_maintenance else "✅ INACTIVE"
             embed = discord.Embed(
                 title="🔧 Maintenance Mode Status",
@@ -1304,12 +1346,12 @@ class AdminCog(commands.Cog):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             if data_type.lower() in ["all", "players"]:
-                player_data = {k: v for k, v in db.items() if k.startswith('player_')}
-                db[f'backup_players_{timestamp}'] = player_data
+                player_data = await get_storage().scan_prefix('player_')
+                await get_storage().set(f'backup_players_{timestamp}', player_data)
                 
             if data_type.lower() in ["all", "guilds"]:
-                guild_data = {k: v for k, v in db.items() if k.startswith('guild_')}
-                db[f'backup_guilds_{timestamp}'] = guild_data
+                guild_data = await get_storage().scan_prefix('guild_')
+                await get_storage().set(f'backup_guilds_{timestamp}', guild_data)
 
             embed = discord.Embed(
                 title="✅ Backup Complete",
@@ -1343,7 +1385,7 @@ class AdminCog(commands.Cog):
             cleaned_count = 0
             
             # Clean old backups
-            for key in list(db.keys()):
+            for key in await get_storage().keys('backup_'):
                 if key.startswith('backup_'):
                     try:
                         # Extract timestamp from backup key
@@ -1351,7 +1393,7 @@ class AdminCog(commands.Cog):
                         backup_date = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
                         
                         if backup_date < cutoff_date:
-                            del db[key]
+                            await get_storage().delete(key)
                             cleaned_count += 1
                     except:
                         continue
@@ -1376,6 +1418,144 @@ class AdminCog(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.command(name="rebuildleaderboard", aliases=["rebuildlb"], hidden=True)
+    @commands.has_permissions(administrator=True)
+    async def rebuild_leaderboard(self, ctx):
+        """Rebuild the sorted leaderboard index from stored player data (ADMIN ONLY)."""
+        await ctx.send("🔄 Rebuilding leaderboard index... This may take a moment.")
+
+        try:
+            start = time.perf_counter()
+            indexed = await leaderboard_index.rebuild()
+            elapsed = time.perf_counter() - start
+
+            embed = discord.Embed(
+                title="✅ Leaderboard Rebuilt",
+                description=f"**Players Indexed:** {format_number(indexed)}\n"
+                           f"**Time Taken:** {elapsed:.2f}s",
+                color=COLORS['success']
+            )
+        except Exception as e:
+            embed = discord.Embed(
+                title="❌ Rebuild Failed",
+                description=f"**Error rebuilding leaderboard:**\n```{str(e)}```",
+                color=COLORS['error']
+            )
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name="balancereport", aliases=["balancesim"], hidden=True)
+    async def balance_report(self, ctx, fights: int = 1000, monsters: str = "enhanced"):
+        """Simulate every class against every monster and report win rates (OWNER ONLY)."""
+        if not self.is_owner_or_admin(ctx.author.id):
+            await ctx.send("❌ Owner access required!")
+            return
+
+        from utils import balance_sim
+        if not balance_sim.NUMPY_AVAILABLE:
+            await ctx.send("❌ The balance simulator needs NumPy installed on the host.")
+            return
+        if monsters not in ("enhanced", "tactical", "all"):
+            await ctx.send("❌ Monsters must be `enhanced`, `tactical` or `all`.")
+            return
+        # Keep the whole sweep to a bounded amount of CPU time inside the bot process
+        combinations = balance_sim.combination_count(source=monsters)
+        fights = max(100, min(fights, 20000, balance_sim.MAX_SWEEP_FIGHTS // combinations))
+
+        await ctx.send(f"🎲 Simulating {format_number(fights)} fights per combination... This may take a moment.")
+
+        try:
+            # CPU-bound, so keep it off the event loop
+            loop = asyncio.get_running_loop()
+            sweep = await loop.run_in_executor(None, lambda: balance_sim.run_sweep(fights=fights, source=monsters))
+
+            flagged = sweep['flagged']
+            flagged_text = "\n".join(
+                f"• **{result['class'].title()}** vs {result['monster']} (Lv {result['level']}): "
+                f"{result['win_rate'] * 100:.0f}% — {balance_sim.flag(result)}"
+                for result in flagged[:10]
+            )
+            if len(flagged) > 10:
+                flagged_text += f"\n*...and {len(flagged) - 10} more in the attached report*"
+
+            embed = discord.Embed(
+                title="🎲 Balance Report",
+                description=f"**Fights Simulated:** {format_number(sweep['fights'])}\n"
+                           f"**Combinations:** {format_number(len(sweep['results']))}\n"
+                           f"**Time Taken:** {sweep['elapsed']:.2f}s",
+                color=COLORS['warning'] if flagged else COLORS['success']
+            )
+            embed.add_field(name=f"⚠️ Flagged ({len(flagged)})", value=flagged_text or "None", inline=False)
+
+            report = discord.File(io.BytesIO(sweep['report'].encode()), filename="balance_report.txt")
+            await ctx.send(embed=embed, file=report)
+        except Exception as e:
+            embed = discord.Embed(
+                title="❌ Simulation Failed",
+                description=f"**Error running balance sweep:**\n```{str(e)}```",
+                color=COLORS['error']
+            )
+            await ctx.send(embed=embed)
+
+    @commands.command(name="ratingreplay", hidden=True)
+    async def rating_replay(self, ctx, mode: str = "preview"):
+        """Rebuild arena ratings from the stored rating periods. Use `apply` to write them back (OWNER ONLY)."""
+        if not self.is_owner_or_admin(ctx.author.id):
+            await ctx.send("❌ Owner access required!")
+            return
+
+        from utils import ratings
+        segments = await ratings.arena_ratings.history()
+        if not segments:
+            await ctx.send("❌ No closed rating periods to replay yet.")
+            return
+
+        try:
+            started = time.time()
+            loop = asyncio.get_running_loop()
+            replayed = await loop.run_in_executor(None, lambda: ratings.replay(segments, ratings.arena_ratings.tau))
+            elapsed = time.time() - started
+
+            applied = 0
+            if mode.lower() == "apply":
+                rpg_core = self.bot.get_cog('RPGCore')
+                if not rpg_core:
+                    await ctx.send("❌ RPG system not loaded.")
+                    return
+                for user_id, (rating, rd, volatility, last_period) in replayed.items():
+                    fields = {
+                        'arena_rating': max(0, round(rating)),
+                        'arena_rd': round(rd, 2),
+                        'arena_volatility': round(volatility, 6),
+                        'arena_rating_period': last_period
+                    }
+                    if await rpg_core.patch_player_data(user_id, sets=fields):
+                        applied += 1
+
+            top = sorted(replayed.items(), key=lambda item: item[1][0], reverse=True)[:5]
+            embed = discord.Embed(
+                title="📈 Arena Rating Replay",
+                description=f"**Periods:** {format_number(len(segments))}\n"
+                           f"**Matches:** {format_number(sum(len(segment['s']) for segment in segments))}\n"
+                           f"**Players:** {format_number(len(replayed))}\n"
+                           f"**Time Taken:** {elapsed:.2f}s",
+                color=COLORS['success'] if applied else COLORS['primary']
+            )
+            embed.add_field(
+                name="🏆 Top Replayed Ratings",
+                value="\n".join(f"<@{user_id}> - {round(rating)} (±{round(rd)})" for user_id, (rating, rd, _, _) in top),
+                inline=False
+            )
+            embed.set_footer(text=f"Applied to {applied} players" if mode.lower() == "apply" else "Preview only - use `ratingreplay apply` to write")
+            await ctx.send(embed=embed)
+        except Exception as e:
+            embed = discord.Embed(
+                title="❌ Replay Failed",
+                description=f"**Error replaying rating periods:**\n```{str(e)}```",
+                color=COLORS['error']
+            )
+            await ctx.send(embed=embed)
+
     @commands.command(name="eval", hidden=True)
     async def evaluate_code(self, ctx, *, code):
         """Execute Python code (OWNER ONLY - DANGEROUS)."""
@@ -1389,7 +1569,7 @@ class AdminCog(commands.Cog):
                 'discord': discord,
                 'bot': self.bot,
                 'ctx': ctx,
-                'db': db,
+                'storage': get_storage(),
                 'format_number': format_number,
                 'COLORS': COLORS,
                 '__import__': None,
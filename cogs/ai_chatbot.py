@@ -18,7 +18,7 @@ except ImportError:
 
 from config import COLORS, EMOJIS, get_server_config, is_module_enabled, get_ai_api_key
 from utils.helpers import create_embed
-from replit import db
+from utils.dispatch import message_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -110,36 +110,30 @@ class AIChatbotCog(commands.Cog):
             logger.error(f"Error generating AI response: {e}")
             return f"❌ Sorry, I encountered an error: {str(e)}"
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Handle messages for AI chat."""
-        if message.author.bot:
-            return
+    async def cog_load(self):
+        message_dispatcher.register("ai_chat", self.wants_message, self.chat_message)
 
-        # Check if bot is mentioned or message is a reply to bot
-        bot_mentioned = self.bot.user in message.mentions
-        reply_to_bot = (message.reference and 
-                       message.reference.message_id and 
-                       message.reference.cached_message and 
-                       message.reference.cached_message.author == self.bot.user)
+    async def cog_unload(self):
+        message_dispatcher.unregister("ai_chat")
 
-        if not bot_mentioned and not reply_to_bot:
-            return
+    def wants_message(self, context):
+        """Only mentions of or replies to the bot, in guilds and channels where AI chat is on."""
+        if not (context.mentions_bot or context.reply_to_bot) or not context.guild:
+            return False
 
         # Check if AI is enabled
-        if not is_module_enabled("ai_chatbot", message.guild.id):
-            return
+        if not context.module_enabled("ai_chatbot"):
+            return False
 
         # Check if in allowed channels
-        config = get_server_config(message.guild.id)
-        ai_channels = config.get('ai_channels', [])
-
-        if ai_channels and message.channel.id not in ai_channels:
-            return
+        ai_channels = context.config.get('ai_channels', [])
+        return not ai_channels or context.message.channel.id in ai_channels
 
+    async def chat_message(self, message, context):
+        """Handle messages for AI chat, routed by the message dispatcher."""
         # Clean the message content
         content = message.content
-        if bot_mentioned:
+        if context.mentions_bot:
             content = content.replace(f'<@{self.bot.user.id}>', '').strip()
 
         if not content:
@@ -166,11 +160,11 @@ class AIChatbotCog(commands.Cog):
     @commands.command(name='chat', help='Chat with AI')
     async def chat_command(self, ctx, *, message: str):
         """Direct chat command."""
-        if not is_module_enabled("ai_chatbot", ctx.guild.id):
+        if not await is_module_enabled("ai_chatbot", ctx.guild.id):
             return
 
         # Check if in allowed channels
-        config = get_server_config(ctx.guild.id)
+        config = await get_server_config(ctx.guild.id)
         ai_channels = config.get('ai_channels', [])
 
         if ai_channels and ctx.channel.id not in ai_channels:
@@ -191,12 +185,12 @@ class AIChatbotCog(commands.Cog):
     @app_commands.describe(message="Your message to the AI")
     async def chat_slash(self, interaction: discord.Interaction, message: str):
         """Chat with AI (slash command)."""
-        if not is_module_enabled("ai_chatbot", interaction.guild.id):
+        if not await is_module_enabled("ai_chatbot", interaction.guild.id):
             await interaction.response.send_message("❌ AI chatbot module is disabled!", ephemeral=True)
             return
 
         # Check if in allowed channels
-        config = get_server_config(interaction.guild.id)
+        config = await get_server_config(interaction.guild.id)
         ai_channels = config.get('ai_channels', [])
 
         if ai_channels and interaction.channel.id not in ai_channels:
@@ -217,7 +211,7 @@ class AIChatbotCog(commands.Cog):
     @commands.command(name='clear_chat', help='Clear your chat history')
     async def clear_chat_command(self, ctx):
         """Clear user's chat history."""
-        if not is_module_enabled("ai_chatbot", ctx.guild.id):
+        if not await is_module_enabled("ai_chatbot", ctx.guild.id):
             return
 
         self.clear_conversation_history(ctx.author.id, ctx.guild.id)
@@ -232,7 +226,7 @@ class AIChatbotCog(commands.Cog):
     @app_commands.command(name="clear_chat", description="Clear your chat history")
     async def clear_chat_slash(self, interaction: discord.Interaction):
         """Clear user's chat history (slash command)."""
-        if not is_module_enabled("ai_chatbot", interaction.guild.id):
+        if not await is_module_enabled("ai_chatbot", interaction.guild.id):
             await interaction.response.send_message("❌ AI chatbot module is disabled!", ephemeral=True)
             return
 
@@ -248,7 +242,7 @@ class AIChatbotCog(commands.Cog):
     @commands.command(name='ai_status', help='Check AI system status')
     async def ai_status_command(self, ctx):
         """Check AI system status."""
-        if not is_module_enabled("ai_chatbot", ctx.guild.id):
+        if not await is_module_enabled("ai_chatbot", ctx.guild.id):
             return
 
         embed = discord.Embed(
@@ -271,7 +265,7 @@ class AIChatbotCog(commands.Cog):
             )
 
         # Check configuration
-        config = get_server_config(ctx.guild.id)
+        config = await get_server_config(ctx.guild.id)
         ai_channels = config.get('ai_channels', [])
 
         if ai_channels:
@@ -301,7 +295,7 @@ class AIChatbotCog(commands.Cog):
     @app_commands.command(name="ai_status", description="Check AI system status")
     async def ai_status_slash(self, interaction: discord.Interaction):
         """Check AI system status (slash command)."""
-        if not is_module_enabled("ai_chatbot", interaction.guild.id):
+        if not await is_module_enabled("ai_chatbot", interaction.guild.id):
             await interaction.response.send_message("❌ AI chatbot module is disabled!", ephemeral=True)
             return
 
@@ -325,7 +319,7 @@ class AIChatbotCog(commands.Cog):
             )
 
         # Check configuration
-        config = get_server_config(interaction.guild.id)
+        config = await get_server_config(interaction.guild.id)
         ai_channels = config.get('ai_channels', [])
 
         if ai_channels:
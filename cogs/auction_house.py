@@ -4,34 +4,49 @@ import time
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from replit import db
 import random
 
 from config import COLORS, is_module_enabled
 from utils.helpers import create_embed, format_number
 from rpg_data.game_data import ITEMS, RARITY_COLORS
+from utils.auction_store import auction_store
+from utils.auction_stats import price_rollups
+from utils.escrow import escrow
+from utils.auction_index import AuctionIndex
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How long to wait before retrying an auction that failed to complete
+COMPLETION_RETRY_DELAY = 300
+
+def escrow_ref(auction_id):
+    """The escrow ref bids on an auction are held under."""
+    return f"auction:{auction_id}"
+
 class AuctionHouse(commands.Cog):
     """Player-driven auction house system for rare items and player economy."""
 
     def __init__(self, bot):
         self.bot = bot
         self.active_auctions = {}
-        self.auction_history = {}
+        self.auction_index = AuctionIndex()
+        # Set when a new auction is listed so the cleanup task re-reads the next expiry
+        self.expiry_changed = asyncio.Event()
 
     async def cog_load(self):
         """Initialize auction data from database."""
         try:
             # Load active auctions
-            if "active_auctions" in db:
-                self.active_auctions = dict(db["active_auctions"])
+            self.active_auctions = await auction_store.load()
+            recovered = await escrow.recover_all()
+            if recovered:
+                logger.warning(f"Recovered escrow for {recovered} players after a restart")
+            await self.reconcile_escrow()
+            self.auction_index.build(self.active_auctions)
 
-            # Load auction history
-            if "auction_history" in db:
-                self.auction_history = dict(db["auction_history"])
+            # Load price statistics
+            await price_rollups.load()
 
             # Start auction cleanup task
             self.cleanup_task = asyncio.create_task(self.auction_cleanup_loop())
@@ -40,105 +55,260 @@ class AuctionHouse(commands.Cog):
             logger.error(f"❌ Error initializing auction house: {e}")
 
     async def auction_cleanup_loop(self):
-        """Background task to clean up expired auctions."""
+        """Background task to clean up expired auctions. Sleeps until the next auction ends."""
         while True:
             try:
                 await self.cleanup_expired_auctions()
-                await asyncio.sleep(60)  # Check every minute
+                self.expiry_changed.clear()
+                next_expiry = self.auction_index.next_expiry()
+                delay = None if next_expiry is None else max(0.0, next_expiry - time.time())
+                try:
+                    await asyncio.wait_for(self.expiry_changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
             except Exception as e:
                 logger.error(f"Error in auction cleanup: {e}")
                 await asyncio.sleep(300)  # Wait 5 minutes on error
 
     async def cleanup_expired_auctions(self):
-        """Remove expired auctions and handle winners."""
+        """Settle every expired auction in one batch."""
         current_time = time.time()
-        expired_auctions = []
+        expired = self.auction_index.pop_expired(current_time)
+        if not expired:
+            return
+
+        await self.settle_auctions(expired)
+        for auction_id in expired:
+            if auction_id in self.active_auctions:
+                # Settlement failed; try again later instead of on every wakeup
+                self.auction_index.schedule(auction_id, current_time + COMPLETION_RETRY_DELAY)
+
+    def add_item(self, player_data, item_key, quantity):
+        """Add items to a player's inventory."""
+        inventory = player_data.setdefault('inventory', {})
+        inventory[item_key] = inventory.get(item_key, 0) + quantity
+
+    async def reconcile_escrow(self):
+        """Make auction bids and escrow holds agree after a restart.
+
+        Bids from before escrow are adopted as holds. On tracked auctions, a bid whose hold was voided (its
+        gold was never taken before a crash) falls back to what is actually held, and a hold with no saved
+        bid is released.
+        """
+        refs = {auction_id: escrow_ref(auction_id) for auction_id in self.active_auctions}
+        if not refs:
+            return
+        await escrow.load_refs(refs.values())
 
+        user_ids = set()
         for auction_id, auction_data in self.active_auctions.items():
-            if current_time >= auction_data['end_time']:
-                expired_auctions.append(auction_id)
+            user_ids.update(bid['bidder_id'] for bid in auction_data['bids'])
+            user_ids.update(escrow.holders(refs[auction_id]))
+        if not user_ids:
+            return
 
-        for auction_id in expired_auctions:
-            await self.complete_auction(auction_id)
+        changed = []
+        async with escrow.batch(user_ids, refs.values()) as batch:
+            for auction_id, auction_data in self.active_auctions.items():
+                ref = refs[auction_id]
+                if batch.is_settled(ref):
+                    continue
 
-    async def complete_auction(self, auction_id):
-        """Complete an auction and transfer items/gold."""
-        if auction_id not in self.active_auctions:
+                if not escrow.is_tracked(ref):
+                    # Bids from before escrow: their gold was already taken
+                    for bid in auction_data['bids']:
+                        batch.adopt(bid['bidder_id'], ref, bid['amount'])
+                    continue
+
+                bids = []
+                for bid in auction_data['bids']:
+                    held = batch.held(bid['bidder_id'], ref)
+                    if held >= bid['amount']:
+                        bids.append(bid)
+                    elif held:
+                        bids.append({**bid, 'amount': held})
+                if bids != auction_data['bids']:
+                    auction_data['bids'] = bids
+                    auction_data['current_bid'] = max((bid['amount'] for bid in bids), default=0)
+                    changed.append(auction_id)
+
+                amounts = {bid['bidder_id']: bid['amount'] for bid in bids}
+                for user_id in escrow.holders(ref):
+                    if batch.held(user_id, ref) > amounts.get(user_id, 0):
+                        batch.hold(user_id, ref, amounts.get(user_id, 0))
+
+            if not await batch.commit():
+                logger.error("Failed to reconcile auction escrow holds")
+                return
+
+        for auction_id in changed:
+            await auction_store.save(auction_id, self.active_auctions[auction_id])
+        if changed:
+            logger.warning(f"Dropped unbacked bids from {len(changed)} auctions after restart")
+
+    async def settle_auctions(self, auction_ids):
+        """Complete auctions and transfer items/gold.
+
+        The winner's escrowed bid is paid to the seller and every other hold is released, all as one escrow
+        batch, so a sweep of many auctions touches each player once and either fully happens or doesn't. If
+        the batch fails the auctions are put back, and a multi-auction batch is retried one auction at a time
+        so one bad auction can't hold up the rest.
+        """
+        # Take the auctions out before awaiting, so bids that land mid-settlement see them gone and refund
+        auctions = {auction_id: self.auction_index.remove(auction_id)
+                    for auction_id in auction_ids if auction_id in self.active_auctions}
+        if not auctions:
             return
 
-        auction_data = self.active_auctions[auction_id]
+        refs = {auction_id: escrow_ref(auction_id) for auction_id in auctions}
+        history = {}
+        completed_at = time.time()
 
         try:
-            rpg_core = self.bot.get_cog('RPGCore')
-            if not rpg_core:
-                return
+            await escrow.load_refs(refs.values())
+            user_ids = set()
+            for auction_id, auction_data in auctions.items():
+                user_ids.add(auction_data['seller_id'])
+                user_ids.update(bid['bidder_id'] for bid in auction_data['bids'])
+                user_ids.update(escrow.holders(refs[auction_id]))
+
+            async with escrow.batch(user_ids, refs.values()) as batch:
+                for auction_id, auction_data in auctions.items():
+                    ref = refs[auction_id]
+                    if batch.is_settled(ref):
+                        # Paid out before a restart; only the auction records are left to clean up
+                        continue
+
+                    item_grant = {auction_data['item_key']: auction_data['quantity']}
+
+                    # The highest bid still backed by escrow wins
+                    winner_bid = next(
+                        (bid for bid in sorted(auction_data['bids'], key=lambda x: x['amount'], reverse=True)
+                         if batch.held(bid['bidder_id'], ref) >= bid['amount']),
+                        None
+                    )
+                    if winner_bid:
+                        winner_id = winner_bid['bidder_id']
+                        winning_amount = winner_bid['amount']
+
+                        # Item to winner, gold to seller (minus 5% auction house fee)
+                        fee = int(winning_amount * 0.05)
+                        batch.transfer(winner_id, ref, auction_data['seller_id'], winning_amount, fee)
+                        batch.grant(winner_id, ref, item_grant)
+
+                        history[auction_id] = {
+                            **auction_data,
+                            'winner_id': winner_id,
+                            'final_price': winning_amount,
+                            'completed_at': completed_at
+                        }
+                    else:
+                        # No bids, return item to seller
+                        batch.grant(auction_data['seller_id'], ref, item_grant)
 
-            # If there are bids, transfer to highest bidder
-            if auction_data['bids']:
-                winner_bid = max(auction_data['bids'], key=lambda x: x['amount'])
-                winner_id = winner_bid['bidder_id']
-                winning_amount = winner_bid['amount']
+                    # Refund losing bidders (holders that appeared after the batch was locked refund themselves)
+                    for user_id in escrow.holders(ref):
+                        if user_id in batch.user_ids:
+                            batch.release(user_id, ref)
+                    batch.settle(ref)
 
-                # Get player data
-                winner_data = rpg_core.get_player_data(winner_id)
-                seller_data = rpg_core.get_player_data(auction_data['seller_id'])
+                settled = await batch.commit()
+        except Exception as e:
+            logger.error(f"Error settling {len(auctions)} auctions: {e}")
+            settled = False
+
+        if not settled:
+            for auction_id, auction_data in auctions.items():
+                self.auction_index.add(auction_id, auction_data)
+            if len(auctions) > 1:
+                logger.warning(f"Batch settlement of {len(auctions)} auctions failed; settling one at a time")
+                for auction_id in auctions:
+                    await self.settle_auctions([auction_id])
+            else:
+                logger.error(f"Error completing auction {next(iter(auctions))}; will retry")
+            return
 
-                if winner_data and seller_data:
-                    # Transfer item to winner
-                    if auction_data['item_key'] in winner_data.get('inventory', {}):
-                        winner_data['inventory'][auction_data['item_key']] += auction_data['quantity']
-                    else:
-                        winner_data['inventory'][auction_data['item_key']] = auction_data['quantity']
+        # Save to database
+        # Settled refs are what stop a reloaded auction from paying out again, so keep them until it's gone
+        if await auction_store.finish_many(list(auctions), history):
+            await escrow.forget_refs(refs.values())
+        if history:
+            await price_rollups.record_many(list(history.values()))
+        logger.info(f"Settled {len(auctions)} auctions")
 
-                    # Transfer gold to seller (minus 5% auction house fee)
-                    fee = int(winning_amount * 0.05)
-                    seller_amount = winning_amount - fee
-                    seller_data['gold'] = seller_data.get('gold', 0) + seller_amount
+    def find_item_key(self, item_name):
+        """Resolve an item key from a key or display name."""
+        for key, data in ITEMS.items():
+            if key == item_name.lower().replace(" ", "_") or data['name'].lower() == item_name.lower():
+                return key
+        return None
+
+    def price_summary(self, item_key, quantity=1):
+        """Market price lines for an item, or None if it has never sold."""
+        stats = price_rollups.stats(item_key)
+        if not stats:
+            return None
+        lines = [
+            f"**Sales:** {stats['count']} ({stats['quantity']} units)",
+            f"**Low / Median / High:** {format_number(int(stats['min']))} / {format_number(int(stats['median']))} / "
+            f"{format_number(int(stats['max']))} 💰"
+        ]
+        if stats['vwap_7d']:
+            lines.append(f"**7-day Avg:** {format_number(int(stats['vwap_7d']))} 💰")
+        lines.append(f"**Suggested Start:** {format_number(price_rollups.suggest_price(item_key, quantity))} 💰"
+                     + (f" for x{quantity}" if quantity > 1 else ""))
+        return "\n".join(lines)
+
+    @commands.command(name="price", aliases=["pricecheck", "marketprice"])
+    async def price_check(self, ctx, *, item_name: str):
+        """Show auction price statistics for an item."""
+        if not await is_module_enabled("rpg", ctx.guild.id):
+            return
 
-                    # Refund losing bidders
-                    for bid in auction_data['bids']:
-                        if bid['bidder_id'] != winner_id:
-                            bidder_data = rpg_core.get_player_data(bid['bidder_id'])
-                            if bidder_data:
-                                bidder_data['gold'] = bidder_data.get('gold', 0) + bid['amount']
-                                rpg_core.save_player_data(bid['bidder_id'], bidder_data)
-
-                    # Save winner and seller data
-                    rpg_core.save_player_data(winner_id, winner_data)
-                    rpg_core.save_player_data(auction_data['seller_id'], seller_data)
-
-                    # Record in history
-                    self.auction_history[auction_id] = {
-                        **auction_data,
-                        'winner_id': winner_id,
-                        'final_price': winning_amount,
-                        'completed_at': time.time()
-                    }
+        item_key = self.find_item_key(item_name)
+        if not item_key:
+            await ctx.send(f"❌ Item '{item_name}' not found!")
+            return
 
-            else:
-                # No bids, return item to seller
-                seller_data = rpg_core.get_player_data(auction_data['seller_id'])
-                if seller_data:
-                    if auction_data['item_key'] in seller_data.get('inventory', {}):
-                        seller_data['inventory'][auction_data['item_key']] += auction_data['quantity']
-                    else:
-                        seller_data['inventory'][auction_data['item_key']] = auction_data['quantity']
-                    rpg_core.save_player_data(auction_data['seller_id'], seller_data)
+        item_data = ITEMS[item_key]
+        summary = self.price_summary(item_key)
+        embed = discord.Embed(
+            title=f"📈 Market Price: {item_data['name']}",
+            description=summary or "*\"Nobody's sold one yet. Name your price - it's not cheese, so who cares.\"*",
+            color=RARITY_COLORS.get(item_data['rarity'], COLORS['primary'])
+        )
+        embed.set_footer(text="Prices are per unit, from completed auctions")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="escrow", aliases=["held", "myescrow"])
+    async def show_escrow(self, ctx):
+        """Show how much of your gold is held in escrow by open bids."""
+        if not await is_module_enabled("rpg", ctx.guild.id):
+            return
 
-            # Remove from active auctions
-            del self.active_auctions[auction_id]
+        account = await escrow.balance(str(ctx.author.id))
+        embed = discord.Embed(
+            title="🔒 Escrow",
+            description=f"**Held:** {format_number(account['held'])} 💰\n"
+                        f"*\"Gold you've promised away but haven't lost yet. Like cheese in the fridge.\"*",
+            color=COLORS['info']
+        )
 
-            # Save to database
-            db["active_auctions"] = self.active_auctions
-            db["auction_history"] = self.auction_history
+        lines = []
+        for ref, amount in list(account['holds'].items())[:10]:
+            auction_id = ref.split(':', 1)[-1]
+            auction_data = self.active_auctions.get(auction_id)
+            name = ITEMS.get(auction_data['item_key'], {}).get('name', auction_data['item_key']) if auction_data else "Settling..."
+            lines.append(f"🎯 **{name}** - {format_number(amount)} 💰 (`{auction_id[-8:]}`)")
+        if lines:
+            embed.add_field(name="📋 Open Holds", value="\n".join(lines), inline=False)
 
-        except Exception as e:
-            logger.error(f"Error completing auction {auction_id}: {e}")
+        await ctx.send(embed=embed)
 
     @commands.command(name="auction", aliases=["ah", "auctionhouse", "auctions", "market"])
     async def auction_house_main(self, ctx):
         """Open the main auction house interface."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -146,7 +316,7 @@ class AuctionHouse(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(str(ctx.author.id))
+        player_data = await rpg_core.get_player_data(str(ctx.author.id))
         if not player_data:
             await ctx.send("❌ Create a character first with `$startrpg`!")
             return
@@ -158,7 +328,7 @@ class AuctionHouse(commands.Cog):
     @commands.command(name="sell", aliases=["list", "sellitem"])
     async def sell_item(self, ctx, item_name: str, quantity: int = 1, starting_bid: int = 100, duration: int = 24):
         """Sell an item on the auction house."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         if quantity < 1 or starting_bid < 1 or duration < 1 or duration > 168:
@@ -170,18 +340,13 @@ class AuctionHouse(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(str(ctx.author.id))
+        player_data = await rpg_core.get_player_data(str(ctx.author.id))
         if not player_data:
             await ctx.send("❌ Create a character first with `$startrpg`!")
             return
 
         # Find item in inventory
-        item_key = None
-        for key, data in ITEMS.items():
-            if key == item_name.lower().replace(" ", "_") or data['name'].lower() == item_name.lower():
-                item_key = key
-                break
-
+        item_key = self.find_item_key(item_name)
         if not item_key:
             await ctx.send(f"❌ Item '{item_name}' not found!")
             return
@@ -208,16 +373,31 @@ class AuctionHouse(commands.Cog):
             'duration_hours': duration
         }
 
-        # Remove item from inventory
-        inventory[item_key] -= quantity
-        if inventory[item_key] <= 0:
-            del inventory[item_key]
-        player_data['inventory'] = inventory
-        rpg_core.save_player_data(str(ctx.author.id), player_data)
+        def take_item(player_data):
+            # Remove item from inventory
+            inventory = player_data.get('inventory', {})
+            if inventory.get(item_key, 0) < quantity:
+                return False
+            inventory[item_key] -= quantity
+            if inventory[item_key] <= 0:
+                del inventory[item_key]
+
+        if not await rpg_core.mutate_player_data(str(ctx.author.id), take_item):
+            await ctx.send(f"❌ You don't have {quantity} {ITEMS[item_key]['name']}!")
+            return
+
+        if not await auction_store.create(auction_id, auction_data):
+            # The item was already taken; give it back rather than lose it with the unsaved auction
+            def return_item(player_data):
+                self.add_item(player_data, item_key, quantity)
+
+            await rpg_core.mutate_player_data(str(ctx.author.id), return_item)
+            await ctx.send("❌ Couldn't create the auction right now. Your items have been returned.")
+            return
 
         # Add to active auctions
-        self.active_auctions[auction_id] = auction_data
-        db["active_auctions"] = self.active_auctions
+        self.auction_index.add(auction_id, auction_data)
+        self.expiry_changed.set()
 
         item_data = ITEMS[item_key]
         embed = discord.Embed(
@@ -234,12 +414,16 @@ class AuctionHouse(commands.Cog):
             inline=True
         )
 
+        summary = self.price_summary(item_key, quantity)
+        if summary:
+            embed.add_field(name="📈 Market Price", value=summary, inline=True)
+
         await ctx.send(embed=embed)
 
     @commands.command(name="bid", aliases=["placebid", "offer"])
     async def place_bid(self, ctx, auction_id: str, amount: int):
         """Place a bid on an auction."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         if amount < 1:
@@ -251,7 +435,7 @@ class AuctionHouse(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(str(ctx.author.id))
+        player_data = await rpg_core.get_player_data(str(ctx.author.id))
         if not player_data:
             await ctx.send("❌ Create a character first with `$startrpg`!")
             return
@@ -278,26 +462,33 @@ class AuctionHouse(commands.Cog):
             await ctx.send(f"❌ Minimum bid is {format_number(minimum_bid)} 💰!")
             return
 
-        # Check if player has enough gold
-        current_gold = player_data.get('gold', 0)
-        if current_gold < amount:
-            await ctx.send(f"❌ You need {format_number(amount)} 💰 but only have {format_number(current_gold)} 💰!")
-            return
-
         # Refund previous bid from this player
         previous_bid = None
         for bid in auction_data['bids']:
             if bid['bidder_id'] == str(ctx.author.id):
                 previous_bid = bid
                 break
+        refund = previous_bid['amount'] if previous_bid else 0
+
+        # Hold the bid in escrow; only the difference from a previous bid is taken
+        ref = escrow_ref(auction_id)
+        if not await escrow.hold(str(ctx.author.id), ref, amount):
+            await ctx.send(f"❌ You need {format_number(amount)} 💰 but only have {format_number(player_data.get('gold', 0) + refund)} 💰!")
+            return
+
+        # The auction may have moved on while the bid was being charged
+        if (auction_id not in self.active_auctions or amount <= auction_data['current_bid']
+                or (previous_bid and previous_bid not in auction_data['bids'])):
+            if auction_id in self.active_auctions and previous_bid in auction_data['bids']:
+                await escrow.hold(str(ctx.author.id), ref, refund)
+            else:
+                await escrow.release(str(ctx.author.id), ref)
+            await ctx.send("❌ You were outbid while placing your bid - your gold has been returned.")
+            return
 
         if previous_bid:
-            player_data['gold'] += previous_bid['amount']
             auction_data['bids'].remove(previous_bid)
 
-        # Deduct gold for new bid
-        player_data['gold'] -= amount
-
         # Add new bid
         new_bid = {
             'bidder_id': str(ctx.author.id),
@@ -306,11 +497,10 @@ class AuctionHouse(commands.Cog):
         }
         auction_data['bids'].append(new_bid)
         auction_data['current_bid'] = amount
+        self.auction_index.add_bid(auction_id, str(ctx.author.id))
 
         # Save data
-        rpg_core.save_player_data(str(ctx.author.id), player_data)
-        self.active_auctions[auction_id] = auction_data
-        db["active_auctions"] = self.active_auctions
+        await auction_store.save(auction_id, auction_data)
 
         item_data = ITEMS[auction_data['item_key']]
         embed = discord.Embed(
@@ -424,19 +614,19 @@ class AuctionBrowseView(discord.ui.View):
 
     def create_browse_embed(self):
         """Create the browse auctions embed."""
-        filtered_auctions = self.get_filtered_auctions()
+        total = self.get_filtered_count()
 
         embed = discord.Embed(
             title="🔍 Browse Active Auctions",
             description=f"*\"Look at all this junk people are selling! None of it's cheese, obviously.\"*\n\n"
-                       f"**Filter:** {self.current_filter.title()} | **Total:** {len(filtered_auctions)}",
+                       f"**Filter:** {self.current_filter.title()} | **Total:** {total}",
             color=COLORS['info']
         )
 
         # Paginate auctions
         start_idx = self.current_page * self.items_per_page
         end_idx = start_idx + self.items_per_page
-        page_auctions = list(filtered_auctions.items())[start_idx:end_idx]
+        page_auctions = self.auction_house.auction_index.browse(self.current_filter, time.time(), start_idx, end_idx)
 
         if not page_auctions:
             embed.add_field(
@@ -470,28 +660,14 @@ class AuctionBrowseView(discord.ui.View):
                     inline=True
                 )
 
-        total_pages = max(1, (len(filtered_auctions) + self.items_per_page - 1) // self.items_per_page)
+        total_pages = max(1, (total + self.items_per_page - 1) // self.items_per_page)
         embed.set_footer(text=f"Page {self.current_page + 1}/{total_pages} • Use buttons to navigate")
 
         return embed
 
-    def get_filtered_auctions(self):
-        """Get auctions filtered by current filter."""
-        filtered = {}
-        current_time = time.time()
-
-        for auction_id, auction_data in self.auction_house.active_auctions.items():
-            if auction_data['end_time'] <= current_time:
-                continue
-
-            if self.current_filter == "all":
-                filtered[auction_id] = auction_data
-            else:
-                item_data = ITEMS.get(auction_data['item_key'], {})
-                if item_data.get('rarity', 'common') == self.current_filter:
-                    filtered[auction_id] = auction_data
-
-        return filtered
+    def get_filtered_count(self):
+        """Number of running auctions matching the current filter."""
+        return self.auction_house.auction_index.count(self.current_filter, time.time())
 
     def get_rarity_emoji(self, rarity):
         """Get emoji for rarity."""
@@ -547,8 +723,7 @@ class AuctionBrowseView(discord.ui.View):
             await interaction.response.send_message("❌ Not your navigation!", ephemeral=True)
             return
 
-        filtered_auctions = self.get_filtered_auctions()
-        max_pages = max(1, (len(filtered_auctions) + self.items_per_page - 1) // self.items_per_page)
+        max_pages = max(1, (self.get_filtered_count() + self.items_per_page - 1) // self.items_per_page)
 
         if self.current_page < max_pages - 1:
             self.current_page += 1
@@ -609,6 +784,10 @@ class SellItemView(discord.ui.View):
                       f"**Your Cut:** 95% of final bid",
                 inline=True
             )
+
+            summary = self.auction_house.price_summary(self.selected_item, self.quantity)
+            if summary:
+                embed.add_field(name="📈 Market Price", value=summary, inline=False)
         else:
             embed.add_field(
                 name="📋 Instructions",
@@ -713,26 +892,17 @@ class MyAuctionsView(discord.ui.View):
 
     def get_my_selling_auctions(self):
         """Get auctions where user is the seller."""
-        my_auctions = {}
-        current_time = time.time()
-
-        for auction_id, auction_data in self.auction_house.active_auctions.items():
-            if auction_data['seller_id'] == self.user_id and auction_data['end_time'] > current_time:
-                my_auctions[auction_id] = auction_data
-
-        return my_auctions
+        return dict(self.auction_house.auction_index.by_seller(self.user_id, time.time()))
 
     def get_my_bidding_auctions(self):
         """Get auctions where user has placed bids."""
         my_bids = {}
-        current_time = time.time()
 
-        for auction_id, auction_data in self.auction_house.active_auctions.items():
-            if auction_data['end_time'] > current_time:
-                for bid in auction_data['bids']:
-                    if bid['bidder_id'] == self.user_id:
-                        my_bids[auction_id] = (auction_data, bid)
-                        break
+        for auction_id, auction_data in self.auction_house.auction_index.by_bidder(self.user_id, time.time()):
+            for bid in auction_data['bids']:
+                if bid['bidder_id'] == self.user_id:
+                    my_bids[auction_id] = (auction_data, bid)
+                    break
 
         return my_bids
 
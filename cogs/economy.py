@@ -5,7 +5,7 @@ import random
 import time
 from datetime import datetime, timedelta
 from utils.helpers import create_embed, format_number
-from utils.database import get_user_data, update_user_data, ensure_user_exists
+from utils.database import get_user_data, ensure_user_exists, patch_user_data
 from config import COLORS, is_module_enabled
 import logging
 
@@ -169,7 +169,7 @@ class JobConfirmView(discord.ui.View):
 
         await interaction.response.defer()
 
-        user_data = get_user_data(self.user_id) or {}
+        user_data = await get_user_data(self.user_id) or {}
         last_work = user_data.get('last_work', 0)
         job_info = self.job_data[self.job]
 
@@ -206,8 +206,7 @@ class JobConfirmView(discord.ui.View):
                 earnings += rare_bonus
                 bonus_text = f"\n⭐ **Exceptional Work:** +{rare_bonus} gold bonus!"
 
-            user_data['balance'] = user_data.get('balance', 0) + earnings
-            user_data['last_work'] = time.time()
+            balance_change = earnings
             
             # Work-specific success messages
             success_messages = {
@@ -238,8 +237,7 @@ class JobConfirmView(discord.ui.View):
             }
 
             penalty = random.randint(50, 150)
-            user_data['balance'] = max(0, user_data.get('balance', 0) - penalty)
-            user_data['last_work'] = time.time()
+            balance_change = -min(penalty, user_data.get('balance', 0))
 
             embed = discord.Embed(
                 title="❌ Work Failed!",
@@ -248,7 +246,7 @@ class JobConfirmView(discord.ui.View):
                 color=COLORS['error']
             )
 
-        update_user_data(self.user_id, user_data)
+        await patch_user_data(self.user_id, {'balance': balance_change}, {'last_work': time.time()})
         await interaction.followup.edit_message(interaction.message.id, embed=embed, view=None)
 
     @discord.ui.button(label="❌ Decline", style=discord.ButtonStyle.danger, emoji="❌")
@@ -375,7 +373,7 @@ class SlotsView(discord.ui.View):
 
         await interaction.response.defer()
 
-        user_data = get_user_data(self.user_id) or {}
+        user_data = await get_user_data(self.user_id) or {}
         balance = user_data.get('balance', 0)
 
         if balance < self.bet_amount:
@@ -411,8 +409,7 @@ class SlotsView(discord.ui.View):
         winnings = self.bet_amount * multiplier
         net_change = winnings - self.bet_amount
 
-        user_data['balance'] = balance + net_change
-        update_user_data(self.user_id, user_data)
+        await patch_user_data(self.user_id, {'balance': net_change})
 
         if multiplier > 0:
             embed = discord.Embed(
@@ -445,10 +442,10 @@ class Economy(commands.Cog):
     @commands.command(name="work", aliases=["job"])
     async def work(self, ctx):
         """Open the interactive job board."""
-        if not is_module_enabled("economy", ctx.guild.id):
+        if not await is_module_enabled("economy", ctx.guild.id):
             return
 
-        ensure_user_exists(str(ctx.author.id))
+        await ensure_user_exists(str(ctx.author.id))
         
         view = JobSelectionView(str(ctx.author.id))
         embed = discord.Embed(
@@ -470,10 +467,10 @@ class Economy(commands.Cog):
     @commands.command(name="casino", aliases=["gamble", "bet"])
     async def casino(self, ctx):
         """Open the interactive casino."""
-        if not is_module_enabled("economy", ctx.guild.id):
+        if not await is_module_enabled("economy", ctx.guild.id):
             return
 
-        ensure_user_exists(str(ctx.author.id))
+        await ensure_user_exists(str(ctx.author.id))
         
         view = CasinoView(str(ctx.author.id))
         embed = discord.Embed(
@@ -497,7 +494,7 @@ class Economy(commands.Cog):
     async def balance(self, ctx, member: discord.Member = None):
         """Check gold balance with interactive display."""
         target = member or ctx.author
-        user_data = get_user_data(str(target.id)) or {}
+        user_data = await get_user_data(str(target.id)) or {}
         balance = user_data.get('balance', 0)
 
         embed = discord.Embed(
@@ -1637,11 +1637,11 @@ class HelpCog(commands.Cog):
     @commands.command(name="help", aliases=["h", "commands", "menu"])
     async def help_command(self, ctx):
         """Display the interactive help menu with full navigation."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         # Get server configuration for prefix
-        config = get_server_config(ctx.guild.id)
+        config = await get_server_config(ctx.guild.id)
         prefix = config.get('prefix', '$')
 
         view = MainMenuView(self.bot, prefix)
@@ -1653,7 +1653,7 @@ class HelpCog(commands.Cog):
     async def tutorial_command(self, ctx):
         """Start the interactive tutorial for new players."""
         # Get server configuration for prefix
-        config = get_server_config(ctx.guild.id)
+        config = await get_server_config(ctx.guild.id)
         prefix = config.get('prefix', '$')
 
         embed = discord.Embed(
@@ -1681,7 +1681,7 @@ class HelpCog(commands.Cog):
     async def info_command(self, ctx):
         """Display detailed game information panels for advanced players."""
         # Get server configuration for prefix
-        config = get_server_config(ctx.guild.id)
+        config = await get_server_config(ctx.guild.id)
         prefix = config.get('prefix', '$')
 
         embed = discord.Embed(
@@ -1708,7 +1708,7 @@ class HelpCog(commands.Cog):
     async def quick_help(self, ctx):
         """Display a quick reference for essential commands."""
         # Get server configuration for prefix
-        config = get_server_config(ctx.guild.id)
+        config = await get_server_config(ctx.guild.id)
         prefix = config.get('prefix', '$')
 
         embed = discord.Embed(
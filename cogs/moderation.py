@@ -3,14 +3,16 @@ from discord.ext import commands
 from discord import app_commands
 from datetime import datetime, timedelta
 import asyncio
-import re
 import logging
 from typing import Optional, Dict, List, Any
 
 from config import COLORS, EMOJIS, user_has_permission, is_module_enabled, get_server_config, update_server_config
 from utils.helpers import create_embed, format_duration
 from utils.database import get_user_data, update_user_data
-from replit import db
+from utils.storage import get_storage
+from utils.dispatch import message_dispatcher
+from utils.rate_tracker import RateTracker
+from utils.content_filter import CompiledRuleSet, DEFAULT_FILTER_WORDS, DEFAULT_SPAM_PATTERNS
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +22,12 @@ class ModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.muted_users = {}  # Simple in-memory storage for muted users
-        self.spam_tracker = {}  # Track spam patterns
+        self.spam_tracker = RateTracker(limit=5, window=10.0)  # Messages per (user, channel)
         self.warned_users = {}  # Track recently warned users
         
-        # Auto-moderation patterns
-        self.spam_patterns = [
-            r'(.)\1{4,}',  # Repeated characters
-            r'[A-Z]{5,}',  # Excessive caps
-            r'(.{1,10})\1{3,}',  # Repeated phrases
-        ]
-        
-        # Basic inappropriate words filter (extend as needed)
-        self.inappropriate_words = [
-            'spam', 'test_inappropriate'  # Add your filter words here
-        ]
+        # Compiled auto-moderation rules per guild, rebuilt when the guild's filter config changes
+        self.rule_sets: Dict[int, CompiledRuleSet] = {}
+        self.default_rules = CompiledRuleSet(DEFAULT_FILTER_WORDS, DEFAULT_SPAM_PATTERNS)
         
     def can_moderate(self, user: discord.Member, target: discord.Member) -> bool:
         """Check if user can moderate target."""
@@ -48,11 +42,11 @@ class ModerationCog(commands.Cog):
             
         return True
         
-    def add_warning(self, user_id: int, guild_id: int, reason: str, moderator_id: int) -> int:
+    async def add_warning(self, user_id: int, guild_id: int, reason: str, moderator_id: int) -> int:
         """Add a warning to user."""
         try:
             warnings_key = f"warnings_{guild_id}_{user_id}"
-            warnings = db.get(warnings_key, [])
+            warnings = await get_storage().get(warnings_key, [])
             
             warning = {
                 'reason': reason,
@@ -61,101 +55,89 @@ class ModerationCog(commands.Cog):
             }
             
             warnings.append(warning)
-            db[warnings_key] = warnings
+            await get_storage().set(warnings_key, warnings)
             
             return len(warnings)
         except Exception as e:
             logger.error(f"Error adding warning: {e}")
             return 0
             
-    def get_user_warnings(self, user_id: int, guild_id: int) -> List[Dict[str, Any]]:
+    async def get_user_warnings(self, user_id: int, guild_id: int) -> List[Dict[str, Any]]:
         """Get user warnings."""
         try:
             warnings_key = f"warnings_{guild_id}_{user_id}"
-            return db.get(warnings_key, [])
+            return await get_storage().get(warnings_key, [])
         except Exception as e:
             logger.error(f"Error getting warnings: {e}")
             return []
             
-    def clear_user_warnings(self, user_id: int, guild_id: int) -> bool:
+    async def clear_user_warnings(self, user_id: int, guild_id: int) -> bool:
         """Clear user warnings."""
         try:
             warnings_key = f"warnings_{guild_id}_{user_id}"
-            db[warnings_key] = []
+            await get_storage().set(warnings_key, [])
             return True
         except Exception as e:
             logger.error(f"Error clearing warnings: {e}")
             return False
             
-    def is_spam(self, message: discord.Message) -> bool:
+    def get_rule_set(self, guild_id: int, auto_moderation: Dict[str, Any]) -> CompiledRuleSet:
+        """Get a guild's compiled rules, rebuilding them only if its filter config changed."""
+        rules = self.rule_sets.get(guild_id)
+        if rules is not None and rules.source is auto_moderation:
+            return rules
+        if rules is not None and rules.key == CompiledRuleSet.config_key(auto_moderation):
+            # A reload of the same config; remember the new object so the identity check hits next time
+            rules.source = auto_moderation
+            return rules
+        rules = CompiledRuleSet.from_config(auto_moderation)
+        self.rule_sets[guild_id] = rules
+        return rules
+
+    def is_spam(self, message: discord.Message, rules: Optional[CompiledRuleSet] = None) -> bool:
         """Check if message is spam."""
         content = message.content.lower()
         
         # Check for repeated characters/patterns
-        for pattern in self.spam_patterns:
-            if re.search(pattern, content):
-                return True
-                
-        # Check for rapid message sending
-        user_id = message.author.id
-        channel_id = message.channel.id
-        
-        if user_id not in self.spam_tracker:
-            self.spam_tracker[user_id] = {}
-            
-        if channel_id not in self.spam_tracker[user_id]:
-            self.spam_tracker[user_id][channel_id] = []
-            
-        now = datetime.now()
-        self.spam_tracker[user_id][channel_id].append(now)
-        
-        # Clean old entries
-        cutoff = now - timedelta(seconds=10)
-        self.spam_tracker[user_id][channel_id] = [
-            ts for ts in self.spam_tracker[user_id][channel_id] if ts > cutoff
-        ]
-        
-        # Check if too many messages in short time
-        if len(self.spam_tracker[user_id][channel_id]) > 5:
+        if (rules or self.default_rules).matches_pattern(content):
             return True
-            
-        return False
+                
+        # Check for rapid message sending (more than 5 messages in 10 seconds)
+        return self.spam_tracker.hit((message.author.id, message.channel.id))
         
-    def has_inappropriate_content(self, message: discord.Message) -> bool:
+    def has_inappropriate_content(self, message: discord.Message, rules: Optional[CompiledRuleSet] = None) -> bool:
         """Check if message has inappropriate content."""
-        content = message.content.lower()
+        return (rules or self.default_rules).find_word(message.content.lower()) is not None
         
-        for word in self.inappropriate_words:
-            if word in content:
-                return True
-                
-        return False
-        
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Auto-moderation listener."""
-        if not message.guild or message.author.bot:
-            return
-            
-        # Check if auto-moderation is enabled
-        config = get_server_config(message.guild.id)
-        if not config.get('auto_moderation', {}).get('enabled', False):
-            return
-            
+    async def cog_load(self):
+        message_dispatcher.register("auto_moderation", self.wants_message, self.moderate_message)
+
+    async def cog_unload(self):
+        message_dispatcher.unregister("auto_moderation")
+
+    def wants_message(self, context):
+        """Only guild messages with auto-moderation on, from non-moderators."""
+        if not context.guild:
+            return False
+        if not context.config.get('auto_moderation', {}).get('enabled', False):
+            return False
         # Skip if user has moderate permissions
-        if user_has_permission(message.author, 'moderator'):
-            return
-            
+        return not user_has_permission(context.message.author, 'moderator')
+
+    async def moderate_message(self, message, context):
+        """Auto-moderation handler, routed by the message dispatcher."""
+        config = context.config
+        rules = self.get_rule_set(message.guild.id, config['auto_moderation'])
         actions_taken = []
         
         # Check for spam
-        if config['auto_moderation'].get('spam_detection', True) and self.is_spam(message):
+        if config['auto_moderation'].get('spam_detection', True) and self.is_spam(message, rules):
             try:
                 await message.delete()
                 actions_taken.append("deleted spam message")
                 
                 # Add warning
-                warning_count = self.add_warning(
+                warning_count = await self.add_warning(
                     message.author.id, 
                     message.guild.id, 
                     "Automatic spam detection", 
@@ -174,13 +156,13 @@ class ModerationCog(commands.Cog):
                 pass
                 
         # Check for inappropriate content
-        if config['auto_moderation'].get('inappropriate_content', True) and self.has_inappropriate_content(message):
+        if config['auto_moderation'].get('inappropriate_content', True) and self.has_inappropriate_content(message, rules):
             try:
                 await message.delete()
                 actions_taken.append("deleted inappropriate content")
                 
                 # Add warning
-                warning_count = self.add_warning(
+                warning_count = await self.add_warning(
                     message.author.id, 
                     message.guild.id, 
                     "Inappropriate content", 
@@ -223,7 +205,7 @@ class ModerationCog(commands.Cog):
     @commands.bot_has_permissions(kick_members=True)
     async def kick_command(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Kick a member from the server."""
-        if not is_module_enabled("moderation", ctx.guild.id):
+        if not await is_module_enabled("moderation", ctx.guild.id):
             return
             
         if not self.can_moderate(ctx.author, member):
@@ -255,7 +237,7 @@ class ModerationCog(commands.Cog):
     @commands.bot_has_permissions(ban_members=True)
     async def ban_command(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Ban a member from the server."""
-        if not is_module_enabled("moderation", ctx.guild.id):
+        if not await is_module_enabled("moderation", ctx.guild.id):
             return
             
         if not self.can_moderate(ctx.author, member):
@@ -286,7 +268,7 @@ class ModerationCog(commands.Cog):
     @commands.has_permissions(kick_members=True)
     async def warn_command(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Warn a member."""
-        if not is_module_enabled("moderation", ctx.guild.id):
+        if not await is_module_enabled("moderation", ctx.guild.id):
             return
             
         if not self.can_moderate(ctx.author, member):
@@ -294,7 +276,7 @@ class ModerationCog(commands.Cog):
             return
             
         try:
-            warning_count = self.add_warning(member.id, ctx.guild.id, reason, ctx.author.id)
+            warning_count = await self.add_warning(member.id, ctx.guild.id, reason, ctx.author.id)
             
             embed = create_embed(
                 "⚠️ Member Warned",
@@ -316,13 +298,13 @@ class ModerationCog(commands.Cog):
     @commands.has_permissions(kick_members=True)
     async def warnings_command(self, ctx, member: discord.Member = None):
         """View user warnings."""
-        if not is_module_enabled("moderation", ctx.guild.id):
+        if not await is_module_enabled("moderation", ctx.guild.id):
             return
             
         if not member:
             member = ctx.author
             
-        warnings = self.get_user_warnings(member.id, ctx.guild.id)
+        warnings = await self.get_user_warnings(member.id, ctx.guild.id)
         
         if not warnings:
             await ctx.send(f"No warnings found for {member.mention}")
@@ -349,7 +331,7 @@ class ModerationCog(commands.Cog):
     @commands.bot_has_permissions(manage_messages=True)
     async def purge_command(self, ctx, amount: int):
         """Delete multiple messages."""
-        if not is_module_enabled("moderation", ctx.guild.id):
+        if not await is_module_enabled("moderation", ctx.guild.id):
             return
             
         if amount < 1 or amount > 100:
@@ -378,6 +360,46 @@ class ModerationCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ Error purging messages: {e}")
             
+    @commands.command(name='filter', help='Manage the auto-moderation word filter')
+    @commands.has_permissions(manage_messages=True)
+    async def filter_command(self, ctx, action: str = "list", *, word: str = None):
+        """Add, remove or list this server's filtered words."""
+        if not await is_module_enabled("moderation", ctx.guild.id):
+            return
+            
+        config = await get_server_config(ctx.guild.id)
+        auto_moderation = config.setdefault('auto_moderation', {})
+        filter_words = auto_moderation.setdefault('filter_words', [])
+        action = action.lower()
+        
+        if action == "list":
+            words = ", ".join(f"`{w}`" for w in sorted(filter_words)) or "No custom words yet."
+            await ctx.send(embed=create_embed("🧹 Word Filter", words, COLORS['info']))
+            return
+            
+        if action not in ("add", "remove") or not word:
+            await ctx.send(f"❌ Usage: `{ctx.prefix}filter <add|remove|list> [word]`")
+            return
+            
+        word = word.lower().strip()
+        if action == "add" and word not in filter_words:
+            filter_words.append(word)
+        elif action == "remove" and word in filter_words:
+            filter_words.remove(word)
+        else:
+            await ctx.send(f"❌ `{word}` is {'already' if action == 'add' else 'not'} in the filter!")
+            return
+            
+        # Saving invalidates the cached config, so the rules recompile on the next message
+        if await update_server_config(ctx.guild.id, config):
+            await ctx.send(embed=create_embed(
+                "✅ Word Filter Updated",
+                f"{'Added' if action == 'add' else 'Removed'} `{word}` ({len(filter_words)} custom words)",
+                COLORS['success']
+            ))
+        else:
+            await ctx.send("❌ Failed to save the filter!")
+            
     # Slash Commands
     @app_commands.command(name="kick", description="Kick a member from the server")
     @app_commands.describe(member="The member to kick", reason="Reason for kicking")
@@ -387,7 +409,7 @@ class ModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You need moderator permissions!", ephemeral=True)
             return
             
-        if not is_module_enabled("moderation", interaction.guild.id):
+        if not await is_module_enabled("moderation", interaction.guild.id):
             await interaction.response.send_message("❌ Moderation module is disabled!", ephemeral=True)
             return
             
@@ -423,7 +445,7 @@ class ModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You need moderator permissions!", ephemeral=True)
             return
             
-        if not is_module_enabled("moderation", interaction.guild.id):
+        if not await is_module_enabled("moderation", interaction.guild.id):
             await interaction.response.send_message("❌ Moderation module is disabled!", ephemeral=True)
             return
             
@@ -459,7 +481,7 @@ class ModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You need moderator permissions!", ephemeral=True)
             return
             
-        if not is_module_enabled("moderation", interaction.guild.id):
+        if not await is_module_enabled("moderation", interaction.guild.id):
             await interaction.response.send_message("❌ Moderation module is disabled!", ephemeral=True)
             return
             
@@ -468,7 +490,7 @@ class ModerationCog(commands.Cog):
             return
             
         try:
-            warning_count = self.add_warning(member.id, interaction.guild.id, reason, interaction.user.id)
+            warning_count = await self.add_warning(member.id, interaction.guild.id, reason, interaction.user.id)
             
             embed = create_embed(
                 "⚠️ Member Warned",
@@ -494,14 +516,14 @@ class ModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You need moderator permissions!", ephemeral=True)
             return
             
-        if not is_module_enabled("moderation", interaction.guild.id):
+        if not await is_module_enabled("moderation", interaction.guild.id):
             await interaction.response.send_message("❌ Moderation module is disabled!", ephemeral=True)
             return
             
         if not member:
             member = interaction.user
             
-        warnings = self.get_user_warnings(member.id, interaction.guild.id)
+        warnings = await self.get_user_warnings(member.id, interaction.guild.id)
         
         if not warnings:
             await interaction.response.send_message(f"No warnings found for {member.mention}", ephemeral=True)
@@ -531,7 +553,7 @@ class ModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You need moderator permissions!", ephemeral=True)
             return
             
-        if not is_module_enabled("moderation", interaction.guild.id):
+        if not await is_module_enabled("moderation", interaction.guild.id):
             await interaction.response.send_message("❌ Moderation module is disabled!", ephemeral=True)
             return
             
@@ -567,7 +589,7 @@ class ModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You need moderator permissions!", ephemeral=True)
             return
             
-        if not is_module_enabled("moderation", interaction.guild.id):
+        if not await is_module_enabled("moderation", interaction.guild.id):
             await interaction.response.send_message("❌ Moderation module is disabled!", ephemeral=True)
             return
             
@@ -604,7 +626,7 @@ class ModerationCog(commands.Cog):
     async def log_moderation_action(self, guild: discord.Guild, action: str, target: Optional[discord.Member], moderator: discord.Member, reason: str):
         """Log moderation action to mod log channel."""
         try:
-            config = get_server_config(guild.id)
+            config = await get_server_config(guild.id)
             log_channel_id = config.get('mod_log_channel')
             
             if not log_channel_id:
@@ -3,553 +3,39 @@ import discord
 from discord.ext import commands
 import random
 import asyncio
+import copy
 from rpg_data.game_data import CLASSES, ITEMS, RARITY_COLORS, TACTICAL_MONSTERS
 from utils.helpers import create_embed, format_number
 from config import COLORS, is_module_enabled
+from rpg_data.combat_data import ENHANCED_MONSTERS, TACTICAL_SKILLS
+from utils.combat_engine import CombatEngine
+from utils.combat_events import CombatEvent
+from utils.combat_sessions import combat_sessions
+from utils.edit_scheduler import edit_scheduler
+from utils.skill_table import skill_table
+from utils.status_effects import status_effects
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Enhanced monster data with weaknesses
-ENHANCED_MONSTERS = {
-    'goblin': {
-        'name': 'Goblin Warrior',
-        'emoji': '👹',
-        'hp': 120,
-        'max_hp': 120,
-        'toughness': 60,
-        'max_toughness': 60,
-        'weakness_type': 'physical',
-        'attack': 25,
-        'defense': 8,
-        'level': 3,
-        'xp_reward': 35,
-        'gold_reward': 15,
-        'skills': ['quick_slash'],
-        'loot_table': {'health_potion': 0.4, 'iron_sword': 0.2}
-    },
-    'orc': {
-        'name': 'Orc Berserker',
-        'emoji': '👺',
-        'hp': 180,
-        'max_hp': 180,
-        'toughness': 80,
-        'max_toughness': 80,
-        'weakness_type': 'ice',
-        'attack': 35,
-        'defense': 12,
-        'level': 6,
-        'xp_reward': 60,
-        'gold_reward': 25,
-        'skills': ['berserker_rage'],
-        'loot_table': {'health_potion': 0.3, 'steel_armor': 0.15}
-    },
-    'ice_elemental': {
-        'name': 'Ice Elemental',
-        'emoji': '🧊',
-        'hp': 150,
-        'max_hp': 150,
-        'toughness': 70,
-        'max_toughness': 70,
-        'weakness_type': 'fire',
-        'attack': 30,
-        'defense': 15,
-        'level': 5,
-        'xp_reward': 50,
-        'gold_reward': 20,
-        'skills': ['ice_blast'],
-        'loot_table': {'mana_potion': 0.5, 'ice_crystal': 0.3}
-    },
-    'dragon': {
-        'name': 'Ancient Dragon',
-        'emoji': '🐉',
-        'hp': 400,
-        'max_hp': 400,
-        'toughness': 120,
-        'max_toughness': 120,
-        'weakness_type': 'lightning',
-        'attack': 60,
-        'defense': 25,
-        'level': 15,
-        'xp_reward': 200,
-        'gold_reward': 100,
-        'skills': ['dragon_breath', 'tail_sweep'],
-        'loot_table': {'dragon_scale': 0.8, 'legendary_weapon': 0.1}
-    }
-}
-
-# Status Effects System
-STATUS_EFFECTS = {
-    # Blessings (Buffs)
-    'fortify': {
-        'name': 'Fortify',
-        'type': 'blessing',
-        'emoji': '🛡️',
-        'effect': 'def_boost',
-        'value': 0.30,
-        'duration': 3,
-        'description': 'Increases Defense by 30% for 3 turns'
-    },
-    'empower': {
-        'name': 'Empower',
-        'type': 'blessing',
-        'emoji': '💪',
-        'effect': 'atk_boost',
-        'value': 0.30,
-        'duration': 3,
-        'description': 'Increases Attack by 30% for 3 turns'
-    },
-    'haste': {
-        'name': 'Haste',
-        'type': 'blessing',
-        'emoji': '⚡',
-        'effect': 'speed_boost',
-        'value': 0.50,
-        'duration': 1,
-        'description': 'Acts 50% sooner on next turn'
-    },
-    'regeneration': {
-        'name': 'Regeneration',
-        'type': 'blessing',
-        'emoji': '💚',
-        'effect': 'heal_over_time',
-        'value': 0.10,
-        'duration': 3,
-        'description': 'Heals 10% of Max HP at start of turn for 3 turns'
-    },
-    'crit_up': {
-        'name': 'Crit Up',
-        'type': 'blessing',
-        'emoji': '🔥',
-        'effect': 'crit_boost',
-        'value': 0.50,
-        'duration': 2,
-        'description': 'Increases Critical Hit Chance by 50% for 2 turns'
-    },
-    'evade_up': {
-        'name': 'Evade Up',
-        'type': 'blessing',
-        'emoji': '👻',
-        'effect': 'dodge_boost',
-        'value': 0.30,
-        'duration': 2,
-        'description': 'Increases dodge chance by 30% for 2 turns'
-    },
-
-    # Curses (Debuffs)
-    'bleed': {
-        'name': 'Bleed',
-        'type': 'curse',
-        'emoji': '🩸',
-        'effect': 'damage_over_time',
-        'value': 0.05,
-        'duration': 3,
-        'description': 'Deals 5% of Max HP as damage at start of turn for 3 turns'
-    },
-    'burn': {
-        'name': 'Burn',
-        'type': 'curse',
-        'emoji': '🔥',
-        'effect': 'damage_over_time_no_heal',
-        'value': 0.08,
-        'duration': 2,
-        'description': 'Deals 8% Max HP damage and prevents healing for 2 turns'
-    },
-    'stun': {
-        'name': 'Stun',
-        'type': 'curse',
-        'emoji': '🌟',
-        'effect': 'skip_turn',
-        'duration': 1,
-        'description': 'Cannot act for 1 turn'
-    },
-    'weakness_break': {
-        'name': 'Weakness Break',
-        'type': 'curse',
-        'emoji': '💥',
-        'effect': 'vulnerability',
-        'value': 0.50,
-        'duration': 2,
-        'description': 'Stunned for 1 turn, +50% damage taken for 2 turns'
-    },
-    'armor_break': {
-        'name': 'Armor Break',
-        'type': 'curse',
-        'emoji': '🛡️💔',
-        'effect': 'def_reduction',
-        'value': 0.50,
-        'duration': 3,
-        'description': 'Reduces Defense by 50% for 3 turns'
-    },
-    'slow': {
-        'name': 'Slow',
-        'type': 'curse',
-        'emoji': '🐌',
-        'effect': 'speed_reduction',
-        'value': 0.50,
-        'duration': 1,
-        'description': 'Acts 50% later on next turn'
-    },
-    'blind': {
-        'name': 'Blind',
-        'type': 'curse',
-        'emoji': '🙈',
-        'effect': 'accuracy_reduction',
-        'value': 0.50,
-        'duration': 2,
-        'description': 'Reduces accuracy by 50% for 2 turns'
-    },
-    'stopwatch': {
-        'name': 'Stopwatch',
-        'type': 'curse',
-        'emoji': '⏱️',
-        'effect': 'stacking_stun',
-        'stacks': 0,
-        'max_stacks': 3,
-        'description': 'Stacking debuff. At 3 stacks, target is Stunned for 1 turn'
-    }
-}
-
-# Enhanced skills with SP costs and status effects
-TACTICAL_SKILLS = {
-    'power_strike': {
-        'name': 'Power Strike',
-        'cost': 20,
-        'damage': 40,
-        'toughness_damage': 15,
-        'damage_type': 'physical',
-        'ultimate_gain': 20,
-        'description': 'A powerful physical attack that costs 20 SP.',
-        'effects': [],
-        'classes': ['warrior', 'battlemage']
-    },
-    'flame_slash': {
-        'name': 'Flame Slash',
-        'cost': 20,
-        'damage': 35,
-        'toughness_damage': 20,
-        'damage_type': 'fire',
-        'ultimate_gain': 20,
-        'description': 'A burning sword technique that costs 20 SP.',
-        'effects': [{'status': 'burn', 'chance': 0.7}],
-        'classes': ['battlemage', 'mage'],
-        'required_items': {}
-    },
-    'ice_lance': {
-        'name': 'Ice Lance',
-        'cost': 20,
-        'damage': 38,
-        'toughness_damage': 18,
-        'damage_type': 'ice',
-        'ultimate_gain': 20,
-        'description': 'A piercing ice attack that costs 20 SP.',
-        'effects': [{'status': 'slow', 'chance': 0.6}],
-        'classes': ['mage'],
-        'required_items': {}
-    },
-    'healing_light': {
-        'name': 'Healing Light',
-        'cost': 30,
-        'heal': 50,
-        'ultimate_gain': 15,
-        'description': 'Restores health using 30 SP.',
-        'effects': [{'status': 'regeneration', 'chance': 0.3}]
-    },
-    'shield_bash': {
-        'name': 'Shield Bash',
-        'cost': 20,
-        'damage': 25,
-        'toughness_damage': 20,
-        'damage_type': 'physical',
-        'ultimate_gain': 20,
-        'description': 'Bash enemy with shield, chance to stun.',
-        'effects': [{'status': 'stun', 'chance': 0.5}]
-    },
-    'taunting_shout': {
-        'name': 'Taunting Shout',
-        'cost': 15,
-        'damage': 0,
-        'ultimate_gain': 15,
-        'description': 'Force enemy to target you and gain defense.',
-        'self_effects': [{'status': 'fortify', 'chance': 1.0}]
-    },
-    'fireball': {
-        'name': 'Fireball',
-        'cost': 25,
-        'damage': 45,
-        'toughness_damage': 25,
-        'damage_type': 'fire',
-        'ultimate_gain': 20,
-        'description': 'Heavy fire damage with burn chance.',
-        'effects': [{'status': 'burn', 'chance': 0.8}]
-    },
-    'arcane_explosion': {
-        'name': 'Arcane Explosion',
-        'cost': 40,
-        'damage': 30,
-        'toughness_damage': 20,
-        'damage_type': 'magic',
-        'ultimate_gain': 30,
-        'description': 'Moderate magic damage to all enemies.',
-        'effects': []
-    },
-    'serrated_strike': {
-        'name': 'Serrated Strike',
-        'cost': 20,
-        'damage': 35,
-        'toughness_damage': 15,
-        'damage_type': 'physical',
-        'ultimate_gain': 20,
-        'description': 'Causes bleeding damage over time.',
-        'effects': [{'status': 'bleed', 'chance': 0.9}]
-    },
-    'shadow_step': {
-        'name': 'Shadow Step',
-        'cost': 25,
-        'damage': 0,
-        'ultimate_gain': 15,
-        'description': 'Grants evasion and critical hit bonus.',
-        'self_effects': [
-            {'status': 'evade_up', 'chance': 1.0},
-            {'status': 'crit_up', 'chance': 1.0}
-        ]
-    },
-    'piercing_shot': {
-        'name': 'Piercing Shot',
-        'cost': 25,
-        'damage': 40,
-        'toughness_damage': 20,
-        'damage_type': 'physical',
-        'ultimate_gain': 20,
-        'description': 'Ignores 50% of enemy defense.',
-        'effects': [],
-        'armor_penetration': 0.5
-    },
-    'pinning_shot': {
-        'name': 'Pinning Shot',
-        'cost': 20,
-        'damage': 25,
-        'toughness_damage': 15,
-        'damage_type': 'physical',
-        'ultimate_gain': 15,
-        'description': 'Low damage but applies slow.',
-        'effects': [{'status': 'slow', 'chance': 0.8}]
-    },
-    'purify': {
-        'name': 'Purify',
-        'cost': 25,
-        'heal': 30,
-        'ultimate_gain': 15,
-        'description': 'Removes debuffs and grants regeneration.',
-        'effects': [],
-        'remove_debuffs': True,
-        'self_effects': [{'status': 'regeneration', 'chance': 1.0}]
-    },
-    'imbue_weapon': {
-        'name': 'Imbue Weapon',
-        'cost': 20,
-        'damage': 0,
-        'ultimate_gain': 20,
-        'description': 'Next 3 basic attacks deal extra magic damage.',
-        'self_effects': [{'status': 'empower', 'chance': 1.0}]
-    },
-    'arcane_shield': {
-        'name': 'Arcane Shield',
-        'cost': 25,
-        'damage': 0,
-        'ultimate_gain': 15,
-        'description': 'Creates shield and empowers attacks.',
-        'self_effects': [
-            {'status': 'fortify', 'chance': 1.0},
-            {'status': 'empower', 'chance': 1.0}
-        ]
-    },
-    'time_dilation': {
-        'name': 'Time Dilation',
-        'cost': 30,
-        'damage': 20,
-        'toughness_damage': 10,
-        'damage_type': 'temporal',
-        'ultimate_gain': 25,
-        'description': 'Applies Stopwatch stack to enemy.',
-        'effects': [{'status': 'stopwatch', 'chance': 1.0}],
-        'classes': ['chrono_knight'],
-        'required_items': {}
-    },
-    'temporal_shift': {
-        'name': 'Temporal Shift',
-        'cost': 20,
-        'damage': 0,
-        'ultimate_gain': 15,
-        'description': 'Grants ally haste effect.',
-        'self_effects': [{'status': 'haste', 'chance': 1.0}],
-        'classes': ['chrono_knight'],
-        'required_items': {}
-    },
-    # Warrior specific skills
-    'berserker_fury': {
-        'name': 'Berserker Fury',
-        'cost': 25,
-        'damage': 50,
-        'toughness_damage': 20,
-        'damage_type': 'physical',
-        'ultimate_gain': 30,
-        'description': 'Devastating attack that increases with missing health.',
-        'effects': [],
-        'classes': ['warrior'],
-        'required_items': {}
-    },
-    # Archer specific skills
-    'explosive_shot': {
-        'name': 'Explosive Shot',
-        'cost': 30,
-        'damage': 45,
-        'toughness_damage': 25,
-        'damage_type': 'physical',
-        'ultimate_gain': 25,
-        'description': 'Ranged attack that deals area damage.',
-        'effects': [{'status': 'burn', 'chance': 0.5}],
-        'classes': ['archer'],
-        'required_items': {'explosive_arrow': 1}
-    },
-    # Healer enhanced abilities
-    'mass_heal': {
-        'name': 'Mass Heal',
-        'cost': 40,
-        'heal': 80,
-        'ultimate_gain': 20,
-        'description': 'Powerful healing that affects entire party.',
-        'effects': [],
-        'classes': ['healer'],
-        'required_items': {'holy_water': 1}
-    },
-    # Rogue stealth skills
-    'vanish': {
-        'name': 'Vanish',
-        'cost': 25,
-        'damage': 0,
-        'ultimate_gain': 15,
-        'description': 'Become invisible and gain massive crit chance.',
-        'self_effects': [
-            {'status': 'evade_up', 'chance': 1.0},
-            {'status': 'crit_up', 'chance': 1.0}
-        ],
-        'classes': ['rogue'],
-        'required_items': {'smoke_bomb': 1}
-    }
-}
-
-# Ultimate abilities by class
-ULTIMATE_ABILITIES = {
-    'warrior': {
-        'name': 'Blade Storm',
-        'description': 'Unleashes a devastating series of strikes',
-        'damage': 120,
-        'toughness_damage': 50,
-        'damage_type': 'physical'
-    },
-    'mage': {
-        'name': 'Arcane Devastation',
-        'description': 'Channels pure magical energy',
-        'damage': 100,
-        'toughness_damage': 60,
-        'damage_type': 'quantum'
-    },
-    'rogue': {
-        'name': 'Shadow Assassination',
-        'description': 'Strikes from the shadows with lethal precision',
-        'damage': 110,
-        'toughness_damage': 40,
-        'damage_type': 'physical'
-    },
-    'archer': {
-        'name': 'Rain of Arrows',
-        'description': 'Unleashes a devastating arrow barrage',
-        'damage': 105,
-        'toughness_damage': 35,
-        'damage_type': 'physical'
-    },
-    'healer': {
-        'name': 'Divine Intervention',
-        'description': 'Calls upon divine power for massive healing',
-        'heal': 150,
-        'damage': 80,
-        'toughness_damage': 30,
-        'damage_type': 'divine'
-    },
-    'battlemage': {
-        'name': 'Elemental Fury',
-        'description': 'Combines magic and melee in perfect harmony',
-        'damage': 115,
-        'toughness_damage': 45,
-        'damage_type': 'elemental'
-    },
-    'chrono_knight': {
-        'name': 'Time Fracture',
-        'description': 'Manipulates time to deal devastating damage',
-        'damage': 130,
-        'toughness_damage': 55,
-        'damage_type': 'temporal'
-    }
-}
-
-# Active combat sessions with cleanup
-active_combats = {}
-
-async def cleanup_orphaned_combats():
-    """Clean up combat sessions that may have been orphaned."""
-    try:
-        current_time = time.time()
-        orphaned_sessions = []
-
-        for channel_id, user_id in list(active_combats.items()):
-            # If a combat session is older than 30 minutes, consider it orphaned
-            if hasattr(active_combats, f'{channel_id}_timestamp'):
-                session_time = getattr(active_combats, f'{channel_id}_timestamp', current_time)
-                if current_time - session_time > 1800:  # 30 minutes
-                    orphaned_sessions.append(channel_id)
-            else:
-                # Set timestamp for existing sessions
-                setattr(active_combats, f'{channel_id}_timestamp', current_time)
-
-        for channel_id in orphaned_sessions:
-            del active_combats[channel_id]
-            logger.info(f"Cleaned up orphaned combat session in channel {channel_id}")
-
-    except Exception as e:
-        logger.error(f"Error in combat cleanup: {e}")
-
-import time
-
 class TacticalCombatView(discord.ui.View):
     """Enhanced combat view with tactical mechanics."""
 
-    def __init__(self, player_id, monster_key, initial_message, rpg_core_cog):
+    def __init__(self, player_id, monster_key, initial_message, rpg_core_cog, player_data):
         super().__init__(timeout=300)
         self.player_id = player_id
         self.monster_key = monster_key
         self.message = initial_message
         self.rpg_core = rpg_core_cog
         self.combat_log = []
-        self.turn_count = 0
+        self.engine = CombatEngine()
 
-        # Load player data
-        self.player_data = self.rpg_core.get_player_data(player_id)
+        self.player_data = player_data
         if not self.player_data:
             return
 
-        # Initialize combat state with tactical elements
-        monster_data = ENHANCED_MONSTERS.get(monster_key, ENHANCED_MONSTERS['goblin']).copy()
-
-        self.combat_state = {
-            'in_combat': True,
-            'skill_points': 5,  # Start with full SP
-            'max_skill_points': 10,  # Increased maximum SP
-            'enemy': monster_data,
-            'turn': 'player',
-            'enemy_broken_turns': 0,
-            'sp_regen_per_turn': 2  # SP regeneration per turn
-        }
+        self.combat_state = self.engine.new_state(monster_key)
+        monster_data = self.combat_state['enemy']
 
         self.add_log(f"⚔️ A wild **{monster_data['name']} {monster_data['emoji']}** appears!")
         self.add_log(f"🔍 Enemy weakness: {monster_data['weakness_type'].title()}")
@@ -560,6 +46,66 @@ class TacticalCombatView(discord.ui.View):
         if len(self.combat_log) > 8:
             self.combat_log.pop(0)
 
+    def log_events(self, events):
+        """Add the engine's events to the combat log."""
+        for event in events:
+            self.add_log(event.text)
+
+    async def save_player(self, apply=None):
+        """Save the fight's effect on the player under their lock. Returns the saved data, or None.
+
+        Resources and status effects belong to the fight and are copied from the view; apply re-runs the
+        rest of the change against the freshly loaded document, so saves made elsewhere aren't overwritten.
+        """
+        def mutator(draft):
+            draft['resources'] = copy.deepcopy(self.player_data['resources'])
+            draft['in_combat'] = self.player_data.get('in_combat', False)
+            if 'active_effects' in self.player_data:
+                draft['active_effects'] = copy.deepcopy(self.player_data['active_effects'])
+            else:
+                draft.pop('active_effects', None)
+            if apply is not None:
+                return apply(draft)
+
+        saved = await self.rpg_core.mutate_player_data(self.player_id, mutator)
+        if saved is None:
+            logger.error(f"Failed to save combat result for player {self.player_id}")
+            return None
+        self.player_data = saved
+        return saved
+
+    def to_session(self):
+        """Serialize the fight for the session store. Only enemy fields that differ from the template are kept."""
+        template = ENHANCED_MONSTERS.get(self.monster_key, ENHANCED_MONSTERS['goblin'])
+        enemy = self.combat_state['enemy']
+        return {
+            'monster_key': self.monster_key,
+            'channel_id': self.message.channel.id,
+            'message_id': self.message.id,
+            'combat_log': list(self.combat_log),
+            'state': {key: value for key, value in self.combat_state.items() if key != 'enemy'},
+            'enemy': {key: value for key, value in enemy.items() if template.get(key) != value}
+        }
+
+    @classmethod
+    def from_session(cls, session, message, rpg_core_cog, player_data):
+        """Rebuild a view from a checkpointed session."""
+        view = cls(int(session['user_id']), session['monster_key'], message, rpg_core_cog, player_data)
+        view.combat_log = list(session.get('combat_log', []))
+        view.combat_state.update(session.get('state', {}))
+        view.combat_state['enemy'].update(session.get('enemy', {}))
+        return view
+
+    async def checkpoint(self):
+        """Persist the fight so it survives a restart."""
+        if not self.is_finished():
+            await combat_sessions.checkpoint(self.player_id, self.to_session(), owner=self)
+
+    async def on_timeout(self):
+        await combat_sessions.discard(self.player_id)
+        # An abandoned fight must not leave the player locked out of new ones
+        await self.rpg_core.patch_player_data(self.player_id, sets={'in_combat': False})
+
     def create_bar(self, current, maximum, length=10, fill="█", empty="░"):
         """Create visual progress bar."""
         if maximum == 0:
@@ -637,7 +183,7 @@ class TacticalCombatView(discord.ui.View):
         if enemy.get('is_broken', False):
             turn_text += " (Enemy Stunned!)"
 
-        embed.add_field(name="Current Turn", value=f"{turn_text} | Turn {self.turn_count + 1}", inline=False)
+        embed.add_field(name="Current Turn", value=f"{turn_text} | Turn {self.combat_state['turn_count'] + 1}", inline=False)
 
         # Combat log
         if self.combat_log:
@@ -648,6 +194,9 @@ class TacticalCombatView(discord.ui.View):
 
     async def update_view(self):
         """Update combat display and button states."""
+        if self.is_finished():
+            # The fight was ended from outside the view (flee or force exit from $battle)
+            return
         enemy = self.combat_state['enemy']
         resources = self.player_data['resources']
 
@@ -671,7 +220,8 @@ class TacticalCombatView(discord.ui.View):
 
         embed = await self.create_embed()
         try:
-            await self.message.edit(embed=embed, view=self)
+            await edit_scheduler.edit(self.message, embed=embed, view=self)
+            await self.checkpoint()
         except discord.NotFound:
             # Message was deleted, end combat gracefully
             logger.warning("Combat message was deleted, ending combat")
@@ -683,6 +233,7 @@ class TacticalCombatView(discord.ui.View):
                 try:
                     new_msg = await self.message.channel.send("⚠️ Combat display refreshed", embed=embed, view=self)
                     self.message = new_msg
+                    await self.checkpoint()
                 except Exception as inner_e:
                     logger.error(f"Failed to send new combat message: {inner_e}")
                     await self.end_combat(victory=False)
@@ -691,241 +242,58 @@ class TacticalCombatView(discord.ui.View):
             # Gracefully end combat on unexpected errors
             await self.end_combat(victory=False)
 
-    async def check_weakness_break(self, damage_type, toughness_damage):
-        """Check and handle weakness break mechanics."""
-        enemy = self.combat_state['enemy']
-        weakness_match = damage_type == enemy['weakness_type']
-
-        if weakness_match and toughness_damage > 0:
-            old_toughness = enemy['toughness']
-            enemy['toughness'] = max(0, enemy['toughness'] - toughness_damage)
-            self.add_log(f"💥 Weakness hit! Toughness damage: {toughness_damage}")
-
-            # Check for break
-            if old_toughness > 0 and enemy['toughness'] == 0:
-                enemy['is_broken'] = True
-                self.combat_state['enemy_broken_turns'] = 1
-                self.add_log(f"🔥 WEAKNESS BREAK! {enemy['name']} is stunned!")
-                return True
-
-        return False
-
     async def end_combat(self, victory):
         """Handle combat conclusion with enhanced rewards."""
-        self.player_data['in_combat'] = False
-        enemy = self.combat_state['enemy']
+        # Callers waiting on the same coalesced edit can all see its failure; settle only once
+        if self.is_finished():
+            return
+        self.stop()
 
-        if victory:
-            # Calculate rewards
-            base_xp = enemy['xp_reward']
-            base_gold = enemy['gold_reward']
-
-            # Level multiplier
-            level_mult = 1 + (self.player_data['level'] - 1) * 0.1
-            xp_gained = int(base_xp * level_mult)
-            gold_gained = int(base_gold * level_mult)
-
-            self.player_data['xp'] += xp_gained
-            self.player_data['gold'] += gold_gained
-
-            # Loot drops
-            loot_found = []
-            for item_name, chance in enemy.get('loot_table', {}).items():
-                if random.random() < chance:
-                    if item_name in self.player_data['inventory']:
-                        self.player_data['inventory'][item_name] += 1
-                    else:
-                        self.player_data['inventory'][item_name] = 1
-                    loot_found.append(item_name)
-
-            self.add_log(f"🏆 Victory! Gained {xp_gained} XP and {gold_gained} gold!")
-            if loot_found:
-                items_str = ", ".join([item.replace('_', ' ').title() for item in loot_found])
-                self.add_log(f"💎 Found: {items_str}")
+        events = []
+        def settle(draft):
+            events[:] = self.engine.settle(
+                self.combat_state, draft, victory, level_up_check=self.rpg_core.level_up_check
+            )
 
-            # Check for level up
-            levels_gained = self.rpg_core.level_up_check(self.player_data)
-            if levels_gained:
-                self.add_log(f"⭐ LEVEL UP! You are now level {self.player_data['level']}!")
+        if await self.save_player(settle) is None:
+            events.append(CombatEvent('error', "⚠️ The battle result couldn't be saved."))
+        self.log_events(events)
 
+        if victory:
             final_embed = discord.Embed(
                 title="🏆 TACTICAL VICTORY! 🏆",
                 description="\n".join(self.combat_log),
                 color=COLORS['success']
             )
         else:
-            # Defeat consequences
-            gold_lost = max(1, int(self.player_data['gold'] * 0.15))
-            self.player_data['gold'] = max(0, self.player_data['gold'] - gold_lost)
-            self.player_data['resources']['hp'] = max(1, self.player_data['resources']['max_hp'] // 4)
-
-            self.add_log(f"💀 Defeat! Lost {gold_lost} gold and most of your health.")
-
             final_embed = discord.Embed(
                 title="☠️ TACTICAL DEFEAT ☠️",
                 description="\n".join(self.combat_log),
                 color=COLORS['error']
             )
 
-        # Reset ultimate energy
-        self.player_data['resources']['ultimate_energy'] = 0
-        self.rpg_core.save_player_data(self.player_id, self.player_data)
-
         try:
-            await self.message.edit(content="Combat concluded.", embed=final_embed, view=None)
+            await edit_scheduler.edit(self.message, content="Combat concluded.", embed=final_embed, view=None)
         except discord.NotFound:
             pass
 
-        if self.message.channel.id in active_combats:
-            del active_combats[self.message.channel.id]
-        self.stop()
+        await combat_sessions.discard(self.player_id)
 
     async def monster_turn(self):
-        """Enhanced monster AI."""
-        enemy = self.combat_state['enemy']
-
-        # Check if broken/stunned
-        if enemy.get('is_broken', False):
-            if self.combat_state['enemy_broken_turns'] > 0:
-                self.add_log(f"💫 {enemy['name']} is stunned and skips their turn!")
-                self.combat_state['enemy_broken_turns'] -= 1
-
-                if self.combat_state['enemy_broken_turns'] <= 0:
-                    enemy['is_broken'] = False
-                    enemy['toughness'] = enemy['max_toughness']
-                    self.add_log(f"🛡️ {enemy['name']} recovers!")
-
-                # Regenerate SP at turn start
-                sp_regen = self.combat_state.get('sp_regen_per_turn', 2)
-                old_sp = self.combat_state['skill_points']
-                self.combat_state['skill_points'] = min(
-                    self.combat_state['max_skill_points'],
-                    old_sp + sp_regen
-                )
-                if self.combat_state['skill_points'] > old_sp:
-                    gained = self.combat_state['skill_points'] - old_sp
-                    self.add_log(f"💎 Regenerated {gained} SP! ({self.combat_state['skill_points']}/{self.combat_state['max_skill_points']})")
-
-                self.combat_state['turn'] = 'player'
-                await self.update_view()
-                return
-
-        # Monster attacks
-        damage = random.randint(enemy['attack'] - 5, enemy['attack'] + 10)
-        self.player_data['resources']['hp'] = max(0, self.player_data['resources']['hp'] - damage)
-        self.add_log(f"{enemy['name']} attacks for {damage} damage!")
-
-        # Regenerate SP at turn start
-        sp_regen = self.combat_state.get('sp_regen_per_turn', 2)
-        old_sp = self.combat_state['skill_points']
-        self.combat_state['skill_points'] = min(
-            self.combat_state['max_skill_points'],
-            old_sp + sp_regen
-        )
-        if self.combat_state['skill_points'] > old_sp:
-            gained = self.combat_state['skill_points'] - old_sp
-            self.add_log(f"💎 Regenerated {gained} SP! ({self.combat_state['skill_points']}/{self.combat_state['max_skill_points']})")
-
-        self.combat_state['turn'] = 'player'
-        self.turn_count += 1
+        """Enemy turn."""
+        self.log_events(self.engine.monster_turn(self.combat_state, self.player_data))
         await self.update_view()
 
+        # Damage over time can finish the enemy on its own turn
+        if self.combat_state['enemy']['hp'] <= 0:
+            await self.end_combat(victory=True)
         # Check for player defeat
-        if self.player_data['resources']['hp'] <= 0:
+        elif self.player_data['resources']['hp'] <= 0:
             await self.end_combat(victory=False)
 
     def get_available_skills(self):
-        """Get skills available to the player's class with inventory checking."""
-        player_class = self.player_data.get('class', 'warrior')
-        player_level = self.player_data.get('level', 1)
-
-        available_skills = []
-
-        # Check all skills for class compatibility
-        for skill_key, skill_data in TACTICAL_SKILLS.items():
-            # Check class restriction
-            allowed_classes = skill_data.get('classes', [])
-            if player_class not in allowed_classes:
-                continue
-
-            # Check level requirement
-            min_level = skill_data.get('min_level', 1)
-            if player_level < min_level:
-                continue
-
-            # Add to available skills (inventory check happens in dropdown)
-            available_skills.append(skill_key)
-
-        # Ensure at least basic attack is available
-        if not available_skills:
-            available_skills = ['power_strike']
-
-        return available_skills
-
-    def apply_status_effect(self, target, effect_name, duration_override=None):
-        """Apply a status effect to target (player or enemy)."""
-        if effect_name not in STATUS_EFFECTS:
-            return False
-
-        effect_data = STATUS_EFFECTS[effect_name].copy()
-        if duration_override:
-            effect_data['duration'] = duration_override
-
-        if 'active_effects' not in target:
-            target['active_effects'] = {}
-
-        # Handle stacking effects like Stopwatch
-        if effect_name == 'stopwatch':
-            if effect_name in target['active_effects']:
-                target['active_effects'][effect_name]['stacks'] += 1
-                if target['active_effects'][effect_name]['stacks'] >= 3:
-                    # Trigger stun and remove stopwatch
-                    self.apply_status_effect(target, 'stun', 1)
-                    del target['active_effects'][effect_name]
-                    self.add_log(f"💥 Stopwatch triggered! Stunning target!")
-            else:
-                effect_data['stacks'] = 1
-                target['active_effects'][effect_name] = effect_data
-        else:
-            target['active_effects'][effect_name] = effect_data
-
-        return True
-
-    def process_status_effects(self, target, is_player=False):
-        """Process all active status effects on a target."""
-        if 'active_effects' not in target:
-            return
-
-        effects_to_remove = []
-
-        for effect_name, effect_data in target['active_effects'].items():
-            effect_type = effect_data.get('effect')
-
-            # Process effect based on type
-            if effect_type == 'damage_over_time':
-                damage = int(target['max_hp'] * effect_data['value'])
-                target['hp'] = max(0, target['hp'] - damage)
-                self.add_log(f"🩸 {effect_data['name']}: {damage} damage")
-
-            elif effect_type == 'heal_over_time':
-                heal = int(target['max_hp'] * effect_data['value'])
-                target['hp'] = min(target['max_hp'], target['hp'] + heal)
-                self.add_log(f"💚 {effect_data['name']}: {heal} healing")
-
-            elif effect_type == 'skip_turn' and effect_data['duration'] > 0:
-                if is_player:
-                    self.add_log(f"🌟 You are stunned and skip your turn!")
-                else:
-                    self.add_log(f"🌟 Enemy is stunned and skips their turn!")
-
-            # Reduce duration
-            effect_data['duration'] -= 1
-            if effect_data['duration'] <= 0:
-                effects_to_remove.append(effect_name)
-
-        # Remove expired effects
-        for effect_name in effects_to_remove:
-            del target['active_effects'][effect_name]
+        """Get skills available to the player's class."""
+        return skill_table.for_player(self.player_data)
 
     # Combat buttons
     @discord.ui.button(label="⚔️ Basic Attack", style=discord.ButtonStyle.secondary, emoji="⚔️")
@@ -936,51 +304,9 @@ class TacticalCombatView(discord.ui.View):
 
         await interaction.response.defer()
 
-        # Basic attack generates SP and ultimate energy
-        base_damage = 20 + self.player_data['derived_stats']['attack'] // 2
-        damage = random.randint(base_damage - 5, base_damage + 8)
-
-        # Check for critical hit
-        crit_chance = self.player_data['derived_stats'].get('critical_chance', 0.05)
-        is_critical = random.random() < crit_chance
-
-        if is_critical:
-            damage = int(damage * 1.5)
-            self.add_log(f"💥 CRITICAL HIT! (150% damage)")
-
-        # Generate SP - always generate 1-2 SP per basic attack
-        sp_gained = random.randint(1, 2)
-        self.combat_state['skill_points'] = min(
-            self.combat_state['max_skill_points'], 
-            self.combat_state['skill_points'] + sp_gained
-        )
-
-        # Generate ultimate energy
-        ultimate_gain = 10
-        old_ultimate = self.player_data['resources'].get('ultimate_energy', 0)
-        self.player_data['resources']['ultimate_energy'] = min(100, old_ultimate + ultimate_gain)
-
-        # Check for weakness (basic attacks are physical)
+        self.log_events(self.engine.basic_attack(self.combat_state, self.player_data))
         enemy = self.combat_state['enemy']
-        if enemy['weakness_type'] == 'physical':
-            toughness_damage = 10
-            await self.check_weakness_break('physical', toughness_damage)
-
-        # Apply damage multiplier if enemy is broken
-        if enemy.get('is_broken', False):
-            damage = int(damage * 1.3)
-            self.add_log(f"💥 Bonus damage on broken enemy!")
-
-        enemy['hp'] = max(0, enemy['hp'] - damage)
 
-        log_msg = f"⚔️ Basic Attack! Dealt {damage} damage"
-        if sp_gained > 0:
-            log_msg += f", gained {sp_gained} SP"
-        log_msg += f", gained {ultimate_gain} UE!"
-
-        self.add_log(log_msg)
-
-        self.combat_state['turn'] = 'monster'
         await self.update_view()
         await asyncio.sleep(1.5)
 
@@ -1036,45 +362,9 @@ class TacticalCombatView(discord.ui.View):
 
         await interaction.response.defer()
 
-        # Get ultimate based on class
-        player_class = self.player_data.get('class', 'warrior')
-        ultimate_data = ULTIMATE_ABILITIES.get(player_class, ULTIMATE_ABILITIES['warrior'])
-
-        # Consume ultimate energy
-        self.player_data['resources']['ultimate_energy'] = 0
-
+        self.log_events(self.engine.ultimate(self.combat_state, self.player_data))
         enemy = self.combat_state['enemy']
 
-        # Calculate ultimate damage
-        if 'damage' in ultimate_data:
-            base_damage = ultimate_data['damage']
-            damage = random.randint(base_damage - 10, base_damage + 20)
-
-            # Check for weakness break
-            toughness_damage = ultimate_data.get('toughness_damage', 30)
-            damage_type = ultimate_data.get('damage_type', 'physical')
-            await self.check_weakness_break(damage_type, toughness_damage)
-
-            # Apply damage multiplier if enemy is broken
-            if enemy.get('is_broken', False):
-                damage = int(damage * 1.8)
-                self.add_log(f"💥 Massive bonus damage on broken enemy!")
-
-            enemy['hp'] = max(0, enemy['hp'] - damage)
-            self.add_log(f"🌟 ULTIMATE: {ultimate_data['name']}!")
-            self.add_log(f"💥 Dealt {damage} {damage_type} damage!")
-
-        # Healing ultimates
-        if 'heal' in ultimate_data:
-            heal_amount = ultimate_data['heal']
-            old_hp = self.player_data['resources']['hp']
-            self.player_data['resources']['hp'] = min(
-                self.player_data['resources']['max_hp'],
-                old_hp + heal_amount
-            )
-            actual_heal = self.player_data['resources']['hp'] - old_hp
-            self.add_log(f"✨ Healed {actual_heal} HP!")
-
         await self.update_view()
 
         if enemy['hp'] <= 0:
@@ -1083,89 +373,16 @@ class TacticalCombatView(discord.ui.View):
 
     async def use_skill(self, interaction, skill_key):
         """Execute a skill during combat."""
-        if skill_key not in TACTICAL_SKILLS:
-            await interaction.response.send_message("❌ Invalid skill!", ephemeral=True)
-            return
-
-        skill_data = TACTICAL_SKILLS[skill_key]
-
-        # Check SP cost
-        if self.combat_state['skill_points'] < skill_data['cost']:
-            await interaction.response.send_message(f"❌ Not enough SP! Need {skill_data['cost']} SP.", ephemeral=True)
+        error = self.engine.skill_error(self.combat_state, skill_key)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
             return
 
         await interaction.response.defer()
 
-        # Consume SP
-        self.combat_state['skill_points'] -= skill_data['cost']
-
+        self.log_events(self.engine.use_skill(self.combat_state, self.player_data, skill_key))
         enemy = self.combat_state['enemy']
 
-        # Apply damage if skill has damage
-        if skill_data.get('damage', 0) > 0:
-            base_damage = skill_data['damage'] + self.player_data['derived_stats']['attack'] // 2
-            damage = random.randint(base_damage - 5, base_damage + 10)
-
-            # Apply armor penetration if skill has it
-            if skill_data.get('armor_penetration', 0) > 0:
-                self.add_log(f"🔓 Armor penetration: {int(skill_data['armor_penetration']*100)}%")
-
-            # Check for weakness break
-            toughness_damage = skill_data.get('toughness_damage', 0)
-            damage_type = skill_data.get('damage_type', 'physical')
-            if toughness_damage > 0:
-                await self.check_weakness_break(damage_type, toughness_damage)
-
-            # Apply damage multiplier if enemy is broken
-            if enemy.get('is_broken', False):
-                damage = int(damage * 1.5)
-                self.add_log(f"💥 Bonus damage on broken enemy!")
-
-            enemy['hp'] = max(0, enemy['hp'] - damage)
-            self.add_log(f"✨ {skill_data['name']}! Dealt {damage} {damage_type} damage!")
-
-            # Apply status effects to enemy
-            for effect in skill_data.get('effects', []):
-                if random.random() < effect['chance']:
-                    self.apply_status_effect(enemy, effect['status'])
-                    effect_name = STATUS_EFFECTS[effect['status']]['name']
-                    self.add_log(f"🌟 Applied {effect_name} to enemy!")
-
-        # Apply healing if skill has healing
-        if skill_data.get('heal', 0) > 0:
-            heal_amount = skill_data['heal']
-            old_hp = self.player_data['resources']['hp']
-            self.player_data['resources']['hp'] = min(
-                self.player_data['resources']['max_hp'],
-                old_hp + heal_amount
-            )
-            actual_heal = self.player_data['resources']['hp'] - old_hp
-            self.add_log(f"❤️ Healed {actual_heal} HP!")
-
-        # Apply self-effects (buffs to player)
-        for effect in skill_data.get('self_effects', []):
-            if random.random() < effect['chance']:
-                self.apply_status_effect(self.player_data, effect['status'])
-                effect_name = STATUS_EFFECTS[effect['status']]['name']
-                self.add_log(f"✨ Gained {effect_name}!")
-
-        # Remove debuffs if skill has that ability
-        if skill_data.get('remove_debuffs', False):
-            if 'active_effects' in self.player_data:
-                removed_effects = []
-                for effect_name in list(self.player_data['active_effects'].keys()):
-                    if STATUS_EFFECTS[effect_name]['type'] == 'curse':
-                        del self.player_data['active_effects'][effect_name]
-                        removed_effects.append(effect_name)
-                if removed_effects:
-                    self.add_log(f"✨ Removed debuffs: {', '.join(removed_effects)}")
-
-        # Grant ultimate energy
-        ultimate_gain = skill_data.get('ultimate_gain', 0)
-        old_ultimate = self.player_data['resources'].get('ultimate_energy', 0)
-        self.player_data['resources']['ultimate_energy'] = min(100, old_ultimate + ultimate_gain)
-
-        self.combat_state['turn'] = 'monster'
         await self.update_view()
         await asyncio.sleep(1.5)
 
@@ -1225,11 +442,7 @@ class TacticalCombatView(discord.ui.View):
 
         # Show active effects
         if enemy.get('active_effects'):
-            effects_text = []
-            for effect_name, effect_data in enemy['active_effects'].items():
-                emoji = STATUS_EFFECTS[effect_name]['emoji']
-                duration = effect_data['duration']
-                effects_text.append(f"{emoji} {effect_data['name']} ({duration})")
+            effects_text = status_effects.describe(enemy)
 
             embed.add_field(
                 name="🌟 Active Effects",
@@ -1256,14 +469,15 @@ class TacticalCombatView(discord.ui.View):
         await interaction.response.defer()
 
         # Flee always succeeds but has consequences
-        self.add_log("🏃 You fled from combat!")
-        self.player_data['in_combat'] = False
-        self.player_data['resources']['ultimate_energy'] = 0
-        # Small penalty for fleeing
-        gold_lost = max(1, int(self.player_data.get('gold', 0) * 0.10))
-        self.player_data['gold'] = max(0, self.player_data.get('gold', 0) - gold_lost)
+        events = []
+        def flee(draft):
+            events[:] = self.engine.flee(self.combat_state, draft)
 
-        self.rpg_core.save_player_data(self.player_id, self.player_data)
+        if await self.save_player(flee) is None:
+            await interaction.followup.send("❌ Couldn't save your escape. Try again!", ephemeral=True)
+            return
+        self.log_events(events)
+        gold_lost = events[-1].value
 
         embed = discord.Embed(
             title="🏃 Fled from Combat",
@@ -1274,115 +488,27 @@ class TacticalCombatView(discord.ui.View):
         )
 
         try:
-            await self.message.edit(content="Combat ended - you escaped!", embed=embed, view=None)
+            await edit_scheduler.edit(self.message, content="Combat ended - you escaped!", embed=embed, view=None)
         except discord.NotFound:
             pass
 
-        if self.message.channel.id in active_combats:
-            del active_combats[self.message.channel.id]
         self.stop()
+        await combat_sessions.discard(self.player_id)
 
 
 
-    def use_consumable_item(self, item_key):
-        """Use a consumable item and apply its effects with detailed feedback."""
-        from rpg_data.game_data import ITEMS
-        from utils.helpers import format_number
+    async def use_consumable_item(self, item_key):
+        """Use a consumable item and save it. Returns the effects as log text, or None if the save failed."""
+        events = []
+        def use(draft):
+            events[:] = self.engine.use_item(self.combat_state, draft, item_key)
+            if events and events[0].kind == 'rejected':
+                return False
 
-        item_data = ITEMS.get(item_key, {})
-        if item_data.get('type') != 'consumable':
-            return "❌ Item cannot be consumed!"
-
-        # Check if item exists in inventory
-        inventory = self.player_data.get('inventory', {})
-        if inventory.get(item_key, 0) <= 0:
-            return "❌ Item not found in inventory!"
-
-        # Remove item from inventory
-        self.player_data['inventory'][item_key] -= 1
-        if self.player_data['inventory'][item_key] <= 0:
-            del self.player_data['inventory'][item_key]
-
-        results = []
-
-        # Apply item effects with enhanced feedback
-        if item_data.get('heal_amount'):
-            heal = item_data['heal_amount']
-            old_hp = self.player_data['resources']['hp']
-            max_hp = self.player_data['resources']['max_hp']
-
-            # Apply class bonuses for healers
-            if self.player_data.get('class') == 'healer':
-                heal = int(heal * 1.25)  # 25% bonus healing
-                results.append("✨ Healer class bonus: +25% healing!")
-
-            self.player_data['resources']['hp'] = min(old_hp + heal, max_hp)
-            actual_heal = self.player_data['resources']['hp'] - old_hp
-            results.append(f"❤️ Restored {actual_heal} HP ({self.player_data['resources']['hp']}/{max_hp})")
-
-        if item_data.get('mana_amount'):
-            restore = item_data['mana_amount']
-
-            # Apply class bonuses for mages
-            if self.player_data.get('class') == 'mage':
-                restore = int(restore * 1.3)  # 30% bonus mana restoration
-                results.append("🔮 Mage class bonus: +30% mana restoration!")
-
-            # Initialize mana if needed
-            if 'mana' not in self.player_data['resources']:
-                self.player_data['resources']['mana'] = self.player_data.get('derived_stats', {}).get('max_mana', 100)
-
-            old_mana = self.player_data['resources']['mana']
-            max_mana = self.player_data.get('derived_stats', {}).get('max_mana', 100)
-            self.player_data['resources']['mana'] = min(old_mana + restore, max_mana)
-            actual_restore = self.player_data['resources']['mana'] - old_mana
-            results.append(f"💙 Restored {actual_restore} Mana ({self.player_data['resources']['mana']}/{max_mana})")
-
-        # Combat-specific effects
-        if item_data.get('effects'):
-            for effect in item_data['effects']:
-                if effect == 'remove_debuffs':
-                    if 'active_effects' in self.player_data:
-                        removed = []
-                        for effect_name in list(self.player_data['active_effects'].keys()):
-                            if STATUS_EFFECTS.get(effect_name, {}).get('type') == 'curse':
-                                del self.player_data['active_effects'][effect_name]
-                                removed.append(effect_name)
-                        if removed:
-                            results.append(f"✨ Removed debuffs: {', '.join(removed)}")
-
-                elif effect == 'temporary_boost':
-                    # Apply temporary combat bonuses
-                    self.apply_status_effect(self.player_data, 'empower')
-                    results.append("⚡ Gained temporary power boost!")
-
-                elif effect == 'ultimate_energy':
-                    energy_gain = item_data.get('ultimate_energy', 25)
-                    old_energy = self.player_data['resources'].get('ultimate_energy', 0)
-                    self.player_data['resources']['ultimate_energy'] = min(100, old_energy + energy_gain)
-                    actual_gain = self.player_data['resources']['ultimate_energy'] - old_energy
-                    results.append(f"⚡ Gained {actual_gain} Ultimate Energy!")
-
-        # Special cheese handling
-        if 'cheese' in item_key.lower():
-            # Plagg is excited about cheese!
-            cheese_bonus = random.randint(10, 25)
-            old_hp = self.player_data['resources']['hp']
-            max_hp = self.player_data['resources']['max_hp']
-            self.player_data['resources']['hp'] = min(old_hp + cheese_bonus, max_hp)
-            actual_heal = self.player_data['resources']['hp'] - old_hp
-            results.append(f"🧀 CHEESE POWER! Plagg grants extra {actual_heal} HP!")
-
-            # Also gain some ultimate energy
-            old_energy = self.player_data['resources'].get('ultimate_energy', 0)
-            self.player_data['resources']['ultimate_energy'] = min(100, old_energy + 15)
-            results.append("🧀 Plagg's joy gives +15 Ultimate Energy!")
-
-        # Default message if no specific effects
-        if not results:
-            results.append(f"✨ {item_data.get('name', 'Item')} consumed!")
-
-        return '\n'.join(results)
+        saved = await self.save_player(use)
+        if saved is None and not events:
+            return None
+        return '\n'.join(event.text for event in events)
 
 class SkillSelectionView(discord.ui.View):
     """Dropdown view for selecting skills during combat."""
@@ -1450,21 +576,7 @@ class SkillDropdown(discord.ui.Select):
 
     def check_skill_requirements(self, skill_key, player_data):
         """Check if player meets skill requirements including inventory items."""
-        skill_data = TACTICAL_SKILLS.get(skill_key, {})
-        inventory = player_data.get('inventory', {})
-
-        # Check for required items (some skills might need components)
-        required_items = skill_data.get('required_items', {})
-        missing_items = []
-
-        for item_key, needed_amount in required_items.items():
-            if inventory.get(item_key, 0) < needed_amount:
-                missing_items.append(f"{ITEMS.get(item_key, {}).get('name', item_key)} x{needed_amount}")
-
-        return {
-            'can_use': len(missing_items) == 0,
-            'missing': ', '.join(missing_items) if missing_items else ''
-        }
+        return skill_table.check_requirements(skill_key, player_data.get('inventory', {}))
 
     async def callback(self, interaction: discord.Interaction):
         if interaction.user.id != self.combat_view.player_id:
@@ -1552,16 +664,16 @@ class ItemDropdown(discord.ui.Select):
             await interaction.response.send_message("❌ Item no longer available!", ephemeral=True)
             return
 
-        # Process item usage
-        result = self.combat_view.use_consumable_item(item_key)
+        # Use the item on the saved document so a stale copy can't drop it
+        result = await self.combat_view.use_consumable_item(item_key)
+        if result is None:
+            await interaction.response.send_message("❌ Couldn't use that item. Try again!", ephemeral=True)
+            return
 
         self.combat_view.add_log(f"🧪 Used {item_name}!")
         if result:
             self.combat_view.add_log(result)
 
-        # Save player data
-        self.combat_view.rpg_core.save_player_data(self.combat_view.player_id, self.combat_view.player_data)
-
         # Update the combat view
         await self.combat_view.update_view()
         await interaction.response.send_message(f"✅ Used **{item_name}**!", ephemeral=True)
@@ -1579,11 +691,53 @@ class RPGCombat(commands.Cog):
         self.rpg_core = self.bot.get_cog('RPGCore')
         if not self.rpg_core:
             logger.warning("RPGCore cog not found, combat system will not function properly.")
+        skill_table.build()
+        asyncio.create_task(self.restore_combat_sessions())
+
+    async def restore_combat_sessions(self):
+        """Reattach combat views for fights that were in progress when the bot last stopped."""
+        await self.bot.wait_until_ready()
+        if not self.rpg_core:
+            self.rpg_core = self.bot.get_cog('RPGCore')
+            if not self.rpg_core:
+                return
+
+        live, expired = await combat_sessions.load()
+        for session in expired:
+            await self.rpg_core.patch_player_data(session['user_id'], sets={'in_combat': False})
+
+        restored = 0
+        for session in live:
+            try:
+                channel = self.bot.get_channel(session['channel_id']) or await self.bot.fetch_channel(session['channel_id'])
+                message = await channel.fetch_message(session['message_id'])
+                player_data = await self.rpg_core.get_player_data(session['user_id'])
+                if not player_data:
+                    await combat_sessions.discard(session['user_id'])
+                    continue
+
+                view = TacticalCombatView.from_session(session, message, self.rpg_core, player_data)
+                # A checkpoint can be taken between the player's action and the enemy's reply
+                outcome = view.engine.outcome(view.combat_state, view.player_data)
+                if outcome:
+                    await view.end_combat(victory=outcome == 'victory')
+                elif view.combat_state['turn'] == 'monster':
+                    await view.monster_turn()
+                else:
+                    await view.update_view()
+                restored += 1
+            except Exception as e:
+                logger.warning(f"Could not restore combat session for {session['user_id']}: {e}")
+                await combat_sessions.discard(session['user_id'])
+                await self.rpg_core.patch_player_data(session['user_id'], sets={'in_combat': False})
+
+        if live or expired:
+            logger.info(f"Restored {restored}/{len(live)} combat sessions, cleared {len(expired)} expired")
 
     @commands.command(name="battle", aliases=["fight", "combat", "attack", "duel"])
     async def battle(self, ctx, monster_name: str = None):
         """Start a tactical battle against a monster."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         if not self.rpg_core:
@@ -1592,14 +746,14 @@ class RPGCombat(commands.Cog):
                 await ctx.send("❌ RPGCore system not loaded.")
                 return
 
-        player_data = self.rpg_core.get_player_data(ctx.author.id)
+        player_data = await self.rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
             return
 
         # Check if already in combat with helpful options
-        if ctx.author.id in active_combats.values():
+        if combat_sessions.in_combat(ctx.author.id):
             embed = discord.Embed(
                 title="⚔️ Already in Combat!",
                 description="*\"You're already fighting something! Focus on one battle at a time, genius.\"*\n\n"
@@ -1620,19 +774,17 @@ class RPGCombat(commands.Cog):
                     return
 
                 # Apply flee penalties
-                player_data = self.rpg_core.get_player_data(ctx.author.id)
+                player_data = await self.rpg_core.get_player_data(ctx.author.id)
                 if player_data:
                     gold_lost = max(1, int(player_data.get('gold', 0) * 0.15))
-                    player_data['gold'] = max(0, player_data.get('gold', 0) - gold_lost)
-                    player_data['resources']['hp'] = max(1, player_data['resources']['max_hp'] // 4)
-                    player_data['in_combat'] = False
-                    self.rpg_core.save_player_data(ctx.author.id, player_data)
+                    await self.rpg_core.patch_player_data(
+                        ctx.author.id,
+                        {'gold': -min(gold_lost, player_data.get('gold', 0))},
+                        {'resources.hp': max(1, player_data['resources']['max_hp'] // 4), 'in_combat': False}
+                    )
 
                 # Clear combat tracking
-                for channel_id, user_id in list(active_combats.items()):
-                    if user_id == ctx.author.id:
-                        del active_combats[channel_id]
-                        break
+                await combat_sessions.discard(ctx.author.id)
 
                 embed = discord.Embed(
                     title="🏃 Fled from Combat",
@@ -1651,20 +803,17 @@ class RPGCombat(commands.Cog):
                     return
 
                 # Apply heavy penalties
-                player_data = self.rpg_core.get_player_data(ctx.author.id)
+                player_data = await self.rpg_core.get_player_data(ctx.author.id)
                 if player_data:
                     gold_lost = max(10, int(player_data.get('gold', 0) * 0.30))
-                    player_data['gold'] = max(0, player_data.get('gold', 0) - gold_lost)
-                    player_data['resources']['hp'] = 1
-                    player_data['resources']['ultimate_energy'] = 0
-                    player_data['in_combat'] = False
-                    self.rpg_core.save_player_data(ctx.author.id, player_data)
+                    await self.rpg_core.patch_player_data(
+                        ctx.author.id,
+                        {'gold': -min(gold_lost, player_data.get('gold', 0))},
+                        {'resources.hp': 1, 'resources.ultimate_energy': 0, 'in_combat': False}
+                    )
 
                 # Clear combat tracking
-                for channel_id, user_id in list(active_combats.items()):
-                    if user_id == ctx.author.id:
-                        del active_combats[channel_id]
-                        break
+                await combat_sessions.discard(ctx.author.id)
 
                 embed = discord.Embed(
                     title="🚪 Force Exit Applied",
@@ -1693,28 +842,29 @@ class RPGCombat(commands.Cog):
         # Start combat
         message = await ctx.send("⚔️ **Initializing Combat...**")
 
-        view = TacticalCombatView(ctx.author.id, monster_name, message, self.rpg_core)
+        player_data = await self.rpg_core.get_player_data(ctx.author.id)
+        view = TacticalCombatView(ctx.author.id, monster_name, message, self.rpg_core, player_data)
         if not view.player_data:
             await message.edit(content="❌ Failed to load player data!")
             return
 
-        # Track active combat
-        active_combats[ctx.channel.id] = ctx.author.id
-
         embed = await view.create_embed()
         await message.edit(embed=embed, view=view)
 
+        # Track active combat
+        await view.checkpoint()
+
     @commands.command(name="startbattle", aliases=["engage", "initiate"])
     async def startbattle(self, ctx, monster_name: str = None):
         """Engage in a tactical battle with Plagg's sarcastic commentary."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         if not self.rpg_core:
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = self.rpg_core.get_player_data(ctx.author.id)
+        player_data = await self.rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
@@ -1750,8 +900,7 @@ class RPGCombat(commands.Cog):
         self.battle_states[str(ctx.author.id)] = battle_state
 
         # Update Player to in combat
-        player_data['in_combat'] = True
-        self.rpg_core.save_player_data(ctx.author.id, player_data)
+        await self.rpg_core.patch_player_data(ctx.author.id, sets={'in_combat': True})
 
         # Create initial battle embed
         embed = self.create_enhanced_battle_embed(player_data, enemy_data, 1)
@@ -1792,14 +941,14 @@ class RPGCombat(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def adminbattle(self, ctx, user: discord.Member, monster_name: str):
         """Start a battle on behalf of another user (ADMIN ONLY)."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         if not self.rpg_core:
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = self.rpg_core.get_player_data(user.id)
+        player_data = await self.rpg_core.get_player_data(user.id)
         if not player_data:
             await ctx.send("❌ User does not have an RPG character.")
             return
@@ -1830,7 +979,7 @@ class RPGCombat(commands.Cog):
 
         # Update Player to in combat
         player_data['in_combat'] = True
-        self.rpg_core.save_player_data(user.id, player_data)
+        await self.rpg_core.save_player_data(user.id, player_data)
 
         # Create initial battle embed
         embed = self.create_enhanced_battle_embed(player_data, enemy_data, 1)
@@ -2137,7 +1286,7 @@ class RPGCombat(commands.Cog):
             player_data['resources']['hp'] = player_data.get('resources', {}).get('max_hp', 100) // 4  # 25% HP
 
             # Save data
-            success = self.rpg_core.save_player_data(str(interaction.user.id), player_data)
+            success = await self.rpg_core.save_player_data(str(interaction.user.id), player_data)
             if not success:
                 await interaction.response.send_message("❌ Error saving defeat results!", ephemeral=True)
                 return
@@ -7,10 +7,11 @@ from typing import Dict, Any, List, Optional
 import logging
 
 from config import COLORS, EMOJIS, is_module_enabled
-from utils.database import get_user_data, update_user_data, ensure_user_exists
+from utils.database import get_user_data, update_user_data, ensure_user_exists, patch_player, mutate_player
 from utils.helpers import create_embed, format_number
 from rpg_data.game_data import CLASSES, PATHS, ITEMS, RARITY_COLORS
 from utils.warning_system import warning_system
+from utils.leaderboard import leaderboard_index
 
 logger = logging.getLogger(__name__)
 
@@ -30,10 +31,10 @@ class StartRPGView(discord.ui.View):
         await interaction.response.defer(ephemeral=False)  # Acknowledge and defer
 
         user_id = str(interaction.user.id)
-        ensure_user_exists(user_id)
+        await ensure_user_exists(user_id)
 
         # Check if user already has a character
-        player_data = rpg_core.get_player_data(user_id)
+        player_data = await rpg_core.get_player_data(user_id)
         if player_data:
             embed = discord.Embed(
                 title="🎮 Adventure Already Started!",
@@ -196,10 +197,12 @@ class ClassSelectionView(discord.ui.View):
             'chosen_path': None
         }
 
-        # Save character data
-        user_data = get_user_data(self.user_id) or {}
-        user_data['rpg_data'] = new_character
-        update_user_data(self.user_id, user_data)
+        # Save character data; a fresh character only saves if no other one was created meanwhile
+        if not await self.rpg_core.save_player_data(self.user_id, new_character):
+            embed = create_embed("Character Exists", "You already have a character! Use `$profile` to view it.",
+                                 COLORS['error'])
+            await interaction.response.edit_message(embed=embed, view=None)
+            return
 
         embed = discord.Embed(
             title="🎉 Character Created Successfully!",
@@ -278,7 +281,7 @@ class StatAllocationView(discord.ui.View):
             return
 
         stat = select.values[0]
-        player_data = self.rpg_core.get_player_data(interaction.user.id)
+        player_data = await self.rpg_core.get_player_data(interaction.user.id)
 
         if not player_data:
             await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
@@ -294,7 +297,7 @@ class StatAllocationView(discord.ui.View):
 
         # Update derived stats
         self.update_derived_stats(player_data)
-        self.rpg_core.save_player_data(interaction.user.id, player_data)
+        await self.rpg_core.save_player_data(interaction.user.id, player_data)
 
         embed = self.create_allocation_embed(player_data)
         embed.add_field(
@@ -346,7 +349,7 @@ class CombatEscapeView(discord.ui.View):
             await interaction.response.send_message("❌ This isn't your combat!", ephemeral=True)
             return
 
-        player_data = self.rpg_core.get_player_data(self.user_id)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
         if player_data:
             player_data['in_combat'] = False
             player_data['resources']['ultimate_energy'] = 0
@@ -354,7 +357,7 @@ class CombatEscapeView(discord.ui.View):
             gold_lost = max(1, int(player_data.get('gold', 0) * 0.05))
             player_data['gold'] = max(0, player_data.get('gold', 0) - gold_lost)
 
-            self.rpg_core.save_player_data(self.user_id, player_data)
+            await self.rpg_core.save_player_data(self.user_id, player_data)
 
             embed = discord.Embed(
                 title="🏃 Forced Exit from Combat",
@@ -395,7 +398,7 @@ class ProfileActionView(discord.ui.View):
             return
 
         # Get updated player data
-        player_data = self.get_rpg_core(interaction.client).get_player_data(interaction.user.id)
+        player_data = await self.get_rpg_core(interaction.client).get_player_data(interaction.user.id)
         if not player_data:
             await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
             return
@@ -416,7 +419,7 @@ class ProfileActionView(discord.ui.View):
 
         # Get updated player data
         rpg_core = self.get_rpg_core(interaction.client)
-        player_data = rpg_core.get_player_data(interaction.user.id)
+        player_data = await rpg_core.get_player_data(interaction.user.id)
         if not player_data:
             await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
             return
@@ -437,9 +440,9 @@ class RPGCore(commands.Cog):
         self.bot = bot
         self.bot.add_view(StartRPGView())
 
-    def get_player_data(self, user_id):
+    async def get_player_data(self, user_id):
         """Get player RPG data safely."""
-        user_data = get_user_data(str(user_id))
+        user_data = await get_user_data(str(user_id))
         if user_data and 'rpg_data' in user_data:
             player_data = user_data['rpg_data']
 
@@ -459,22 +462,46 @@ class RPGCore(commands.Cog):
                     'ultimate_energy': 0,
                     'technique_points': 3
                 }
-                self.save_player_data(user_id, player_data)
+                await self.save_player_data(user_id, player_data)
 
             # Ensure SP exists (for existing characters)
             if 'sp' not in player_data['resources']:
                 player_data['resources']['sp'] = 100
                 player_data['resources']['max_sp'] = 100
-                self.save_player_data(user_id, player_data)
+                await self.save_player_data(user_id, player_data)
 
             return player_data
         return None
 
-    def save_player_data(self, user_id, player_data):
-        """Save player RPG data safely."""
-        user_data = get_user_data(str(user_id)) or {}
+    async def save_player_data(self, user_id, player_data):
+        """Save player RPG data safely (persisted by the player cache's flush)."""
+        user_data = await get_user_data(str(user_id)) or {}
+        current = user_data.get('rpg_data')
+        if isinstance(current, dict) and current is not player_data:
+            if player_data.get('_version', 0) < current.get('_version', 0):
+                # A newer save landed since this copy was loaded; overwriting would lose it
+                logger.warning(f"Rejected stale save for player {user_id} "
+                               f"(version {player_data.get('_version', 0)} < {current.get('_version', 0)})")
+                return False
+
+        player_data['_version'] = player_data.get('_version', 0) + 1
         user_data['rpg_data'] = player_data
-        update_user_data(str(user_id), user_data)
+        leaderboard_index.update(user_id, player_data)
+        return await update_user_data(str(user_id), user_data)
+
+    async def mutate_player_data(self, user_id, mutator):
+        """Apply mutator to the player's data under their lock, saving with compare-and-swap and retry."""
+        player_data = await mutate_player(str(user_id), mutator)
+        if player_data:
+            leaderboard_index.update(user_id, player_data)
+        return player_data
+
+    async def patch_player_data(self, user_id, increments=None, sets=None):
+        """Apply small field-level changes to a player; only the touched paths are written back."""
+        player_data = await patch_player(str(user_id), increments, sets)
+        if player_data:
+            leaderboard_index.update(user_id, player_data)
+        return player_data
 
     def level_up_check(self, player_data):
         """Check and process level ups."""
@@ -552,9 +579,9 @@ class RPGCore(commands.Cog):
         """Calculate XP needed for a level."""
         return int(100 * (level ** 1.5))
 
-    def is_player_in_combat(self, user_id):
+    async def is_player_in_combat(self, user_id):
         """Check if player is currently in combat."""
-        player_data = self.get_player_data(user_id)
+        player_data = await self.get_player_data(user_id)
         if not player_data:
             return False
         return player_data.get('in_combat', False)
@@ -562,14 +589,14 @@ class RPGCore(commands.Cog):
     @commands.command(name="startrpg", aliases=["start", "begin", "create", "newchar"])
     async def start_rpg(self, ctx):
         """Start your RPG adventure with interactive class selection."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         user_id = str(ctx.author.id)
-        ensure_user_exists(user_id)
+        await ensure_user_exists(user_id)
 
         # Check if player is in combat first
-        if self.is_player_in_combat(user_id):
+        if await self.is_player_in_combat(user_id):
             embed = discord.Embed(
                 title="⚔️ Already Fighting!",
                 description="You're currently in combat! Finish your current battle first.",
@@ -580,7 +607,7 @@ class RPGCore(commands.Cog):
             return
 
         # Check if user already has a character
-        player_data = self.get_player_data(user_id)
+        player_data = await self.get_player_data(user_id)
         if player_data:
             embed = discord.Embed(
                 title="🎮 Adventure Already Started!",
@@ -610,11 +637,11 @@ class RPGCore(commands.Cog):
     @commands.command(name="profile", aliases=["prof", "me", "stats", "char", "character"])
     async def profile(self, ctx, member: discord.Member = None):
         """View character profile and stats."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         target = member or ctx.author
-        player_data = self.get_player_data(target.id)
+        player_data = await self.get_player_data(target.id)
 
         if not player_data:
             if target == ctx.author:
@@ -740,10 +767,10 @@ class RPGCore(commands.Cog):
     @commands.command(name="inventory", aliases=["inv"])
     async def inventory(self, ctx, category: str = None):
         """View your inventory with interactive interface."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
-        player_data = self.get_player_data(ctx.author.id)
+        player_data = await self.get_player_data(ctx.author.id)
         if not player_data:
             # Auto-start tutorial for new players
             embed = discord.Embed(
@@ -759,7 +786,7 @@ class RPGCore(commands.Cog):
 
         # Use the new interactive inventory system
         from cogs.rpg_inventory import InventoryView
-        view = InventoryView(ctx.author.id, self)
+        view = InventoryView(ctx.author.id, self, player_data)
         if not view.player_data:
             await ctx.send("❌ Error loading player data.")
             return
@@ -770,10 +797,10 @@ class RPGCore(commands.Cog):
     @commands.command(name="combatstatus", aliases=["cs"])
     async def combat_status(self, ctx):
         """Check your current combat status."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
-        player_data = self.get_player_data(ctx.author.id)
+        player_data = await self.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
@@ -805,10 +832,10 @@ class RPGCore(commands.Cog):
     @commands.command(name="allocate", aliases=["alloc"])
     async def allocate_stats(self, ctx, stat: str, points: int = 1):
         """Allocate stat points to improve your character."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
-        player_data = self.get_player_data(ctx.author.id)
+        player_data = await self.get_player_data(ctx.author.id)
         if not player_data:
             embed = discord.Embed(
                 title="🎮 No Character Found",
@@ -877,7 +904,7 @@ class RPGCore(commands.Cog):
         # Update derived stats
         self.update_derived_stats(player_data)
 
-        self.save_player_data(ctx.author.id, player_data)
+        await self.save_player_data(ctx.author.id, player_data)
 
         embed = create_embed("Stats Allocated", f"Successfully allocated {points} points to {stat.title()}.", COLORS['success'])
         await ctx.send(embed=embed)
@@ -885,10 +912,10 @@ class RPGCore(commands.Cog):
     @commands.command(name="forceexit", aliases=["forcexit", "emergencyexit"])
     async def force_exit_combat(self, ctx):
         """Force exit combat with heavy penalties (emergency use only)."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
-        player_data = self.get_player_data(str(ctx.author.id))
+        player_data = await self.get_player_data(str(ctx.author.id))
         if not player_data:
             await ctx.send("❌ You don't have a character!")
             return
@@ -932,7 +959,7 @@ class ForceExitConfirmView(discord.ui.View):
             return
 
         # Apply heavy penalties
-        player_data = self.rpg_core.get_player_data(self.user_id)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
         if not player_data:
             await interaction.response.send_message("❌ Player data not found!", ephemeral=True)
             return
@@ -950,14 +977,11 @@ class ForceExitConfirmView(discord.ui.View):
         player_data['stats'] = stats
 
         # Save changes
-        self.rpg_core.save_player_data(self.user_id, player_data)
+        await self.rpg_core.save_player_data(self.user_id, player_data)
 
         # Clear combat tracking
-        from cogs.rpg_combat import active_combats
-        for channel_id, user_id in list(active_combats.items()):
-            if user_id == int(self.user_id):
-                del active_combats[channel_id]
-                break
+        from utils.combat_sessions import combat_sessions
+        await combat_sessions.discard(self.user_id)
 
         embed = discord.Embed(
             title="💀 Force Exit Applied",
@@ -995,10 +1019,10 @@ class ForceExitConfirmView(discord.ui.View):
     @commands.command(name="superitems", aliases=["legendary_items", "op_items"])
     async def super_items(self, ctx):
         """View the 10 super OP items and their requirements."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
-        player_data = self.get_player_data(ctx.author.id)
+        player_data = await self.get_player_data(ctx.author.id)
         if not player_data:
             embed = discord.Embed(
                 title="🎮 No Character Found",
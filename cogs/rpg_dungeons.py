@@ -1,117 +1,28 @@
 import discord
 from discord.ext import commands
-from replit import db
-import random
 import asyncio
-from datetime import datetime
-from rpg_data.game_data import TACTICAL_MONSTERS, ITEMS
+from rpg_data.dungeon_data import DUNGEONS
+from utils.dungeon_engine import (
+    ROOMS_PER_FLOOR, dungeon_runs, generate_layout, new_run, resolve_boss, resolve_room, run_totals
+)
 from utils.helpers import create_embed, format_number
 from config import COLORS, is_module_enabled
+from utils.sessions import session_registry
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Enhanced Dungeon definitions with comprehensive scenarios
-DUNGEONS = {
-    'akuma_catacombs': {
-        'name': 'The Crumbling Akuma Catacombs',
-        'emoji': '🏴‍☠️',
-        'min_level': 1,
-        'max_level': 8,
-        'floors': 3,
-        'description': 'Dusty, dark stone corridors filled with cobwebs, leftover magical energy, and disappointingly cheese-free air.',
-        'monsters': ['shadow_grub', 'akuma_sentinel', 'cursed_spirit'],
-        'boss': 'Giant Akumatized Spider',
-        'theme': 'dark_catacombs',
-        'plagg_intro': "Ugh, finally. You've stumbled into the Akuma Catacombs. It smells like old socks and regret, with just a HINT of aged cheese. Disappointing, really.",
-        'rewards': {
-            'xp_multiplier': 1.5,
-            'gold_multiplier': 1.3,
-            'rare_materials': ['shadow_essence', 'akuma_fragment', 'old_cheese_rind']
-        }
-    },
-    'foxen_forest': {
-        'name': 'The Whispering Foxen Forest',
-        'emoji': '🌲',
-        'min_level': 8,
-        'max_level': 15,
-        'floors': 5,
-        'description': 'An enchanted forest of perpetual twilight with glowing runes and trickster magic.',
-        'monsters': ['forest_sprite', 'illusion_fox', 'trickster_spirit'],
-        'boss': 'Council of Kitsune Illusionists',
-        'theme': 'mystical_forest',
-        'plagg_intro': "Great, a magical forest. It's all sparkly and mystical and has exactly ZERO cheese. The foxes better have some good snacks hidden somewhere.",
-        'rewards': {
-            'xp_multiplier': 2.0,
-            'gold_multiplier': 1.8,
-            'rare_materials': ['fox_fur', 'illusion_crystal', 'forest_essence']
-        }
-    },
-    'shadow_fortress': {
-        'name': 'Shadow Fortress',
-        'emoji': '🏰',
-        'min_level': 15,
-        'max_level': 25,
-        'floors': 7,
-        'description': 'An ancient fortress consumed by darkness and shadowy beings.',
-        'monsters': ['shadow_assassin', 'shadow_wraith', 'void_sentinel'],
-        'boss': 'Shadow Lord',
-        'theme': 'dark_fortress',
-        'plagg_intro': "Oh wonderful, a spooky shadow fortress. Because what I really needed was MORE darkness and LESS cheese visibility.",
-        'rewards': {
-            'xp_multiplier': 2.5,
-            'gold_multiplier': 2.2,
-            'rare_materials': ['shadow_essence', 'dark_crystal', 'void_fragment']
-        }
-    },
-    'dragons_lair': {
-        'name': "Dragon's Lair",
-        'emoji': '🐉',
-        'min_level': 25,
-        'max_level': 35,
-        'floors': 10,
-        'description': 'The lair of an ancient dragon, filled with legendary treasures.',
-        'monsters': ['fire_drake', 'dragon_cultist', 'flame_elemental'],
-        'boss': 'Ancient Red Dragon',
-        'theme': 'dragon_hoard',
-        'plagg_intro': "A dragon's lair! Finally, someone with good taste in hoarding. Though I bet they don't collect cheese. Typical.",
-        'rewards': {
-            'xp_multiplier': 3.0,
-            'gold_multiplier': 2.8,
-            'rare_materials': ['dragon_scale', 'dragon_heart', 'legendary_gem']
-        }
-    },
-    'cosmic_void': {
-        'name': 'The Cosmic Void of the Peacock',
-        'emoji': '🌌',
-        'min_level': 35,
-        'max_level': 50,
-        'floors': 15,
-        'description': 'A mind-bending reality of floating islands and crystallized emotions.',
-        'monsters': ['void_walker', 'emotion_wraith', 'cosmic_horror'],
-        'boss': 'Manifestation of Cosmic Indifference',
-        'theme': 'cosmic_nightmare',
-        'plagg_intro': "Well, THIS is new. We're in some kind of emotional void space thing. It's all floaty and weird and I GUARANTEE there's no cheese. This is the worst.",
-        'rewards': {
-            'xp_multiplier': 4.0,
-            'gold_multiplier': 3.5,
-            'rare_materials': ['void_essence', 'cosmic_dust', 'reality_fragment']
-        }
-    }
-}
-
 class DungeonSelectionView(discord.ui.View):
     """Interactive dungeon selection interface."""
 
-    def __init__(self, user_id, rpg_core):
+    def __init__(self, user_id, rpg_core, player_data):
         super().__init__(timeout=300)
         self.user_id = str(user_id)
         self.rpg_core = rpg_core
-        self.add_dungeon_select()
+        self.add_dungeon_select(player_data)
 
-    def add_dungeon_select(self):
+    def add_dungeon_select(self, player_data):
         """Add dungeon selection dropdown."""
-        player_data = self.rpg_core.get_player_data(self.user_id)
         if not player_data:
             return
 
@@ -154,9 +65,13 @@ class DungeonSelect(discord.ui.Select):
             return
 
         dungeon_key = self.values[0]
+        if session_registry.is_open('dungeon', self.user_id):
+            await interaction.response.send_message("❌ You're already exploring a dungeon!", ephemeral=True)
+            return
 
         # Start the dungeon exploration
-        view = DungeonExplorationView(self.user_id, dungeon_key, self.rpg_core)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
+        view = DungeonExplorationView(self.user_id, dungeon_key, self.rpg_core, player_data)
         embed = view.create_dungeon_intro_embed()
 
         await interaction.response.edit_message(embed=embed, view=view)
@@ -164,36 +79,124 @@ class DungeonSelect(discord.ui.Select):
 class DungeonExplorationView(discord.ui.View):
     """Comprehensive dungeon exploration system."""
 
-    def __init__(self, user_id, dungeon_key, rpg_core):
+    def __init__(self, user_id, dungeon_key, rpg_core, player_data, run=None):
         super().__init__(timeout=900)  # 15 minute timeout
         self.user_id = str(user_id)
         self.dungeon_key = dungeon_key
         self.rpg_core = rpg_core
         self.dungeon_data = DUNGEONS[dungeon_key]
 
-        # Exploration state
-        self.current_floor = 1
-        self.current_room = 1
-        self.rooms_per_floor = 5
-        self.total_rooms_explored = 0
+        # Exploration state is just the run's seed and cursor; the layout is regenerated from the seed
+        self.player_data = player_data
+        self.rooms_per_floor = ROOMS_PER_FLOOR
         self.total_rooms = self.dungeon_data['floors'] * self.rooms_per_floor
+        self.run = run or new_run(dungeon_key, player_data['level'] if player_data else 1)
+        self.layout = generate_layout(dungeon_key, self.run['seed'])
+
+        # Session tracking, replayed for resumed runs
+        totals = run_totals(self.run)
+        self.total_xp_gained = totals['xp']
+        self.total_gold_gained = totals['gold']
+        self.items_found = [item.replace('_', ' ').title() for item in totals['items']]
+        self.monsters_defeated = totals['monsters']
+        # Serialises claims from this view so a double-click can't pay out the same room twice
+        self.claim_lock = asyncio.Lock()
 
-        # Session tracking
-        self.total_xp_gained = 0
-        self.total_gold_gained = 0
-        self.items_found = []
-        self.monsters_defeated = 0
-        self.floors_completed = 0
-
-        # Current scenario
-        self.current_scenario = None
-        self.awaiting_choice = False
-
-        # Load player data
-        self.player_data = self.rpg_core.get_player_data(user_id)
         if not self.player_data:
             return
 
+        session_registry.open('dungeon', self.user_id, self.timeout)
+
+    @property
+    def current_floor(self):
+        return self.run['floor']
+
+    @property
+    def total_rooms_explored(self):
+        return self.run['cursor']
+
+    @property
+    def current_room(self):
+        """Room number on the current floor; one past the last room once the floor is cleared."""
+        return self.run['cursor'] - (self.run['floor'] - 1) * self.rooms_per_floor + 1
+
+    @property
+    def floors_completed(self):
+        return self.run['floor'] - 1
+
+    async def apply_outcome(self, outcome):
+        """Credit a resolved room to the player and save only the fields it touched."""
+        increments = {'xp': outcome.xp, 'gold': outcome.gold}
+        for item_key in outcome.items:
+            increments[f"inventory.{item_key}"] = increments.get(f"inventory.{item_key}", 0) + 1
+
+        if outcome.damage:
+            # HP is clamped against the stored value, so this needs a read-modify-write
+            def credit(player_data):
+                for path, amount in increments.items():
+                    target, field = player_data, path
+                    if path.startswith('inventory.'):
+                        target, field = player_data.setdefault('inventory', {}), path.split('.', 1)[1]
+                    target[field] = target.get(field, 0) + amount
+                resources = player_data['resources']
+                resources['hp'] = max(1, resources['hp'] - outcome.damage)
+
+            updated = await self.rpg_core.mutate_player_data(self.user_id, credit)
+        else:
+            updated = await self.rpg_core.patch_player_data(self.user_id, increments)
+        if updated:
+            self.player_data = updated
+
+        self.total_xp_gained += outcome.xp
+        self.total_gold_gained += outcome.gold
+        self.monsters_defeated += outcome.monster_defeated
+        self.items_found.extend(item.replace('_', ' ').title() for item in outcome.items)
+
+    async def is_current_run(self) -> bool:
+        """Whether the stored run is still this view's run at the same room and floor."""
+        stored = await dungeon_runs.get(self.user_id)
+        return (bool(stored) and stored['seed'] == self.run['seed'] and stored['cursor'] == self.run['cursor']
+                and stored['floor'] == self.run['floor'])
+
+    async def explore_room(self):
+        """Resolve the next room and move the cursor past it. Returns None if it was already claimed."""
+        async with self.claim_lock:
+            if self.run['cursor'] >= self.total_rooms or not await self.is_current_run():
+                return None
+            outcome = resolve_room(self.layout, self.run['cursor'], self.run['level'])
+            self.run['cursor'] += 1
+            await dungeon_runs.save(self.user_id, self.run)
+        await self.apply_outcome(outcome)
+        return outcome
+
+    async def descend(self) -> bool:
+        """Move to the next floor once this one is cleared. Returns False if that already happened."""
+        async with self.claim_lock:
+            if (self.run['cursor'] < self.run['floor'] * self.rooms_per_floor
+                    or self.run['floor'] >= self.dungeon_data['floors'] or not await self.is_current_run()):
+                return False
+            self.run['floor'] += 1
+            await dungeon_runs.save(self.user_id, self.run)
+        return True
+
+    async def fight_boss(self):
+        """Resolve the boss; the run ends either way. Returns None if the run was already finished."""
+        async with self.claim_lock:
+            if not await self.is_current_run():
+                return None
+            outcome = resolve_boss(self.layout, self.run['level'])
+            await dungeon_runs.discard(self.user_id)
+        await self.apply_outcome(outcome)
+        return outcome
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Every interaction restarts the view's timeout, so keep the session deadline in step
+        session_registry.touch('dungeon', self.user_id, self.timeout)
+        return True
+
+    async def on_timeout(self):
+        session_registry.close('dungeon', self.user_id)
+
     def create_dungeon_intro_embed(self):
         """Create the dungeon introduction embed."""
         embed = discord.Embed(
@@ -316,6 +319,39 @@ class DungeonExplorationView(discord.ui.View):
 
         self.add_item(ExitDungeonButton())
 
+    async def calculate_completion_rewards(self):
+        """Calculate final completion rewards."""
+        bonus_xp = 100 * self.floors_completed
+        bonus_gold = 200 * self.floors_completed
+
+        updated = await self.rpg_core.patch_player_data(self.user_id, {'xp': bonus_xp, 'gold': bonus_gold})
+        if updated:
+            self.player_data = updated
+
+        return f"**Completion Bonus:** +{bonus_xp} XP, +{bonus_gold} Gold"
+
+    def create_encounter_result_embed(self, encounter_type, result):
+        """Create embed for encounter results."""
+        embed = discord.Embed(
+            title=f"🎲 {encounter_type.title()} Encounter",
+            description=result,
+            color=COLORS['primary']
+        )
+
+        # Update player status in embed
+        hp = self.player_data['resources']['hp']
+        max_hp = self.player_data['resources']['max_hp']
+
+        embed.add_field(
+            name="🛡️ Status",
+            value=f"**HP:** {hp}/{max_hp}\n"
+                  f"**Session XP:** {format_number(self.total_xp_gained)}\n"
+                  f"**Session Gold:** {format_number(self.total_gold_gained)}",
+            inline=True
+        )
+
+        return embed
+
 class EnterDungeonButton(discord.ui.Button):
     def __init__(self):
         super().__init__(label="Enter Dungeon", style=discord.ButtonStyle.success, emoji="🚪")
@@ -323,7 +359,8 @@ class EnterDungeonButton(discord.ui.Button):
     async def callback(self, interaction: discord.Interaction):
         view = self.view
 
-        # Start exploration
+        # Start exploration; from here the run can be resumed
+        await dungeon_runs.save(view.user_id, view.run)
         embed = view.create_exploration_embed()
         await view.update_exploration_view()
 
@@ -336,20 +373,14 @@ class ExploreRoomButton(discord.ui.Button):
     async def callback(self, interaction: discord.Interaction):
         view = self.view
 
-        # Generate random encounter
-        encounter_type = random.choices(
-            ['monster', 'treasure', 'trap', 'empty'],
-            weights=[40, 30, 20, 10]
-        )[0]
-
-        result = view.process_room_encounter(encounter_type)
-
-        # Update progress
-        view.current_room += 1
-        view.total_rooms_explored += 1
+        # The room was rolled when the run was generated
+        outcome = await view.explore_room()
+        if not outcome:
+            await interaction.response.send_message("❌ That room has already been explored.", ephemeral=True)
+            return
 
         # Create result embed
-        embed = view.create_encounter_result_embed(encounter_type, result)
+        embed = view.create_encounter_result_embed(outcome.kind, outcome.text)
         await view.update_exploration_view()
 
         await interaction.response.edit_message(embed=embed, view=view)
@@ -361,9 +392,9 @@ class NextFloorButton(discord.ui.Button):
     async def callback(self, interaction: discord.Interaction):
         view = self.view
 
-        view.current_floor += 1
-        view.current_room = 1
-        view.floors_completed += 1
+        if not await view.descend():
+            await interaction.response.send_message("❌ You've already descended from this floor.", ephemeral=True)
+            return
 
         embed = discord.Embed(
             title=f"🏁 Floor {view.current_floor - 1} Complete!",
@@ -382,16 +413,22 @@ class RestButton(discord.ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         view = self.view
-        player_data = view.player_data
+        healed = {}
 
         # Restore some HP
-        resources = player_data['resources']
-        heal_amount = int(resources['max_hp'] * 0.25)  # 25% heal
-        old_hp = resources['hp']
-        resources['hp'] = min(resources['max_hp'], resources['hp'] + heal_amount)
-        actual_heal = resources['hp'] - old_hp
-
-        view.rpg_core.save_player_data(view.user_id, player_data)
+        def rest(player_data):
+            resources = player_data['resources']
+            heal_amount = int(resources['max_hp'] * 0.25)  # 25% heal
+            old_hp = resources['hp']
+            resources['hp'] = min(resources['max_hp'], resources['hp'] + heal_amount)
+            healed['hp'] = resources['hp'] - old_hp
+
+        player_data = await view.rpg_core.mutate_player_data(view.user_id, rest)
+        if not player_data:
+            await interaction.response.send_message("❌ Couldn't rest right now. Try again!", ephemeral=True)
+            return
+        view.player_data = player_data
+        actual_heal = healed['hp']
 
         embed = discord.Embed(
             title="💤 Rest Complete",
@@ -410,17 +447,20 @@ class FinalBossButton(discord.ui.Button):
         view = self.view
 
         # Boss encounter logic
-        boss_result = view.process_boss_encounter()
+        outcome = await view.fight_boss()
+        if not outcome:
+            await interaction.response.send_message("❌ This dungeon run is already over.", ephemeral=True)
+            return
 
         embed = discord.Embed(
             title=f"🐉 FINAL BOSS: {view.dungeon_data['boss']}",
-            description=boss_result,
-            color=COLORS['error'] if 'defeated' in boss_result.lower() else COLORS['success']
+            description=outcome.text,
+            color=COLORS['success'] if outcome.victory else COLORS['error']
         )
 
-        if 'victory' in boss_result.lower():
+        if outcome.victory:
             # Dungeon completed
-            completion_rewards = view.calculate_completion_rewards()
+            completion_rewards = await view.calculate_completion_rewards()
             embed.add_field(
                 name="🏆 Completion Rewards",
                 value=completion_rewards,
@@ -459,148 +499,9 @@ class ExitDungeonButton(discord.ui.Button):
             embed.add_field(name="🎒 Items Found", value=items_text, inline=False)
 
         await interaction.response.edit_message(embed=embed, view=None)
-
-# Add these methods to DungeonExplorationView class
-    def process_room_encounter(self, encounter_type):
-        """Process different types of room encounters."""
-        if encounter_type == 'monster':
-            return self.handle_monster_encounter()
-        elif encounter_type == 'treasure':
-            return self.handle_treasure_encounter()
-        elif encounter_type == 'trap':
-            return self.handle_trap_encounter()
-        else:
-            return "The room appears empty. *\"Great, more nothing. Like a cheese-less refrigerator.\"*"
-
-    def handle_monster_encounter(self):
-        """Handle monster encounter."""
-        monster = random.choice(self.dungeon_data['monsters'])
-
-        # Simple combat resolution
-        player_level = self.player_data['level']
-        monster_strength = random.randint(1, 10)
-
-        if player_level + random.randint(1, 6) > monster_strength:
-            # Victory
-            xp_gain = random.randint(20, 50) * self.dungeon_data['rewards']['xp_multiplier']
-            gold_gain = random.randint(10, 30) * self.dungeon_data['rewards']['gold_multiplier']
-
-            self.total_xp_gained += int(xp_gain)
-            self.total_gold_gained += int(gold_gain)
-            self.monsters_defeated += 1
-
-            # Update player data
-            self.player_data['xp'] += int(xp_gain)
-            self.player_data['gold'] += int(gold_gain)
-
-            return f"Victory! You defeated the {monster.replace('_', ' ').title()}! Gained {int(xp_gain)} XP and {int(gold_gain)} gold."
-        else:
-            # Defeat
-            damage = random.randint(5, 15)
-            self.player_data['resources']['hp'] = max(1, self.player_data['resources']['hp'] - damage)
-            return f"The {monster.replace('_', ' ').title()} proves too strong! You take {damage} damage."
-
-    def handle_treasure_encounter(self):
-        """Handle treasure encounter."""
-        treasure_type = random.choice(['gold', 'item', 'materials'])
-
-        if treasure_type == 'gold':
-            gold_amount = random.randint(50, 150) * self.dungeon_data['rewards']['gold_multiplier']
-            self.total_gold_gained += int(gold_amount)
-            self.player_data['gold'] += int(gold_amount)
-            return f"Treasure chest! You found {int(gold_amount)} gold!"
-
-        elif treasure_type == 'item':
-            item_key = 'health_potion'  # Simplified for now
-            inventory = self.player_data.get('inventory', {})
-            inventory[item_key] = inventory.get(item_key, 0) + 1
-            self.player_data['inventory'] = inventory
-            self.items_found.append(item_key.replace('_', ' ').title())
-            return f"You found a {item_key.replace('_', ' ').title()}!"
-
-        else:
-            material = random.choice(self.dungeon_data['rewards']['rare_materials'])
-            inventory = self.player_data.get('inventory', {})
-            inventory[material] = inventory.get(material, 0) + 1
-            self.player_data['inventory'] = inventory
-            self.items_found.append(material.replace('_', ' ').title())
-            return f"Rare materials! You found {material.replace('_', ' ').title()}!"
-
-    def handle_trap_encounter(self):
-        """Handle trap encounter."""
-        trap_types = [
-            ("Pressure Plate", "You step on a pressure plate and spikes shoot up!"),
-            ("Poison Dart", "A dart flies out of the wall!"),
-            ("Pit Trap", "The floor gives way beneath you!")
-        ]
-
-        trap_name, description = random.choice(trap_types)
-
-        # Simple trap resolution
-        if random.randint(1, 10) > 6:  # 40% chance to avoid
-            return f"{description} But you dodge it skillfully!"
-        else:
-            damage = random.randint(8, 20)
-            self.player_data['resources']['hp'] = max(1, self.player_data['resources']['hp'] - damage)
-            return f"{description} You take {damage} damage!"
-
-    def process_boss_encounter(self):
-        """Process the final boss encounter."""
-        boss_name = self.dungeon_data['boss']
-        player_level = self.player_data['level']
-
-        # Simple boss fight resolution
-        boss_difficulty = self.dungeon_data['max_level']
-
-        if player_level + random.randint(1, 10) > boss_difficulty - 5:
-            # Victory
-            xp_reward = 200 * self.dungeon_data['rewards']['xp_multiplier']
-            gold_reward = 500 * self.dungeon_data['rewards']['gold_multiplier']
-
-            self.total_xp_gained += int(xp_reward)
-            self.total_gold_gained += int(gold_reward)
-
-            self.player_data['xp'] += int(xp_reward)
-            self.player_data['gold'] += int(gold_reward)
-
-            return f"VICTORY! You have defeated the {boss_name}! The dungeon trembles as your foe falls!"
-        else:
-            # Defeat
-            damage = random.randint(20, 40)
-            self.player_data['resources']['hp'] = max(1, self.player_data['resources']['hp'] - damage)
-            return f"The {boss_name} proves too powerful! You are defeated and must retreat, taking {damage} damage."
-
-    def calculate_completion_rewards(self):
-        """Calculate final completion rewards."""
-        bonus_xp = 100 * self.floors_completed
-        bonus_gold = 200 * self.floors_completed
-
-        self.player_data['xp'] += bonus_xp
-        self.player_data['gold'] += bonus_gold
-
-        return f"**Completion Bonus:** +{bonus_xp} XP, +{bonus_gold} Gold"
-
-    def create_encounter_result_embed(self, encounter_type, result):
-        """Create embed for encounter results."""
-        embed = discord.Embed(
-            title=f"🎲 {encounter_type.title()} Encounter",
-            description=result,
-            color=COLORS['primary']
-        )
-
-        # Update player status in embed
-        hp = self.player_data['resources']['hp']
-        max_hp = self.player_data['resources']['max_hp']
-
-        embed.add_field(
-            name="🛡️ Status",
-            value=f"**HP:** {hp}/{max_hp}\n"
-                  f"**Session XP:** {format_number(self.total_xp_gained)}\n"
-                  f"**Session Gold:** {format_number(self.total_gold_gained)}",
-            inline=True
-        )
-
-        return embed
+        session_registry.close('dungeon', view.user_id)
+        await dungeon_runs.discard(view.user_id)
+        view.stop()
 
 class RPGDungeons(commands.Cog):
     """Comprehensive dungeon exploration system."""
@@ -611,7 +512,7 @@ class RPGDungeons(commands.Cog):
     @commands.command(name="dungeons", aliases=["dung", "explore_dungeon"])
     async def dungeon_explore(self, ctx, dungeon_name: str = None):
         """Enter and explore dangerous dungeons for rewards."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -619,14 +520,14 @@ class RPGDungeons(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
             return
 
         # Check if player is in combat
-        if rpg_core.is_player_in_combat(ctx.author.id):
+        if await rpg_core.is_player_in_combat(ctx.author.id):
             embed = discord.Embed(
                 title="⚔️ Currently in Combat",
                 description="You're currently in combat! Finish your battle first.",
@@ -635,10 +536,30 @@ class RPGDungeons(commands.Cog):
             await ctx.send(embed=embed)
             return
 
+        # Only one exploration view per player, so the same run can't be played from two messages
+        if session_registry.is_open('dungeon', ctx.author.id):
+            embed = discord.Embed(
+                title="🏰 Already Exploring",
+                description="You already have a dungeon open! Continue there or exit it first.",
+                color=COLORS['warning']
+            )
+            await ctx.send(embed=embed)
+            return
+
+        # Pick an unfinished run back up where it left off
+        run = await dungeon_runs.get(ctx.author.id)
+        if run:
+            view = DungeonExplorationView(str(ctx.author.id), run['dungeon_key'], rpg_core, player_data, run=run)
+            embed = view.create_exploration_embed()
+            embed.set_footer(text="💡 Resuming your unfinished run. Exit the dungeon to choose another one.")
+            await view.update_exploration_view()
+            await ctx.send(embed=embed, view=view)
+            return
+
         if not dungeon_name:
             # Show dungeon selection
             embed = self.create_dungeon_list_embed(player_data)
-            view = DungeonSelectionView(str(ctx.author.id), rpg_core)
+            view = DungeonSelectionView(str(ctx.author.id), rpg_core, player_data)
             await ctx.send(embed=embed, view=view)
         else:
             # Try to enter specific dungeon
@@ -653,7 +574,7 @@ class RPGDungeons(commands.Cog):
                 return
 
             # Start dungeon directly
-            view = DungeonExplorationView(str(ctx.author.id), dungeon_key, rpg_core)
+            view = DungeonExplorationView(str(ctx.author.id), dungeon_key, rpg_core, player_data)
             embed = view.create_dungeon_intro_embed()
             await ctx.send(embed=embed, view=view)
 
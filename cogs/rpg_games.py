@@ -14,10 +14,25 @@ class RPGGames(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def apply_rewards(self, ctx, rpg_core, embed, increments, sets=None):
+        """Patch the player's changed fields, falling back to a full save on level up."""
+        player_data = await rpg_core.patch_player_data(ctx.author.id, increments, sets)
+        if not player_data:
+            return
+
+        # Level ups touch stats and resources all over the document
+        if rpg_core.calculate_level_xp_requirement(player_data['level'] + 1) > player_data['xp']:
+            return
+        player_data = await rpg_core.mutate_player_data(
+            ctx.author.id, lambda draft: rpg_core.level_up_check(draft) > 0
+        )
+        if player_data:
+            embed.add_field(name="⭐ Level Up!", value=f"You are now level {player_data['level']}!", inline=False)
+
     @commands.command(name="hunt")
     async def hunt_monsters(self, ctx):
         """Hunt for monsters and treasure."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -25,7 +40,7 @@ class RPGGames(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
@@ -42,7 +57,8 @@ class RPGGames(commands.Cog):
             return
 
         # Update cooldown
-        player_data['last_hunt'] = time.time()
+        increments = {}
+        sets = {'last_hunt': time.time()}
 
         # Hunt encounter
         encounters = [
@@ -58,17 +74,11 @@ class RPGGames(commands.Cog):
         victory = random.random() > 0.3  # 70% success rate
 
         if victory:
-            player_data['xp'] += encounter['xp']
-            player_data['gold'] += encounter['gold']
+            increments['xp'] = encounter['xp']
+            increments['gold'] = encounter['gold']
 
             if encounter['item']:
-                if encounter['item'] in player_data['inventory']:
-                    player_data['inventory'][encounter['item']] += 1
-                else:
-                    player_data['inventory'][encounter['item']] = 1
-
-            # Check for level up
-            levels_gained = rpg_core.level_up_check(player_data)
+                increments[f"inventory.{encounter['item']}"] = 1
 
             embed = discord.Embed(
                 title="🏹 Successful Hunt!",
@@ -80,13 +90,10 @@ class RPGGames(commands.Cog):
             if encounter['item']:
                 embed.add_field(name="Item Found", value=encounter['item'].replace('_', ' ').title(), inline=True)
 
-            if levels_gained:
-                embed.add_field(name="⭐ Level Up!", value=f"You are now level {player_data['level']}!", inline=False)
-
         else:
             # Failure - lose some health
             damage = random.randint(10, 25)
-            player_data['resources']['hp'] = max(1, player_data['resources']['hp'] - damage)
+            sets['resources.hp'] = max(1, player_data['resources']['hp'] - damage)
 
             embed = discord.Embed(
                 title="💀 Hunt Failed",
@@ -95,13 +102,13 @@ class RPGGames(commands.Cog):
             )
             embed.add_field(name="Consequence", value=f"Lost {damage} HP", inline=True)
 
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await self.apply_rewards(ctx, rpg_core, embed, increments, sets)
         await ctx.send(embed=embed)
 
     @commands.command(name="explore")
     async def explore_world(self, ctx):
         """Explore the world for discoveries."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -110,7 +117,7 @@ class RPGGames(commands.Cog):
             return
 
         # Check if player is in combat first
-        if rpg_core.is_player_in_combat(ctx.author.id):
+        if await rpg_core.is_player_in_combat(ctx.author.id):
             embed = discord.Embed(
                 title="⚔️ Already Fighting!",
                 description="You're currently in combat! Finish your current battle first.",
@@ -121,7 +128,7 @@ class RPGGames(commands.Cog):
             await ctx.send(embed=embed, view=view)
             return
 
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
@@ -138,7 +145,8 @@ class RPGGames(commands.Cog):
             return
 
         # Update cooldown
-        player_data['last_explore'] = time.time()
+        increments = {}
+        sets = {'last_explore': time.time()}
 
         discoveries = [
             {"name": "Ancient Chest", "gold": 50, "item": "rare_gem"},
@@ -158,46 +166,35 @@ class RPGGames(commands.Cog):
 
         rewards = []
         if 'xp' in discovery:
-            player_data['xp'] += discovery['xp']
+            increments['xp'] = discovery['xp']
             rewards.append(f"• {discovery['xp']} XP")
 
         if 'gold' in discovery:
-            player_data['gold'] += discovery['gold']
+            increments['gold'] = discovery['gold']
             rewards.append(f"• {discovery['gold']} Gold")
 
         if 'item' in discovery:
             item_name = discovery['item']
             quantity = discovery.get('quantity', 1)
-            if item_name in player_data['inventory']:
-                player_data['inventory'][item_name] += quantity
-            else:
-                player_data['inventory'][item_name] = quantity
+            increments[f"inventory.{item_name}"] = quantity
             rewards.append(f"• {quantity}x {item_name.replace('_', ' ').title()}")
 
         if 'heal' in discovery:
             old_hp = player_data['resources']['hp']
-            player_data['resources']['hp'] = min(
-                player_data['resources']['max_hp'],
-                old_hp + discovery['heal']
-            )
-            actual_heal = player_data['resources']['hp'] - old_hp
-            rewards.append(f"• Healed {actual_heal} HP")
+            new_hp = min(player_data['resources']['max_hp'], old_hp + discovery['heal'])
+            sets['resources.hp'] = new_hp
+            rewards.append(f"• Healed {new_hp - old_hp} HP")
 
         if rewards:
             embed.add_field(name="Rewards", value="\n".join(rewards), inline=False)
 
-        # Check for level up
-        levels_gained = rpg_core.level_up_check(player_data)
-        if levels_gained:
-            embed.add_field(name="⭐ Level Up!", value=f"You are now level {player_data['level']}!", inline=False)
-
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await self.apply_rewards(ctx, rpg_core, embed, increments, sets)
         await ctx.send(embed=embed)
 
     @commands.command(name="dungeon")
     async def enter_dungeon(self, ctx, dungeon_name: str = None):
         """Enter a dungeon for challenging adventures."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -205,7 +202,7 @@ class RPGGames(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             return
@@ -249,7 +246,8 @@ class RPGGames(commands.Cog):
             return
 
         # Consume stamina
-        player_data['resources']['stamina'] -= 20
+        increments = {'resources.stamina': -20}
+        sets = {}
 
         # Dungeon run simulation
         success = random.random() > 0.4  # 60% success rate
@@ -260,17 +258,14 @@ class RPGGames(commands.Cog):
             xp_reward = int(base_xp * dungeon['reward_mult'])
             gold_reward = int(base_gold * dungeon['reward_mult'])
 
-            player_data['xp'] += xp_reward
-            player_data['gold'] += gold_reward
+            increments['xp'] = xp_reward
+            increments['gold'] = gold_reward
 
             # Rare loot chance
             if random.random() < 0.3:  # 30% chance
                 rare_items = ['legendary_weapon', 'mythical_armor', 'rare_artifact']
                 item = random.choice(rare_items)
-                if item in player_data['inventory']:
-                    player_data['inventory'][item] += 1
-                else:
-                    player_data['inventory'][item] = 1
+                increments[f"inventory.{item}"] = 1
 
             embed = discord.Embed(
                 title="🏆 Dungeon Cleared!",
@@ -282,7 +277,7 @@ class RPGGames(commands.Cog):
         else:
             # Failure
             damage = random.randint(20, 40)
-            player_data['resources']['hp'] = max(1, player_data['resources']['hp'] - damage)
+            sets['resources.hp'] = max(1, player_data['resources']['hp'] - damage)
 
             embed = discord.Embed(
                 title="💀 Dungeon Failed",
@@ -291,19 +286,13 @@ class RPGGames(commands.Cog):
             )
             embed.add_field(name="Consequence", value=f"Lost {damage} HP", inline=True)
 
-        # Check for level up
-        if success:
-            levels_gained = rpg_core.level_up_check(player_data)
-            if levels_gained:
-                embed.add_field(name="⭐ Level Up!", value=f"You are now level {player_data['level']}!", inline=False)
-
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await self.apply_rewards(ctx, rpg_core, embed, increments, sets)
         await ctx.send(embed=embed)
 
     @commands.command(name="miraculous", aliases=["box"])
     async def miraculous_box(self, ctx):
         """Enter the Miraculous Box for artifact farming."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -311,7 +300,7 @@ class RPGGames(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
@@ -321,9 +310,6 @@ class RPGGames(commands.Cog):
             await ctx.send("❌ You need 40 Miraculous Energy to enter the box!")
             return
 
-        # Consume energy
-        player_data['resources']['miraculous_energy'] -= 40
-
         # Artifact rewards
         artifacts = [
             'ladybug_earrings', 'cat_ring', 'bee_comb', 'fox_necklace',
@@ -331,13 +317,14 @@ class RPGGames(commands.Cog):
         ]
 
         artifact = random.choice(artifacts)
-        if artifact in player_data['inventory']:
-            player_data['inventory'][artifact] += 1
-        else:
-            player_data['inventory'][artifact] = 1
-
         xp_reward = random.randint(40, 80)
-        player_data['xp'] += xp_reward
+
+        # Consume energy and grant rewards
+        increments = {
+            'resources.miraculous_energy': -40,
+            f"inventory.{artifact}": 1,
+            'xp': xp_reward,
+        }
 
         embed = discord.Embed(
             title="✨ Miraculous Box Expedition",
@@ -351,12 +338,7 @@ class RPGGames(commands.Cog):
         )
         embed.add_field(name="XP Gained", value=str(xp_reward), inline=True)
 
-        # Check for level up
-        levels_gained = rpg_core.level_up_check(player_data)
-        if levels_gained:
-            embed.add_field(name="⭐ Level Up!", value=f"You are now level {player_data['level']}!", inline=False)
-
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await self.apply_rewards(ctx, rpg_core, embed, increments)
         await ctx.send(embed=embed)
 
 async def setup(bot):
@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-from replit import db
 import math
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -54,7 +53,7 @@ INVENTORY_CATEGORIES = {
 class InventoryView(discord.ui.View):
     """Plagg's revolutionary interactive inventory management system."""
 
-    def __init__(self, user_id, rpg_core):
+    def __init__(self, user_id, rpg_core, player_data):
         super().__init__(timeout=300)
         self.user_id = str(user_id)
         self.rpg_core = rpg_core
@@ -66,8 +65,7 @@ class InventoryView(discord.ui.View):
         self.last_interaction = None
         self.cooldown_duration = 1  # 1 second cooldown
 
-        # Load player data
-        self.player_data = rpg_core.get_player_data(self.user_id)
+        self.player_data = player_data
         if not self.player_data:
             return
 
@@ -696,7 +694,7 @@ class EquipItemButton(discord.ui.Button):
         # Save changes
         player_data['equipment'] = equipment
         player_data['inventory'] = inventory
-        self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
+        await self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
 
         # Plagg's response
         plagg_responses = [
@@ -715,7 +713,7 @@ class EquipItemButton(discord.ui.Button):
         # Save changes
         player_data['equipment'] = equipment
         player_data['inventory'] = inventory
-        self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
+        await self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
 
         # Plagg's response
         plagg_responses = [
@@ -873,7 +871,7 @@ class UseItemButton(discord.ui.Button):
         player_data['inventory'] = inventory
 
         # Save changes
-        self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
+        await self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
 
         embed = discord.Embed(
             title="🧪 Item Used!",
@@ -1132,30 +1130,31 @@ class SellConfirmationView(discord.ui.View):
             await interaction.response.send_message("Not your inventory!", ephemeral=True)
             return
 
-        player_data = self.inventory_view.player_data
-        inventory = player_data.get('inventory', {})
-
-        # Check if item still exists
-        if inventory.get(self.item_key, 0) <= 0:
-            await interaction.response.send_message("Item no longer in inventory!", ephemeral=True)
-            return
-
-        # Process sale
         item_data = ITEMS.get(self.item_key, {})
         item_name = item_data.get('name', self.item_key.replace('_', ' ').title())
         sell_price = item_data.get('sell_price', 10)
 
-        # Remove item
-        if inventory[self.item_key] > 1:
-            inventory[self.item_key] -= 1
-        else:
-            inventory.pop(self.item_key, None)
+        def sell(player_data):
+            inventory = player_data.get('inventory', {})
 
-        # Add gold
-        player_data['gold'] = player_data.get('gold', 0) + sell_price
+            # Check if item still exists
+            if inventory.get(self.item_key, 0) <= 0:
+                return False
 
-        # Save changes
-        self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
+            # Remove item
+            if inventory[self.item_key] > 1:
+                inventory[self.item_key] -= 1
+            else:
+                inventory.pop(self.item_key, None)
+
+            # Add gold
+            player_data['gold'] = player_data.get('gold', 0) + sell_price
+
+        player_data = await self.inventory_view.rpg_core.mutate_player_data(self.inventory_view.user_id, sell)
+        if not player_data:
+            await interaction.response.send_message("Item no longer in inventory!", ephemeral=True)
+            return
+        self.inventory_view.player_data = player_data
 
         # Plagg's response
         if 'cheese' in self.item_key.lower():
@@ -1223,7 +1222,7 @@ class DropConfirmationView(discord.ui.View):
             inventory.pop(self.item_key, None)
 
         # Save changes
-        self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
+        await self.inventory_view.rpg_core.save_player_data(self.inventory_view.user_id, player_data)
 
         # Plagg's response
         if 'cheese' in self.item_key.lower():
@@ -1267,7 +1266,7 @@ class RPGInventoryManager(commands.Cog):
     @commands.command(name="bag", aliases=["items", "stuff"])
     async def inventory_command(self, ctx):
         """Open Plagg's enhanced interactive inventory interface."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -1275,7 +1274,7 @@ class RPGInventoryManager(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(str(ctx.author.id))
+        player_data = await rpg_core.get_player_data(str(ctx.author.id))
         if not player_data:
             embed = create_embed(
                 "🎒 No Inventory Found", 
@@ -1288,7 +1287,7 @@ class RPGInventoryManager(commands.Cog):
             return
 
         # Create enhanced inventory view
-        view = InventoryView(str(ctx.author.id), rpg_core)
+        view = InventoryView(str(ctx.author.id), rpg_core, player_data)
         if not view.player_data:
             await ctx.send("❌ Error loading player data.")
             return
@@ -1299,7 +1298,7 @@ class RPGInventoryManager(commands.Cog):
     @commands.command(name="equip")
     async def quick_equip(self, ctx, *, item_name: str = None):
         """Quickly equip an item by name."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         if not item_name:
@@ -1311,7 +1310,7 @@ class RPGInventoryManager(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(str(ctx.author.id))
+        player_data = await rpg_core.get_player_data(str(ctx.author.id))
         if not player_data:
             await ctx.send("❌ Create a character first with `$startrpg`!")
             return
@@ -1369,7 +1368,7 @@ class RPGInventoryManager(commands.Cog):
         # Save
         player_data['equipment'] = equipment
         player_data['inventory'] = inventory
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await rpg_core.save_player_data(ctx.author.id, player_data)
 
         item_display_name = item_data.get('name', item_key.replace('_', ' ').title())
 
@@ -1393,7 +1392,7 @@ class RPGInventoryManager(commands.Cog):
     @commands.command(name="use")
     async def quick_use(self, ctx, *, item_name: str = None):
         """Quickly use a consumable item by name."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         if not item_name:
@@ -1405,7 +1404,7 @@ class RPGInventoryManager(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(str(ctx.author.id))
+        player_data = await rpg_core.get_player_data(str(ctx.author.id))
         if not player_data:
             await ctx.send("❌ Create a character first with `$startrpg`!")
             return
@@ -1448,7 +1447,7 @@ class RPGInventoryManager(commands.Cog):
         player_data['inventory'] = inventory
 
         # Save changes
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await rpg_core.save_player_data(ctx.author.id, player_data)
 
         item_display_name = item_data.get('name', item_key.replace('_', ' ').title())
 
@@ -442,7 +442,7 @@ class RPGItems(commands.Cog):
     @commands.command(name="equip")
     async def equip_item(self, ctx, *, item_name: str):
         """Equip weapons, armor, or accessories."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
             
         rpg_core = self.bot.get_cog('RPGCore')
@@ -450,7 +450,7 @@ class RPGItems(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
         
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             # Auto-start tutorial
             from cogs.help import TutorialView
@@ -508,7 +508,7 @@ class RPGItems(commands.Cog):
         
         # Update stats
         self.update_equipment_stats(player_data)
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await rpg_core.save_player_data(ctx.author.id, player_data)
         
         rarity_color = RARITY_COLORS.get(item_data['rarity'], COLORS['primary'])
         embed = discord.Embed(
@@ -547,7 +547,7 @@ class RPGItems(commands.Cog):
     @commands.command(name="unequip")
     async def unequip_item(self, ctx, slot: str):
         """Unequip an item from a specific slot."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
             
         rpg_core = self.bot.get_cog('RPGCore')
@@ -555,7 +555,7 @@ class RPGItems(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
         
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             from cogs.help import TutorialView
             view = TutorialView(self.bot, "$")
@@ -597,7 +597,7 @@ class RPGItems(commands.Cog):
         
         # Update stats
         self.update_equipment_stats(player_data)
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await rpg_core.save_player_data(ctx.author.id, player_data)
         
         embed = discord.Embed(
             title="📦 Item Unequipped",
@@ -609,7 +609,7 @@ class RPGItems(commands.Cog):
     @commands.command(name="use")
     async def use_item(self, ctx, *, item_name: str):
         """Use a consumable item."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
             
         rpg_core = self.bot.get_cog('RPGCore')
@@ -617,7 +617,7 @@ class RPGItems(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
         
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             from cogs.help import TutorialView
             view = TutorialView(self.bot, "$")
@@ -677,7 +677,7 @@ class RPGItems(commands.Cog):
         if player_data['inventory'][item_key] <= 0:
             del player_data['inventory'][item_key]
         
-        rpg_core.save_player_data(ctx.author.id, player_data)
+        await rpg_core.save_player_data(ctx.author.id, player_data)
         
         rarity_color = RARITY_COLORS.get(item_data['rarity'], COLORS['primary'])
         embed = discord.Embed(
@@ -698,7 +698,7 @@ class RPGItems(commands.Cog):
     @commands.command(name="equipment", aliases=["gear"])
     async def show_equipment(self, ctx):
         """Show currently equipped items."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
             
         rpg_core = self.bot.get_cog('RPGCore')
@@ -706,7 +706,7 @@ class RPGItems(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
         
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             from cogs.help import TutorialView
             view = TutorialView(self.bot, "$")
@@ -4,6 +4,11 @@ from discord.ext import commands
 import random
 import asyncio
 from utils.helpers import create_embed, format_number
+from utils.leaderboard import leaderboard_index
+from utils.sessions import session_registry
+from utils.edit_scheduler import edit_scheduler
+from utils.matchmaking import MatchCancelled, matchmaker
+from utils.ratings import DEFAULT_RD, arena_ratings
 from config import COLORS, is_module_enabled
 import logging
 
@@ -12,18 +17,26 @@ logger = logging.getLogger(__name__)
 class PvPCombatView(discord.ui.View):
     """PvP combat interface."""
     
-    def __init__(self, player_id, opponent_data, rpg_core):
+    def __init__(self, player_id, opponent_data, rpg_core, player_data, guild_id=None):
         super().__init__(timeout=300)
         self.player_id = player_id
+        self.guild_id = guild_id
         self.opponent = opponent_data
         self.rpg_core = rpg_core
         self.combat_log = []
         self.turn = 'player'
         
-        # Load player data
-        self.player_data = self.rpg_core.get_player_data(player_id)
+        self.player_data = player_data
         
         self.add_log(f"⚔️ PvP Battle: {self.player_data.get('name', 'Player')} vs {self.opponent['name']}")
+        session_registry.open('pvp', self.player_id, self.timeout)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        session_registry.touch('pvp', self.player_id, self.timeout)
+        return True
+
+    async def on_timeout(self):
+        session_registry.close('pvp', self.player_id)
         
     def add_log(self, text):
         """Add entry to combat log."""
@@ -62,7 +75,7 @@ class PvPCombatView(discord.ui.View):
         opponent_hp_bar = self.create_bar(self.opponent['hp'], self.opponent['max_hp'])
         
         embed.add_field(
-            name=f"🤖 {self.opponent['name']} (Lv.{self.opponent['level']})",
+            name=f"{'🤖' if self.opponent.get('is_ai') else '👤'} {self.opponent['name']} (Lv.{self.opponent['level']})",
             value=f"❤️ **HP:** {self.opponent['hp']}/{self.opponent['max_hp']} {opponent_hp_bar}\n"
                   f"⚔️ **Attack:** {self.opponent['attack']}\n"
                   f"🛡️ **Defense:** {self.opponent['defense']}",
@@ -93,16 +106,15 @@ class PvPCombatView(discord.ui.View):
 
         embed = await self.create_embed()
         try:
-            await self.message.edit(embed=embed, view=self)
+            await edit_scheduler.edit(self.message, embed=embed, view=self)
         except discord.NotFound:
             pass
 
     async def end_combat(self, victory):
         """Handle PvP combat conclusion."""
         if victory:
-            # Calculate rating change
-            rating_change = random.randint(15, 35)
-            self.player_data['arena_rating'] += rating_change
+            # Provisional Elo change now; the rating period settles it with Glicko-2
+            rating_change = await arena_ratings.record(self.player_id, self.player_data, self.opponent, 1.0)
             self.player_data['arena_wins'] += 1
             
             # Rewards
@@ -128,8 +140,7 @@ class PvPCombatView(discord.ui.View):
             )
         else:
             # Defeat
-            rating_change = random.randint(-25, -10)
-            self.player_data['arena_rating'] = max(0, self.player_data['arena_rating'] + rating_change)
+            rating_change = await arena_ratings.record(self.player_id, self.player_data, self.opponent, 0.0)
             self.player_data['arena_losses'] += 1
             
             self.add_log(f"💀 Defeat! {rating_change} rating")
@@ -157,13 +168,20 @@ class PvPCombatView(discord.ui.View):
                 inline=False
             )
 
-        self.rpg_core.save_player_data(self.player_id, self.player_data)
+        # Enter the guild's ladder; saving re-ranks the player on every ladder they belong to
+        if self.guild_id is not None:
+            arena_guilds = self.player_data.setdefault('arena_guilds', [])
+            if str(self.guild_id) not in arena_guilds:
+                arena_guilds.append(str(self.guild_id))
+
+        await self.rpg_core.save_player_data(self.player_id, self.player_data)
 
         try:
-            await self.message.edit(embed=final_embed, view=None)
+            await edit_scheduler.edit(self.message, embed=final_embed, view=None)
         except discord.NotFound:
             pass
         self.stop()
+        session_registry.close('pvp', self.player_id)
 
     async def opponent_turn(self):
         """AI opponent turn."""
@@ -254,21 +272,64 @@ class PvPCombatView(discord.ui.View):
 class RPGPvP(commands.Cog):
     """PvP system with arena battles."""
     
+    # Seconds to wait for a human opponent before an AI one steps in
+    QUEUE_TIMEOUT = 30
+
     def __init__(self, bot):
         self.bot = bot
+        self.rating_task = None
+
+    async def cog_load(self):
+        """Resume the open rating period."""
+        await arena_ratings.load()
+        self.rating_task = asyncio.create_task(self.rating_period_loop())
+
+    async def cog_unload(self):
+        if self.rating_task:
+            self.rating_task.cancel()
+
+    async def rating_period_loop(self):
+        """Close each rating period when it is due and write the Glicko-2 results back to players."""
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await asyncio.sleep(arena_ratings.seconds_until_close())
+                await self.apply_rating_updates(await arena_ratings.close_period())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error closing arena rating period: {e}")
+                await asyncio.sleep(300)
+
+    async def apply_rating_updates(self, updates):
+        """Set rated fields on each player; saving re-ranks them on the arena ladders."""
+        rpg_core = self.bot.get_cog('RPGCore')
+        if not rpg_core:
+            logger.warning("RPGCore cog not found, arena ratings were not applied.")
+            return
+        for user_id, fields in updates.items():
+            await rpg_core.patch_player_data(user_id, sets=fields)
         
     @commands.command(name="pvp", aliases=["arena"])
-    async def pvp_arena(self, ctx):
-        """Enter the PvP arena for ranked battles."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+    async def pvp_arena(self, ctx, scope: str = "server"):
+        """Enter the PvP arena for ranked battles. Use `pvp global` to queue across servers, `pvp leave` to stop searching."""
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
-            
+
+        if scope.lower() in ("leave", "cancel"):
+            if matchmaker.cancel(ctx.author.id):
+                embed = create_embed("Left Queue", "You stopped searching for a match.", COLORS['secondary'])
+            else:
+                embed = create_embed("Not Queued", "You aren't searching for a match.", COLORS['warning'])
+            await ctx.send(embed=embed)
+            return
+
         rpg_core = self.bot.get_cog('RPGCore')
         if not rpg_core:
             await ctx.send("❌ RPG system not loaded.")
             return
             
-        player_data = rpg_core.get_player_data(ctx.author.id)
+        player_data = await rpg_core.get_player_data(ctx.author.id)
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` first!", COLORS['error'])
             await ctx.send(embed=embed)
@@ -283,7 +344,8 @@ class RPGPvP(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        if player_data.get('in_combat'):
+        if (player_data.get('in_combat') or session_registry.is_open('pvp', ctx.author.id)
+                or matchmaker.is_queued(ctx.author.id)):
             embed = create_embed("Already Fighting", "Finish your current battle first!", COLORS['warning'])
             await ctx.send(embed=embed)
             return
@@ -293,16 +355,33 @@ class RPGPvP(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Generate AI opponent based on player level and rating
-        opponent = self.generate_ai_opponent(player_data)
+        is_global = scope.lower() in ("global", "all")
+        queue_scope = None if is_global else ctx.guild.id
 
         embed = discord.Embed(
             title="🔍 Finding PvP Match...",
-            description="Searching for a worthy opponent...",
+            description=f"Searching the {'global' if is_global else 'server'} arena for a worthy opponent...\n"
+                       f"**Your Rating:** {player_data.get('arena_rating', 1000)}\n"
+                       f"*An arena champion steps in if no challenger appears within {self.QUEUE_TIMEOUT} seconds.*",
             color=COLORS['primary']
         )
         message = await ctx.send(embed=embed)
-        await asyncio.sleep(2)
+
+        # Fight a snapshot of whoever the queue pairs us with, or an AI opponent if nobody turns up
+        try:
+            opponent = await matchmaker.find_match(
+                ctx.author.id,
+                player_data.get('arena_rating', 1000),
+                self.player_opponent(ctx.author, player_data),
+                scope=queue_scope,
+                timeout=self.QUEUE_TIMEOUT
+            )
+        except MatchCancelled:
+            embed = create_embed("Search Cancelled", "You left the arena queue.", COLORS['secondary'])
+            await message.edit(embed=embed)
+            return
+        if opponent is None:
+            opponent = self.generate_ai_opponent(player_data)
 
         # Show opponent found
         embed = discord.Embed(
@@ -317,10 +396,29 @@ class RPGPvP(commands.Cog):
         await asyncio.sleep(2)
 
         # Start PvP combat
-        combat_view = PvPCombatView(ctx.author.id, opponent, rpg_core)
+        combat_view = PvPCombatView(ctx.author.id, opponent, rpg_core, player_data, ctx.guild.id)
         combat_view.message = message
         await combat_view.update_view()
 
+    def player_opponent(self, user, player_data):
+        """Snapshot a queued player's character as an opponent for whoever they are paired with."""
+        derived_stats = player_data.get('derived_stats', {})
+        max_hp = player_data['resources']['max_hp']
+        return {
+            'name': getattr(user, 'display_name', None) or player_data.get('name', 'Challenger'),
+            'level': player_data['level'],
+            'hp': max_hp,
+            'max_hp': max_hp,
+            'attack': derived_stats.get('attack', 15),
+            'defense': derived_stats.get('defense', 8),
+            'rating': player_data.get('arena_rating', 1000),
+            'rd': player_data.get('arena_rd', DEFAULT_RD),
+            'wins': player_data.get('arena_wins', 0),
+            'losses': player_data.get('arena_losses', 0),
+            'user_id': str(user.id),
+            'is_ai': False
+        }
+
     def generate_ai_opponent(self, player_data):
         """Generate AI opponent based on player stats."""
         level_variance = random.randint(-2, 2)
@@ -360,51 +458,71 @@ class RPGPvP(commands.Cog):
             'is_ai': True
         }
 
+    def ladder_name(self, ctx, user_id):
+        """Resolve a display name for a ladder entry without hitting the API."""
+        member = ctx.guild.get_member(int(user_id)) if ctx.guild else None
+        if member:
+            return member.display_name
+        user = self.bot.get_user(int(user_id))
+        return user.name if user else f"Player {user_id}"
+
     @commands.command(name="rankings", aliases=["leaderboard"])
-    async def pvp_rankings(self, ctx):
-        """View PvP leaderboards."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+    async def pvp_rankings(self, ctx, scope: str = "server"):
+        """View PvP leaderboards. Use `rankings global` for the cross-server ladder."""
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
+        if not leaderboard_index.ready:
+            await leaderboard_index.rebuild()
+
+        is_global = scope.lower() in ("global", "all")
+        ladder = leaderboard_index.arena_ladder(None if is_global else ctx.guild.id)
+
         embed = discord.Embed(
-            title="🏆 PvP Arena Rankings",
+            title="🌍 Global Arena Rankings" if is_global else f"🏆 {ctx.guild.name} Arena Rankings",
             description="Top warriors in competitive combat:",
             color=COLORS['primary']
         )
 
-        # Sample leaderboard (in a real implementation, this would query all players)
-        sample_rankings = [
-            {"name": "ChampionDestroyer", "rating": 2847, "record": "247-23"},
-            {"name": "BladeMaster2000", "rating": 2756, "record": "198-31"},
-            {"name": "MysticSage", "rating": 2643, "record": "156-22"},
-            {"name": "IronFist", "rating": 2521, "record": "134-28"},
-            {"name": "ShadowAssassin", "rating": 2398, "record": "112-19"}
-        ]
-
         ranking_text = ""
-        for i, player in enumerate(sample_rankings, 1):
+        for i, entry in enumerate(ladder.top(10) if ladder else [], 1):
             emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-            ranking_text += f"{emoji} **{player['name']}** - {player['rating']} ({player['record']})\n"
+            ranking_text += f"{emoji} **{self.ladder_name(ctx, entry['user_id'])}** - {entry['value']}\n"
 
-        embed.add_field(name="🏆 Top Players", value=ranking_text, inline=False)
+        embed.add_field(
+            name="🏆 Top Players",
+            value=ranking_text or "No ranked matches yet. Use `$pvp` to claim the top spot!",
+            inline=False
+        )
 
         # Show current player's ranking if they have data
         rpg_core = self.bot.get_cog('RPGCore')
         if rpg_core:
-            player_data = rpg_core.get_player_data(ctx.author.id)
+            player_data = await rpg_core.get_player_data(ctx.author.id)
             if player_data:
                 wins = player_data.get('arena_wins', 0)
                 losses = player_data.get('arena_losses', 0)
                 rating = player_data.get('arena_rating', 1000)
-                
+                rank = ladder.rank(ctx.author.id) if ladder else None
+
                 embed.add_field(
                     name="📊 Your Stats",
                     value=f"**Rating:** {rating}\n"
+                          f"**Rank:** {f'#{rank} of {len(ladder)}' if rank else 'Unranked'}\n"
                           f"**Record:** {wins}-{losses}\n"
                           f"**Tokens:** {player_data.get('arena_tokens', 0)}",
                     inline=False
                 )
 
+                if rank and rank > 10:
+                    nearby_text = ""
+                    for entry in ladder.around(ctx.author.id, radius=2):
+                        name = self.ladder_name(ctx, entry['user_id'])
+                        if entry['user_id'] == str(ctx.author.id):
+                            name = f"__{name}__"
+                        nearby_text += f"#{entry['rank']} **{name}** - {entry['value']}\n"
+                    embed.add_field(name="🎯 Around You", value=nearby_text, inline=False)
+
         embed.set_footer(text="Compete in ranked matches to climb the leaderboard!")
         await ctx.send(embed=embed)
 
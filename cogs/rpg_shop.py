@@ -4,6 +4,8 @@ import math
 from utils.helpers import create_embed, format_number
 from config import COLORS, is_module_enabled
 from rpg_data.game_data import ITEMS, RARITY_COLORS
+from utils.sessions import session_registry
+from utils.escrow import escrow
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,11 +13,14 @@ logger = logging.getLogger(__name__)
 class ShopMainView(discord.ui.View):
     """Main shop interface with category buttons and enhanced features."""
 
-    def __init__(self, user_id: str, rpg_core):
+    def __init__(self, user_id: str, rpg_core, shopping_cart=None):
         super().__init__(timeout=300)
         self.user_id = user_id
         self.rpg_core = rpg_core
-        self.shopping_cart = {}  # item_key: {"quantity": int, "price": int, "name": str}
+        # item_key: {"quantity": int, "price": int, "name": str}
+        self.shopping_cart = shopping_cart if shopping_cart is not None else {}
+        # Abandoned carts are emptied once the shop goes untouched for the view's lifetime
+        session_registry.open('shop_cart', user_id, self.timeout, on_expire=lambda _: self.shopping_cart.clear())
 
     @discord.ui.button(label="⚔️ Weapons", style=discord.ButtonStyle.primary, emoji="⚔️", row=0)
     async def weapons_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -73,7 +78,7 @@ class ShopMainView(discord.ui.View):
             await interaction.response.send_message("❌ This isn't your shop!", ephemeral=True)
             return
 
-        player_data = self.rpg_core.get_player_data(self.user_id)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
         if not player_data:
             await interaction.response.send_message("❌ Character not found!", ephemeral=True)
             return
@@ -109,7 +114,7 @@ class ShopMainView(discord.ui.View):
             return
 
         view = ShoppingCartView(self.user_id, self.rpg_core, self.shopping_cart)
-        embed = view.create_cart_embed()
+        embed = await view.create_cart_embed()
         await interaction.response.edit_message(embed=embed, view=view)
 
     @discord.ui.button(label="🏛️ Auction House", style=discord.ButtonStyle.success, emoji="🏛️", row=2)
@@ -243,7 +248,7 @@ class ShopCategoryView(discord.ui.View):
         if select != "none":
             item_key = select
             view = ItemDetailsView(self.user_id, item_key, self.rpg_core, self.category)
-            embed = view.create_item_embed()
+            embed = await view.create_item_embed()
             await interaction.response.edit_message(embed=embed, view=view)
         else:
             await interaction.response.send_message("❌ No items available in this category!", ephemeral=True)
@@ -277,7 +282,7 @@ class ShopCategoryView(discord.ui.View):
             await interaction.response.send_message("❌ This isn't your shop!", ephemeral=True)
             return
 
-        player_data = self.rpg_core.get_player_data(self.user_id)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
         view = ShopMainView(self.user_id, self.rpg_core)
         embed = self.create_main_shop_embed(player_data)
         await interaction.response.edit_message(embed=embed, view=view)
@@ -329,10 +334,10 @@ class ItemDetailsView(discord.ui.View):
         self.category = category
         self.quantity = 1
 
-    def create_item_embed(self):
+    async def create_item_embed(self):
         """Create detailed item embed."""
         item_data = ITEMS.get(self.item_key, {})
-        player_data = self.rpg_core.get_player_data(self.user_id)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
 
         if not item_data:
             return create_embed("Error", "Item not found!", COLORS['error'])
@@ -409,7 +414,7 @@ class ItemDetailsView(discord.ui.View):
             return
 
         self.quantity = int(select.values[0])
-        embed = self.create_item_embed()
+        embed = await self.create_item_embed()
         await interaction.response.edit_message(embed=embed, view=self)
 
     @discord.ui.button(label="➕ Add to Cart", style=discord.ButtonStyle.primary, emoji="🛒", row=2)
@@ -469,7 +474,7 @@ class ItemDetailsView(discord.ui.View):
 
         await interaction.response.defer()
 
-        player_data = self.rpg_core.get_player_data(self.user_id)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
         if not player_data:
             embed = create_embed("Error", "Character not found!", COLORS['error'])
             await interaction.followup.edit_message(interaction.message.id, embed=embed, view=None)
@@ -490,7 +495,7 @@ class ItemDetailsView(discord.ui.View):
             return
 
         # Anti-exploit: Get fresh player data before purchase
-        fresh_player_data = self.rpg_core.get_player_data(self.user_id)
+        fresh_player_data = await self.rpg_core.get_player_data(self.user_id)
         if not fresh_player_data:
             embed = create_embed("Error", "Failed to load player data!", COLORS['error'])
             await interaction.followup.edit_message(interaction.message.id, embed=embed, view=None)
@@ -508,18 +513,8 @@ class ItemDetailsView(discord.ui.View):
             await interaction.followup.edit_message(interaction.message.id, embed=embed, view=None)
             return
 
-        # Process purchase with validation
-        fresh_player_data['gold'] -= total_cost
-        if 'inventory' not in fresh_player_data:
-            fresh_player_data['inventory'] = {}
-
-        if self.item_key in fresh_player_data['inventory']:
-            fresh_player_data['inventory'][self.item_key] += self.quantity
-        else:
-            fresh_player_data['inventory'][self.item_key] = self.quantity
-
-        # Validate the purchase was successful
-        success = self.rpg_core.save_player_data(self.user_id, fresh_player_data)
+        # Process purchase through the escrow ledger; gold and items change together
+        success = await escrow.spend(self.user_id, f"shop:{self.item_key}", total_cost, {self.item_key: self.quantity})
         if not success:
             embed = create_embed("Error", "Failed to save purchase data!", COLORS['error'])
             await interaction.followup.edit_message(interaction.message.id, embed=embed, view=None)
@@ -580,8 +575,9 @@ class ShoppingCartView(discord.ui.View):
         self.user_id = user_id
         self.rpg_core = rpg_core
         self.shopping_cart = shopping_cart  # List of (item_key, quantity, total_price) tuples
+        session_registry.touch('shop_cart', user_id, self.timeout)
 
-    def create_cart_embed(self):
+    async def create_cart_embed(self):
         """Create cart display embed."""
         embed = discord.Embed(
             title="🛒 Your Shopping Cart",
@@ -627,7 +623,7 @@ class ShoppingCartView(discord.ui.View):
             )
 
             # Get player gold for comparison
-            player_data = self.rpg_core.get_player_data(self.user_id)
+            player_data = await self.rpg_core.get_player_data(self.user_id)
             player_gold = player_data.get('gold', 0) if player_data else 0
 
             if total_cost > player_gold:
@@ -657,11 +653,6 @@ class ShoppingCartView(discord.ui.View):
 
         await interaction.response.defer()
 
-        player_data = self.rpg_core.get_player_data(self.user_id)
-        if not player_data:
-            await interaction.followup.send("❌ Character not found!")
-            return
-
         # Calculate total cost
         total_cost = 0
         purchased_items = []
@@ -675,16 +666,15 @@ class ShoppingCartView(discord.ui.View):
 
             purchased_items.append(f"• **{item_name}** x{quantity} - {format_number(line_total)} 💰")
 
-            # Add to player inventory
-            if item_key in player_data.get('inventory', {}):
-                player_data['inventory'][item_key] += quantity
-            else:
-                player_data['inventory'][item_key] = quantity
-
-        self.rpg_core.save_player_data(self.user_id, player_data)
+        cart_items = {item_key: cart_item.get('quantity', 0) for item_key, cart_item in self.shopping_cart.items()}
+        if not await escrow.spend(self.user_id, "shop:cart", total_cost, cart_items):
+            await interaction.followup.send("❌ Checkout failed - you can't afford everything in your cart!")
+            return
+        player_data = await self.rpg_core.get_player_data(self.user_id)
 
         # Clear the cart
         self.shopping_cart.clear()
+        session_registry.close('shop_cart', self.user_id)
 
         plagg_responses = [
             "Alright, I processed your bulk order of junk. The money's gone, the items are yours. Don't blame me for your choices.",
@@ -724,6 +714,7 @@ class ShoppingCartView(discord.ui.View):
             return
 
         self.shopping_cart.clear()
+        session_registry.close('shop_cart', self.user_id)
 
         embed = discord.Embed(
             title="🗑️ Cart Cleared",
@@ -740,10 +731,9 @@ class ShoppingCartView(discord.ui.View):
             return
 
         # Return to main shop
-        view = ShopMainView(self.user_id, self.rpg_core)
-        view.shopping_cart = self.shopping_cart  # Preserve cart contents
+        view = ShopMainView(self.user_id, self.rpg_core, self.shopping_cart)  # Preserve cart contents
 
-        player_data = self.rpg_core.get_player_data(self.user_id)
+        player_data = await self.rpg_core.get_player_data(self.user_id)
         embed = view.create_main_shop_embed(player_data)
         await interaction.response.edit_message(embed=embed, view=view)
 
@@ -756,7 +746,7 @@ class RPGShop(commands.Cog):
     @commands.command(name="shop", aliases=["store", "buy", "vendor"])
     async def shop(self, ctx, *, search_term: str = None):
         """Open the interactive shop interface with improved navigation."""
-        if not is_module_enabled("rpg", ctx.guild.id):
+        if not await is_module_enabled("rpg", ctx.guild.id):
             return
 
         rpg_core = self.bot.get_cog('RPGCore')
@@ -764,7 +754,7 @@ class RPGShop(commands.Cog):
             await ctx.send("❌ RPG system not loaded.")
             return
 
-        player_data = rpg_core.get_player_data(str(ctx.author.id))
+        player_data = await rpg_core.get_player_data(str(ctx.author.id))
         if not player_data:
             embed = create_embed("No Character", "Use `$startrpg` to begin your adventure!", COLORS['error'])
             await ctx.send(embed=embed)
@@ -934,7 +924,7 @@ class SearchResultsView(discord.ui.View):
         
         item_key = interaction.data['values'][0]
         view = ItemDetailsView(self.user_id, item_key, self.rpg_core, "search")
-        embed = view.create_item_embed()
+        embed = await view.create_item_embed()
         await interaction.response.edit_message(embed=embed, view=view)
     
     @discord.ui.button(label="🛒 Browse Shop", style=discord.ButtonStyle.primary)
@@ -1,9 +1,13 @@
 import discord
-from replit import db
+import asyncio
+import copy
 import logging
 import os
 from typing import Dict, Any, Optional
 
+from utils.cache import TTLCache
+from utils.storage import get_storage
+
 logger = logging.getLogger(__name__)
 
 # Module definitions for admin panel
@@ -35,13 +39,22 @@ MODULES = {
     }
 }
 
-def get_prefix(bot, message):
-    """Get server-specific command prefix."""
+# Per-guild server config, merged with defaults (guild id -> config)
+server_config_cache = TTLCache(ttl=300)
+_config_refreshes: Dict[int, asyncio.Task] = {}
+
+async def get_prefix(bot, message):
+    """Get server-specific command prefix, served from the config cache."""
     if not message.guild:
         return '$'
     
     try:
-        config = get_server_config(message.guild.id)
+        config, fresh = server_config_cache.peek(message.guild.id)
+        if config is None:
+            config = await get_cached_server_config(message.guild.id)
+        elif not fresh:
+            # Serve the stale prefix now and refresh it off the message path
+            _schedule_config_refresh(message.guild.id)
         return config.get('prefix', '$')
     except Exception as e:
         logger.error(f"Error getting prefix: {e}")
@@ -90,57 +103,66 @@ EMOJIS = {
     'luck': '🍀'
 }
 
-def get_server_config(guild_id: int) -> Dict[str, Any]:
-    """Get server configuration from database."""
-    try:
-        config_key = f"server_config_{guild_id}"
-        config = db.get(config_key, {})
-        
-        # Ensure default values exist
-        default_config = {
-            'prefix': '$',
-            'currency_name': 'coins',
-            'enabled_modules': {
-                'rpg': True,
-                'economy': True,
-                'moderation': True,
-                'ai_chatbot': True,
-                'admin': True
-            },
-            'ai_channels': [],
-            'mod_log_channel': None,
-            'auto_moderation': {
-                'enabled': True,
-                'spam_detection': True,
-                'inappropriate_content': True,
-                'max_warnings': 3
-            }
-        }
-        
-        # Merge with defaults
-        for key, value in default_config.items():
-            if key not in config:
-                config[key] = value
-                
+def _schedule_config_refresh(guild_id: int):
+    task = _config_refreshes.get(guild_id)
+    if task is None or task.done():
+        _config_refreshes[guild_id] = asyncio.create_task(get_cached_server_config(guild_id))
+
+async def get_cached_server_config(guild_id: int) -> Dict[str, Any]:
+    """Get the shared cached config for a guild, loading it on a miss. Callers must not modify it."""
+    config = server_config_cache.get(guild_id)
+    if config is not None:
         return config
+
+    config = await get_storage().get(f"server_config_{guild_id}", {})
+
+    # Merge with defaults
+    for key, value in DEFAULT_SERVER_CONFIG.items():
+        if key not in config:
+            config[key] = copy.deepcopy(value)
+
+    server_config_cache.set(guild_id, config)
+    return config
+
+async def warm_server_configs(guild_ids) -> int:
+    """Load configs for many guilds in one storage round trip."""
+    guild_ids = [guild_id for guild_id in guild_ids if server_config_cache.get(guild_id) is None]
+    stored = await get_storage().get_many(f"server_config_{guild_id}" for guild_id in guild_ids)
+    for guild_id in guild_ids:
+        config = stored.get(f"server_config_{guild_id}", {})
+        for key, value in DEFAULT_SERVER_CONFIG.items():
+            if key not in config:
+                config[key] = copy.deepcopy(value)
+        server_config_cache.set(guild_id, config)
+    return len(guild_ids)
+
+def invalidate_server_config(guild_id: Optional[int] = None):
+    """Drop cached config for a guild (or every guild) so the next read goes to storage."""
+    server_config_cache.invalidate(guild_id)
+
+async def get_server_config(guild_id: int) -> Dict[str, Any]:
+    """Get server configuration (a copy the caller may modify and pass to update_server_config)."""
+    try:
+        return copy.deepcopy(await get_cached_server_config(guild_id))
     except Exception as e:
         logger.error(f"Error getting server config for {guild_id}: {e}")
         return {}
 
-def update_server_config(guild_id: int, config: Dict[str, Any]) -> bool:
+async def update_server_config(guild_id: int, config: Dict[str, Any]) -> bool:
     """Update server configuration in database."""
     try:
         config_key = f"server_config_{guild_id}"
-        db[config_key] = config
+        await get_storage().set(config_key, config)
+        invalidate_server_config(guild_id)
         return True
     except Exception as e:
         logger.error(f"Error updating server config for {guild_id}: {e}")
         return False
 
-def is_module_enabled(module_name: str, guild_id: int) -> bool:
+async def is_module_enabled(module_name: str, guild_id: int) -> bool:
     """Check if a module is enabled for a guild."""
     try:
-        config = get_server_config(guild_id)
+        config = await get_cached_server_config(guild_id)
         return config.get('enabled_modules', {}).get(module_name, True)
     except Exception as e:
         logger.error(f"Error checking module status: {e}")
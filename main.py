@@ -7,8 +7,11 @@ import time
 from datetime import datetime
 import signal
 import traceback
-from config import COLORS, EMOJIS, get_server_config
-from utils.database import initialize_database
+from config import COLORS, EMOJIS, get_server_config, get_prefix, warm_server_configs
+from utils.database import initialize_database, player_cache
+from utils.leaderboard import leaderboard_index
+from utils.dispatch import message_dispatcher
+from utils.sessions import session_registry
 
 # Configure logging with better formatting
 class ColoredFormatter(logging.Formatter):
@@ -78,7 +81,7 @@ intents.members = True
 intents.guilds = True
 
 bot = commands.Bot(
-    command_prefix='$',
+    command_prefix=get_prefix,
     intents=intents,
     help_command=None,  # We'll implement our own
     case_insensitive=True,
@@ -212,6 +215,12 @@ async def graceful_shutdown():
         # Wait a moment for messages to send
         await asyncio.sleep(2)
 
+        # Stop expiring sessions; live combats stay checkpointed for the next start
+        await session_registry.stop()
+
+        # Write back any cached player data before disconnecting
+        await player_cache.close()
+
         # Close bot connection
         await bot.close()
         logger.info("Bot shutdown complete")
@@ -243,6 +252,11 @@ async def on_ready():
     # Initialize database
     try:
         await initialize_database()
+        player_cache.start()
+        session_registry.start()
+        await warm_server_configs(guild.id for guild in bot.guilds)
+        if not leaderboard_index.ready:
+            asyncio.create_task(leaderboard_index.rebuild())
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
@@ -329,19 +343,8 @@ async def on_guild_join(guild):
 
 @bot.event
 async def on_message(message):
-    """Enhanced message handling with debug info."""
-    if message.author.bot:
-        return
-
-    # Log command attempts for debugging
-    if message.content.startswith('$'):
-        logger.info(f"Command: {message.content[:50]} by {message.author} in {message.guild.name if message.guild else 'DM'}")
-
-    # Process commands
-    try:
-        await bot.process_commands(message)
-    except Exception as e:
-        logger.error(f"Error processing command {message.content}: {e}")
+    """Route each message once through the dispatcher (commands, auto-mod, AI chat)."""
+    await message_dispatcher.dispatch(bot, message)
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -474,10 +477,6 @@ async def heartbeat_monitor():
                     if bot.guilds:
                         guild_count = len(bot.guilds)
                         logger.debug(f"🏰 Connected to {guild_count} guilds")
-                        
-                    # Clean up any orphaned combat sessions
-                    from cogs.rpg_combat import cleanup_orphaned_combats
-                    await cleanup_orphaned_combats()
                     
                 except Exception as self_heal_error:
                     logger.warning(f"Self-healing check failed: {self_heal_error}")
@@ -0,0 +1,488 @@
+"""
+Tactical combat data.
+Monsters, status effects, skills and ultimates used by the combat engine.
+"""
+
+# Enhanced monster data with weaknesses
+ENHANCED_MONSTERS = {
+    'goblin': {
+        'name': 'Goblin Warrior',
+        'emoji': '👹',
+        'hp': 120,
+        'max_hp': 120,
+        'toughness': 60,
+        'max_toughness': 60,
+        'weakness_type': 'physical',
+        'attack': 25,
+        'defense': 8,
+        'level': 3,
+        'xp_reward': 35,
+        'gold_reward': 15,
+        'skills': ['quick_slash'],
+        'loot_table': {'health_potion': 0.4, 'iron_sword': 0.2}
+    },
+    'orc': {
+        'name': 'Orc Berserker',
+        'emoji': '👺',
+        'hp': 180,
+        'max_hp': 180,
+        'toughness': 80,
+        'max_toughness': 80,
+        'weakness_type': 'ice',
+        'attack': 35,
+        'defense': 12,
+        'level': 6,
+        'xp_reward': 60,
+        'gold_reward': 25,
+        'skills': ['berserker_rage'],
+        'loot_table': {'health_potion': 0.3, 'steel_armor': 0.15}
+    },
+    'ice_elemental': {
+        'name': 'Ice Elemental',
+        'emoji': '🧊',
+        'hp': 150,
+        'max_hp': 150,
+        'toughness': 70,
+        'max_toughness': 70,
+        'weakness_type': 'fire',
+        'attack': 30,
+        'defense': 15,
+        'level': 5,
+        'xp_reward': 50,
+        'gold_reward': 20,
+        'skills': ['ice_blast'],
+        'loot_table': {'mana_potion': 0.5, 'ice_crystal': 0.3}
+    },
+    'dragon': {
+        'name': 'Ancient Dragon',
+        'emoji': '🐉',
+        'hp': 400,
+        'max_hp': 400,
+        'toughness': 120,
+        'max_toughness': 120,
+        'weakness_type': 'lightning',
+        'attack': 60,
+        'defense': 25,
+        'level': 15,
+        'xp_reward': 200,
+        'gold_reward': 100,
+        'skills': ['dragon_breath', 'tail_sweep'],
+        'loot_table': {'dragon_scale': 0.8, 'legendary_weapon': 0.1}
+    }
+}
+
+# Status Effects System
+STATUS_EFFECTS = {
+    # Blessings (Buffs)
+    'fortify': {
+        'name': 'Fortify',
+        'type': 'blessing',
+        'emoji': '🛡️',
+        'effect': 'def_boost',
+        'value': 0.30,
+        'duration': 3,
+        'description': 'Increases Defense by 30% for 3 turns'
+    },
+    'empower': {
+        'name': 'Empower',
+        'type': 'blessing',
+        'emoji': '💪',
+        'effect': 'atk_boost',
+        'value': 0.30,
+        'duration': 3,
+        'description': 'Increases Attack by 30% for 3 turns'
+    },
+    'haste': {
+        'name': 'Haste',
+        'type': 'blessing',
+        'emoji': '⚡',
+        'effect': 'speed_boost',
+        'value': 0.50,
+        'duration': 1,
+        'description': 'Acts 50% sooner on next turn'
+    },
+    'regeneration': {
+        'name': 'Regeneration',
+        'type': 'blessing',
+        'emoji': '💚',
+        'effect': 'heal_over_time',
+        'value': 0.10,
+        'duration': 3,
+        'description': 'Heals 10% of Max HP at start of turn for 3 turns'
+    },
+    'crit_up': {
+        'name': 'Crit Up',
+        'type': 'blessing',
+        'emoji': '🔥',
+        'effect': 'crit_boost',
+        'value': 0.50,
+        'duration': 2,
+        'description': 'Increases Critical Hit Chance by 50% for 2 turns'
+    },
+    'evade_up': {
+        'name': 'Evade Up',
+        'type': 'blessing',
+        'emoji': '👻',
+        'effect': 'dodge_boost',
+        'value': 0.30,
+        'duration': 2,
+        'description': 'Increases dodge chance by 30% for 2 turns'
+    },
+
+    # Curses (Debuffs)
+    'bleed': {
+        'name': 'Bleed',
+        'type': 'curse',
+        'emoji': '🩸',
+        'effect': 'damage_over_time',
+        'value': 0.05,
+        'duration': 3,
+        'description': 'Deals 5% of Max HP as damage at start of turn for 3 turns'
+    },
+    'burn': {
+        'name': 'Burn',
+        'type': 'curse',
+        'emoji': '🔥',
+        'effect': 'damage_over_time_no_heal',
+        'value': 0.08,
+        'duration': 2,
+        'description': 'Deals 8% Max HP damage and prevents healing for 2 turns'
+    },
+    'stun': {
+        'name': 'Stun',
+        'type': 'curse',
+        'emoji': '🌟',
+        'effect': 'skip_turn',
+        'duration': 1,
+        'description': 'Cannot act for 1 turn'
+    },
+    'weakness_break': {
+        'name': 'Weakness Break',
+        'type': 'curse',
+        'emoji': '💥',
+        'effect': 'vulnerability',
+        'value': 0.50,
+        'duration': 2,
+        'description': 'Stunned for 1 turn, +50% damage taken for 2 turns'
+    },
+    'armor_break': {
+        'name': 'Armor Break',
+        'type': 'curse',
+        'emoji': '🛡️💔',
+        'effect': 'def_reduction',
+        'value': 0.50,
+        'duration': 3,
+        'description': 'Reduces Defense by 50% for 3 turns'
+    },
+    'slow': {
+        'name': 'Slow',
+        'type': 'curse',
+        'emoji': '🐌',
+        'effect': 'speed_reduction',
+        'value': 0.50,
+        'duration': 1,
+        'description': 'Acts 50% later on next turn'
+    },
+    'blind': {
+        'name': 'Blind',
+        'type': 'curse',
+        'emoji': '🙈',
+        'effect': 'accuracy_reduction',
+        'value': 0.50,
+        'duration': 2,
+        'description': 'Reduces accuracy by 50% for 2 turns'
+    },
+    'stopwatch': {
+        'name': 'Stopwatch',
+        'type': 'curse',
+        'emoji': '⏱️',
+        'effect': 'stacking_stun',
+        'stacks': 0,
+        'max_stacks': 3,
+        'trigger': 'stun',
+        'description': 'Stacking debuff. At 3 stacks, target is Stunned for 1 turn'
+    }
+}
+
+# Enhanced skills with SP costs and status effects
+TACTICAL_SKILLS = {
+    'power_strike': {
+        'name': 'Power Strike',
+        'cost': 20,
+        'damage': 40,
+        'toughness_damage': 15,
+        'damage_type': 'physical',
+        'ultimate_gain': 20,
+        'description': 'A powerful physical attack that costs 20 SP.',
+        'effects': [],
+        'classes': ['warrior', 'battlemage']
+    },
+    'flame_slash': {
+        'name': 'Flame Slash',
+        'cost': 20,
+        'damage': 35,
+        'toughness_damage': 20,
+        'damage_type': 'fire',
+        'ultimate_gain': 20,
+        'description': 'A burning sword technique that costs 20 SP.',
+        'effects': [{'status': 'burn', 'chance': 0.7}],
+        'classes': ['battlemage', 'mage'],
+        'required_items': {}
+    },
+    'ice_lance': {
+        'name': 'Ice Lance',
+        'cost': 20,
+        'damage': 38,
+        'toughness_damage': 18,
+        'damage_type': 'ice',
+        'ultimate_gain': 20,
+        'description': 'A piercing ice attack that costs 20 SP.',
+        'effects': [{'status': 'slow', 'chance': 0.6}],
+        'classes': ['mage'],
+        'required_items': {}
+    },
+    'healing_light': {
+        'name': 'Healing Light',
+        'cost': 30,
+        'heal': 50,
+        'ultimate_gain': 15,
+        'description': 'Restores health using 30 SP.',
+        'effects': [{'status': 'regeneration', 'chance': 0.3}]
+    },
+    'shield_bash': {
+        'name': 'Shield Bash',
+        'cost': 20,
+        'damage': 25,
+        'toughness_damage': 20,
+        'damage_type': 'physical',
+        'ultimate_gain': 20,
+        'description': 'Bash enemy with shield, chance to stun.',
+        'effects': [{'status': 'stun', 'chance': 0.5}]
+    },
+    'taunting_shout': {
+        'name': 'Taunting Shout',
+        'cost': 15,
+        'damage': 0,
+        'ultimate_gain': 15,
+        'description': 'Force enemy to target you and gain defense.',
+        'self_effects': [{'status': 'fortify', 'chance': 1.0}]
+    },
+    'fireball': {
+        'name': 'Fireball',
+        'cost': 25,
+        'damage': 45,
+        'toughness_damage': 25,
+        'damage_type': 'fire',
+        'ultimate_gain': 20,
+        'description': 'Heavy fire damage with burn chance.',
+        'effects': [{'status': 'burn', 'chance': 0.8}]
+    },
+    'arcane_explosion': {
+        'name': 'Arcane Explosion',
+        'cost': 40,
+        'damage': 30,
+        'toughness_damage': 20,
+        'damage_type': 'magic',
+        'ultimate_gain': 30,
+        'description': 'Moderate magic damage to all enemies.',
+        'effects': []
+    },
+    'serrated_strike': {
+        'name': 'Serrated Strike',
+        'cost': 20,
+        'damage': 35,
+        'toughness_damage': 15,
+        'damage_type': 'physical',
+        'ultimate_gain': 20,
+        'description': 'Causes bleeding damage over time.',
+        'effects': [{'status': 'bleed', 'chance': 0.9}]
+    },
+    'shadow_step': {
+        'name': 'Shadow Step',
+        'cost': 25,
+        'damage': 0,
+        'ultimate_gain': 15,
+        'description': 'Grants evasion and critical hit bonus.',
+        'self_effects': [
+            {'status': 'evade_up', 'chance': 1.0},
+            {'status': 'crit_up', 'chance': 1.0}
+        ]
+    },
+    'piercing_shot': {
+        'name': 'Piercing Shot',
+        'cost': 25,
+        'damage': 40,
+        'toughness_damage': 20,
+        'damage_type': 'physical',
+        'ultimate_gain': 20,
+        'description': 'Ignores 50% of enemy defense.',
+        'effects': [],
+        'armor_penetration': 0.5
+    },
+    'pinning_shot': {
+        'name': 'Pinning Shot',
+        'cost': 20,
+        'damage': 25,
+        'toughness_damage': 15,
+        'damage_type': 'physical',
+        'ultimate_gain': 15,
+        'description': 'Low damage but applies slow.',
+        'effects': [{'status': 'slow', 'chance': 0.8}]
+    },
+    'purify': {
+        'name': 'Purify',
+        'cost': 25,
+        'heal': 30,
+        'ultimate_gain': 15,
+        'description': 'Removes debuffs and grants regeneration.',
+        'effects': [],
+        'remove_debuffs': True,
+        'self_effects': [{'status': 'regeneration', 'chance': 1.0}]
+    },
+    'imbue_weapon': {
+        'name': 'Imbue Weapon',
+        'cost': 20,
+        'damage': 0,
+        'ultimate_gain': 20,
+        'description': 'Next 3 basic attacks deal extra magic damage.',
+        'self_effects': [{'status': 'empower', 'chance': 1.0}]
+    },
+    'arcane_shield': {
+        'name': 'Arcane Shield',
+        'cost': 25,
+        'damage': 0,
+        'ultimate_gain': 15,
+        'description': 'Creates shield and empowers attacks.',
+        'self_effects': [
+            {'status': 'fortify', 'chance': 1.0},
+            {'status': 'empower', 'chance': 1.0}
+        ]
+    },
+    'time_dilation': {
+        'name': 'Time Dilation',
+        'cost': 30,
+        'damage': 20,
+        'toughness_damage': 10,
+        'damage_type': 'temporal',
+        'ultimate_gain': 25,
+        'description': 'Applies Stopwatch stack to enemy.',
+        'effects': [{'status': 'stopwatch', 'chance': 1.0}],
+        'classes': ['chrono_knight'],
+        'required_items': {}
+    },
+    'temporal_shift': {
+        'name': 'Temporal Shift',
+        'cost': 20,
+        'damage': 0,
+        'ultimate_gain': 15,
+        'description': 'Grants ally haste effect.',
+        'self_effects': [{'status': 'haste', 'chance': 1.0}],
+        'classes': ['chrono_knight'],
+        'required_items': {}
+    },
+    # Warrior specific skills
+    'berserker_fury': {
+        'name': 'Berserker Fury',
+        'cost': 25,
+        'damage': 50,
+        'toughness_damage': 20,
+        'damage_type': 'physical',
+        'ultimate_gain': 30,
+        'description': 'Devastating attack that increases with missing health.',
+        'effects': [],
+        'classes': ['warrior'],
+        'required_items': {}
+    },
+    # Archer specific skills
+    'explosive_shot': {
+        'name': 'Explosive Shot',
+        'cost': 30,
+        'damage': 45,
+        'toughness_damage': 25,
+        'damage_type': 'physical',
+        'ultimate_gain': 25,
+        'description': 'Ranged attack that deals area damage.',
+        'effects': [{'status': 'burn', 'chance': 0.5}],
+        'classes': ['archer'],
+        'required_items': {'explosive_arrow': 1}
+    },
+    # Healer enhanced abilities
+    'mass_heal': {
+        'name': 'Mass Heal',
+        'cost': 40,
+        'heal': 80,
+        'ultimate_gain': 20,
+        'description': 'Powerful healing that affects entire party.',
+        'effects': [],
+        'classes': ['healer'],
+        'required_items': {'holy_water': 1}
+    },
+    # Rogue stealth skills
+    'vanish': {
+        'name': 'Vanish',
+        'cost': 25,
+        'damage': 0,
+        'ultimate_gain': 15,
+        'description': 'Become invisible and gain massive crit chance.',
+        'self_effects': [
+            {'status': 'evade_up', 'chance': 1.0},
+            {'status': 'crit_up', 'chance': 1.0}
+        ],
+        'classes': ['rogue'],
+        'required_items': {'smoke_bomb': 1}
+    }
+}
+
+# Ultimate abilities by class
+ULTIMATE_ABILITIES = {
+    'warrior': {
+        'name': 'Blade Storm',
+        'description': 'Unleashes a devastating series of strikes',
+        'damage': 120,
+        'toughness_damage': 50,
+        'damage_type': 'physical'
+    },
+    'mage': {
+        'name': 'Arcane Devastation',
+        'description': 'Channels pure magical energy',
+        'damage': 100,
+        'toughness_damage': 60,
+        'damage_type': 'quantum'
+    },
+    'rogue': {
+        'name': 'Shadow Assassination',
+        'description': 'Strikes from the shadows with lethal precision',
+        'damage': 110,
+        'toughness_damage': 40,
+        'damage_type': 'physical'
+    },
+    'archer': {
+        'name': 'Rain of Arrows',
+        'description': 'Unleashes a devastating arrow barrage',
+        'damage': 105,
+        'toughness_damage': 35,
+        'damage_type': 'physical'
+    },
+    'healer': {
+        'name': 'Divine Intervention',
+        'description': 'Calls upon divine power for massive healing',
+        'heal': 150,
+        'damage': 80,
+        'toughness_damage': 30,
+        'damage_type': 'divine'
+    },
+    'battlemage': {
+        'name': 'Elemental Fury',
+        'description': 'Combines magic and melee in perfect harmony',
+        'damage': 115,
+        'toughness_damage': 45,
+        'damage_type': 'elemental'
+    },
+    'chrono_knight': {
+        'name': 'Time Fracture',
+        'description': 'Manipulates time to deal devastating damage',
+        'damage': 130,
+        'toughness_damage': 55,
+        'damage_type': 'temporal'
+    }
+}
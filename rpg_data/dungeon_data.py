@@ -0,0 +1,93 @@
+"""
+Dungeon data.
+Dungeon definitions used by the dungeon run engine.
+"""
+
+# Enhanced Dungeon definitions with comprehensive scenarios
+DUNGEONS = {
+    'akuma_catacombs': {
+        'name': 'The Crumbling Akuma Catacombs',
+        'emoji': '🏴‍☠️',
+        'min_level': 1,
+        'max_level': 8,
+        'floors': 3,
+        'description': 'Dusty, dark stone corridors filled with cobwebs, leftover magical energy, and disappointingly cheese-free air.',
+        'monsters': ['shadow_grub', 'akuma_sentinel', 'cursed_spirit'],
+        'boss': 'Giant Akumatized Spider',
+        'theme': 'dark_catacombs',
+        'plagg_intro': "Ugh, finally. You've stumbled into the Akuma Catacombs. It smells like old socks and regret, with just a HINT of aged cheese. Disappointing, really.",
+        'rewards': {
+            'xp_multiplier': 1.5,
+            'gold_multiplier': 1.3,
+            'rare_materials': ['shadow_essence', 'akuma_fragment', 'old_cheese_rind']
+        }
+    },
+    'foxen_forest': {
+        'name': 'The Whispering Foxen Forest',
+        'emoji': '🌲',
+        'min_level': 8,
+        'max_level': 15,
+        'floors': 5,
+        'description': 'An enchanted forest of perpetual twilight with glowing runes and trickster magic.',
+        'monsters': ['forest_sprite', 'illusion_fox', 'trickster_spirit'],
+        'boss': 'Council of Kitsune Illusionists',
+        'theme': 'mystical_forest',
+        'plagg_intro': "Great, a magical forest. It's all sparkly and mystical and has exactly ZERO cheese. The foxes better have some good snacks hidden somewhere.",
+        'rewards': {
+            'xp_multiplier': 2.0,
+            'gold_multiplier': 1.8,
+            'rare_materials': ['fox_fur', 'illusion_crystal', 'forest_essence']
+        }
+    },
+    'shadow_fortress': {
+        'name': 'Shadow Fortress',
+        'emoji': '🏰',
+        'min_level': 15,
+        'max_level': 25,
+        'floors': 7,
+        'description': 'An ancient fortress consumed by darkness and shadowy beings.',
+        'monsters': ['shadow_assassin', 'shadow_wraith', 'void_sentinel'],
+        'boss': 'Shadow Lord',
+        'theme': 'dark_fortress',
+        'plagg_intro': "Oh wonderful, a spooky shadow fortress. Because what I really needed was MORE darkness and LESS cheese visibility.",
+        'rewards': {
+            'xp_multiplier': 2.5,
+            'gold_multiplier': 2.2,
+            'rare_materials': ['shadow_essence', 'dark_crystal', 'void_fragment']
+        }
+    },
+    'dragons_lair': {
+        'name': "Dragon's Lair",
+        'emoji': '🐉',
+        'min_level': 25,
+        'max_level': 35,
+        'floors': 10,
+        'description': 'The lair of an ancient dragon, filled with legendary treasures.',
+        'monsters': ['fire_drake', 'dragon_cultist', 'flame_elemental'],
+        'boss': 'Ancient Red Dragon',
+        'theme': 'dragon_hoard',
+        'plagg_intro': "A dragon's lair! Finally, someone with good taste in hoarding. Though I bet they don't collect cheese. Typical.",
+        'rewards': {
+            'xp_multiplier': 3.0,
+            'gold_multiplier': 2.8,
+            'rare_materials': ['dragon_scale', 'dragon_heart', 'legendary_gem']
+        }
+    },
+    'cosmic_void': {
+        'name': 'The Cosmic Void of the Peacock',
+        'emoji': '🌌',
+        'min_level': 35,
+        'max_level': 50,
+        'floors': 15,
+        'description': 'A mind-bending reality of floating islands and crystallized emotions.',
+        'monsters': ['void_walker', 'emotion_wraith', 'cosmic_horror'],
+        'boss': 'Manifestation of Cosmic Indifference',
+        'theme': 'cosmic_nightmare',
+        'plagg_intro': "Well, THIS is new. We're in some kind of emotional void space thing. It's all floaty and weird and I GUARANTEE there's no cheese. This is the worst.",
+        'rewards': {
+            'xp_multiplier': 4.0,
+            'gold_multiplier': 3.5,
+            'rare_materials': ['void_essence', 'cosmic_dust', 'reality_fragment']
+        }
+    }
+}
@@ -3,7 +3,6 @@ Comprehensive game data for Project: Blood & Cheese RPG system.
 Contains all classes, paths, items, monsters, and game mechanics.
 """
 
-import discord
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
@@ -0,0 +1,53 @@
+"""
+Shared test fixtures.
+Tests run against an in-memory storage backend, so nothing touches Replit DB or SQLite.
+"""
+
+import copy
+
+import pytest
+
+import utils.storage
+from utils.database import player_cache
+
+class MemoryStorage(utils.storage.Storage):
+    """Dict-backed storage. Values are copied in and out, as they would be serialized by a real backend."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key, default=None):
+        return copy.deepcopy(self.data.get(key, default))
+
+    async def set(self, key, value):
+        self.data[key] = copy.deepcopy(value)
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def keys(self, prefix=""):
+        return [key for key in self.data if key.startswith(prefix)]
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Swap in a fresh in-memory backend and start with an empty player cache."""
+    backend = MemoryStorage()
+    monkeypatch.setattr(utils.storage, '_storage', backend)
+    yield backend
+    for key, _ in player_cache.items():
+        player_cache.invalidate(key)
+
+def make_player(gold: int = 1000, hp: int = 200, **fields):
+    """A minimal player document with what the combat engine and escrow read."""
+    player = {
+        'class': 'warrior',
+        'level': 5,
+        'xp': 0,
+        'gold': gold,
+        'inventory': {},
+        'derived_stats': {'attack': 30, 'critical_chance': 0.05},
+        'resources': {'hp': hp, 'max_hp': hp, 'ultimate_energy': 0},
+        '_version': 1
+    }
+    player.update(fields)
+    return player
@@ -0,0 +1,50 @@
+import asyncio
+import random
+
+from conftest import MemoryStorage
+from utils.auction_store import MANIFEST_KEY, RECORD_PREFIX, AuctionStore
+
+class SlowStorage(MemoryStorage):
+    """Writes finish in a random order, like a thread-pool backend."""
+
+    def __init__(self, seed: int = 0):
+        super().__init__()
+        self.rng = random.Random(seed)
+
+    async def set(self, key, value):
+        await asyncio.sleep(self.rng.random() / 1000)
+        await super().set(key, value)
+
+def test_concurrent_listings_and_settlements_keep_the_manifest(storage, monkeypatch):
+    slow = SlowStorage()
+    monkeypatch.setattr('utils.storage._storage', slow)
+
+    async def run():
+        store = AuctionStore()
+        await store.load()
+        await asyncio.gather(*(store.create(f"a{i}", {'i': i}) for i in range(5)))
+
+        results = await asyncio.gather(store.finish_many(['a0', 'a1']),
+                                       *(store.create(f"b{i}", {'i': i}) for i in range(10)))
+        assert all(results)
+
+        live = {'a2', 'a3', 'a4'} | {f"b{i}" for i in range(10)}
+        assert set(slow.data[MANIFEST_KEY]) == live
+        assert set(await AuctionStore().load()) == live
+
+    asyncio.run(run())
+
+def test_failed_create_is_rolled_back(storage):
+    async def run():
+        store = AuctionStore()
+        await store.load()
+
+        async def failing_set_many(items):
+            raise RuntimeError("write failed")
+
+        storage.set_many = failing_set_many
+        assert not await store.create('a1', {'i': 1})
+        assert f"{RECORD_PREFIX}a1" not in storage.data
+        assert 'a1' not in (await storage.get(MANIFEST_KEY, []))
+
+    asyncio.run(run())
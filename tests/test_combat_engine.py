@@ -0,0 +1,106 @@
+import copy
+
+import pytest
+
+from conftest import make_player
+from utils.combat_engine import MAX_ENEMY_TURNS, CombatEngine, simulate_battle
+
+def kinds(events):
+    return [event.kind for event in events]
+
+def test_seeded_battles_replay_exactly():
+    player = make_player()
+    first = simulate_battle(copy.deepcopy(player), 'goblin', CombatEngine(seed=42))
+    second = simulate_battle(copy.deepcopy(player), 'goblin', CombatEngine(seed=42))
+    assert first == second
+    assert first['outcome'] in ('victory', 'defeat')
+
+def test_basic_attack_damages_and_passes_turn():
+    engine = CombatEngine(seed=1)
+    player = make_player()
+    state = engine.new_state('goblin')
+    enemy_hp = state['enemy']['hp']
+
+    events = engine.basic_attack(state, player)
+
+    assert 'attack' in kinds(events)
+    assert state['enemy']['hp'] < enemy_hp
+    assert state['turn'] == 'monster'
+    assert player['resources']['ultimate_energy'] == 10
+
+def test_skill_without_enough_sp_is_refused():
+    engine = CombatEngine(seed=1)
+    state = engine.new_state('goblin')
+    state['skill_points'] = 0
+    skill_key = next(iter(engine.available_skills(make_player())))
+
+    assert engine.skill_error(state, skill_key)
+    with pytest.raises(ValueError):
+        engine.use_skill(state, make_player(), skill_key)
+
+def test_weakness_break_stuns_enemy():
+    engine = CombatEngine(seed=1)
+    state = engine.new_state('goblin')
+    events = []
+
+    assert engine.check_weakness_break(state, state['enemy']['weakness_type'], state['enemy']['toughness'], events)
+    assert state['enemy']['is_broken']
+    assert 'break' in kinds(events)
+
+def test_stunned_player_loses_their_turn():
+    engine = CombatEngine(seed=1)
+    player = make_player(hp=10_000)
+    state = engine.new_state('goblin')
+    engine.apply_status_effect(player, 'stun', 1)
+
+    events = engine.monster_turn(state, player)
+
+    assert kinds(events).count('enemy_attack') == 2
+    assert state['turn'] == 'player'
+
+def test_long_stun_is_bounded():
+    engine = CombatEngine(seed=1)
+    player = make_player(hp=10_000)
+    state = engine.new_state('goblin')
+    engine.apply_status_effect(player, 'stun', 50)
+
+    events = engine.monster_turn(state, player)
+
+    assert kinds(events).count('enemy_attack') == MAX_ENEMY_TURNS
+    assert state['turn'] == 'player'
+
+def test_burn_blocks_potion_healing():
+    engine = CombatEngine(seed=1)
+    player = make_player(inventory={'health_potion': 1})
+    player['resources']['hp'] = 50
+    state = engine.new_state('goblin')
+    engine.apply_status_effect(player, 'burn')
+
+    events = engine.use_item(state, player, 'health_potion')
+
+    assert 'heal_blocked' in kinds(events)
+    assert 'heal' not in kinds(events)
+    assert player['resources']['hp'] == 50
+    assert 'health_potion' not in player['inventory']
+
+def test_settle_victory_pays_rewards_and_clears_effects():
+    engine = CombatEngine(seed=1)
+    player = make_player(gold=100, in_combat=True)
+    state = engine.new_state('goblin')
+    engine.apply_status_effect(player, 'bleed')
+
+    events = engine.settle(state, player, victory=True)
+
+    assert 'victory' in kinds(events)
+    assert player['xp'] > 0 and player['gold'] > 100
+    assert not player['in_combat'] and 'active_effects' not in player
+
+def test_settle_defeat_costs_gold_and_health():
+    engine = CombatEngine(seed=1)
+    player = make_player(gold=100)
+    state = engine.new_state('goblin')
+
+    engine.settle(state, player, victory=False)
+
+    assert player['gold'] == 85
+    assert player['resources']['hp'] == player['resources']['max_hp'] // 4
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+import utils.escrow
+from conftest import make_player
+from utils.database import player_cache
+from utils.escrow import SNAPSHOT_EVERY, EscrowLedger
+
+def add_players(storage, *gold):
+    for user_id, amount in enumerate(gold):
+        storage.data[f"user_{user_id}"] = {'rpg_data': make_player(gold=amount)}
+
+async def player(user_id):
+    return (await player_cache.get(f"user_{user_id}"))['rpg_data']
+
+def restart():
+    """Lose everything held in memory, as a crash would."""
+    for key, _ in player_cache.items():
+        player_cache.invalidate(key)
+    return EscrowLedger()
+
+def test_hold_and_release_move_gold_through_escrow(storage):
+    add_players(storage, 1000)
+
+    async def run():
+        ledger = EscrowLedger()
+        assert await ledger.hold('0', 'auction_a', 300)
+        assert (await player('0'))['gold'] == 700
+        assert (await ledger.balance('0'))['holds'] == {'auction_a': 300}
+
+        # Raising a hold only takes the difference
+        assert await ledger.hold('0', 'auction_a', 400)
+        assert (await player('0'))['gold'] == 600
+
+        assert await ledger.release('0', 'auction_a')
+        assert (await player('0'))['gold'] == 1000
+        assert (await ledger.balance('0'))['held'] == 0
+
+    asyncio.run(run())
+
+def test_unaffordable_hold_changes_nothing(storage):
+    add_players(storage, 100)
+
+    async def run():
+        ledger = EscrowLedger()
+        assert not await ledger.hold('0', 'auction_a', 500)
+        assert (await player('0'))['gold'] == 100
+        assert (await ledger.balance('0'))['held'] == 0
+
+    asyncio.run(run())
+
+def test_transfer_pays_seller_and_releases_excess(storage):
+    add_players(storage, 1000, 0)
+
+    async def run():
+        ledger = EscrowLedger()
+        await ledger.hold('0', 'auction_a', 500)
+        async with ledger.batch(['0', '1'], ['auction_a']) as batch:
+            batch.transfer('0', 'auction_a', '1', 400, fee=20)
+            batch.settle('auction_a')
+            assert await batch.commit()
+
+        assert (await player('0'))['gold'] == 600
+        assert (await player('1'))['gold'] == 380
+        assert ledger.is_settled('auction_a')
+        assert ledger.holders('auction_a') == {}
+
+    asyncio.run(run())
+
+def test_startup_recovery_rolls_credits_forward_and_voids_debits(storage, monkeypatch):
+    add_players(storage, 1000, 1000)
+
+    async def crash(mutators):
+        raise RuntimeError("crashed between the ledger write and the player write")
+
+    async def run():
+        ledger = EscrowLedger()
+        with monkeypatch.context() as patch, pytest.raises(RuntimeError):
+            patch.setattr(utils.escrow, 'mutate_players', crash)
+            async with ledger.batch(['0', '1'], ['auction_a']) as batch:
+                batch._add('0', 'transfer_in', 'auction_a', gold=200)
+                batch.hold('1', 'auction_a', 300)
+                await batch.commit()
+
+        ledger = restart()
+        assert await ledger.recover_all() == 2
+
+        # The credit was rolled forward; the debit was never taken, so its hold is voided
+        assert (await player('0'))['gold'] == 1200
+        assert (await player('1'))['gold'] == 1000
+        assert (await ledger.balance('1'))['held'] == 0
+        assert await ledger.recover_all() == 0
+
+    asyncio.run(run())
+
+def test_adopted_holds_advance_escrow_seq(storage):
+    add_players(storage, 1000)
+
+    async def run():
+        ledger = EscrowLedger()
+        async with ledger.batch(['0'], ['auction_a']) as batch:
+            batch.adopt('0', 'auction_a', 250)
+            assert await batch.commit()
+
+        assert (await player('0'))['escrow_seq'] == 1
+        assert (await player('0'))['gold'] == 1000
+        await player_cache.flush()
+        assert await restart().recover_all() == 0
+
+    asyncio.run(run())
+
+def test_replay_matches_snapshot_across_segments(storage):
+    add_players(storage, 100_000)
+
+    async def run():
+        ledger = EscrowLedger()
+        for amount in range(1, SNAPSHOT_EVERY * 2 + 5):
+            assert await ledger.hold('0', f"auction_{amount % 3}", amount)
+        assert await ledger.verify('0')
+
+        held = (await ledger.balance('0'))['held']
+        assert (await player('0'))['gold'] == 100_000 - held
+
+    asyncio.run(run())
+
+def test_tail_left_behind_by_a_partial_snapshot_is_not_folded_twice(storage):
+    add_players(storage, 100_000)
+
+    async def run():
+        ledger = EscrowLedger()
+        for amount in range(1, SNAPSHOT_EVERY):
+            assert await ledger.hold('0', f"auction_{amount}", 10)
+        stale_tail = await storage.get(f"{utils.escrow.TAIL_PREFIX}0")
+
+        # The next hold archives the tail; pretend the emptied tail never reached storage
+        assert await ledger.hold('0', 'auction_last', 10)
+        storage.data[f"{utils.escrow.TAIL_PREFIX}0"] = stale_tail
+
+        assert (await restart().balance('0'))['held'] == 10 * SNAPSHOT_EVERY
+
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from utils.matchmaking import MatchCancelled, Matchmaker, MatchQueue, MatchTicket
+
+def test_nearest_walks_outward_from_own_bucket():
+    async def run():
+        queue = MatchQueue(50)
+        for seq, rating in enumerate([1000, 1010, 940, 1060, 700, 1390]):
+            queue.add(MatchTicket(str(seq), rating, None, None, seq))
+
+        assert [ticket.rating for ticket in queue.nearest(1020, 400)] == [1000, 1010, 1060, 940, 700, 1390]
+        assert [ticket.rating for ticket in queue.nearest(1020, 50)] == [1000, 1010, 1060]
+
+    asyncio.run(run())
+
+def test_close_ratings_are_paired_on_enqueue():
+    async def run():
+        matchmaker = Matchmaker()
+        first = asyncio.ensure_future(matchmaker.find_match(1, 1000, payload='one', timeout=1))
+        await asyncio.sleep(0)
+        assert matchmaker.is_queued(1)
+
+        assert await matchmaker.find_match(2, 1040, payload='two', timeout=1) == 'one'
+        assert await first == 'two'
+        assert len(matchmaker) == 0
+        assert matchmaker.stats['matched'] == 1
+
+    asyncio.run(run())
+
+def test_nearest_acceptable_rating_wins():
+    async def run():
+        matchmaker = Matchmaker(widen_per_second=0)
+        # Too far apart to pair with each other, but both within reach of the newcomer
+        waiting = [asyncio.ensure_future(matchmaker.find_match(user_id, rating, payload=rating, timeout=0.05))
+                   for user_id, rating in ((1, 910), (2, 1015))]
+        await asyncio.sleep(0)
+
+        assert await matchmaker.find_match(3, 1000, payload=1000, timeout=1) == 1015
+        assert await asyncio.gather(*waiting) == [None, 1000]
+
+    asyncio.run(run())
+
+def test_far_apart_ratings_time_out():
+    async def run():
+        matchmaker = Matchmaker(widen_per_second=0)
+        results = await asyncio.gather(matchmaker.find_match(1, 1000, timeout=0.05),
+                                       matchmaker.find_match(2, 1500, timeout=0.05))
+        assert results == [None, None]
+        assert len(matchmaker) == 0
+        assert matchmaker.stats['fallbacks'] == 2
+
+    asyncio.run(run())
+
+def test_windows_widen_until_the_sweep_pairs_them():
+    async def run():
+        matchmaker = Matchmaker(base_window=100, widen_per_second=10_000, sweep_interval=0.01)
+        results = await asyncio.gather(matchmaker.find_match(1, 1000, payload='low', timeout=1),
+                                       matchmaker.find_match(2, 1300, payload='high', timeout=1))
+        assert results == ['high', 'low']
+
+    asyncio.run(run())
+
+def test_scopes_are_kept_apart():
+    async def run():
+        matchmaker = Matchmaker(widen_per_second=0)
+        results = await asyncio.gather(matchmaker.find_match(1, 1000, scope='guild_a', timeout=0.05),
+                                       matchmaker.find_match(2, 1000, scope='guild_b', timeout=0.05))
+        assert results == [None, None]
+
+    asyncio.run(run())
+
+def test_cancel_leaves_the_queue():
+    async def run():
+        matchmaker = Matchmaker()
+        waiting = asyncio.ensure_future(matchmaker.find_match(1, 1000, timeout=1))
+        await asyncio.sleep(0)
+
+        assert matchmaker.cancel(1)
+        with pytest.raises(MatchCancelled):
+            await waiting
+        assert not matchmaker.is_queued(1)
+        assert not matchmaker.cancel(1)
+
+    asyncio.run(run())
+
+def test_queueing_twice_is_refused():
+    async def run():
+        matchmaker = Matchmaker()
+        waiting = asyncio.ensure_future(matchmaker.find_match(1, 1000, timeout=1))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ValueError):
+            await matchmaker.find_match(1, 1000)
+        matchmaker.cancel(1)
+        with pytest.raises(MatchCancelled):
+            await waiting
+
+    asyncio.run(run())
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+import utils.ratings
+from utils.ratings import (DEFAULT_RATING, DEFAULT_RD, HISTORY_PREFIX, RESULT_PREFIX, ArenaRatings, elo_change,
+                           glicko2_period, replay)
+
+# Worked example from Glickman's Glicko-2 paper, shifted from its 1500 centre to ours
+PAPER_SHIFT = 1500 - DEFAULT_RATING
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def numpy_available(request, monkeypatch):
+    if request.param and not utils.ratings.NUMPY_AVAILABLE:
+        pytest.skip("NumPy is not installed")
+    monkeypatch.setattr(utils.ratings, 'NUMPY_AVAILABLE', request.param)
+    return request.param
+
+def test_glicko2_matches_paper_example(numpy_available):
+    ratings, rds, vols = glicko2_period(
+        [1500 - PAPER_SHIFT], [200], [0.06], [0, 0, 0],
+        [1400 - PAPER_SHIFT, 1550 - PAPER_SHIFT, 1700 - PAPER_SHIFT], [30, 100, 300], [1, 0, 0]
+    )
+    assert ratings[0] + PAPER_SHIFT == pytest.approx(1464.06, abs=0.01)
+    assert rds[0] == pytest.approx(151.52, abs=0.01)
+    assert vols[0] == pytest.approx(0.05999, abs=1e-5)
+
+def test_glicko2_player_without_results_only_gains_deviation(numpy_available):
+    ratings, rds, vols = glicko2_period([1000, 1200], [200, 80], [0.06, 0.06], [0], [1000], [100], [1])
+    assert ratings[1] == 1200
+    assert 80 < rds[1] < DEFAULT_RD
+    assert vols[1] == 0.06
+    assert ratings[0] > 1000
+
+def test_elo_change_is_zero_sum_between_equals():
+    assert elo_change(1000, 1000, 1) == 16
+    assert elo_change(1000, 1000, 0) == -16
+    assert elo_change(1400, 1000, 1) < elo_change(1000, 1400, 1)
+
+def test_recorded_results_survive_a_restart(storage):
+    async def run():
+        ratings = ArenaRatings()
+        await ratings.load()
+        player = {'arena_rating': 1000}
+        assert await ratings.record('1', player, {'rating': 1000}, 1.0) == 16
+        assert player['arena_rating'] == 1016
+        await ratings.record('1', player, {'rating': 1100, 'rd': 60}, 0.0)
+
+        # One storage key per result; the start-of-period values ride on the player's first one
+        assert len(await storage.keys(RESULT_PREFIX)) == 2
+
+        reloaded = ArenaRatings()
+        await reloaded.load()
+        assert reloaded.period['players'] == {'1': [1000, DEFAULT_RD, 0.06]}
+        assert reloaded.period['results'] == [['1', 1000, DEFAULT_RD, 1.0], ['1', 1100, 60, 0.0]]
+
+    asyncio.run(run())
+
+def test_close_period_rates_from_period_start_and_replays(storage):
+    async def run():
+        ratings = ArenaRatings()
+        await ratings.load()
+        for user_id, score in (('1', 1.0), ('1', 1.0), ('2', 0.0)):
+            await ratings.record(user_id, {'arena_rating': 1000}, {'rating': 1000}, score)
+
+        updates = await ratings.close_period()
+
+        assert updates['1']['arena_rating'] > 1000 > updates['2']['arena_rating']
+        assert updates['1']['arena_rating_period'] == 0
+        assert ratings.period['index'] == 1
+        assert await storage.keys(RESULT_PREFIX) == []
+
+        history = await ratings.history()
+        assert [segment['index'] for segment in history] == [0]
+        replayed = replay(history)
+        assert round(replayed['1'][0]) == updates['1']['arena_rating']
+
+    asyncio.run(run())
+
+def test_result_recorded_during_close_lands_in_next_period(storage):
+    async def run():
+        ratings = ArenaRatings()
+        await ratings.load()
+        await ratings.record('1', {'arena_rating': 1000}, {'rating': 1000}, 1.0)
+
+        closing = asyncio.ensure_future(ratings.close_period())
+        await asyncio.sleep(0)
+        await ratings.record('2', {'arena_rating': 1000}, {'rating': 1000}, 1.0)
+        updates = await closing
+
+        assert list(updates) == ['1']
+        assert ratings.period['index'] == 1
+        assert list(ratings.period['players']) == ['2']
+        assert f"{HISTORY_PREFIX}000000" in storage.data
+
+        reloaded = ArenaRatings()
+        await reloaded.load()
+        assert reloaded.period['index'] == 1
+        assert list(reloaded.period['players']) == ['2']
+
+    asyncio.run(run())
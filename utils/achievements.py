@@ -270,9 +270,9 @@ def check_achievement_progress(user_id: str, achievement_key: str, player_data:
     
     return True
 
-def award_achievement(user_id: str, achievement_key: str) -> Optional[Dict[str, Any]]:
+async def award_achievement(user_id: str, achievement_key: str) -> Optional[Dict[str, Any]]:
     """Award an achievement to a player and return the achievement data."""
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return None
     
@@ -313,12 +313,12 @@ def award_achievement(user_id: str, achievement_key: str) -> Optional[Dict[str,
         'tier': achievement.get('tier', 'bronze')
     }
     
-    update_user_rpg_data(user_id, player_data)
+    await update_user_rpg_data(user_id, player_data)
     return achievement_data
 
-def get_available_achievements(user_id: str) -> List[Dict[str, Any]]:
+async def get_available_achievements(user_id: str) -> List[Dict[str, Any]]:
     """Get list of achievements visible to the player."""
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return []
     
@@ -367,9 +367,9 @@ def get_available_achievements(user_id: str) -> List[Dict[str, Any]]:
     
     return sorted(available, key=lambda x: (x['completed'], x['tier']))
 
-def check_hidden_class_unlock(user_id: str, class_key: str) -> bool:
+async def check_hidden_class_unlock(user_id: str, class_key: str) -> bool:
     """Check if player can unlock a hidden class."""
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return False
     
@@ -0,0 +1,153 @@
+"""
+Auction house order book.
+Indexes the active auctions so nothing has to scan them all: a min-heap of expiry times tells the cleanup task
+which auction ends next, per-rarity lists kept sorted by end time serve the browse pages, and per-seller and
+per-bidder sets serve "my auctions". Item rarity is resolved from ITEMS once, when an auction is listed.
+"""
+
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sortedcontainers import SortedList
+
+from rpg_data.game_data import ITEMS
+
+logger = logging.getLogger(__name__)
+
+ALL = 'all'
+# Sorts after every auction id, so (now, _LAST_ID) bisects past everything ending at now
+_LAST_ID = '\uffff'
+
+class AuctionIndex:
+    """Secondary indexes over an active auctions dict. Add and remove auctions through the index so both agree."""
+
+    def __init__(self):
+        self._auctions: Dict[str, Dict[str, Any]] = {}
+        # (due, auction_id); entries whose due no longer matches _due are stale and skipped
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        # rarity (and ALL) -> (end_time, auction_id), soonest ending first
+        self._by_rarity: Dict[str, SortedList] = {ALL: SortedList()}
+        self._rarity_of: Dict[str, str] = {}
+        self._by_item: Dict[str, Set[str]] = {}
+        self._by_seller: Dict[str, Set[str]] = {}
+        self._by_bidder: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rarity_of)
+
+    def __contains__(self, auction_id) -> bool:
+        return auction_id in self._rarity_of
+
+    def build(self, auctions: Dict[str, Dict[str, Any]]):
+        """Index every auction in a dict and keep a reference to it for lookups."""
+        self.__init__()
+        self._auctions = auctions
+        for auction_id, auction_data in list(auctions.items()):
+            self.add(auction_id, auction_data)
+        logger.info(f"Auction index built: {len(auctions)} active auctions")
+
+    def add(self, auction_id: str, auction_data: Dict[str, Any]):
+        """Insert an auction into the dict and every index."""
+        if auction_id in self._rarity_of:
+            self.remove(auction_id)
+        self._auctions[auction_id] = auction_data
+
+        end_time = auction_data['end_time']
+        rarity = ITEMS.get(auction_data['item_key'], {}).get('rarity', 'common')
+        self._rarity_of[auction_id] = rarity
+        self._by_rarity[ALL].add((end_time, auction_id))
+        self._by_rarity.setdefault(rarity, SortedList()).add((end_time, auction_id))
+        self._by_item.setdefault(auction_data['item_key'], set()).add(auction_id)
+        self._by_seller.setdefault(auction_data['seller_id'], set()).add(auction_id)
+        for bid in auction_data.get('bids', []):
+            self._by_bidder.setdefault(bid['bidder_id'], set()).add(auction_id)
+        self.schedule(auction_id, end_time)
+
+    def remove(self, auction_id: str) -> Optional[Dict[str, Any]]:
+        """Delete an auction from the dict and every index. Its heap entry goes stale and is skipped later."""
+        auction_data = self._auctions.pop(auction_id, None)
+        rarity = self._rarity_of.pop(auction_id, None)
+        self._due.pop(auction_id, None)
+        if auction_data is None or rarity is None:
+            return auction_data
+
+        key = (auction_data['end_time'], auction_id)
+        self._by_rarity[ALL].discard(key)
+        self._by_rarity[rarity].discard(key)
+        self._discard(self._by_item, auction_data['item_key'], auction_id)
+        self._discard(self._by_seller, auction_data['seller_id'], auction_id)
+        for bid in auction_data.get('bids', []):
+            self._discard(self._by_bidder, bid['bidder_id'], auction_id)
+        return auction_data
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, auction_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(auction_id)
+            if not ids:
+                del index[key]
+
+    def add_bid(self, auction_id: str, bidder_id: str):
+        if auction_id in self._rarity_of:
+            self._by_bidder.setdefault(bidder_id, set()).add(auction_id)
+
+    def schedule(self, auction_id: str, due: float):
+        """Set (or move) when the cleanup task should next look at an auction."""
+        self._due[auction_id] = due
+        heapq.heappush(self._heap, (due, auction_id))
+
+    def next_expiry(self) -> Optional[float]:
+        """When the next auction is due, or None if nothing is listed."""
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_expired(self, now: float) -> List[str]:
+        """Every auction due at or before now, soonest first. Popped auctions stay indexed until removed."""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            when, auction_id = heapq.heappop(heap)
+            if self._due.get(auction_id) == when:
+                del self._due[auction_id]
+                due.append(auction_id)
+        return due
+
+    def count(self, rarity: str = ALL, now: float = 0.0) -> int:
+        """How many auctions of a rarity are still running."""
+        entries = self._by_rarity.get(rarity)
+        if not entries:
+            return 0
+        return len(entries) - entries.bisect_right((now, _LAST_ID))
+
+    def browse(self, rarity: str = ALL, now: float = 0.0, start: int = 0,
+               stop: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """A page of running auctions of a rarity, soonest ending first."""
+        entries = self._by_rarity.get(rarity)
+        if not entries:
+            return []
+        offset = entries.bisect_right((now, _LAST_ID))
+        stop = len(entries) if stop is None else offset + stop
+        return [(auction_id, self._auctions[auction_id])
+                for _, auction_id in entries.islice(offset + start, stop)]
+
+    def _running(self, ids: Optional[Set[str]], now: float) -> List[Tuple[str, Dict[str, Any]]]:
+        if not ids:
+            return []
+        found = [(auction_id, self._auctions[auction_id]) for auction_id in ids]
+        found = [(auction_id, data) for auction_id, data in found if data['end_time'] > now]
+        found.sort(key=lambda pair: pair[1]['end_time'])
+        return found
+
+    def by_item(self, item_key: str, now: float = 0.0) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._running(self._by_item.get(item_key), now)
+
+    def by_seller(self, seller_id: str, now: float = 0.0) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._running(self._by_seller.get(seller_id), now)
+
+    def by_bidder(self, bidder_id: str, now: float = 0.0) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._running(self._by_bidder.get(bidder_id), now)
@@ -0,0 +1,170 @@
+"""
+Auction price rollups.
+Every sold auction is folded into a small per-item rollup as it completes: count, exact min/max, a log-scale
+unit-price histogram for the median, and per-day value/quantity buckets for a recent VWAP. Rollups stay the
+same size however old the market gets, so raw history segments only need to be kept for RETENTION_DAYS.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.auction_store import auction_store, history_day
+from utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_PREFIX = "auction_rollup_"
+
+# Raw history segments older than this are deleted; rollups keep their statistics
+RETENTION_DAYS = 30
+# Daily VWAP buckets kept per item
+VWAP_DAYS = 30
+# Histogram buckets per doubling of price (about 9% wide)
+BUCKETS_PER_DOUBLING = 8
+
+def _bucket(unit_price: float) -> int:
+    return int(math.floor(math.log2(max(unit_price, 1.0)) * BUCKETS_PER_DOUBLING))
+
+def _bucket_price(bucket: int) -> float:
+    """Geometric midpoint of a histogram bucket."""
+    return 2 ** ((bucket + 0.5) / BUCKETS_PER_DOUBLING)
+
+def new_rollup() -> Dict[str, Any]:
+    return {'count': 0, 'quantity': 0, 'min': None, 'max': None, 'last': None,
+            'histogram': {}, 'vwap': {}, 'updated_at': 0}
+
+def fold(rollup: Dict[str, Any], final_price: int, quantity: int, completed_at: float):
+    """Add one sale to a rollup in place. Prices are tracked per unit."""
+    quantity = max(1, quantity)
+    unit_price = final_price / quantity
+
+    rollup['count'] += 1
+    rollup['quantity'] += quantity
+    rollup['min'] = unit_price if rollup['min'] is None else min(rollup['min'], unit_price)
+    rollup['max'] = unit_price if rollup['max'] is None else max(rollup['max'], unit_price)
+    rollup['last'] = unit_price
+    rollup['updated_at'] = max(rollup['updated_at'], completed_at)
+
+    # JSON object keys are strings
+    bucket = str(_bucket(unit_price))
+    rollup['histogram'][bucket] = rollup['histogram'].get(bucket, 0) + 1
+
+    day = history_day(completed_at)
+    value_and_quantity = rollup['vwap'].setdefault(day, [0, 0])
+    value_and_quantity[0] += final_price
+    value_and_quantity[1] += quantity
+    if len(rollup['vwap']) > VWAP_DAYS:
+        for old_day in sorted(rollup['vwap'])[:-VWAP_DAYS]:
+            del rollup['vwap'][old_day]
+
+def median(rollup: Dict[str, Any]) -> Optional[float]:
+    """Approximate median unit price, clamped to the exact min/max."""
+    histogram = rollup.get('histogram')
+    if not histogram:
+        return None
+    half = rollup['count'] / 2
+    seen = 0
+    for bucket in sorted(histogram, key=int):
+        seen += histogram[bucket]
+        if seen >= half:
+            return min(rollup['max'], max(rollup['min'], _bucket_price(int(bucket))))
+    return rollup['max']
+
+def vwap(rollup: Dict[str, Any], days: int = 7, now: Optional[float] = None) -> Optional[float]:
+    """Volume-weighted average unit price over the last few days."""
+    now = time.time() if now is None else now
+    since = history_day(now - days * 86400)
+    value = quantity = 0
+    for day, (day_value, day_quantity) in rollup.get('vwap', {}).items():
+        if day > since:
+            value += day_value
+            quantity += day_quantity
+    return value / quantity if quantity else None
+
+class PriceRollups:
+    """Per-item price statistics, kept in memory and written one item at a time."""
+
+    def __init__(self, retention_days: int = RETENTION_DAYS):
+        self.retention_days = retention_days
+        self.rollups: Dict[str, Dict[str, Any]] = {}
+        self._pruned_day: Optional[str] = None
+
+    async def load(self):
+        """Load rollups, backfilling them from raw history the first time."""
+        try:
+            stored = await get_storage().scan_prefix(ROLLUP_PREFIX)
+            self.rollups = {key[len(ROLLUP_PREFIX):]: rollup for key, rollup in stored.items()}
+            if not self.rollups:
+                await self._backfill()
+            await self.prune()
+        except Exception as e:
+            logger.error(f"Error loading auction price rollups: {e}")
+
+    async def _backfill(self):
+        days = await auction_store.history_days()
+        for day in days:
+            for entry in (await auction_store.load_history(day)).values():
+                self._fold_entry(entry)
+        if self.rollups:
+            await get_storage().set_many({f"{ROLLUP_PREFIX}{key}": rollup for key, rollup in self.rollups.items()})
+            logger.info(f"Built price rollups for {len(self.rollups)} items from {len(days)} days of history")
+
+    def _fold_entry(self, entry: Dict[str, Any]) -> Optional[str]:
+        item_key = entry.get('item_key')
+        if not item_key or not entry.get('final_price'):
+            return None
+        rollup = self.rollups.setdefault(item_key, new_rollup())
+        fold(rollup, entry['final_price'], entry.get('quantity', 1), entry.get('completed_at', time.time()))
+        return item_key
+
+    async def record(self, entry: Dict[str, Any]):
+        """Fold a completed sale into its item's rollup and store that rollup."""
+        await self.record_many([entry])
+
+    async def record_many(self, entries: List[Dict[str, Any]]):
+        """Fold several sales in, storing each touched rollup once."""
+        touched = {self._fold_entry(entry) for entry in entries} - {None}
+        if not touched:
+            return
+        try:
+            await get_storage().set_many({f"{ROLLUP_PREFIX}{key}": self.rollups[key] for key in touched})
+        except Exception as e:
+            logger.error(f"Error saving price rollups for {len(touched)} items: {e}")
+        if self._pruned_day != history_day(time.time()):
+            await self.prune()
+
+    async def prune(self):
+        """Delete raw history segments past the retention window. Runs at most once a day."""
+        self._pruned_day = history_day(time.time())
+        cutoff = history_day(time.time() - self.retention_days * 86400)
+        removed = await auction_store.prune_history(cutoff)
+        if removed:
+            logger.info(f"Pruned {removed} auction history segments older than {cutoff}")
+
+    def stats(self, item_key: str) -> Optional[Dict[str, Any]]:
+        """Summary price statistics for an item, or None if it has never sold."""
+        rollup = self.rollups.get(item_key)
+        if not rollup or not rollup['count']:
+            return None
+        return {
+            'count': rollup['count'],
+            'quantity': rollup['quantity'],
+            'min': rollup['min'],
+            'median': median(rollup),
+            'max': rollup['max'],
+            'last': rollup['last'],
+            'vwap_7d': vwap(rollup, 7)
+        }
+
+    def suggest_price(self, item_key: str, quantity: int = 1) -> Optional[int]:
+        """A starting bid for a listing: recent VWAP if there is one, otherwise the median."""
+        stats = self.stats(item_key)
+        if stats is None:
+            return None
+        unit_price = stats['vwap_7d'] or stats['median']
+        return max(1, int(round(unit_price * quantity)))
+
+# Global auction price rollups
+price_rollups = PriceRollups()
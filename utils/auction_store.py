@@ -0,0 +1,192 @@
+"""
+Auction persistence.
+Each active auction is its own record, and a small manifest lists the ids that are live, so a bid rewrites
+one auction instead of the whole market. Finished auctions are appended to history segments that roll over
+by (UTC) day; a write only ever touches the current day's segment.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+RECORD_PREFIX = "auction_record_"
+MANIFEST_KEY = "auction_manifest"
+HISTORY_PREFIX = "auction_history_"
+
+# Single-blob keys from before per-auction records
+LEGACY_ACTIVE_KEY = "active_auctions"
+LEGACY_HISTORY_KEY = "auction_history"
+
+def history_day(timestamp: float) -> str:
+    """The history segment a completion time falls in."""
+    return time.strftime('%Y%m%d', time.gmtime(timestamp))
+
+class AuctionStore:
+    """Reads and writes auction records, the manifest and the history segments."""
+
+    def __init__(self):
+        self._manifest: set = set()
+        # Day of the newest segment known to exist in storage
+        self._segment_day: Optional[str] = None
+        # Serializes manifest and history writes, so an older manifest snapshot can't land after a newer one
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> Dict[str, Dict[str, Any]]:
+        """Every active auction, migrating the old single-blob layout on first run."""
+        storage = get_storage()
+        try:
+            manifest = await storage.get(MANIFEST_KEY)
+            if manifest is None:
+                return await self._migrate()
+
+            records = await storage.get_many(f"{RECORD_PREFIX}{auction_id}" for auction_id in manifest)
+            auctions = {key[len(RECORD_PREFIX):]: record for key, record in records.items()}
+            self._manifest = set(auctions)
+            if len(auctions) != len(manifest):
+                logger.warning(f"Auction manifest listed {len(manifest) - len(auctions)} missing records")
+                async with self._lock:
+                    await self._write_manifest()
+            return auctions
+        except Exception as e:
+            logger.error(f"Error loading auctions: {e}")
+            return {}
+
+    async def _migrate(self) -> Dict[str, Dict[str, Any]]:
+        storage = get_storage()
+        auctions = dict(await storage.get(LEGACY_ACTIVE_KEY, {}))
+        history = dict(await storage.get(LEGACY_HISTORY_KEY, {}))
+
+        segments: Dict[str, Dict[str, Any]] = {}
+        for auction_id, record in history.items():
+            day = history_day(record.get('completed_at', record.get('end_time', 0)))
+            segments.setdefault(f"{HISTORY_PREFIX}{day}", {})[auction_id] = record
+
+        self._manifest = set(auctions)
+        await storage.set_many({
+            **{f"{RECORD_PREFIX}{auction_id}": record for auction_id, record in auctions.items()},
+            **segments,
+            MANIFEST_KEY: sorted(self._manifest)
+        })
+        await storage.delete_many([LEGACY_ACTIVE_KEY, LEGACY_HISTORY_KEY])
+        if auctions or history:
+            logger.info(f"Migrated {len(auctions)} auctions and {len(history)} history entries "
+                        f"into {len(segments)} day segments")
+        return auctions
+
+    async def _write_manifest(self):
+        # Callers hold self._lock
+        await get_storage().set(MANIFEST_KEY, sorted(self._manifest))
+
+    async def create(self, auction_id: str, auction_data: Dict[str, Any]) -> bool:
+        """Store a new auction and add it to the manifest. Returns False if it couldn't be saved."""
+        storage = get_storage()
+        async with self._lock:
+            self._manifest.add(auction_id)
+            try:
+                await storage.set_many({
+                    f"{RECORD_PREFIX}{auction_id}": auction_data,
+                    MANIFEST_KEY: sorted(self._manifest)
+                })
+                return True
+            except Exception as e:
+                logger.error(f"Error saving new auction {auction_id}: {e}")
+                self._manifest.discard(auction_id)
+
+            # Without its record the id is dropped on load, even if the manifest write did land
+            try:
+                await storage.delete(f"{RECORD_PREFIX}{auction_id}")
+            except Exception as e:
+                logger.error(f"Error rolling back new auction {auction_id}: {e}")
+            return False
+
+    async def save(self, auction_id: str, auction_data: Dict[str, Any]):
+        """Rewrite one auction, e.g. after a bid. The manifest is untouched."""
+        try:
+            await get_storage().set(f"{RECORD_PREFIX}{auction_id}", auction_data)
+        except Exception as e:
+            logger.error(f"Error saving auction {auction_id}: {e}")
+
+    async def finish(self, auction_id: str, history_record: Optional[Dict[str, Any]] = None) -> bool:
+        """Remove a finished auction, appending it to history if it sold."""
+        return await self.finish_many([auction_id], {auction_id: history_record} if history_record else None)
+
+    async def finish_many(self, auction_ids: List[str], history: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
+        """Remove a batch of finished auctions with one manifest write, appending the sold ones to history.
+
+        The manifest is the source of truth, so leftover records from an interrupted batch are never loaded.
+        Returns False if the manifest couldn't be written; the auctions stay listed and load again next start.
+        """
+        if history:
+            await self.append_history(history)
+        async with self._lock:
+            try:
+                self._manifest.difference_update(auction_ids)
+                await self._write_manifest()
+            except Exception as e:
+                self._manifest.update(auction_ids)
+                logger.error(f"Error removing {len(auction_ids)} finished auctions: {e}")
+                return False
+        try:
+            await get_storage().delete_many([f"{RECORD_PREFIX}{auction_id}" for auction_id in auction_ids])
+        except Exception as e:
+            logger.error(f"Error deleting {len(auction_ids)} finished auction records: {e}")
+        return True
+
+    async def append_history(self, entries: Dict[str, Dict[str, Any]]):
+        """Add {auction_id: record} entries to the segments for their completion days."""
+        by_day: Dict[str, Dict[str, Any]] = {}
+        for auction_id, record in entries.items():
+            by_day.setdefault(history_day(record.get('completed_at', time.time())), {})[auction_id] = record
+
+        storage = get_storage()
+        try:
+            async with self._lock:
+                new_segments, patches = {}, {}
+                for day, day_entries in by_day.items():
+                    key = f"{HISTORY_PREFIX}{day}"
+                    if day == self._segment_day or await storage.exists(key):
+                        # Only the new entries are written into the existing segment
+                        patches[key] = day_entries
+                    else:
+                        new_segments[key] = day_entries
+                if new_segments:
+                    await storage.set_many(new_segments)
+                if patches:
+                    await storage.patch_many(patches)
+                self._segment_day = max(by_day)
+        except Exception as e:
+            logger.error(f"Error recording auction history for {len(entries)} auctions: {e}")
+
+    async def history_days(self) -> List[str]:
+        """Days that have a history segment, oldest first."""
+        try:
+            keys = await get_storage().keys(HISTORY_PREFIX)
+        except Exception as e:
+            logger.error(f"Error listing auction history: {e}")
+            return []
+        return sorted(key[len(HISTORY_PREFIX):] for key in keys)
+
+    async def prune_history(self, before_day: str) -> int:
+        """Delete every history segment from before a day. Returns how many were removed."""
+        try:
+            old = [f"{HISTORY_PREFIX}{day}" for day in await self.history_days() if day < before_day]
+            return await get_storage().delete_many(old) if old else 0
+        except Exception as e:
+            logger.error(f"Error pruning auction history: {e}")
+            return 0
+
+    async def load_history(self, day: str) -> Dict[str, Dict[str, Any]]:
+        """One day's finished auctions."""
+        try:
+            return dict(await get_storage().get(f"{HISTORY_PREFIX}{day}", {}))
+        except Exception as e:
+            logger.error(f"Error loading auction history for {day}: {e}")
+            return {}
+
+# Global auction store
+auction_store = AuctionStore()
@@ -0,0 +1,349 @@
+"""
+Monte Carlo balance simulator.
+Plays thousands of tactical fights per class × monster × level side by side in NumPy arrays,
+following the same rules and action policy as utils.combat_engine.simulate_battle.
+
+Run `python -m utils.balance_sim --help` for the command-line report.
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from rpg_data.combat_data import ENHANCED_MONSTERS, TACTICAL_SKILLS, ULTIMATE_ABILITIES
+from rpg_data.game_data import CLASSES, TACTICAL_MONSTERS
+from utils.combat_engine import CombatEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEVELS = (1, 5, 10, 20)
+
+# Win rates outside this band get flagged in the report
+MIN_WIN_RATE = 0.25
+MAX_WIN_RATE = 0.99
+
+# Fights simulated side by side at once; larger sweeps run in chunks so memory stays bounded
+BATCH_FIGHTS = 250_000
+# Total fights the in-bot report will run; the command line has no limit
+MAX_SWEEP_FIGHTS = 2_000_000
+
+def build_player(player_class: str, level: int) -> Dict[str, Any]:
+    """A fresh character of a class at a level, with the stat growth level_up_check applies."""
+    class_data = CLASSES[player_class]
+    stats = dict(class_data['starting_stats'])
+    stats['strength'] += level - 1
+    stats['constitution'] += level - 1
+    max_hp = class_data['base_hp'] if level == 1 else 100 + stats['constitution'] * 10
+
+    return {
+        'class': player_class,
+        'level': level,
+        'gold': 0,
+        'xp': 0,
+        'inventory': {},
+        'derived_stats': {
+            'attack': 10 + stats['strength'] * 2,
+            'critical_chance': 0.05 + stats['dexterity'] * 0.01
+        },
+        'resources': {'hp': max_hp, 'max_hp': max_hp, 'ultimate_energy': 0}
+    }
+
+def tactical_monster(monster_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Adapt a TACTICAL_MONSTERS entry to the engine's monster shape."""
+    weaknesses = monster_data.get('weaknesses') or {}
+    weakness_type = max(weaknesses, key=weaknesses.get) if isinstance(weaknesses, dict) and weaknesses else 'physical'
+    toughness = max(1, round(monster_data['hp'] * 0.4))
+    return {
+        'name': monster_data['name'],
+        'hp': monster_data['hp'],
+        'max_hp': monster_data.get('max_hp', monster_data['hp']),
+        'attack': monster_data['attack'],
+        'toughness': toughness,
+        'max_toughness': toughness,
+        'weakness_type': weakness_type.lower()
+    }
+
+def monster_pool(source: str = "enhanced") -> Dict[str, Dict[str, Any]]:
+    """Monsters to sweep: 'enhanced', 'tactical' or 'all'."""
+    pool = {}
+    if source in ("enhanced", "all"):
+        pool.update(ENHANCED_MONSTERS)
+    if source in ("tactical", "all"):
+        pool.update({f"tactical:{key}": tactical_monster(data) for key, data in TACTICAL_MONSTERS.items()})
+    return pool
+
+class BalanceSimulator:
+    """Runs batches of fights as parallel arrays, one element per fight."""
+
+    def __init__(self, seed: Optional[int] = None, max_turns: int = 200):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("The balance simulator needs NumPy (pip install numpy)")
+        self.rng = np.random.default_rng(seed)
+        self.max_turns = max_turns
+        self._damage_types: Dict[str, int] = {}
+
+    def _type_code(self, damage_type: str) -> int:
+        return self._damage_types.setdefault(damage_type, len(self._damage_types))
+
+    def run(self, classes: Sequence[str], monsters: Dict[str, Dict[str, Any]],
+            levels: Sequence[int], fights: int = 1000) -> List[Dict[str, Any]]:
+        """Simulate every class × monster × level combination and summarize each one."""
+        combos = [(c, m, l) for c in classes for m in monsters for l in levels]
+        per_batch = max(1, BATCH_FIGHTS // fights)
+        results = []
+        for start in range(0, len(combos), per_batch):
+            results.extend(self._run_batch(combos[start:start + per_batch], monsters, fights))
+        return results
+
+    def _run_batch(self, combos: List[Tuple[str, str, int]], monsters: Dict[str, Dict[str, Any]],
+                   fights: int) -> List[Dict[str, Any]]:
+        combo_count = len(combos)
+        n = combo_count * fights
+        combo = np.repeat(np.arange(combo_count), fights)
+
+        # Per-combination parameters, gathered out to one entry per fight
+        players = [build_player(c, l) for c, _, l in combos]
+        enemies = [monsters[m] for _, m, _ in combos]
+        ultimates = [ULTIMATE_ABILITIES.get(c, ULTIMATE_ABILITIES['warrior']) for c, _, _ in combos]
+
+        def per_fight(values, dtype):
+            return np.asarray(values, dtype=dtype)[combo]
+
+        attack = per_fight([p['derived_stats']['attack'] for p in players], np.int64)
+        crit_chance = per_fight([p['derived_stats']['critical_chance'] for p in players], np.float64)
+        max_hp = per_fight([p['resources']['max_hp'] for p in players], np.int64)
+        enemy_attack = per_fight([e['attack'] for e in enemies], np.int64)
+        max_toughness = per_fight([e['max_toughness'] for e in enemies], np.int64)
+        weakness = per_fight([self._type_code(e['weakness_type']) for e in enemies], np.int64)
+
+        ult_damage = per_fight([u.get('damage', 0) for u in ultimates], np.int64)
+        ult_has_damage = per_fight(['damage' in u for u in ultimates], bool)
+        ult_toughness = per_fight([u.get('toughness_damage', 30) for u in ultimates], np.int64)
+        ult_type = per_fight([self._type_code(u.get('damage_type', 'physical')) for u in ultimates], np.int64)
+        ult_heal = per_fight([u.get('heal', 0) for u in ultimates], np.int64)
+
+        # Skills in the order the default policy tries them; padding slots cost more than anyone can have
+        skill_lists = [CombatEngine.available_skills(p) for p in players]
+        width = max(len(skills) for skills in skill_lists)
+
+        def skill_table(field, default, pad):
+            rows = [
+                [TACTICAL_SKILLS[key].get(field, default) for key in skills] + [pad] * (width - len(skills))
+                for skills in skill_lists
+            ]
+            return np.asarray(rows, dtype=np.int64)[combo]
+
+        skill_cost = skill_table('cost', 0, np.iinfo(np.int32).max)
+        skill_damage = skill_table('damage', 0, 0)
+        skill_toughness = skill_table('toughness_damage', 0, 0)
+        skill_heal = skill_table('heal', 0, 0)
+        skill_gain = skill_table('ultimate_gain', 0, 0)
+        skill_type = np.asarray([
+            [self._type_code(TACTICAL_SKILLS[key].get('damage_type', 'physical')) for key in skills] + [-1] * (width - len(skills))
+            for skills in skill_lists
+        ], dtype=np.int64)[combo]
+
+        # Mutable fight state, mirroring CombatEngine.new_state
+        hp = max_hp.copy()
+        ultimate_energy = np.zeros(n, np.int64)
+        skill_points = np.full(n, 5, np.int64)
+        enemy_hp = per_fight([e['hp'] for e in enemies], np.int64)
+        toughness = max_toughness.copy()
+        broken = np.zeros(n, bool)
+        broken_turns = np.zeros(n, np.int64)
+        on_player_turn = np.ones(n, bool)
+        turn_count = np.zeros(n, np.int64)
+        active = np.ones(n, bool)
+        won = np.zeros(n, bool)
+
+        # Tallies for the report
+        actions = np.zeros(n, np.int64)
+        sp_spent = np.zeros(n, np.int64)
+        ultimates_used = np.zeros(n, np.int64)
+        damage_dealt = np.zeros(n, np.int64)
+        damage_taken = np.zeros(n, np.int64)
+
+        rng = self.rng
+        rows = np.arange(n)
+
+        def weakness_hit(mask, damage_type, toughness_damage):
+            hit = mask & (damage_type == weakness) & (toughness_damage > 0)
+            old = toughness.copy()
+            np.subtract(toughness, toughness_damage, out=toughness, where=hit)
+            np.maximum(toughness, 0, out=toughness)
+            breaks = hit & (old > 0) & (toughness == 0)
+            broken[breaks] = True
+            broken_turns[breaks] = 1
+
+        def deal(mask, damage):
+            np.subtract(enemy_hp, damage, out=enemy_hp, where=mask)
+            np.maximum(enemy_hp, 0, out=enemy_hp)
+            damage_dealt[mask] += damage[mask]
+
+        def heal(mask, amount):
+            np.minimum(np.where(mask, hp + amount, hp), max_hp, out=hp)
+
+        while active.any():
+            acting = active & on_player_turn
+            actions += acting
+
+            # Ultimate when charged
+            use_ultimate = acting & (ultimate_energy >= 100)
+            ultimate_energy[use_ultimate] = 0
+            ultimates_used += use_ultimate
+            ult_hits = use_ultimate & ult_has_damage
+            damage = rng.integers(ult_damage - 10, ult_damage + 21)
+            weakness_hit(ult_hits, ult_type, ult_toughness)
+            damage = np.where(broken, (damage * 1.8).astype(np.int64), damage)
+            deal(ult_hits, damage)
+            heal(use_ultimate & (ult_heal > 0), ult_heal)
+
+            # Otherwise the first affordable skill
+            affordable = skill_cost <= skill_points[:, None]
+            use_skill = acting & ~use_ultimate & affordable.any(axis=1)
+            choice = affordable.argmax(axis=1)
+            cost = skill_cost[rows, choice]
+            base = skill_damage[rows, choice] + attack // 2
+            skill_hits = use_skill & (skill_damage[rows, choice] > 0)
+            skill_points[use_skill] -= cost[use_skill]
+            sp_spent[use_skill] += cost[use_skill]
+            damage = rng.integers(base - 5, base + 11)
+            weakness_hit(skill_hits, skill_type[rows, choice], skill_toughness[rows, choice])
+            damage = np.where(broken, (damage * 1.5).astype(np.int64), damage)
+            deal(skill_hits, damage)
+            heal(use_skill & (skill_heal[rows, choice] > 0), skill_heal[rows, choice])
+            np.minimum(np.where(use_skill, ultimate_energy + skill_gain[rows, choice], ultimate_energy), 100,
+                       out=ultimate_energy)
+
+            # Otherwise a basic attack
+            attacking = acting & ~use_ultimate & ~use_skill
+            base = 20 + attack // 2
+            damage = rng.integers(base - 5, base + 9)
+            crit = rng.random(n) < crit_chance
+            damage = np.where(crit, (damage * 1.5).astype(np.int64), damage)
+            np.minimum(np.where(attacking, skill_points + rng.integers(1, 3, n), skill_points), 10, out=skill_points)
+            np.minimum(np.where(attacking, ultimate_energy + 10, ultimate_energy), 100, out=ultimate_energy)
+            weakness_hit(attacking, self._type_code('physical'), 10)
+            damage = np.where(broken, (damage * 1.3).astype(np.int64), damage)
+            deal(attacking, damage)
+
+            # Ultimates keep the turn; skills and attacks pass it
+            on_player_turn[use_skill | attacking] = False
+
+            victory = active & (enemy_hp <= 0)
+            won |= victory
+            active &= ~victory
+
+            # Enemy turn: a broken enemy recovers instead of attacking
+            enemy_turn = active & ~on_player_turn
+            stunned = enemy_turn & broken & (broken_turns > 0)
+            broken_turns[stunned] -= 1
+            recovered = stunned & (broken_turns <= 0)
+            broken[recovered] = False
+            toughness[recovered] = max_toughness[recovered]
+
+            attacked = enemy_turn & ~stunned
+            damage = rng.integers(enemy_attack - 5, enemy_attack + 11)
+            np.subtract(hp, damage, out=hp, where=attacked)
+            np.maximum(hp, 0, out=hp)
+            damage_taken[attacked] += damage[attacked]
+            turn_count += attacked
+
+            np.minimum(np.where(enemy_turn, skill_points + 2, skill_points), 10, out=skill_points)
+            on_player_turn[enemy_turn] = True
+
+            active &= (hp > 0) & (turn_count < self.max_turns)
+
+        results = []
+        for index, (player_class, monster_key, level) in enumerate(combos):
+            fights_slice = slice(index * fights, (index + 1) * fights)
+            wins = won[fights_slice]
+            kill_turns = turn_count[fights_slice][wins]
+            dealt = damage_dealt[fights_slice]
+            taken = damage_taken[fights_slice]
+            results.append({
+                'class': player_class,
+                'monster': monster_key,
+                'level': level,
+                'fights': fights,
+                'win_rate': float(wins.mean()),
+                'turns_to_kill': float(np.median(kill_turns)) if kill_turns.size else None,
+                'turns_to_kill_p90': float(np.percentile(kill_turns, 90)) if kill_turns.size else None,
+                'actions': float(actions[fights_slice].mean()),
+                'sp_spent': float(sp_spent[fights_slice].mean()),
+                'ultimates': float(ultimates_used[fights_slice].mean()),
+                'damage_dealt': [float(value) for value in np.percentile(dealt, (10, 50, 90))],
+                'damage_taken': [float(value) for value in np.percentile(taken, (10, 50, 90))],
+                'hp_left': float((hp[fights_slice][wins] / max_hp[fights_slice][wins]).mean()) if wins.any() else 0.0
+            })
+        return results
+
+def flag(result: Dict[str, Any]) -> str:
+    """Short note for combinations that look mis-tuned."""
+    if result['win_rate'] < MIN_WIN_RATE:
+        return "too hard"
+    if result['win_rate'] > MAX_WIN_RATE and (result['turns_to_kill'] or 0) <= 1:
+        return "trivial"
+    return ""
+
+def format_report(results: Iterable[Dict[str, Any]]) -> str:
+    """Render simulation results as a fixed-width table."""
+    lines = [
+        f"{'class':<14}{'monster':<28}{'lvl':>4}{'win%':>7}{'ttk':>6}{'ttk90':>7}{'sp':>6}{'ult':>5}"
+        f"{'dealt p10/50/90':>20}{'taken p50/90':>15}{'hp%':>6}  flag"
+    ]
+    for result in results:
+        ttk = "-" if result['turns_to_kill'] is None else f"{result['turns_to_kill']:.0f}"
+        ttk90 = "-" if result['turns_to_kill_p90'] is None else f"{result['turns_to_kill_p90']:.0f}"
+        dealt = "/".join(f"{value:.0f}" for value in result['damage_dealt'])
+        taken = "/".join(f"{value:.0f}" for value in result['damage_taken'][1:])
+        lines.append(
+            f"{result['class']:<14}{result['monster']:<28}{result['level']:>4}{result['win_rate'] * 100:>6.1f}%"
+            f"{ttk:>6}{ttk90:>7}{result['sp_spent']:>6.1f}{result['ultimates']:>5.1f}"
+            f"{dealt:>20}{taken:>15}{result['hp_left'] * 100:>5.0f}%  {flag(result)}"
+        )
+    return "\n".join(lines)
+
+def combination_count(levels: Sequence[int] = DEFAULT_LEVELS, source: str = "enhanced",
+                      classes: Optional[Sequence[str]] = None) -> int:
+    """How many class × monster × level combinations a sweep covers."""
+    return len(classes or CLASSES) * len(monster_pool(source)) * len(levels)
+
+def run_sweep(fights: int = 1000, levels: Sequence[int] = DEFAULT_LEVELS, source: str = "enhanced",
+              classes: Optional[Sequence[str]] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Full balance sweep. Returns the per-combination results, the report text and timing."""
+    classes = list(classes or CLASSES)
+    monsters = monster_pool(source)
+    started = time.perf_counter()
+    results = BalanceSimulator(seed=seed).run(classes, monsters, levels, fights)
+    elapsed = time.perf_counter() - started
+    return {
+        'results': results,
+        'report': format_report(results),
+        'flagged': [result for result in results if flag(result)],
+        'fights': len(results) * fights,
+        'elapsed': elapsed
+    }
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Monte Carlo balance sweep for tactical combat.")
+    parser.add_argument("--fights", type=int, default=2000, help="fights per class/monster/level combination")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(DEFAULT_LEVELS))
+    parser.add_argument("--monsters", choices=("enhanced", "tactical", "all"), default="enhanced")
+    parser.add_argument("--classes", nargs="+", choices=list(CLASSES))
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    sweep = run_sweep(args.fights, args.levels, args.monsters, args.classes, args.seed)
+    print(sweep['report'])
+    print(f"\n{sweep['fights']:,} fights in {sweep['elapsed']:.2f}s, {len(sweep['flagged'])} combinations flagged")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Caches for database documents.
+Keeps hot records in memory, batching player writes back to storage and expiring read-mostly config.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _read_path(document: Dict[str, Any], path: str) -> Any:
+    for part in path.split('.'):
+        document = document[part]
+    return document
+
+class WriteBackCache:
+    """LRU document cache with dirty tracking and periodic asynchronous flushing."""
+
+    def __init__(self, loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]],
+                 writer: Callable[[Dict[str, Dict[str, Any]]], Awaitable[None]],
+                 max_entries: int = 2048, flush_interval: float = 15.0,
+                 patcher: Optional[Callable[[Dict[str, Dict[str, Any]]], Awaitable[None]]] = None,
+                 bulk_loader: Optional[Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]]] = None,
+                 can_patch: Optional[Callable[[], bool]] = None):
+        self.loader = loader
+        self.writer = writer
+        self.patcher = patcher
+        # Checked when paths are marked; without it patches are always used when there is a patcher
+        self.can_patch = can_patch
+        self.bulk_loader = bulk_loader
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty = set()
+        self._patches: Dict[str, set] = {}  # Clean documents with only these dotted paths modified
+        self._evicted: Dict[str, Dict[str, Any]] = {}  # Dirty entries pushed out by LRU, awaiting flush
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'patches': 0, 'flushes': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def dirty_count(self) -> int:
+        """Number of documents waiting to be written back."""
+        return len(self._dirty) + len(self._evicted) + len(self._patches)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a document, loading it from storage on a miss."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._entries[key]
+
+        if key in self._evicted:
+            # Evicted before its flush - revive it without touching storage
+            self.stats['hits'] += 1
+            self._store(key, self._evicted.pop(key), dirty=True)
+            return self._entries[key]
+
+        self.stats['misses'] += 1
+        data = await self.loader(key)
+        if key in self._entries:
+            # Another caller loaded (and may have modified) it while we awaited
+            return self._entries[key]
+        if data is None:
+            return None
+
+        self._store(key, data, dirty=False)
+        return data
+
+    async def get_many(self, keys) -> Dict[str, Dict[str, Any]]:
+        """Get several documents, loading all the misses in one batch. Missing documents are left out."""
+        result = {}
+        misses = []
+        for key in dict.fromkeys(keys):
+            if key in self._entries or key in self._evicted:
+                result[key] = await self.get(key)
+            else:
+                misses.append(key)
+        if not misses:
+            return result
+
+        if self.bulk_loader is None:
+            for key in misses:
+                data = await self.get(key)
+                if data is not None:
+                    result[key] = data
+            return result
+
+        self.stats['misses'] += len(misses)
+        loaded = await self.bulk_loader(misses)
+        for key in misses:
+            if key in self._entries:
+                # Loaded by another caller while we awaited
+                result[key] = self._entries[key]
+            elif loaded.get(key) is not None:
+                self._store(key, loaded[key], dirty=False)
+                result[key] = loaded[key]
+        return result
+
+    def put(self, key: str, data: Dict[str, Any]):
+        """Store a document and schedule it for write-back."""
+        self._evicted.pop(key, None)
+        self._patches.pop(key, None)
+        self._store(key, data, dirty=True)
+
+    def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Snapshot of every cached document, including ones awaiting write-back."""
+        return list(self._evicted.items()) + list(self._entries.items())
+
+    def mark_dirty(self, key: str):
+        """Flag a cached document as modified in place."""
+        if key in self._entries:
+            self._patches.pop(key, None)
+            self._dirty.add(key)
+
+    def mark_paths(self, key: str, paths):
+        """Flag dotted paths of a cached document as modified in place."""
+        if key not in self._entries or key in self._dirty:
+            return
+        if self.patcher is None or (self.can_patch is not None and not self.can_patch()):
+            # A full write of the cached document is cheaper than a patch here
+            self._dirty.add(key)
+            return
+        self._patches.setdefault(key, set()).update(paths)
+
+    def invalidate(self, key: str):
+        """Drop a document from the cache without writing it back."""
+        self._entries.pop(key, None)
+        self._evicted.pop(key, None)
+        self._dirty.discard(key)
+        self._patches.pop(key, None)
+
+    def _store(self, key: str, data: Dict[str, Any], dirty: bool):
+        self._entries[key] = data
+        self._entries.move_to_end(key)
+        if dirty:
+            self._dirty.add(key)
+
+        while len(self._entries) > self.max_entries:
+            old_key, old_data = self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+            if old_key in self._dirty or old_key in self._patches:
+                self._dirty.discard(old_key)
+                self._patches.pop(old_key, None)
+                self._evicted[old_key] = old_data
+
+    async def flush(self) -> int:
+        """Write every dirty document back to storage. Returns the number written."""
+        async with self._flush_lock:
+            batch = dict(self._evicted)
+            self._evicted.clear()
+            for key in self._dirty:
+                batch[key] = self._entries[key]
+            self._dirty.clear()
+            patched = self._patches
+            self._patches = {}
+            # Patched documents may be evicted mid-write; keep them so a failure can requeue them
+            patched_documents = {key: self._entries[key] for key in patched}
+
+            if not batch and not patched:
+                return 0
+
+            # Snapshot before awaiting so in-place edits can't race the writer
+            snapshot = {key: copy.deepcopy(data) for key, data in batch.items()}
+            patches = {
+                key: {path: copy.deepcopy(_read_path(self._entries[key], path)) for path in paths}
+                for key, paths in patched.items()
+            }
+            try:
+                if snapshot:
+                    await self.writer(snapshot)
+                if patches:
+                    await self.patcher(patches)
+            except Exception as e:
+                logger.error(f"Error flushing {len(batch) + len(patches)} cached documents: {e}")
+                # Keep the documents queued for the next flush, as full writes
+                for key, data in batch.items():
+                    if key in self._entries:
+                        self._dirty.add(key)
+                    else:
+                        self._evicted[key] = data
+                for key in patches:
+                    if key in self._entries:
+                        self._dirty.add(key)
+                    else:
+                        self._evicted[key] = patched_documents[key]
+                return 0
+
+            written = len(batch) + len(patches)
+            self.stats['writes'] += written
+            self.stats['patches'] += len(patches)
+            self.stats['flushes'] += 1
+            logger.debug(f"Flushed {len(batch)} cached documents and {len(patches)} patches")
+            return written
+
+    def start(self):
+        """Start the periodic flush task if it isn't already running."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the periodic flush task and write back everything still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-back flush failed: {e}")
+
+class TTLCache:
+    """Small in-memory cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key) -> Any:
+        """Get a live entry, or None if it's missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def peek(self, key) -> Tuple[Any, bool]:
+        """Get an entry even if it has expired. Returns (value, is_fresh)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        return entry[1], entry[0] > time.monotonic()
+
+    def set(self, key, value):
+        """Store an entry for one TTL."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when no key is given."""
+        self.stats['invalidations'] += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
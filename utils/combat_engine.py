@@ -0,0 +1,471 @@
+"""
+Headless tactical combat engine.
+Resolves turns on a plain combat state dict and player dict, with no Discord objects involved,
+so the same rules drive TacticalCombatView and offline simulations.
+
+Run `python -m utils.combat_engine` for a simulation benchmark.
+"""
+
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rpg_data.combat_data import ENHANCED_MONSTERS, TACTICAL_SKILLS, ULTIMATE_ABILITIES
+from rpg_data.game_data import ITEMS
+from utils.combat_events import CombatEvent
+from utils.skill_table import skill_table
+from utils.status_effects import status_effects
+
+# Bound on enemy actions in a row while the player keeps losing turns to stuns
+MAX_ENEMY_TURNS = 5
+
+class CombatEngine:
+    """Applies combat actions to a state and player, mutating both and returning the events.
+
+    All randomness comes from self.rng, so a seeded engine replays a fight exactly.
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    @staticmethod
+    def new_state(monster_key: str) -> Dict[str, Any]:
+        """Start a fight against a monster."""
+        monster_data = ENHANCED_MONSTERS.get(monster_key, ENHANCED_MONSTERS['goblin']).copy()
+        return {
+            'in_combat': True,
+            'skill_points': 5,  # Start with full SP
+            'max_skill_points': 10,  # Increased maximum SP
+            'enemy': monster_data,
+            'turn': 'player',
+            'turn_count': 0,
+            'enemy_broken_turns': 0,
+            'sp_regen_per_turn': 2  # SP regeneration per turn
+        }
+
+    @staticmethod
+    def outcome(state: Dict[str, Any], player: Dict[str, Any]) -> Optional[str]:
+        """'victory' or 'defeat' once either side is down, otherwise None."""
+        if state['enemy']['hp'] <= 0:
+            return 'victory'
+        if player['resources']['hp'] <= 0:
+            return 'defeat'
+        return None
+
+    @staticmethod
+    def available_skills(player: Dict[str, Any]) -> Tuple[str, ...]:
+        """Skills the player's class and level allow."""
+        return skill_table.for_player(player)
+
+    @staticmethod
+    def skill_error(state: Dict[str, Any], skill_key: str) -> Optional[str]:
+        """Why a skill can't be used right now, or None if it can."""
+        if skill_key not in TACTICAL_SKILLS:
+            return "❌ Invalid skill!"
+        cost = TACTICAL_SKILLS[skill_key]['cost']
+        if state['skill_points'] < cost:
+            return f"❌ Not enough SP! Need {cost} SP."
+        return None
+
+    def _regen_sp(self, state: Dict[str, Any], events: List[CombatEvent]):
+        old_sp = state['skill_points']
+        state['skill_points'] = min(state['max_skill_points'], old_sp + state.get('sp_regen_per_turn', 2))
+        if state['skill_points'] > old_sp:
+            gained = state['skill_points'] - old_sp
+            events.append(CombatEvent(
+                'sp_regen', f"💎 Regenerated {gained} SP! ({state['skill_points']}/{state['max_skill_points']})", gained
+            ))
+
+    def check_weakness_break(self, state: Dict[str, Any], damage_type: str, toughness_damage: int,
+                             events: List[CombatEvent]) -> bool:
+        """Apply toughness damage if it hits the enemy's weakness. Returns whether the enemy broke."""
+        enemy = state['enemy']
+        if damage_type != enemy['weakness_type'] or toughness_damage <= 0:
+            return False
+
+        old_toughness = enemy['toughness']
+        enemy['toughness'] = max(0, enemy['toughness'] - toughness_damage)
+        events.append(CombatEvent('weakness_hit', f"💥 Weakness hit! Toughness damage: {toughness_damage}", toughness_damage))
+
+        if old_toughness > 0 and enemy['toughness'] == 0:
+            enemy['is_broken'] = True
+            state['enemy_broken_turns'] = 1
+            events.append(CombatEvent('break', f"🔥 WEAKNESS BREAK! {enemy['name']} is stunned!"))
+            return True
+        return False
+
+    def apply_status_effect(self, target: Dict[str, Any], effect_name: str, duration_override: int = None,
+                            events: Optional[List[CombatEvent]] = None) -> bool:
+        """Apply a status effect to target (player or enemy)."""
+        return status_effects.apply(target, effect_name, duration_override, events)
+
+    def process_status_effects(self, target: Dict[str, Any], is_player: bool = False) -> Tuple[List[CombatEvent], bool]:
+        """Tick every active status effect on a target. Returns (events, skip_turn)."""
+        pool = target['resources'] if is_player else target
+        return status_effects.tick(target, pool, is_player)
+
+    def _heal(self, player: Dict[str, Any], amount: int, events: List[CombatEvent]) -> Optional[int]:
+        """Heal the player up to max HP. Returns the HP restored, or None if an effect blocks healing."""
+        if status_effects.healing_blocked(player):
+            events.append(CombatEvent('heal_blocked', "🔥 Healing is blocked!"))
+            return None
+        resources = player['resources']
+        old_hp = resources['hp']
+        resources['hp'] = min(resources['max_hp'], old_hp + amount)
+        return resources['hp'] - old_hp
+
+    def basic_attack(self, state: Dict[str, Any], player: Dict[str, Any]) -> List[CombatEvent]:
+        """Basic attack: generates SP and ultimate energy, then passes the turn."""
+        events = []
+        derived_stats = player['derived_stats']
+        resources = player['resources']
+        enemy = state['enemy']
+
+        base_damage = 20 + derived_stats['attack'] // 2
+        damage = self.rng.randint(base_damage - 5, base_damage + 8)
+
+        if self.rng.random() < derived_stats.get('critical_chance', 0.05):
+            damage = int(damage * 1.5)
+            events.append(CombatEvent('critical', "💥 CRITICAL HIT! (150% damage)"))
+
+        # Always generate 1-2 SP per basic attack
+        sp_gained = self.rng.randint(1, 2)
+        state['skill_points'] = min(state['max_skill_points'], state['skill_points'] + sp_gained)
+
+        ultimate_gain = 10
+        resources['ultimate_energy'] = min(100, resources.get('ultimate_energy', 0) + ultimate_gain)
+
+        # Basic attacks are physical
+        if enemy['weakness_type'] == 'physical':
+            self.check_weakness_break(state, 'physical', 10, events)
+
+        if enemy.get('is_broken', False):
+            damage = int(damage * 1.3)
+            events.append(CombatEvent('broken_bonus', "💥 Bonus damage on broken enemy!"))
+
+        enemy['hp'] = max(0, enemy['hp'] - damage)
+
+        log_msg = f"⚔️ Basic Attack! Dealt {damage} damage"
+        if sp_gained > 0:
+            log_msg += f", gained {sp_gained} SP"
+        log_msg += f", gained {ultimate_gain} UE!"
+        events.append(CombatEvent('attack', log_msg, damage))
+
+        state['turn'] = 'monster'
+        return events
+
+    def use_skill(self, state: Dict[str, Any], player: Dict[str, Any], skill_key: str) -> List[CombatEvent]:
+        """Use a skill the player can afford (check skill_error first), then pass the turn."""
+        error = self.skill_error(state, skill_key)
+        if error:
+            raise ValueError(error)
+
+        events = []
+        skill_data = TACTICAL_SKILLS[skill_key]
+        resources = player['resources']
+        enemy = state['enemy']
+
+        state['skill_points'] -= skill_data['cost']
+
+        if skill_data.get('damage', 0) > 0:
+            base_damage = skill_data['damage'] + player['derived_stats']['attack'] // 2
+            damage = self.rng.randint(base_damage - 5, base_damage + 10)
+
+            if skill_data.get('armor_penetration', 0) > 0:
+                events.append(CombatEvent('armor_penetration', f"🔓 Armor penetration: {int(skill_data['armor_penetration']*100)}%"))
+
+            toughness_damage = skill_data.get('toughness_damage', 0)
+            damage_type = skill_data.get('damage_type', 'physical')
+            if toughness_damage > 0:
+                self.check_weakness_break(state, damage_type, toughness_damage, events)
+
+            if enemy.get('is_broken', False):
+                damage = int(damage * 1.5)
+                events.append(CombatEvent('broken_bonus', "💥 Bonus damage on broken enemy!"))
+
+            enemy['hp'] = max(0, enemy['hp'] - damage)
+            events.append(CombatEvent('skill', f"✨ {skill_data['name']}! Dealt {damage} {damage_type} damage!", damage))
+
+            for effect in skill_data.get('effects', []):
+                if self.rng.random() < effect['chance']:
+                    self.apply_status_effect(enemy, effect['status'], events=events)
+                    events.append(CombatEvent('status', f"🌟 Applied {status_effects.handlers[effect['status']].name} to enemy!"))
+
+        if skill_data.get('heal', 0) > 0:
+            actual_heal = self._heal(player, skill_data['heal'], events)
+            if actual_heal is not None:
+                events.append(CombatEvent('heal', f"❤️ Healed {actual_heal} HP!", actual_heal))
+
+        for effect in skill_data.get('self_effects', []):
+            if self.rng.random() < effect['chance']:
+                self.apply_status_effect(player, effect['status'], events=events)
+                events.append(CombatEvent('status', f"✨ Gained {status_effects.handlers[effect['status']].name}!"))
+
+        if skill_data.get('remove_debuffs', False):
+            removed_effects = status_effects.cleanse(player)
+            if removed_effects:
+                events.append(CombatEvent('cleanse', f"✨ Removed debuffs: {', '.join(removed_effects)}"))
+
+        resources['ultimate_energy'] = min(100, resources.get('ultimate_energy', 0) + skill_data.get('ultimate_gain', 0))
+
+        state['turn'] = 'monster'
+        return events
+
+    def ultimate(self, state: Dict[str, Any], player: Dict[str, Any]) -> List[CombatEvent]:
+        """Spend a full ultimate bar on the class ultimate. The player keeps the turn."""
+        events = []
+        resources = player['resources']
+        enemy = state['enemy']
+        ultimate_data = ULTIMATE_ABILITIES.get(player.get('class', 'warrior'), ULTIMATE_ABILITIES['warrior'])
+
+        resources['ultimate_energy'] = 0
+
+        if 'damage' in ultimate_data:
+            base_damage = ultimate_data['damage']
+            damage = self.rng.randint(base_damage - 10, base_damage + 20)
+
+            damage_type = ultimate_data.get('damage_type', 'physical')
+            self.check_weakness_break(state, damage_type, ultimate_data.get('toughness_damage', 30), events)
+
+            if enemy.get('is_broken', False):
+                damage = int(damage * 1.8)
+                events.append(CombatEvent('broken_bonus', "💥 Massive bonus damage on broken enemy!"))
+
+            enemy['hp'] = max(0, enemy['hp'] - damage)
+            events.append(CombatEvent('ultimate', f"🌟 ULTIMATE: {ultimate_data['name']}!"))
+            events.append(CombatEvent('damage', f"💥 Dealt {damage} {damage_type} damage!", damage))
+
+        if 'heal' in ultimate_data:
+            actual_heal = self._heal(player, ultimate_data['heal'], events)
+            if actual_heal is not None:
+                events.append(CombatEvent('heal', f"✨ Healed {actual_heal} HP!", actual_heal))
+
+        return events
+
+    def monster_turn(self, state: Dict[str, Any], player: Dict[str, Any]) -> List[CombatEvent]:
+        """The enemy acts (or recovers from a break), then the turn returns to the player.
+
+        A player stunned as their turn begins loses it, and the enemy goes again.
+        """
+        enemy = state['enemy']
+        resources = player['resources']
+        events = []
+        for _ in range(MAX_ENEMY_TURNS):
+            enemy_events, stunned = status_effects.tick(enemy)
+            events.extend(enemy_events)
+            if enemy['hp'] <= 0:
+                break
+
+            broken = enemy.get('is_broken', False) and state['enemy_broken_turns'] > 0
+            if broken:
+                events.append(CombatEvent('stunned', f"💫 {enemy['name']} is stunned and skips their turn!"))
+                state['enemy_broken_turns'] -= 1
+
+                if state['enemy_broken_turns'] <= 0:
+                    enemy['is_broken'] = False
+                    enemy['toughness'] = enemy['max_toughness']
+                    events.append(CombatEvent('recover', f"🛡️ {enemy['name']} recovers!"))
+            elif not stunned:
+                damage = self.rng.randint(enemy['attack'] - 5, enemy['attack'] + 10)
+                resources['hp'] = max(0, resources['hp'] - damage)
+                events.append(CombatEvent('enemy_attack', f"{enemy['name']} attacks for {damage} damage!", damage))
+
+            # The player's own effects tick as their turn begins
+            player_stunned = False
+            if resources['hp'] > 0:
+                player_events, player_stunned = self.process_status_effects(player, is_player=True)
+                events.extend(player_events)
+
+            self._regen_sp(state, events)
+            if not broken:
+                state['turn_count'] += 1
+            if not player_stunned or resources['hp'] <= 0:
+                break
+
+        state['turn'] = 'player'
+        return events
+
+    def use_item(self, state: Dict[str, Any], player: Dict[str, Any], item_key: str) -> List[CombatEvent]:
+        """Consume an item from the player's inventory. Doesn't use up the turn."""
+        item_data = ITEMS.get(item_key, {})
+        if item_data.get('type') != 'consumable':
+            return [CombatEvent('rejected', "❌ Item cannot be consumed!")]
+
+        inventory = player.get('inventory', {})
+        if inventory.get(item_key, 0) <= 0:
+            return [CombatEvent('rejected', "❌ Item not found in inventory!")]
+
+        inventory[item_key] -= 1
+        if inventory[item_key] <= 0:
+            del inventory[item_key]
+
+        events = []
+        resources = player['resources']
+
+        if item_data.get('heal_amount'):
+            heal = item_data['heal_amount']
+
+            if player.get('class') == 'healer':
+                heal = int(heal * 1.25)  # 25% bonus healing
+                events.append(CombatEvent('class_bonus', "✨ Healer class bonus: +25% healing!"))
+
+            actual_heal = self._heal(player, heal, events)
+            if actual_heal is not None:
+                events.append(CombatEvent('heal', f"❤️ Restored {actual_heal} HP ({resources['hp']}/{resources['max_hp']})", actual_heal))
+
+        if item_data.get('mana_amount'):
+            restore = item_data['mana_amount']
+
+            if player.get('class') == 'mage':
+                restore = int(restore * 1.3)  # 30% bonus mana restoration
+                events.append(CombatEvent('class_bonus', "🔮 Mage class bonus: +30% mana restoration!"))
+
+            max_mana = player.get('derived_stats', {}).get('max_mana', 100)
+            old_mana = resources.setdefault('mana', max_mana)
+            resources['mana'] = min(old_mana + restore, max_mana)
+            actual_restore = resources['mana'] - old_mana
+            events.append(CombatEvent('mana', f"💙 Restored {actual_restore} Mana ({resources['mana']}/{max_mana})", actual_restore))
+
+        for effect in item_data.get('effects') or []:
+            if effect == 'remove_debuffs':
+                removed = status_effects.cleanse(player)
+                if removed:
+                    events.append(CombatEvent('cleanse', f"✨ Removed debuffs: {', '.join(removed)}"))
+
+            elif effect == 'temporary_boost':
+                self.apply_status_effect(player, 'empower')
+                events.append(CombatEvent('status', "⚡ Gained temporary power boost!"))
+
+            elif effect == 'ultimate_energy':
+                old_energy = resources.get('ultimate_energy', 0)
+                resources['ultimate_energy'] = min(100, old_energy + item_data.get('ultimate_energy', 25))
+                actual_gain = resources['ultimate_energy'] - old_energy
+                events.append(CombatEvent('ultimate_energy', f"⚡ Gained {actual_gain} Ultimate Energy!", actual_gain))
+
+        # Plagg is excited about cheese!
+        if 'cheese' in item_key.lower():
+            actual_heal = self._heal(player, self.rng.randint(10, 25), events)
+            if actual_heal is not None:
+                events.append(CombatEvent('heal', f"🧀 CHEESE POWER! Plagg grants extra {actual_heal} HP!", actual_heal))
+
+            resources['ultimate_energy'] = min(100, resources.get('ultimate_energy', 0) + 15)
+            events.append(CombatEvent('ultimate_energy', "🧀 Plagg's joy gives +15 Ultimate Energy!", 15))
+
+        if not events:
+            events.append(CombatEvent('item', f"✨ {item_data.get('name', 'Item')} consumed!"))
+        return events
+
+    def flee(self, state: Dict[str, Any], player: Dict[str, Any]) -> List[CombatEvent]:
+        """Escape the fight, losing 10% of gold. The event's value is the gold lost."""
+        state['in_combat'] = False
+        player['in_combat'] = False
+        player['resources']['ultimate_energy'] = 0
+        gold_lost = max(1, int(player.get('gold', 0) * 0.10))
+        player['gold'] = max(0, player.get('gold', 0) - gold_lost)
+        return [CombatEvent('flee', "🏃 You fled from combat!", gold_lost)]
+
+    def settle(self, state: Dict[str, Any], player: Dict[str, Any], victory: bool,
+               level_up_check: Optional[Callable[[Dict[str, Any]], int]] = None) -> List[CombatEvent]:
+        """Apply the rewards or penalties for a finished fight."""
+        events = []
+        state['in_combat'] = False
+        player['in_combat'] = False
+        # Combat effects don't carry over into the next fight
+        player.pop('active_effects', None)
+        enemy = state['enemy']
+
+        if victory:
+            level_mult = 1 + (player['level'] - 1) * 0.1
+            xp_gained = int(enemy['xp_reward'] * level_mult)
+            gold_gained = int(enemy['gold_reward'] * level_mult)
+            player['xp'] += xp_gained
+            player['gold'] += gold_gained
+
+            inventory = player['inventory']
+            loot_found = []
+            for item_name, chance in enemy.get('loot_table', {}).items():
+                if self.rng.random() < chance:
+                    inventory[item_name] = inventory.get(item_name, 0) + 1
+                    loot_found.append(item_name)
+
+            events.append(CombatEvent('victory', f"🏆 Victory! Gained {xp_gained} XP and {gold_gained} gold!", gold_gained))
+            if loot_found:
+                items_str = ", ".join(item.replace('_', ' ').title() for item in loot_found)
+                events.append(CombatEvent('loot', f"💎 Found: {items_str}", len(loot_found)))
+
+            if level_up_check and level_up_check(player):
+                events.append(CombatEvent('level_up', f"⭐ LEVEL UP! You are now level {player['level']}!", player['level']))
+        else:
+            gold_lost = max(1, int(player['gold'] * 0.15))
+            player['gold'] = max(0, player['gold'] - gold_lost)
+            player['resources']['hp'] = max(1, player['resources']['max_hp'] // 4)
+            events.append(CombatEvent('defeat', f"💀 Defeat! Lost {gold_lost} gold and most of your health.", gold_lost))
+
+        player['resources']['ultimate_energy'] = 0
+        return events
+
+def default_policy(engine: CombatEngine, state: Dict[str, Any], player: Dict[str, Any]):
+    """Ultimate when charged, otherwise the first affordable skill, otherwise a basic attack."""
+    if player['resources'].get('ultimate_energy', 0) >= 100:
+        return ('ultimate',)
+    for skill_key in engine.available_skills(player):
+        if engine.skill_error(state, skill_key) is None:
+            return ('skill', skill_key)
+    return ('attack',)
+
+def simulate_battle(player: Dict[str, Any], monster_key: str, engine: Optional[CombatEngine] = None,
+                    policy: Callable = default_policy, max_turns: int = 200) -> Dict[str, Any]:
+    """Fight a battle to the end without rewards. player is modified, so pass a copy."""
+    engine = engine or CombatEngine()
+    state = engine.new_state(monster_key)
+    actions = 0
+
+    outcome = None
+    while outcome is None and state['turn_count'] < max_turns:
+        if state['turn'] == 'player':
+            action = policy(engine, state, player)
+            if action[0] == 'ultimate':
+                engine.ultimate(state, player)
+            elif action[0] == 'skill':
+                engine.use_skill(state, player, action[1])
+            else:
+                engine.basic_attack(state, player)
+            actions += 1
+        else:
+            engine.monster_turn(state, player)
+        outcome = engine.outcome(state, player)
+
+    return {
+        'outcome': outcome or 'timeout',
+        'turns': state['turn_count'],
+        'actions': actions,
+        'player_hp': player['resources']['hp'],
+        'enemy_hp': state['enemy']['hp']
+    }
+
+def _benchmark(battles: int = 20000):
+    import time
+
+    template = {
+        'class': 'warrior', 'level': 10, 'gold': 0, 'xp': 0, 'inventory': {},
+        'derived_stats': {'attack': 40, 'critical_chance': 0.1},
+        'resources': {'hp': 250, 'max_hp': 250, 'ultimate_energy': 0}
+    }
+    engine = CombatEngine(seed=42)
+    monsters = list(ENHANCED_MONSTERS)
+    results = {}
+    turns = 0
+
+    started = time.perf_counter()
+    for index in range(battles):
+        player = {**template, 'resources': dict(template['resources'])}
+        result = simulate_battle(player, monsters[index % len(monsters)], engine)
+        results[result['outcome']] = results.get(result['outcome'], 0) + 1
+        turns += result['actions'] + result['turns']
+    elapsed = time.perf_counter() - started
+
+    print(f"{battles} battles, {turns} turns in {elapsed:.2f}s "
+          f"({turns / elapsed * 60 / 1e6:.1f}M turns/minute)")
+    print(f"outcomes: {results}")
+
+if __name__ == "__main__":
+    _benchmark()
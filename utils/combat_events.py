@@ -0,0 +1,17 @@
+"""
+Combat events.
+The log entries combat produces. Shared by the engine and the status effect handlers, which it imports.
+"""
+
+class CombatEvent:
+    """One thing that happened during a turn. text is the combat log line."""
+
+    __slots__ = ('kind', 'text', 'value')
+
+    def __init__(self, kind: str, text: str, value: int = 0):
+        self.kind = kind
+        self.text = text
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"CombatEvent({self.kind!r}, {self.text!r}, {self.value!r})"
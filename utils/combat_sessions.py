@@ -0,0 +1,116 @@
+"""
+Persistent combat sessions.
+Live battles are checkpointed to storage after every turn so a restart can pick them back up.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.sessions import session_registry
+from utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+SESSION_PREFIX = "combat_session_"
+
+class CombatSessionStore:
+    """Tracks one combat session per user, mirrored to storage with a TTL."""
+
+    def __init__(self, ttl: float = 1800.0):
+        self.ttl = ttl
+        # user_id -> last checkpointed session
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        # user_id -> the live view driving the fight, stopped when the session is discarded from elsewhere
+        self._owners: Dict[str, Any] = {}
+        self.stats = {'checkpoints': 0, 'restored': 0, 'expired': 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, user_id) -> Optional[Dict[str, Any]]:
+        """Get a user's current session, or None."""
+        return self._sessions.get(str(user_id))
+
+    def in_combat(self, user_id) -> bool:
+        """Check whether a user has a live session."""
+        return str(user_id) in self._sessions
+
+    async def checkpoint(self, user_id, session: Dict[str, Any], owner=None):
+        """Save a session and push its expiry back by the TTL. owner is the view running the fight."""
+        user_id = str(user_id)
+        if owner is not None:
+            self._owners[user_id] = owner
+        # Wall-clock time, since the expiry has to mean something after a restart
+        session['user_id'] = user_id
+        session['expires_at'] = time.time() + self.ttl
+        self._sessions[user_id] = session
+        session_registry.open('combat', user_id, self.ttl, on_expire=self._expire)
+        self.stats['checkpoints'] += 1
+        try:
+            await get_storage().set(f"{SESSION_PREFIX}{user_id}", session)
+        except Exception as e:
+            logger.error(f"Error checkpointing combat session for {user_id}: {e}")
+
+    async def discard(self, user_id) -> bool:
+        """Forget a user's session. Returns whether there was one."""
+        user_id = str(user_id)
+        existed = self._sessions.pop(user_id, None) is not None
+        session_registry.close('combat', user_id)
+        self._stop_owner(user_id)
+        try:
+            await get_storage().delete(f"{SESSION_PREFIX}{user_id}")
+        except Exception as e:
+            logger.error(f"Error deleting combat session for {user_id}: {e}")
+        return existed
+
+    def _stop_owner(self, user_id: str):
+        # A stopped view no longer checkpoints, so the fight can't come back after a restart
+        owner = self._owners.pop(user_id, None)
+        if owner is not None and not owner.is_finished():
+            owner.stop()
+
+    async def load(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Read every stored session. Returns (live, expired); expired ones are deleted."""
+        try:
+            stored = await get_storage().scan_prefix(SESSION_PREFIX)
+        except Exception as e:
+            logger.error(f"Error loading combat sessions: {e}")
+            return [], []
+
+        now = time.time()
+        live, expired = [], []
+        for session in stored.values():
+            if session.get('expires_at', 0) > now:
+                self._sessions[session['user_id']] = session
+                session_registry.open('combat', session['user_id'], session['expires_at'] - now,
+                                      on_expire=self._expire)
+                live.append(session)
+            else:
+                expired.append(session)
+
+        if expired:
+            self.stats['expired'] += len(expired)
+            try:
+                await get_storage().delete_many(f"{SESSION_PREFIX}{session['user_id']}" for session in expired)
+            except Exception as e:
+                logger.error(f"Error deleting expired combat sessions: {e}")
+        self.stats['restored'] += len(live)
+        return live, expired
+
+    async def _expire(self, user_id: str):
+        # Called by the session registry once a session goes a full TTL without a checkpoint
+        from utils.database import patch_player
+
+        self.stats['expired'] += 1
+        self._sessions.pop(user_id, None)
+        self._stop_owner(user_id)
+        try:
+            await get_storage().delete(f"{SESSION_PREFIX}{user_id}")
+        except Exception as e:
+            logger.error(f"Error deleting expired combat session for {user_id}: {e}")
+        # Nothing will finish this fight now, so let the player start another
+        await patch_player(user_id, sets={'in_combat': False})
+
+# Global combat session store
+combat_sessions = CombatSessionStore()
@@ -1,12 +1,44 @@
 import logging
-from typing import Dict, Any, Optional, List
-from replit import db
+from typing import Dict, Any, Optional, List, Callable
 import json
+import copy
+import inspect
 from datetime import datetime
 import asyncio
 
+from utils.cache import TTLCache, WriteBackCache
+from utils.locks import user_locks
+from utils.storage import get_storage
+
 logger = logging.getLogger(__name__)
 
+async def _load_document(key: str) -> Optional[Dict[str, Any]]:
+    """Load a document from storage."""
+    return await get_storage().get(key)
+
+async def _load_documents(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Load a batch of documents from storage."""
+    return await get_storage().get_many(keys)
+
+async def _write_documents(documents: Dict[str, Dict[str, Any]]):
+    """Write a batch of documents to storage."""
+    await get_storage().set_many(documents)
+
+async def _patch_documents(patches: Dict[str, Dict[str, Any]]):
+    """Write changed paths of a batch of documents to storage."""
+    await get_storage().patch_many(patches)
+
+def _native_patch() -> bool:
+    """Whether path patches are cheaper than full writes on the active backend."""
+    return get_storage().native_patch
+
+# Write-back cache for user_{id} documents (player RPG data lives under 'rpg_data')
+player_cache = WriteBackCache(_load_document, _write_documents, patcher=_patch_documents,
+                              bulk_loader=_load_documents, can_patch=_native_patch)
+
+# Read-mostly guild_{id} documents (multipliers, module toggles)
+guild_data_cache = TTLCache(ttl=300)
+
 async def initialize_database():
     """Initialize database tables and default data with retry logic."""
     max_retries = 3
@@ -16,11 +48,12 @@ async def initialize_database():
         try:
             # Test database connection
             test_key = "db_test"
-            db[test_key] = "working"
+            storage = get_storage()
+            await storage.set(test_key, "working")
 
-            if db.get(test_key) == "working":
+            if await storage.get(test_key) == "working":
                 logger.info("Database connection successful")
-                del db[test_key]
+                await storage.delete(test_key)
                 break
             else:
                 raise Exception("Database read/write test failed")
@@ -36,39 +69,40 @@ async def initialize_database():
 
     logger.info("Database initialization complete")
 
-def get_user_rpg_data(user_id: str) -> Optional[Dict[str, Any]]:
+async def get_user_rpg_data(user_id: str) -> Optional[Dict[str, Any]]:
     """Get user's RPG data from database."""
     try:
         key = f"user_rpg_{user_id}"
-        if key in db:
-            return dict(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return dict(value)
         return None
     except Exception as e:
         logger.error(f"Error getting user RPG data for {user_id}: {e}")
         return None
 
-def update_user_rpg_data(user_id: str, data: Dict[str, Any]) -> bool:
+async def update_user_rpg_data(user_id: str, data: Dict[str, Any]) -> bool:
     """Update user's RPG data in database."""
     try:
         key = f"user_rpg_{user_id}"
-        db[key] = data
+        await get_storage().set(key, data)
         return True
     except Exception as e:
         logger.error(f"Error updating user RPG data for {user_id}: {e}")
         return False
 
-def ensure_user_exists(user_id: str) -> bool:
+async def ensure_user_exists(user_id: str) -> bool:
     """Ensure user exists in database, create if not."""
     try:
         key = f"user_rpg_{user_id}"
-        if key not in db:
-            return create_user_profile(user_id)
+        if not await get_storage().exists(key):
+            return await create_user_profile(user_id)
         return True
     except Exception as e:
         logger.error(f"Error ensuring user exists {user_id}: {e}")
         return False
 
-def create_user_profile(user_id: str) -> bool:
+async def create_user_profile(user_id: str) -> bool:
     """Create a new user profile with default stats."""
     try:
         default_profile = {
@@ -134,16 +168,16 @@ def create_user_profile(user_id: str) -> bool:
             "seasonal_progress": {},
             "housing": None,
             "pets": [],
-            "created_at": str(db.get("timestamp", ""))
+            "created_at": str(await get_storage().get("timestamp", ""))
         }
 
         key = f"user_rpg_{user_id}"
-        db[key] = default_profile
+        await get_storage().set(key, default_profile)
 
         # Update global user count
-        global_settings = db.get("global_settings", {})
+        global_settings = await get_storage().get("global_settings", {})
         global_settings["total_users"] = global_settings.get("total_users", 0) + 1
-        db["global_settings"] = global_settings
+        await get_storage().set("global_settings", global_settings)
 
         logger.info(f"Created new user profile for {user_id}")
         return True
@@ -151,45 +185,30 @@ def create_user_profile(user_id: str) -> bool:
         logger.error(f"Error creating user profile for {user_id}: {e}")
         return False
 
-def get_leaderboard(category: str, guild_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-    """Get leaderboard data for a specific category."""
-    try:
-        users = []
-
-        # Get all user keys
-        user_keys = [key for key in db.keys() if key.startswith("user_rpg_")]
-
-        for key in user_keys:
-            try:
-                user_data = dict(db[key])
-                user_id = user_data.get("user_id")
+async def get_leaderboard(category: str, guild_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    """Get leaderboard data for a specific category from the sorted leaderboard index."""
+    from utils.leaderboard import leaderboard_index
 
-                if not user_id:
-                    continue
-
-                value = user_data.get(category, 0)
-                users.append({
-                    "user_id": user_id,
-                    "value": value
-                })
-            except Exception as e:
-                logger.warning(f"Error processing user data for leaderboard: {e}")
-                continue
-
-        # Sort by value (descending)
-        users.sort(key=lambda x: x["value"], reverse=True)
-
-        return users[:limit]
+    try:
+        if not leaderboard_index.ready:
+            await leaderboard_index.rebuild()
+        return leaderboard_index.top(category, limit)
     except Exception as e:
         logger.error(f"Error getting leaderboard for {category}: {e}")
         return []
 
-def get_guild_data(guild_id: int) -> Dict[str, Any]:
+async def get_guild_data(guild_id: int) -> Dict[str, Any]:
     """Get guild-specific data."""
     try:
         key = f"guild_{guild_id}"
-        if key in db:
-            return dict(db[key])
+        cached = guild_data_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        value = await get_storage().get(key)
+        if value is not None:
+            guild_data_cache.set(key, value)
+            return copy.deepcopy(value)
 
         # Create default guild data
         default_guild = {
@@ -207,100 +226,102 @@ def get_guild_data(guild_id: int) -> Dict[str, Any]:
             "settings": {}
         }
 
-        db[key] = default_guild
+        await get_storage().set(key, default_guild)
         return default_guild
     except Exception as e:
         logger.error(f"Error getting guild data for {guild_id}: {e}")
         return {}
 
-def update_guild_data(guild_id: int, data: Dict[str, Any]) -> bool:
+async def update_guild_data(guild_id: int, data: Dict[str, Any]) -> bool:
     """Update guild data in database."""
     try:
         key = f"guild_{guild_id}"
-        db[key] = data
+        await get_storage().set(key, data)
+        guild_data_cache.invalidate(key)
         return True
     except Exception as e:
         logger.error(f"Error updating guild data for {guild_id}: {e}")
         return False
 
-def get_user_warnings(user_id: int, guild_id: int) -> List[Dict[str, Any]]:
+async def get_user_warnings(user_id: int, guild_id: int) -> List[Dict[str, Any]]:
     """Get user warnings for a specific guild."""
     try:
         key = f"warnings_{guild_id}_{user_id}"
-        if key in db:
-            return list(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return list(value)
         return []
     except Exception as e:
         logger.error(f"Error getting warnings for {user_id} in {guild_id}: {e}")
         return []
 
-def add_user_warning(user_id: int, guild_id: int, reason: str, moderator_id: int) -> bool:
+async def add_user_warning(user_id: int, guild_id: int, reason: str, moderator_id: int) -> bool:
     """Add a warning to a user."""
     try:
         key = f"warnings_{guild_id}_{user_id}"
-        warnings = db.get(key, [])
+        warnings = await get_storage().get(key, [])
 
         warning = {
             "reason": reason,
             "moderator_id": moderator_id,
-            "timestamp": str(db.get("timestamp", ""))
+            "timestamp": str(await get_storage().get("timestamp", ""))
         }
 
         warnings.append(warning)
-        db[key] = warnings
+        await get_storage().set(key, warnings)
 
         return True
     except Exception as e:
         logger.error(f"Error adding warning for {user_id} in {guild_id}: {e}")
         return False
 
-def clear_user_warnings(user_id: int, guild_id: int) -> bool:
+async def clear_user_warnings(user_id: int, guild_id: int) -> bool:
     """Clear all warnings for a user."""
     try:
         key = f"warnings_{guild_id}_{user_id}"
-        if key in db:
-            del db[key]
+        await get_storage().delete(key)
         return True
     except Exception as e:
         logger.error(f"Error clearing warnings for {user_id} in {guild_id}: {e}")
         return False
 
-def get_conversation_history(user_id: int, guild_id: int) -> List[Dict[str, Any]]:
+async def get_conversation_history(user_id: int, guild_id: int) -> List[Dict[str, Any]]:
     """Get AI conversation history for a user."""
     try:
         key = f"conversation_{guild_id}_{user_id}"
-        if key in db:
-            return list(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return list(value)
         return []
     except Exception as e:
         logger.error(f"Error getting conversation history for {user_id}: {e}")
         return []
 
-def update_conversation_history(user_id: int, guild_id: int, history: List[Dict[str, Any]]) -> bool:
+async def update_conversation_history(user_id: int, guild_id: int, history: List[Dict[str, Any]]) -> bool:
     """Update AI conversation history."""
     try:
         key = f"conversation_{guild_id}_{user_id}"
-        db[key] = history
+        await get_storage().set(key, history)
         return True
     except Exception as e:
         logger.error(f"Error updating conversation history for {user_id}: {e}")
         return False
 
-def clear_conversation_history(user_id: int, guild_id: int) -> bool:
+async def clear_conversation_history(user_id: int, guild_id: int) -> bool:
     """Clear AI conversation history."""
     try:
         key = f"conversation_{guild_id}_{user_id}"
-        if key in db:
-            del db[key]
+        await get_storage().delete(key)
         return True
     except Exception as e:
         logger.error(f"Error clearing conversation history for {user_id}: {e}")
         return False
 
-def get_user_data(user_id: int) -> Optional[Dict[str, Any]]:
-    """Get user data from database."""
+async def get_user_data(user_id: int) -> Optional[Dict[str, Any]]:
+    """Get user data, served from the player cache when possible."""
     try:
-        user_data = db.get(f"user_{user_id}")
+        key = f"user_{user_id}"
+        user_data = await player_cache.get(key)
         if user_data is None:
             # Create default user data
             default_data = {
@@ -313,24 +334,179 @@ def get_user_data(user_id: int) -> Optional[Dict[str, Any]]:
                 'reputation': 0,
                 'notes': []
             }
-            db[f"user_{user_id}"] = default_data
+            player_cache.put(key, default_data)
             return default_data
         return user_data
     except Exception as e:
         logger.error(f"Error getting user data for {user_id}: {e}")
         return None
 
-def update_user_data(user_id: int, data: Dict[str, Any]) -> bool:
-    """Update user data in database."""
+async def update_user_data(user_id: int, data: Dict[str, Any]) -> bool:
+    """Update user data; the player cache writes it back on its next flush."""
     try:
         data['last_active'] = datetime.now().isoformat()
-        db[f"user_{user_id}"] = data
+        player_cache.put(f"user_{user_id}", data)
         return True
     except Exception as e:
         logger.error(f"Error updating user data for {user_id}: {e}")
         return False
 
-def create_guild_profile(guild_id: int, name: str = "Unknown Guild") -> bool:
+def _apply_patch(document: Dict[str, Any], increments: Dict[str, Any], sets: Dict[str, Any]) -> List[str]:
+    """Apply increments and assignments to dotted paths. Returns the paths to persist."""
+    changed = []
+    for path, value in list(increments.items()) + list(sets.items()):
+        parts = path.split('.')
+        node = document
+        persist_path = path
+        for depth, part in enumerate(parts[:-1]):
+            if node.get(part) is None:
+                # Persist the whole new container since storage has nothing beneath it yet
+                persist_path = '.'.join(parts[:depth + 1])
+                node[part] = {}
+            elif not isinstance(node[part], dict):
+                raise TypeError(f"Cannot patch '{path}': '{part}' is not a mapping")
+            node = node[part]
+
+        leaf = parts[-1]
+        if path in increments:
+            node[leaf] = (node.get(leaf) or 0) + value
+        else:
+            node[leaf] = value
+        changed.append(persist_path)
+    return changed
+
+async def patch_user_data(user_id: int, increments: Dict[str, Any] = None,
+                          sets: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    """Atomically increment and assign dotted paths in a user document; only those paths are written back."""
+    try:
+        key = f"user_{user_id}"
+        user_data = await player_cache.get(key)
+        if user_data is None:
+            return None
+
+        # No awaits from here on, so the read-modify-write can't interleave with other tasks
+        changed = _apply_patch(user_data, increments or {}, dict(sets or {}, last_active=datetime.now().isoformat()))
+        player_cache.mark_paths(key, changed)
+        return user_data
+    except Exception as e:
+        logger.error(f"Error patching user data for {user_id}: {e}")
+        return None
+
+async def patch_player(user_id: int, increments: Dict[str, Any] = None,
+                       sets: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    """Patch a player's rpg_data, e.g. patch_player(uid, {"gold": 50, "inventory.health_potion": 1}).
+
+    Returns the updated player data, or None if the user has no character.
+    """
+    user_data = await player_cache.get(f"user_{user_id}")
+    if not user_data or not isinstance(user_data.get('rpg_data'), dict):
+        return None
+
+    increments = {f"rpg_data.{path}": value for path, value in (increments or {}).items()}
+    increments['rpg_data._version'] = 1
+    sets = {f"rpg_data.{path}": value for path, value in (sets or {}).items()}
+    user_data = await patch_user_data(user_id, increments, sets)
+    return user_data['rpg_data'] if user_data else None
+
+async def compare_and_swap_player(user_id: int, player_data: Dict[str, Any], expected_version: int) -> bool:
+    """Save a player's rpg_data only if nobody saved since expected_version was read."""
+    try:
+        key = f"user_{user_id}"
+        user_data = await player_cache.get(key)
+        if user_data is None:
+            return False
+
+        # No awaits from here on, so the check and the swap happen together
+        current = user_data.get('rpg_data')
+        if not isinstance(current, dict) or current.get('_version', 0) != expected_version:
+            return False
+
+        player_data['_version'] = expected_version + 1
+        if current is not player_data:
+            # Update in place so views holding the live document see the change
+            current.clear()
+            current.update(player_data)
+        user_data['last_active'] = datetime.now().isoformat()
+        player_cache.mark_dirty(key)
+        return True
+    except Exception as e:
+        logger.error(f"Error saving player data for {user_id}: {e}")
+        return False
+
+async def mutate_player(user_id: int, mutator: Callable[[Dict[str, Any]], Any],
+                        retries: int = 3) -> Optional[Dict[str, Any]]:
+    """Apply mutator to a player's data under their lock and save it with compare-and-swap.
+
+    The mutator edits a copy and may be async; returning False aborts without saving.
+    Returns the saved player data, or None if aborted, missing or still conflicting after retries.
+    """
+    async with user_locks.lock(user_id):
+        for attempt in range(retries):
+            user_data = await player_cache.get(f"user_{user_id}")
+            if not user_data or not isinstance(user_data.get('rpg_data'), dict):
+                return None
+
+            current = user_data['rpg_data']
+            expected_version = current.get('_version', 0)
+            draft = copy.deepcopy(current)
+
+            result = mutator(draft)
+            if inspect.isawaitable(result):
+                result = await result
+            if result is False:
+                return None
+
+            if await compare_and_swap_player(user_id, draft, expected_version):
+                return current
+            logger.warning(f"Version conflict saving player {user_id} (attempt {attempt + 1}/{retries})")
+
+    logger.error(f"Gave up saving player {user_id} after {retries} version conflicts")
+    return None
+
+async def mutate_players(mutators: Dict[str, Callable[[Dict[str, Any]], Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Apply a mutator to each of several players as one all-or-nothing change.
+
+    Every player's lock is held and their documents are loaded in one batch. Mutators edit copies and must be
+    synchronous; if any player is missing or any mutator returns False, nobody is changed.
+    Returns {user_id: saved player data}, or None if the batch was aborted.
+    """
+    user_ids = [str(user_id) for user_id in mutators]
+    mutators = {str(user_id): mutator for user_id, mutator in mutators.items()}
+    try:
+        async with user_locks.hold(*user_ids):
+            documents = await player_cache.get_many([f"user_{user_id}" for user_id in user_ids])
+
+            # No awaits from here on, so nothing can change these players between the drafts and the swap
+            drafts = {}
+            for user_id in user_ids:
+                user_data = documents.get(f"user_{user_id}")
+                if not user_data or not isinstance(user_data.get('rpg_data'), dict):
+                    logger.warning(f"Batch update aborted: player {user_id} has no character")
+                    return None
+                draft = copy.deepcopy(user_data['rpg_data'])
+                if mutators[user_id](draft) is False:
+                    return None
+                drafts[user_id] = draft
+
+            now = datetime.now().isoformat()
+            saved = {}
+            for user_id, draft in drafts.items():
+                key = f"user_{user_id}"
+                user_data = documents[key]
+                current = user_data['rpg_data']
+                draft['_version'] = current.get('_version', 0) + 1
+                current.clear()
+                current.update(draft)
+                user_data['last_active'] = now
+                # put rather than mark_dirty: the batch load may have pushed some of these out of the LRU
+                player_cache.put(key, user_data)
+                saved[user_id] = current
+            return saved
+    except Exception as e:
+        logger.error(f"Error in batch update of {len(user_ids)} players: {e}")
+        return None
+
+async def create_guild_profile(guild_id: int, name: str = "Unknown Guild") -> bool:
     """Create a guild profile in database."""
     try:
         guild_data = {
@@ -346,35 +522,36 @@ def create_guild_profile(guild_id: int, name: str = "Unknown Guild") -> bool:
                 'timeouts_given': 0
             }
         }
-        db[f"guild_{guild_id}"] = guild_data
+        await get_storage().set(f"guild_{guild_id}", guild_data)
         return True
     except Exception as e:
         logger.error(f"Error creating guild profile for {guild_id}: {e}")
         return False
 
 
-def get_guild_rpg_data(guild_id: str) -> Optional[Dict[str, Any]]:
+async def get_guild_rpg_data(guild_id: str) -> Optional[Dict[str, Any]]:
     """Get guild's RPG data from database."""
     try:
         key = f"guild_rpg_{guild_id}"
-        if key in db:
-            return dict(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return dict(value)
         return None
     except Exception as e:
         logger.error(f"Error getting guild RPG data for {guild_id}: {e}")
         return None
 
-def update_guild_rpg_data(guild_id: str, data: Dict[str, Any]) -> bool:
+async def update_guild_rpg_data(guild_id: str, data: Dict[str, Any]) -> bool:
     """Update guild's RPG data in database."""
     try:
         key = f"guild_rpg_{guild_id}"
-        db[key] = data
+        await get_storage().set(key, data)
         return True
     except Exception as e:
         logger.error(f"Error updating guild RPG data for {guild_id}: {e}")
         return False
 
-def create_guild_rpg_profile(guild_id: str, name: str, founder_id: str) -> bool:
+async def create_guild_rpg_profile(guild_id: str, name: str, founder_id: str) -> bool:
     """Create a new guild RPG profile."""
     try:
         guild_profile = {
@@ -396,34 +573,35 @@ def create_guild_rpg_profile(guild_id: str, name: str, founder_id: str) -> bool:
         }
 
         key = f"guild_rpg_{guild_id}"
-        db[key] = guild_profile
+        await get_storage().set(key, guild_profile)
         return True
     except Exception as e:
         logger.error(f"Error creating guild RPG profile for {guild_id}: {e}")
         return False
 
-def get_party_data(party_id: str) -> Optional[Dict[str, Any]]:
+async def get_party_data(party_id: str) -> Optional[Dict[str, Any]]:
     """Get party data from database."""
     try:
         key = f"party_{party_id}"
-        if key in db:
-            return dict(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return dict(value)
         return None
     except Exception as e:
         logger.error(f"Error getting party data for {party_id}: {e}")
         return None
 
-def update_party_data(party_id: str, data: Dict[str, Any]) -> bool:
+async def update_party_data(party_id: str, data: Dict[str, Any]) -> bool:
     """Update party data in database."""
     try:
         key = f"party_{party_id}"
-        db[key] = data
+        await get_storage().set(key, data)
         return True
     except Exception as e:
         logger.error(f"Error updating party data for {party_id}: {e}")
         return False
 
-def create_party(leader_id: str, party_name: str = "Adventuring Party") -> str:
+async def create_party(leader_id: str, party_name: str = "Adventuring Party") -> str:
     """Create a new party and return party ID."""
     try:
         import uuid
@@ -441,77 +619,80 @@ def create_party(leader_id: str, party_name: str = "Adventuring Party") -> str:
             "loot_distribution": "fair"  # fair, leader, roll
         }
 
-        if update_party_data(party_id, party_data):
+        if await update_party_data(party_id, party_data):
             return party_id
         return None
     except Exception as e:
         logger.error(f"Error creating party: {e}")
         return None
 
-def get_quest_data(quest_id: str) -> Optional[Dict[str, Any]]:
+async def get_quest_data(quest_id: str) -> Optional[Dict[str, Any]]:
     """Get quest data from database."""
     try:
         key = f"quest_{quest_id}"
-        if key in db:
-            return dict(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return dict(value)
         return None
     except Exception as e:
         logger.error(f"Error getting quest data for {quest_id}: {e}")
         return None
 
-def update_quest_data(quest_id: str, data: Dict[str, Any]) -> bool:
+async def update_quest_data(quest_id: str, data: Dict[str, Any]) -> bool:
     """Update quest data in database."""
     try:
         key = f"quest_{quest_id}"
-        db[key] = data
+        await get_storage().set(key, data)
         return True
     except Exception as e:
         logger.error(f"Error updating quest data for {quest_id}: {e}")
         return False
 
-def get_world_event_data(event_id: str) -> Optional[Dict[str, Any]]:
+async def get_world_event_data(event_id: str) -> Optional[Dict[str, Any]]:
     """Get world event data from database."""
     try:
         key = f"world_event_{event_id}"
-        if key in db:
-            return dict(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return dict(value)
         return None
     except Exception as e:
         logger.error(f"Error getting world event data for {event_id}: {e}")
         return None
 
-def update_world_event_data(event_id: str, data: Dict[str, Any]) -> bool:
+async def update_world_event_data(event_id: str, data: Dict[str, Any]) -> bool:
     """Update world event data in database."""
     try:
         key = f"world_event_{event_id}"
-        db[key] = data
+        await get_storage().set(key, data)
         return True
     except Exception as e:
         logger.error(f"Error updating world event data for {event_id}: {e}")
         return False
 
-def get_auction_listings() -> List[Dict[str, Any]]:
+async def get_auction_listings() -> List[Dict[str, Any]]:
     """Get all auction house listings."""
     try:
         key = "auction_house"
-        if key in db:
-            return list(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return list(value)
         return []
     except Exception as e:
         logger.error(f"Error getting auction listings: {e}")
         return []
 
-def update_auction_listings(listings: List[Dict[str, Any]]) -> bool:
+async def update_auction_listings(listings: List[Dict[str, Any]]) -> bool:
     """Update auction house listings."""
     try:
         key = "auction_house"
-        db[key] = listings
+        await get_storage().set(key, listings)
         return True
     except Exception as e:
         logger.error(f"Error updating auction listings: {e}")
         return False
 
-def add_auction_listing(seller_id: str, item_name: str, price: int, duration: int = 86400) -> bool:
+async def add_auction_listing(seller_id: str, item_name: str, price: int, duration: int = 86400) -> bool:
     """Add new auction listing."""
     try:
         import uuid
@@ -529,19 +710,20 @@ def add_auction_listing(seller_id: str, item_name: str, price: int, duration: in
             "status": "active"
         }
 
-        listings = get_auction_listings()
+        listings = await get_auction_listings()
         listings.append(listing)
-        return update_auction_listings(listings)
+        return await update_auction_listings(listings)
     except Exception as e:
         logger.error(f"Error adding auction listing: {e}")
         return False
 
-def get_seasonal_data() -> Dict[str, Any]:
+async def get_seasonal_data() -> Dict[str, Any]:
     """Get current seasonal data."""
     try:
         key = "seasonal_data"
-        if key in db:
-            return dict(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return dict(value)
 
         # Create default seasonal data
         default_seasonal = {
@@ -551,32 +733,33 @@ def get_seasonal_data() -> Dict[str, Any]:
             "year": 1,
             "active_events": []
         }
-        db[key] = default_seasonal
+        await get_storage().set(key, default_seasonal)
         return default_seasonal
     except Exception as e:
         logger.error(f"Error getting seasonal data: {e}")
         return {}
 
-def update_seasonal_data(data: Dict[str, Any]) -> bool:
+async def update_seasonal_data(data: Dict[str, Any]) -> bool:
     """Update seasonal data."""
     try:
         key = "seasonal_data"
-        db[key] = data
+        await get_storage().set(key, data)
         return True
     except Exception as e:
         logger.error(f"Error updating seasonal data: {e}")
         return False
 
-def update_user_profile(user_id, updates):
+async def update_user_profile(user_id, updates):
     """Update a user's profile with the provided updates."""
     try:
         user_id = str(user_id)
         profile_key = f"profile_{user_id}"
 
-        if profile_key in db:
-            profile = dict(db[profile_key])
+        profile = await get_storage().get(profile_key)
+        if profile is not None:
+            profile = dict(profile)
             profile.update(updates)
-            db[profile_key] = profile
+            await get_storage().set(profile_key, profile)
             logger.info(f"Updated profile for user {user_id}")
             return True
         else:
@@ -587,24 +770,25 @@ def update_user_profile(user_id, updates):
         logger.error(f"Error updating profile for user {user_id}: {e}")
         return False
 
-def get_user_rpg_data(user_id):
+async def get_user_rpg_data(user_id):
     """Get user's RPG data."""
     try:
         user_id = str(user_id)
         key = f"rpg_player_{user_id}"
-        if key in db:
-            return dict(db[key])
+        value = await get_storage().get(key)
+        if value is not None:
+            return dict(value)
         return None
     except Exception as e:
         logger.error(f"Error getting RPG data for user {user_id}: {e}")
         return None
 
-def update_user_rpg_data(user_id, rpg_data):
+async def update_user_rpg_data(user_id, rpg_data):
     """Update user's RPG data."""
     try:
         user_id = str(user_id)
         key = f"rpg_player_{user_id}"
-        db[key] = rpg_data
+        await get_storage().set(key, rpg_data)
         logger.info(f"Updated RPG data for user {user_id}")
         return True
     except Exception as e:
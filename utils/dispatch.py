@@ -0,0 +1,106 @@
+"""
+Message dispatch layer.
+Resolves guild config, prefix and mentions once per message and routes it only to handlers that want it.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import DEFAULT_SERVER_CONFIG, get_cached_server_config
+
+logger = logging.getLogger(__name__)
+
+class MessageContext:
+    """Everything handlers need to know about a message, computed once."""
+
+    __slots__ = ('message', 'config', 'prefix', 'is_command', 'mentions_bot', 'reply_to_bot')
+
+    def __init__(self, message, config: Dict[str, Any], prefix: str, bot_user):
+        self.message = message
+        self.config = config
+        self.prefix = prefix
+        self.is_command = message.content.startswith(prefix)
+        self.mentions_bot = bot_user in message.mentions
+        reference = message.reference
+        self.reply_to_bot = bool(
+            reference and reference.message_id and reference.cached_message
+            and reference.cached_message.author == bot_user
+        )
+
+    @property
+    def guild(self):
+        return self.message.guild
+
+    def module_enabled(self, module_name: str) -> bool:
+        """Check a module toggle from the already-resolved config."""
+        return self.config.get('enabled_modules', {}).get(module_name, True)
+
+class MessageDispatcher:
+    """Routes each incoming message to the handlers interested in it."""
+
+    def __init__(self):
+        # name -> (interested(context) -> bool, handler(message, context))
+        self._handlers: Dict[str, Tuple[Callable[[MessageContext], bool],
+                                        Callable[[Any, MessageContext], Awaitable[None]]]] = {}
+        self.stats = {'messages': 0, 'bot_messages': 0, 'commands': 0, 'short_circuited': 0, 'handled': {}}
+
+    def register(self, name: str, interested: Callable[[MessageContext], bool],
+                 handler: Callable[[Any, MessageContext], Awaitable[None]]):
+        """Register a handler; it only runs for messages where interested(context) is true."""
+        self._handlers[name] = (interested, handler)
+        self.stats['handled'].setdefault(name, 0)
+
+    def unregister(self, name: str):
+        """Remove a handler, e.g. when its cog unloads."""
+        self._handlers.pop(name, None)
+
+    async def dispatch(self, bot, message) -> Optional[MessageContext]:
+        """Process one message. Returns its context, or None if it was dropped outright."""
+        self.stats['messages'] += 1
+        if message.author.bot:
+            self.stats['bot_messages'] += 1
+            self.stats['short_circuited'] += 1
+            return None
+
+        if message.guild:
+            config = await get_cached_server_config(message.guild.id)
+        else:
+            config = DEFAULT_SERVER_CONFIG
+        context = MessageContext(message, config, config.get('prefix', '$'), bot.user)
+
+        interested = []
+        for name, (wants, handler) in self._handlers.items():
+            try:
+                if wants(context):
+                    interested.append((name, handler))
+            except Exception as e:
+                logger.error(f"Error in message filter for {name}: {e}")
+
+        if not interested and not context.is_command:
+            self.stats['short_circuited'] += 1
+            return context
+
+        # Handlers run alongside command processing, like the listeners they replace
+        for name, handler in interested:
+            self.stats['handled'][name] += 1
+            asyncio.create_task(self._run(name, handler, message, context))
+
+        if context.is_command:
+            self.stats['commands'] += 1
+            logger.info(f"Command: {message.content[:50]} by {message.author} in {message.guild.name if message.guild else 'DM'}")
+            try:
+                await bot.process_commands(message)
+            except Exception as e:
+                logger.error(f"Error processing command {message.content}: {e}")
+
+        return context
+
+    async def _run(self, name: str, handler, message, context: MessageContext):
+        try:
+            await handler(message, context)
+        except Exception as e:
+            logger.error(f"Error in message handler {name}: {e}")
+
+# Global message dispatcher
+message_dispatcher = MessageDispatcher()
@@ -0,0 +1,204 @@
+"""
+Seeded dungeon runs.
+A run's whole layout (every room's encounter and dice rolls, plus the boss fight) is generated up front from
+DUNGEONS and the run's seed, so a run is fully described by its seed and a cursor. Only that small record is
+stored; the layout is regenerated on demand, and replaying the cursor reproduces the run exactly after a
+restart or view timeout.
+"""
+
+import logging
+import random
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from rpg_data.dungeon_data import DUNGEONS
+from utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+ROOMS_PER_FLOOR = 5
+ENCOUNTER_WEIGHTS = (('monster', 40), ('treasure', 30), ('trap', 20), ('empty', 10))
+
+TRAP_TYPES = (
+    ("Pressure Plate", "You step on a pressure plate and spikes shoot up!"),
+    ("Poison Dart", "A dart flies out of the wall!"),
+    ("Pit Trap", "The floor gives way beneath you!")
+)
+
+RUN_PREFIX = "dungeon_run_"
+
+class Room:
+    """One pre-rolled room. rolls holds every die the encounter needs."""
+
+    __slots__ = ('kind', 'rolls')
+
+    def __init__(self, kind: str, rolls: Tuple):
+        self.kind = kind
+        self.rolls = rolls
+
+class RoomOutcome:
+    """What resolving a room did to the player."""
+
+    __slots__ = ('kind', 'text', 'xp', 'gold', 'damage', 'items', 'monster_defeated', 'victory')
+
+    def __init__(self, kind: str, text: str, xp: int = 0, gold: int = 0, damage: int = 0,
+                 items: Tuple[str, ...] = (), monster_defeated: bool = False, victory: bool = False):
+        self.kind = kind
+        self.text = text
+        self.xp = xp
+        self.gold = gold
+        self.damage = damage
+        self.items = items
+        self.monster_defeated = monster_defeated
+        self.victory = victory
+
+class DungeonLayout:
+    """The generated rooms of a run, floor by floor, and the boss rolls."""
+
+    __slots__ = ('dungeon_key', 'seed', 'floors', 'rooms', 'boss')
+
+    def __init__(self, dungeon_key: str, seed: int, rooms: Tuple[Room, ...], boss: Tuple[int, int]):
+        self.dungeon_key = dungeon_key
+        self.seed = seed
+        self.floors = DUNGEONS[dungeon_key]['floors']
+        self.rooms = rooms
+        self.boss = boss
+
+@lru_cache(maxsize=256)
+def generate_layout(dungeon_key: str, seed: int) -> DungeonLayout:
+    """Roll every room of a run. The same dungeon and seed always give the same layout."""
+    dungeon = DUNGEONS[dungeon_key]
+    rng = random.Random(f"{dungeon_key}:{seed}")
+    kinds = [kind for kind, _ in ENCOUNTER_WEIGHTS]
+    weights = [weight for _, weight in ENCOUNTER_WEIGHTS]
+
+    rooms = []
+    for _ in range(dungeon['floors'] * ROOMS_PER_FLOOR):
+        kind = rng.choices(kinds, weights=weights)[0]
+        if kind == 'monster':
+            # monster, strength, player roll, xp, gold, damage if beaten
+            rolls = (rng.choice(dungeon['monsters']), rng.randint(1, 10), rng.randint(1, 6),
+                     rng.randint(20, 50), rng.randint(10, 30), rng.randint(5, 15))
+        elif kind == 'treasure':
+            # treasure type, gold, material
+            rolls = (rng.choice(('gold', 'item', 'materials')), rng.randint(50, 150),
+                     rng.choice(dungeon['rewards']['rare_materials']))
+        elif kind == 'trap':
+            # trap, dodge roll, damage
+            rolls = (rng.randrange(len(TRAP_TYPES)), rng.randint(1, 10), rng.randint(8, 20))
+        else:
+            rolls = ()
+        rooms.append(Room(kind, rolls))
+
+    # player roll, damage if the boss wins
+    boss = (rng.randint(1, 10), rng.randint(20, 40))
+    return DungeonLayout(dungeon_key, seed, tuple(rooms), boss)
+
+def resolve_room(layout: DungeonLayout, index: int, level: int) -> RoomOutcome:
+    """Resolve a room for a player of the given level. Pure: the same inputs give the same outcome."""
+    dungeon = DUNGEONS[layout.dungeon_key]
+    rewards = dungeon['rewards']
+    room = layout.rooms[index]
+
+    if room.kind == 'monster':
+        monster, strength, roll, xp_roll, gold_roll, damage = room.rolls
+        name = monster.replace('_', ' ').title()
+        if level + roll > strength:
+            xp = int(xp_roll * rewards['xp_multiplier'])
+            gold = int(gold_roll * rewards['gold_multiplier'])
+            return RoomOutcome('monster', f"Victory! You defeated the {name}! Gained {xp} XP and {gold} gold.",
+                               xp=xp, gold=gold, monster_defeated=True)
+        return RoomOutcome('monster', f"The {name} proves too strong! You take {damage} damage.", damage=damage)
+
+    if room.kind == 'treasure':
+        treasure_type, gold_roll, material = room.rolls
+        if treasure_type == 'gold':
+            gold = int(gold_roll * rewards['gold_multiplier'])
+            return RoomOutcome('treasure', f"Treasure chest! You found {gold} gold!", gold=gold)
+        if treasure_type == 'item':
+            item_key = 'health_potion'
+            return RoomOutcome('treasure', f"You found a {item_key.replace('_', ' ').title()}!", items=(item_key,))
+        return RoomOutcome('treasure', f"Rare materials! You found {material.replace('_', ' ').title()}!",
+                           items=(material,))
+
+    if room.kind == 'trap':
+        trap_index, dodge_roll, damage = room.rolls
+        _, description = TRAP_TYPES[trap_index]
+        if dodge_roll > 6:  # 40% chance to avoid
+            return RoomOutcome('trap', f"{description} But you dodge it skillfully!")
+        return RoomOutcome('trap', f"{description} You take {damage} damage!", damage=damage)
+
+    return RoomOutcome('empty', "The room appears empty. *\"Great, more nothing. Like a cheese-less refrigerator.\"*")
+
+def resolve_boss(layout: DungeonLayout, level: int) -> RoomOutcome:
+    """Resolve the final boss fight."""
+    dungeon = DUNGEONS[layout.dungeon_key]
+    roll, damage = layout.boss
+    boss_name = dungeon['boss']
+
+    if level + roll > dungeon['max_level'] - 5:
+        xp = int(200 * dungeon['rewards']['xp_multiplier'])
+        gold = int(500 * dungeon['rewards']['gold_multiplier'])
+        return RoomOutcome('boss', f"VICTORY! You have defeated the {boss_name}! The dungeon trembles as your foe falls!",
+                           xp=xp, gold=gold, victory=True)
+    return RoomOutcome('boss', f"The {boss_name} proves too powerful! You are defeated and must retreat, "
+                               f"taking {damage} damage.", damage=damage)
+
+def new_run(dungeon_key: str, level: int, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Start a run record. level is fixed for the run so replays resolve the same way."""
+    return {
+        'dungeon_key': dungeon_key,
+        'seed': random.getrandbits(32) if seed is None else seed,
+        'level': level,
+        'cursor': 0,  # rooms resolved so far
+        'floor': 1
+    }
+
+def run_totals(run: Dict[str, Any]) -> Dict[str, Any]:
+    """Session totals for a run so far, replayed from its seed and cursor."""
+    layout = generate_layout(run['dungeon_key'], run['seed'])
+    totals = {'xp': 0, 'gold': 0, 'monsters': 0, 'items': []}
+    for index in range(run['cursor']):
+        outcome = resolve_room(layout, index, run['level'])
+        totals['xp'] += outcome.xp
+        totals['gold'] += outcome.gold
+        totals['monsters'] += outcome.monster_defeated
+        totals['items'].extend(outcome.items)
+    return totals
+
+class DungeonRunStore:
+    """Keeps each player's open run (seed and cursor only) in storage."""
+
+    def __init__(self, ttl: float = 86400.0):
+        self.ttl = ttl
+
+    async def get(self, user_id) -> Optional[Dict[str, Any]]:
+        """A player's open run, or None if they have none or it has expired."""
+        try:
+            run = await get_storage().get(f"{RUN_PREFIX}{user_id}")
+        except Exception as e:
+            logger.error(f"Error loading dungeon run for {user_id}: {e}")
+            return None
+        if not run or run.get('dungeon_key') not in DUNGEONS:
+            return None
+        if run.get('expires_at', 0) <= time.time():
+            await self.discard(user_id)
+            return None
+        return run
+
+    async def save(self, user_id, run: Dict[str, Any]):
+        run['expires_at'] = time.time() + self.ttl
+        try:
+            await get_storage().set(f"{RUN_PREFIX}{user_id}", run)
+        except Exception as e:
+            logger.error(f"Error saving dungeon run for {user_id}: {e}")
+
+    async def discard(self, user_id):
+        try:
+            await get_storage().delete(f"{RUN_PREFIX}{user_id}")
+        except Exception as e:
+            logger.error(f"Error deleting dungeon run for {user_id}: {e}")
+
+# Global dungeon run store
+dungeon_runs = DungeonRunStore()
@@ -0,0 +1,122 @@
+"""
+Coalesced message edits.
+Views submit their latest frame here instead of editing directly; each message gets at most one edit
+in flight, newer frames replace unsent ones, and edits are paced per channel to stay under rate limits.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+class _PendingEdit:
+    __slots__ = ('message', 'kwargs', 'futures')
+
+    def __init__(self, message, kwargs: Dict[str, Any]):
+        self.message = message
+        self.kwargs = kwargs
+        self.futures: List[asyncio.Future] = []
+
+class EditScheduler:
+    """Sends the newest pending edit for each message, at most `rate` edits per `per` seconds per channel."""
+
+    def __init__(self, rate: int = 5, per: float = 5.0):
+        self.rate = rate
+        self.per = per
+        # message id -> newest frame not yet sent
+        self._pending: Dict[int, _PendingEdit] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        # channel id -> times of its recent edits
+        self._buckets: Dict[int, deque] = {}
+        self.stats = {'submitted': 0, 'sent': 0, 'superseded': 0, 'throttled': 0, 'rate_limited': 0}
+
+    def edit(self, message, **kwargs) -> asyncio.Future:
+        """Queue an edit. The returned future resolves once this frame, or a newer one, has been sent."""
+        future = asyncio.get_running_loop().create_future()
+        self.stats['submitted'] += 1
+
+        pending = self._pending.get(message.id)
+        if pending is None:
+            pending = self._pending[message.id] = _PendingEdit(message, kwargs)
+        else:
+            # Drop the unsent frame; whoever was waiting on it gets this one's result
+            self.stats['superseded'] += 1
+            pending.message = message
+            pending.kwargs = kwargs
+        pending.futures.append(future)
+
+        worker = self._workers.get(message.id)
+        if worker is None or worker.done():
+            self._workers[message.id] = asyncio.create_task(self._drain(message.id))
+        return future
+
+    def pending(self) -> int:
+        """Messages with an edit waiting to be sent."""
+        return len(self._pending)
+
+    async def _wait_for_slot(self, channel_id: int):
+        bucket = self._buckets.setdefault(channel_id, deque(maxlen=self.rate))
+        if len(bucket) == self.rate:
+            delay = bucket[0] + self.per - time.monotonic()
+            if delay > 0:
+                self.stats['throttled'] += 1
+                await asyncio.sleep(delay)
+        bucket.append(time.monotonic())
+
+    async def _drain(self, message_id: int):
+        try:
+            while message_id in self._pending:
+                await self._wait_for_slot(self._pending[message_id].message.channel.id)
+
+                # Take whatever is newest now; frames submitted while we waited were folded in
+                pending = self._pending.pop(message_id, None)
+                if pending is None:
+                    break
+
+                try:
+                    result = await pending.message.edit(**pending.kwargs)
+                except discord.HTTPException as e:
+                    if e.status == 429:
+                        self.stats['rate_limited'] += 1
+                        self._requeue(message_id, pending)
+                        await asyncio.sleep(getattr(e, 'retry_after', None) or self.per / self.rate)
+                        continue
+                    self._settle(pending, exception=e)
+                except Exception as e:
+                    self._settle(pending, exception=e)
+                else:
+                    self.stats['sent'] += 1
+                    self._settle(pending, result=result)
+        finally:
+            self._workers.pop(message_id, None)
+            self._forget_idle_buckets()
+
+    def _requeue(self, message_id: int, pending: _PendingEdit):
+        newer = self._pending.get(message_id)
+        if newer is None:
+            self._pending[message_id] = pending
+        else:
+            newer.futures[:0] = pending.futures
+
+    @staticmethod
+    def _settle(pending: _PendingEdit, result=None, exception: BaseException = None):
+        for future in pending.futures:
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+    def _forget_idle_buckets(self):
+        cutoff = time.monotonic() - self.per
+        for channel_id in [channel_id for channel_id, bucket in self._buckets.items() if not bucket or bucket[-1] < cutoff]:
+            del self._buckets[channel_id]
+
+# Global edit scheduler
+edit_scheduler = EditScheduler()
@@ -511,7 +511,7 @@ def format_duration(seconds: int) -> str:
             return f"{days} days, {remaining_hours} hours"
         return f"{days} days"
 
-def check_weapon_unlock_conditions(user_id: str, weapon_name: str) -> tuple[bool, str]:
+async def check_weapon_unlock_conditions(user_id: str, weapon_name: str) -> tuple[bool, str]:
     """Check if user meets weapon unlock conditions."""
     from utils.constants import WEAPON_UNLOCK_CONDITIONS
     from utils.database import get_user_rpg_data
@@ -519,7 +519,7 @@ def check_weapon_unlock_conditions(user_id: str, weapon_name: str) -> tuple[bool
     if weapon_name not in WEAPON_UNLOCK_CONDITIONS:
         return True, "No special conditions required"
 
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return False, "Player data not found"
 
@@ -548,11 +548,11 @@ def check_weapon_unlock_conditions(user_id: str, weapon_name: str) -> tuple[bool
 
     return True, "All conditions met"
 
-def check_chrono_weave_unlock(user_id: str) -> tuple[bool, str]:
+async def check_chrono_weave_unlock(user_id: str) -> tuple[bool, str]:
     """Check if user can unlock Chrono Weave class."""
     from utils.database import get_user_rpg_data
 
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return False, "Player data not found"
 
@@ -0,0 +1,197 @@
+"""
+Sorted leaderboard index.
+Keeps every player ranked per category so top-N and rank lookups never scan the database.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+logger = logging.getLogger(__name__)
+
+# Category -> how to read its score from a player's rpg_data
+LEADERBOARD_CATEGORIES: Dict[str, Callable[[Dict[str, Any]], int]] = {
+    'level': lambda player: player.get('level', 1),
+    'xp': lambda player: player.get('xp', 0),
+    'gold': lambda player: player.get('gold', 0),
+    'pvp_rating': lambda player: player.get('arena_rating', 1000),
+    'battles_won': lambda player: player.get('stats', {}).get('battles_won', 0),
+}
+
+# Category -> which players it ranks; categories not listed rank everyone
+LEADERBOARD_ELIGIBLE: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    'pvp_rating': lambda player: player.get('arena_wins', 0) + player.get('arena_losses', 0) > 0,
+}
+
+def _read_score(score_of: Callable[[Dict[str, Any]], int], player_data: Dict[str, Any]) -> int:
+    try:
+        return int(score_of(player_data) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+class RankedIndex:
+    """A single ranking of user ids by score, highest first."""
+
+    def __init__(self):
+        # Entries are (-score, user_id) so iteration runs from the highest score down
+        self._ranked = SortedList()
+        self._scores: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, user_id) -> bool:
+        return str(user_id) in self._scores
+
+    def set(self, user_id: str, score: int):
+        """Insert or move a user."""
+        user_id = str(user_id)
+        old_score = self._scores.get(user_id)
+        if old_score == score:
+            return
+        if old_score is not None:
+            self._ranked.remove((-old_score, user_id))
+        self._ranked.add((-score, user_id))
+        self._scores[user_id] = score
+
+    def discard(self, user_id: str):
+        """Remove a user if present."""
+        old_score = self._scores.pop(str(user_id), None)
+        if old_score is not None:
+            self._ranked.discard((-old_score, str(user_id)))
+
+    def score(self, user_id: str) -> Optional[int]:
+        """Get a user's indexed score."""
+        return self._scores.get(str(user_id))
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """Get a user's 1-based rank. Tied users share a rank."""
+        score = self.score(user_id)
+        if score is None:
+            return None
+        return self._ranked.bisect_left((-score,)) + 1
+
+    def iter_ranked(self, offset: int = 0) -> Iterator[Tuple[str, int]]:
+        """Yield (user_id, score) from the top down."""
+        for neg_score, user_id in self._ranked.islice(offset):
+            yield user_id, -neg_score
+
+    def top(self, limit: int = 10, offset: int = 0,
+            predicate: Optional[Callable[[str], bool]] = None) -> List[Dict[str, Any]]:
+        """Get a page of the ranking, optionally filtered by user id."""
+        results = []
+        for user_id, score in self.iter_ranked(offset):
+            if predicate and not predicate(user_id):
+                continue
+            results.append({'user_id': user_id, 'value': score})
+            if len(results) >= limit:
+                break
+        return results
+
+    def around(self, user_id: str, radius: int = 2) -> List[Dict[str, Any]]:
+        """Get the entries directly above and below a user, including the user."""
+        score = self.score(user_id)
+        if score is None:
+            return []
+
+        position = self._ranked.index((-score, str(user_id)))
+        start = max(0, position - radius)
+        results = []
+        for neg_score, other_id in self._ranked.islice(start, position + radius + 1):
+            results.append({
+                'user_id': other_id,
+                'value': -neg_score,
+                'rank': self._ranked.bisect_left((neg_score,)) + 1,
+            })
+        return results
+
+class LeaderboardIndex:
+    """Per-category sorted index of player scores, updated incrementally."""
+
+    def __init__(self):
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self._categories: Dict[str, RankedIndex] = {category: RankedIndex() for category in LEADERBOARD_CATEGORIES}
+        # Guild id -> arena ladder of the players who have fought ranked matches there
+        self._guild_arenas: Dict[str, RankedIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self._categories['level'])
+
+    def update(self, user_id: str, player_data: Dict[str, Any]):
+        """Re-rank a player after their data changed."""
+        for category, score_of in LEADERBOARD_CATEGORIES.items():
+            eligible = LEADERBOARD_ELIGIBLE.get(category)
+            if eligible and not eligible(player_data):
+                self._categories[category].discard(user_id)
+                continue
+            self._categories[category].set(user_id, _read_score(score_of, player_data))
+
+        # Only players with a recorded match are on an arena ladder
+        if not LEADERBOARD_ELIGIBLE['pvp_rating'](player_data):
+            return
+        rating = _read_score(LEADERBOARD_CATEGORIES['pvp_rating'], player_data)
+        for guild_id in player_data.get('arena_guilds', []):
+            self.arena_ladder(guild_id, create=True).set(user_id, rating)
+
+    def remove(self, user_id: str):
+        """Drop a player from every category and arena ladder."""
+        for ranking in self._categories.values():
+            ranking.discard(user_id)
+        for ladder in self._guild_arenas.values():
+            ladder.discard(user_id)
+
+    def arena_ladder(self, guild_id=None, create: bool = False) -> Optional[RankedIndex]:
+        """Get a guild's arena ladder, or the global one when no guild is given."""
+        if guild_id is None:
+            return self._categories['pvp_rating']
+        guild_id = str(guild_id)
+        if create and guild_id not in self._guild_arenas:
+            self._guild_arenas[guild_id] = RankedIndex()
+        return self._guild_arenas.get(guild_id)
+
+    def score(self, category: str, user_id: str) -> Optional[int]:
+        """Get a player's indexed score in a category."""
+        return self._categories[category].score(user_id)
+
+    def rank(self, category: str, user_id: str) -> Optional[int]:
+        """Get a player's 1-based rank. Tied players share a rank."""
+        return self._categories[category].rank(user_id)
+
+    def iter_ranked(self, category: str, offset: int = 0) -> Iterator[Tuple[str, int]]:
+        """Yield (user_id, score) from the top of a category down."""
+        return self._categories[category].iter_ranked(offset)
+
+    def top(self, category: str, limit: int = 10, offset: int = 0,
+            predicate: Optional[Callable[[str], bool]] = None) -> List[Dict[str, Any]]:
+        """Get a page of the leaderboard, optionally filtered by user id."""
+        return self._categories[category].top(limit, offset, predicate)
+
+    async def rebuild(self) -> int:
+        """Rebuild every category from storage. Returns the number of players indexed."""
+        from utils.database import player_cache
+        from utils.storage import get_storage
+
+        documents = await get_storage().scan_prefix("user_")
+
+        # Cached documents are newer than anything storage returned
+        documents.update(player_cache.items())
+
+        self._reset()
+        for key, user_data in documents.items():
+            user_id = key[len("user_"):]
+            if not user_id.isdigit() or not isinstance(user_data, dict):
+                continue
+            player_data = user_data.get('rpg_data')
+            if isinstance(player_data, dict):
+                self.update(user_id, player_data)
+
+        self.ready = True
+        logger.info(f"Leaderboard index rebuilt with {len(self)} players")
+        return len(self)
+
+# Global leaderboard index
+leaderboard_index = LeaderboardIndex()
@@ -0,0 +1,42 @@
+"""
+Per-user asyncio locks.
+Serializes read-modify-write sequences on the same player across views and commands.
+"""
+
+import asyncio
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
+
+class UserLockRegistry:
+    """Hands out one lock per user; locks nobody holds or waits on are dropped automatically."""
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def lock(self, user_id) -> asyncio.Lock:
+        """Get the lock for a user."""
+        user_id = str(user_id)
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[user_id] = lock
+        return lock
+
+    def is_locked(self, user_id) -> bool:
+        """Check whether a user's lock is currently held."""
+        lock = self._locks.get(str(user_id))
+        return lock is not None and lock.locked()
+
+    @asynccontextmanager
+    async def hold(self, *user_ids):
+        """Hold several users' locks at once, always acquired in the same order to avoid deadlocks."""
+        async with AsyncExitStack() as stack:
+            for user_id in sorted({str(user_id) for user_id in user_ids}):
+                await stack.enter_async_context(self.lock(user_id))
+            yield
+
+# Global lock registry
+user_locks = UserLockRegistry()
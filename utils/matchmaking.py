@@ -0,0 +1,234 @@
+"""
+Arena matchmaking.
+Players wait in per-guild or global queues bucketed by arena rating. A new ticket searches outward from its own
+bucket and takes the first acceptable opponent, so pairing never walks the whole queue. Windows widen the longer a ticket
+waits, and a periodic sweep pairs neighbouring buckets whose windows have grown to overlap. Tickets that
+find nobody within the timeout resolve to None so the caller can fall back to an AI opponent.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from sortedcontainers import SortedDict
+
+logger = logging.getLogger(__name__)
+
+class MatchCancelled(Exception):
+    """Raised from find_match when the player leaves the queue."""
+
+class MatchTicket:
+    __slots__ = ('user_id', 'rating', 'scope', 'payload', 'enqueued_at', 'seq', 'future')
+
+    def __init__(self, user_id: str, rating: int, scope, payload: Any, seq: int):
+        self.user_id = user_id
+        self.rating = rating
+        self.scope = scope
+        self.payload = payload
+        self.enqueued_at = time.monotonic()
+        self.seq = seq
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+class MatchQueue:
+    """Waiting tickets for one scope, keyed by rating bucket."""
+
+    def __init__(self, bucket_width: int):
+        self.bucket_width = bucket_width
+        # bucket -> tickets in arrival order
+        self._buckets: SortedDict = SortedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def bucket_of(self, rating: int) -> int:
+        return rating // self.bucket_width
+
+    def add(self, ticket: MatchTicket):
+        bucket = self._buckets.get(self.bucket_of(ticket.rating))
+        if bucket is None:
+            bucket = self._buckets[self.bucket_of(ticket.rating)] = deque()
+        bucket.append(ticket)
+        self._size += 1
+
+    def remove(self, ticket: MatchTicket) -> bool:
+        key = self.bucket_of(ticket.rating)
+        bucket = self._buckets.get(key)
+        if not bucket or ticket not in bucket:
+            return False
+        bucket.remove(ticket)
+        if not bucket:
+            del self._buckets[key]
+        self._size -= 1
+        return True
+
+    def nearest(self, rating: int, reach: int):
+        """Tickets within reach of a rating, from its own bucket outward; each bucket oldest first."""
+        home = self.bucket_of(rating)
+        below = self._buckets.irange(self.bucket_of(rating - reach), home - 1, reverse=True)
+        above = self._buckets.irange(home, self.bucket_of(rating + reach))
+        next_below, next_above = next(below, None), next(above, None)
+        while next_below is not None or next_above is not None:
+            if next_below is None or (next_above is not None and next_above - home <= home - next_below):
+                key, next_above = next_above, next(above, None)
+            else:
+                key, next_below = next_below, next(below, None)
+            yield from self._buckets[key]
+
+    def heads(self) -> List[MatchTicket]:
+        """The oldest ticket of each bucket, in rating order."""
+        return [bucket[0] for bucket in self._buckets.values()]
+
+class Matchmaker:
+    """Pairs arena players by rating, widening each ticket's window while it waits."""
+
+    def __init__(self, bucket_width: int = 50, base_window: int = 100, widen_per_second: float = 10.0,
+                 max_window: int = 400, sweep_interval: float = 3.0):
+        self.bucket_width = bucket_width
+        self.base_window = base_window
+        self.widen_per_second = widen_per_second
+        self.max_window = max_window
+        self.sweep_interval = sweep_interval
+        self._queues: Dict[Any, MatchQueue] = {}
+        self._tickets: Dict[str, MatchTicket] = {}
+        self._seq = itertools.count()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = {'queued': 0, 'matched': 0, 'fallbacks': 0, 'cancelled': 0, 'wait_total': 0.0}
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def is_queued(self, user_id) -> bool:
+        return str(user_id) in self._tickets
+
+    def window(self, ticket: MatchTicket, now: float) -> float:
+        """How far from its own rating a ticket will accept an opponent."""
+        return min(self.max_window, self.base_window + self.widen_per_second * (now - ticket.enqueued_at))
+
+    def _acceptable(self, a: MatchTicket, b: MatchTicket, now: float) -> bool:
+        return a.user_id != b.user_id and abs(a.rating - b.rating) <= max(self.window(a, now), self.window(b, now))
+
+    async def find_match(self, user_id, rating: int, payload: Any = None, scope=None,
+                         timeout: float = 30.0) -> Optional[Any]:
+        """Queue a player and wait for an opponent. Returns the opponent's payload, or None on timeout.
+
+        Raises MatchCancelled if the player leaves the queue first.
+        """
+        user_id = str(user_id)
+        if user_id in self._tickets:
+            raise ValueError("Player is already queued")
+
+        ticket = MatchTicket(user_id, rating, scope, payload, next(self._seq))
+        self.stats['queued'] += 1
+        if not self._pair_on_enqueue(ticket):
+            self._queue(scope).add(ticket)
+            self._tickets[user_id] = ticket
+            self._ensure_sweeper()
+
+        try:
+            opponent = await asyncio.wait_for(asyncio.shield(ticket.future), timeout)
+        except asyncio.TimeoutError:
+            # The sweep may have paired the ticket just as the timeout fired
+            if ticket.future.done():
+                return ticket.future.result().payload
+            self._discard(ticket)
+            self.stats['fallbacks'] += 1
+            return None
+        except asyncio.CancelledError:
+            self._discard(ticket)
+            raise
+        return opponent.payload
+
+    def cancel(self, user_id) -> bool:
+        """Take a player out of the queue. Their find_match raises MatchCancelled."""
+        ticket = self._tickets.get(str(user_id))
+        if ticket is None:
+            return False
+        self._discard(ticket)
+        self.stats['cancelled'] += 1
+        if not ticket.future.done():
+            ticket.future.set_exception(MatchCancelled())
+        return True
+
+    def queue_size(self, scope=None) -> int:
+        queue = self._queues.get(scope)
+        return len(queue) if queue else 0
+
+    def _queue(self, scope) -> MatchQueue:
+        queue = self._queues.get(scope)
+        if queue is None:
+            queue = self._queues[scope] = MatchQueue(self.bucket_width)
+        return queue
+
+    def _discard(self, ticket: MatchTicket):
+        if self._tickets.get(ticket.user_id) is ticket:
+            del self._tickets[ticket.user_id]
+        queue = self._queues.get(ticket.scope)
+        if queue is not None:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.scope]
+
+    def _pair_on_enqueue(self, ticket: MatchTicket) -> bool:
+        queue = self._queues.get(ticket.scope)
+        if not queue:
+            return False
+
+        now = time.monotonic()
+        for candidate in queue.nearest(ticket.rating, self.max_window):
+            if self._acceptable(ticket, candidate, now):
+                self._match(ticket, candidate)
+                return True
+        return False
+
+    def _match(self, a: MatchTicket, b: MatchTicket):
+        now = time.monotonic()
+        for ticket, opponent in ((a, b), (b, a)):
+            self._discard(ticket)
+            self.stats['wait_total'] += now - ticket.enqueued_at
+            if not ticket.future.done():
+                ticket.future.set_result(opponent)
+        self.stats['matched'] += 1
+
+    def sweep(self) -> int:
+        """Pair neighbouring buckets whose windows now overlap. Returns the number of matches made."""
+        now = time.monotonic()
+        matches = 0
+        for scope in list(self._queues):
+            queue = self._queues.get(scope)
+            if queue is None:
+                continue
+            heads = queue.heads()
+            i = 0
+            while i < len(heads) - 1:
+                a, b = heads[i], heads[i + 1]
+                if self._acceptable(a, b, now):
+                    self._match(a, b)
+                    matches += 1
+                    i += 2
+                else:
+                    i += 1
+        return matches
+
+    def _ensure_sweeper(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        # Runs only while someone is waiting
+        while self._tickets:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Error in matchmaking sweep: {e}")
+
+    def average_wait(self) -> float:
+        paired = self.stats['matched'] * 2
+        return self.stats['wait_total'] / paired if paired else 0.0
+
+# Global arena matchmaker
+matchmaker = Matchmaker()
@@ -112,9 +112,9 @@ WEEKLY_QUEST_POOL = [
     {"template": "collect_items", "difficulty": "hard", "target_range": (20, 40)}
 ]
 
-def generate_daily_quest(user_id: str) -> Optional[Dict[str, Any]]:
+async def generate_daily_quest(user_id: str) -> Optional[Dict[str, Any]]:
     """Generate a daily quest for the player."""
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return None
     
@@ -151,9 +151,9 @@ def generate_daily_quest(user_id: str) -> Optional[Dict[str, Any]]:
     
     return quest
 
-def generate_weekly_quest(user_id: str) -> Optional[Dict[str, Any]]:
+async def generate_weekly_quest(user_id: str) -> Optional[Dict[str, Any]]:
     """Generate a weekly quest for the player."""
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return None
     
@@ -190,9 +190,9 @@ def generate_weekly_quest(user_id: str) -> Optional[Dict[str, Any]]:
     
     return quest
 
-def update_quest_progress(user_id: str, action_type: str, details: Dict[str, Any]) -> List[Dict[str, Any]]:
+async def update_quest_progress(user_id: str, action_type: str, details: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Update quest progress based on player actions."""
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return []
     
@@ -229,13 +229,13 @@ def update_quest_progress(user_id: str, action_type: str, details: Dict[str, Any
     
     # Update player data
     player_data['active_quests'] = active_quests
-    update_user_rpg_data(user_id, player_data)
+    await update_user_rpg_data(user_id, player_data)
     
     return completed_quests
 
-def get_available_story_quests(user_id: str) -> List[Dict[str, Any]]:
+async def get_available_story_quests(user_id: str) -> List[Dict[str, Any]]:
     """Get story quests available to the player."""
-    player_data = get_user_rpg_data(user_id)
+    player_data = await get_user_rpg_data(user_id)
     if not player_data:
         return []
     
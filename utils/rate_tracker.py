@@ -0,0 +1,59 @@
+"""
+Sliding-window rate tracking.
+Counts recent events per key in fixed-size ring buffers and forgets keys that go quiet.
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Hashable, Optional
+
+class RateTracker:
+    """Flags keys that see more than `limit` events inside `window` seconds."""
+
+    def __init__(self, limit: int = 5, window: float = 10.0, max_keys: int = 50000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        # key -> timestamps of its last limit + 1 events, least recently active key first
+        self._events: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self.stats = {'events': 0, 'flagged': 0, 'evicted': 0}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def hit(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """Record an event. Returns whether the key is now over the limit."""
+        now = time.monotonic() if now is None else now
+        self.stats['events'] += 1
+
+        events = self._events.get(key)
+        if events is None:
+            events = deque(maxlen=self.limit + 1)
+            self._events[key] = events
+        else:
+            self._events.move_to_end(key)
+        events.append(now)
+
+        self._evict(now)
+
+        # The buffer only holds limit + 1 events, so the oldest one decides
+        if len(events) > self.limit and now - events[0] <= self.window:
+            self.stats['flagged'] += 1
+            return True
+        return False
+
+    def _evict(self, now: float):
+        # Keys are ordered by last activity, so idle ones are all at the front
+        while self._events:
+            key, events = next(iter(self._events.items()))
+            if now - events[-1] <= self.window and len(self._events) <= self.max_keys:
+                break
+            self._events.popitem(last=False)
+            self.stats['evicted'] += 1
+
+    def reset(self, key: Hashable = None):
+        """Forget one key, or everything when no key is given."""
+        if key is None:
+            self._events.clear()
+        else:
+            self._events.pop(key, None)
@@ -0,0 +1,412 @@
+"""
+Arena ratings.
+Each match moves the player's rating straight away with Elo, so the result screen has a number to show.
+Matches are also collected into a rating period. When the period closes, Glicko-2 rates every participant
+at once from their start-of-period rating, deviation and volatility, vectorized over the whole period when
+NumPy is available. Closed periods are stored as compact column segments, so a season can be replayed
+from history to rebuild every rating.
+
+Arena fights are asynchronous (you fight a snapshot of your opponent), so each result only rates the
+player who fought it; the opponent's rating and deviation are just inputs.
+
+The open period is stored as a small header plus one record per result, so recording a match writes
+only that match.
+
+Run `python -m utils.ratings` for a season replay benchmark.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+PERIOD_KEY = "arena_rating_period"
+RESULT_PREFIX = "arena_rating_result_"
+HISTORY_PREFIX = "arena_rating_history_"
+
+DEFAULT_RATING = 1000
+DEFAULT_RD = 350.0
+DEFAULT_VOLATILITY = 0.06
+# Glicko-2 works on a scale where 173.7178 rating points is one unit
+GLICKO_SCALE = 173.7178
+CONVERGENCE = 1e-6
+
+def elo_expected(rating: float, opponent_rating: float) -> float:
+    """Chance of beating an opponent under Elo."""
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - rating) / 400.0))
+
+def elo_change(rating: float, opponent_rating: float, score: float, k: float = 32) -> int:
+    """Rating points gained (or lost) for a result; score is 1 for a win, 0 for a loss."""
+    return round(k * (score - elo_expected(rating, opponent_rating)))
+
+def _volatility(phi2: float, v: float, delta: float, sigma: float, tau: float) -> float:
+    """New volatility for one player (Illinois method, step 5 of the Glicko-2 paper)."""
+    a = math.log(sigma * sigma)
+
+    def f(x):
+        ex = math.exp(x)
+        return ex * (delta * delta - phi2 - v - ex) / (2 * (phi2 + v + ex) ** 2) - (x - a) / (tau * tau)
+
+    A = a
+    if delta * delta > phi2 + v:
+        B = math.log(delta * delta - phi2 - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        B = a - k * tau
+
+    fA, fB = f(A), f(B)
+    while abs(B - A) > CONVERGENCE:
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        if fC * fB <= 0:
+            A, fA = B, fB
+        else:
+            fA /= 2
+        B, fB = C, fC
+    return math.exp(A / 2)
+
+def glicko2_period(ratings, rds, vols, player_index, opp_ratings, opp_rds, scores,
+                   tau: float = 0.5) -> Tuple[List[float], List[float], List[float]]:
+    """Rate one period.
+
+    ratings/rds/vols describe the participants; each result row gives the participant's index, the
+    opponent's rating and deviation, and the score. Returns new (ratings, rds, vols).
+    """
+    if NUMPY_AVAILABLE:
+        return _glicko2_numpy(ratings, rds, vols, player_index, opp_ratings, opp_rds, scores, tau)
+
+    n = len(ratings)
+    mu = [(r - DEFAULT_RATING) / GLICKO_SCALE for r in ratings]
+    phi = [rd / GLICKO_SCALE for rd in rds]
+    v_inv = [0.0] * n
+    delta_sum = [0.0] * n
+    for i, opp_r, opp_rd, s in zip(player_index, opp_ratings, opp_rds, scores):
+        opp_phi = opp_rd / GLICKO_SCALE
+        g = 1.0 / math.sqrt(1 + 3 * opp_phi * opp_phi / (math.pi * math.pi))
+        e = 1.0 / (1.0 + math.exp(-g * (mu[i] - (opp_r - DEFAULT_RATING) / GLICKO_SCALE)))
+        v_inv[i] += g * g * e * (1 - e)
+        delta_sum[i] += g * (s - e)
+
+    new_ratings, new_rds, new_vols = [], [], []
+    for i in range(n):
+        if v_inv[i] == 0:
+            # Nothing usable this period: only the deviation grows
+            new_ratings.append(ratings[i])
+            new_rds.append(min(DEFAULT_RD, math.sqrt(phi[i] ** 2 + vols[i] ** 2) * GLICKO_SCALE))
+            new_vols.append(vols[i])
+            continue
+        v = 1.0 / v_inv[i]
+        sigma = _volatility(phi[i] ** 2, v, v * delta_sum[i], vols[i], tau)
+        phi_star2 = phi[i] ** 2 + sigma * sigma
+        new_phi = 1.0 / math.sqrt(1.0 / phi_star2 + 1.0 / v)
+        new_ratings.append(GLICKO_SCALE * (mu[i] + new_phi * new_phi * delta_sum[i]) + DEFAULT_RATING)
+        new_rds.append(GLICKO_SCALE * new_phi)
+        new_vols.append(sigma)
+    return new_ratings, new_rds, new_vols
+
+def _glicko2_numpy(ratings, rds, vols, player_index, opp_ratings, opp_rds, scores, tau):
+    mu = (np.asarray(ratings, dtype=float) - DEFAULT_RATING) / GLICKO_SCALE
+    phi = np.asarray(rds, dtype=float) / GLICKO_SCALE
+    sigma = np.asarray(vols, dtype=float)
+    idx = np.asarray(player_index, dtype=np.int64)
+    opp_mu = (np.asarray(opp_ratings, dtype=float) - DEFAULT_RATING) / GLICKO_SCALE
+    opp_phi = np.asarray(opp_rds, dtype=float) / GLICKO_SCALE
+    s = np.asarray(scores, dtype=float)
+    n = len(mu)
+
+    # Steps 3-4: estimated variance and improvement, summed per participant
+    g = 1.0 / np.sqrt(1 + 3 * opp_phi ** 2 / np.pi ** 2)
+    e = 1.0 / (1.0 + np.exp(-g * (mu[idx] - opp_mu)))
+    v_inv = np.bincount(idx, weights=g * g * e * (1 - e), minlength=n)
+    delta_sum = np.bincount(idx, weights=g * (s - e), minlength=n)
+
+    rated = v_inv > 0
+    v = np.divide(1.0, v_inv, out=np.full(n, np.inf), where=rated)
+    delta = np.multiply(v, delta_sum, out=np.zeros(n), where=rated)
+    phi2 = phi ** 2
+
+    # Step 5: Illinois iteration, run for every participant at once until all have converged
+    a = np.log(sigma ** 2)
+    tau2 = tau * tau
+
+    def f(x, m):
+        ex = np.exp(x)
+        return ex * (delta[m] ** 2 - phi2[m] - v[m] - ex) / (2 * (phi2[m] + v[m] + ex) ** 2) - (x - a[m]) / tau2
+
+    everyone = np.arange(n)[rated]
+    A = a[everyone].copy()
+    big = delta[everyone] ** 2 > phi2[everyone] + v[everyone]
+    B = np.empty_like(A)
+    B[big] = np.log(delta[everyone][big] ** 2 - phi2[everyone][big] - v[everyone][big])
+    k = np.ones_like(A)
+    small = ~big
+    while small.any():
+        trial = a[everyone] - k * tau
+        still = small & (f(trial, everyone) < 0)
+        B[small & ~still] = trial[small & ~still]
+        k[still] += 1
+        small = still
+
+    fA, fB = f(A, everyone), f(B, everyone)
+    active = np.abs(B - A) > CONVERGENCE
+    while active.any():
+        m = everyone[active]
+        C = A[active] + (A[active] - B[active]) * fA[active] / (fB[active] - fA[active])
+        fC = f(C, m)
+        swap = fC * fB[active] <= 0
+        A_new = np.where(swap, B[active], A[active])
+        fA_new = np.where(swap, fB[active], fA[active] / 2)
+        A[active], fA[active] = A_new, fA_new
+        B[active], fB[active] = C, fC
+        active = np.abs(B - A) > CONVERGENCE
+
+    new_sigma = sigma.copy()
+    new_sigma[everyone] = np.exp(A / 2)
+
+    # Steps 6-8: new deviation and rating
+    phi_star2 = phi2 + new_sigma ** 2
+    new_phi = np.where(rated, 1.0 / np.sqrt(1.0 / phi_star2 + np.divide(1.0, v, out=np.zeros(n), where=rated)),
+                       np.minimum(np.sqrt(phi_star2), DEFAULT_RD / GLICKO_SCALE))
+    new_mu = mu + np.where(rated, new_phi ** 2 * delta_sum, 0.0)
+    return ((new_mu * GLICKO_SCALE + DEFAULT_RATING).tolist(), (new_phi * GLICKO_SCALE).tolist(), new_sigma.tolist())
+
+def _idle_rd(rd: float, vol: float, idle_periods: int) -> float:
+    """Deviation after sitting out some periods (step 6 applied once per idle period)."""
+    if idle_periods <= 0:
+        return rd
+    phi = rd / GLICKO_SCALE
+    return min(DEFAULT_RD, math.sqrt(phi * phi + idle_periods * vol * vol) * GLICKO_SCALE)
+
+def _rate_segment(segment: Dict[str, Any], tau: float):
+    return glicko2_period(segment['r'], segment['rd'], segment['vol'],
+                          segment['p'], segment['o'], segment['d'], segment['s'], tau)
+
+def replay(segments: Iterable[Dict[str, Any]], tau: float = 0.5) -> Dict[str, Tuple[float, float, float, int]]:
+    """Rebuild ratings from stored period segments, oldest first.
+
+    Each player starts from the values recorded the first time they appear; after that their own replayed
+    results carry forward. Returns {user_id: (rating, rd, volatility, last_period)}.
+    """
+    state: Dict[str, Tuple[float, float, float, int]] = {}
+    for segment in sorted(segments, key=lambda seg: seg['index']):
+        players = segment['players']
+        ratings, rds, vols = [], [], []
+        for i, user_id in enumerate(players):
+            if user_id in state:
+                rating, rd, vol, last = state[user_id]
+                rd = _idle_rd(rd, vol, segment['index'] - last - 1)
+            else:
+                rating, rd, vol = segment['r'][i], segment['rd'][i], segment['vol'][i]
+            ratings.append(rating)
+            rds.append(rd)
+            vols.append(vol)
+        new_r, new_rd, new_vol = glicko2_period(ratings, rds, vols, segment['p'], segment['o'],
+                                                segment['d'], segment['s'], tau)
+        for i, user_id in enumerate(players):
+            state[user_id] = (new_r[i], new_rd[i], new_vol[i], segment['index'])
+    return state
+
+class ArenaRatings:
+    """The open rating period plus its closed history in storage."""
+
+    def __init__(self, period_length: float = 86400.0, tau: float = 0.5, k_factor: float = 32):
+        self.period_length = period_length
+        self.tau = tau
+        self.k_factor = k_factor
+        self.period = self._new_period(0)
+        self.stats = {'recorded': 0, 'periods_closed': 0}
+
+    @staticmethod
+    def _new_period(index: int) -> Dict[str, Any]:
+        # players: user_id -> [rating, rd, volatility] at their first match this period
+        # results: [user_id, opponent_rating, opponent_rd, score]
+        return {'index': index, 'started_at': time.time(), 'players': {}, 'results': []}
+
+    @staticmethod
+    def _result_key(index: int, seq: int = None) -> str:
+        """Key of a result record, or the prefix of a period's records when seq is None."""
+        prefix = f"{RESULT_PREFIX}{index:06d}_"
+        return prefix if seq is None else f"{prefix}{seq:08d}"
+
+    async def load(self):
+        """Pick up the open period and its recorded results after a restart."""
+        storage = get_storage()
+        try:
+            header = await storage.get(PERIOD_KEY)
+            if not header:
+                # First run: store the header so results recorded from now on can be found again
+                await storage.set(PERIOD_KEY, {'index': self.period['index'], 'started_at': self.period['started_at']})
+                return
+            period = self._new_period(header['index'])
+            period['started_at'] = header['started_at']
+
+            if 'results' in header:
+                # Periods stored as one blob before per-result records
+                records, seen = {}, set()
+                for seq, row in enumerate(header['results']):
+                    start = header['players'][row[0]] if row[0] not in seen else None
+                    seen.add(row[0])
+                    records[self._result_key(period['index'], seq)] = row + [start]
+                await storage.set_many({**records, PERIOD_KEY: {'index': period['index'],
+                                                                'started_at': period['started_at']}})
+            else:
+                records = await storage.scan_prefix(self._result_key(period['index']))
+
+            for key in sorted(records):
+                user_id, opponent_rating, opponent_rd, score, start = records[key]
+                if start is not None:
+                    period['players'].setdefault(user_id, start)
+                period['results'].append([user_id, opponent_rating, opponent_rd, score])
+            self.period = period
+        except Exception as e:
+            logger.error(f"Error loading arena rating period: {e}")
+
+    def seconds_until_close(self) -> float:
+        return max(0.0, self.period['started_at'] + self.period_length - time.time())
+
+    async def record(self, user_id, player_data: Dict[str, Any], opponent: Dict[str, Any], score: float) -> int:
+        """Record a result and apply the provisional Elo change to player_data. Returns the change."""
+        user_id = str(user_id)
+        rating = player_data.get('arena_rating', DEFAULT_RATING)
+        opponent_rating = opponent.get('rating', DEFAULT_RATING)
+
+        # A player's first result of the period also stores their start-of-period values
+        start = None
+        if user_id not in self.period['players']:
+            vol = player_data.get('arena_volatility', DEFAULT_VOLATILITY)
+            last_period = player_data.get('arena_rating_period')
+            idle = self.period['index'] - last_period - 1 if last_period is not None else 0
+            rd = _idle_rd(player_data.get('arena_rd', DEFAULT_RD), vol, idle)
+            start = self.period['players'][user_id] = [rating, rd, vol]
+
+        row = [user_id, opponent_rating, opponent.get('rd', DEFAULT_RD), score]
+        key = self._result_key(self.period['index'], len(self.period['results']))
+        self.period['results'].append(row)
+        self.stats['recorded'] += 1
+
+        change = elo_change(rating, opponent_rating, score, self.k_factor)
+        player_data['arena_rating'] = max(0, rating + change)
+        try:
+            await get_storage().set(key, row + [start])
+        except Exception as e:
+            logger.error(f"Error saving arena result for {user_id}: {e}")
+        return player_data['arena_rating'] - rating
+
+    def _segment(self) -> Dict[str, Any]:
+        """The open period in column form."""
+        players = list(self.period['players'])
+        position = {user_id: i for i, user_id in enumerate(players)}
+        starts = [self.period['players'][user_id] for user_id in players]
+        results = self.period['results']
+        return {
+            'index': self.period['index'],
+            'started_at': self.period['started_at'],
+            'ended_at': time.time(),
+            'players': players,
+            'r': [start[0] for start in starts],
+            'rd': [start[1] for start in starts],
+            'vol': [start[2] for start in starts],
+            'p': [position[row[0]] for row in results],
+            'o': [row[1] for row in results],
+            'd': [row[2] for row in results],
+            's': [row[3] for row in results]
+        }
+
+    async def close_period(self) -> Dict[str, Dict[str, Any]]:
+        """Rate the open period, store it as history and start the next one.
+
+        Returns {user_id: {field: value}} to set on each participant.
+        """
+        segment = self._segment()
+        index = segment['index']
+        # Swap before awaiting, so results recorded meanwhile land in the new period
+        self.period = self._new_period(index + 1)
+
+        updates = {}
+        if segment['players']:
+            new_r, new_rd, new_vol = _rate_segment(segment, self.tau)
+            for i, user_id in enumerate(segment['players']):
+                updates[user_id] = {
+                    'arena_rating': max(0, round(new_r[i])),
+                    'arena_rd': round(new_rd[i], 2),
+                    'arena_volatility': round(new_vol[i], 6),
+                    'arena_rating_period': index
+                }
+
+        storage = get_storage()
+        try:
+            writes = {PERIOD_KEY: {'index': index + 1, 'started_at': self.period['started_at']}}
+            if segment['players']:
+                writes[f"{HISTORY_PREFIX}{index:06d}"] = segment
+            await storage.set_many(writes)
+            await storage.delete_many(await storage.keys(self._result_key(index)))
+        except Exception as e:
+            logger.error(f"Error storing arena rating period {index}: {e}")
+
+        self.stats['periods_closed'] += 1
+        logger.info(f"Closed arena rating period {index}: {len(segment['players'])} players, {len(segment['s'])} matches")
+        return updates
+
+    async def history(self) -> List[Dict[str, Any]]:
+        """Every closed period segment."""
+        try:
+            return list((await get_storage().scan_prefix(HISTORY_PREFIX)).values())
+        except Exception as e:
+            logger.error(f"Error loading arena rating history: {e}")
+            return []
+
+# Global arena ratings
+arena_ratings = ArenaRatings()
+
+def _benchmark(matches: int = 100_000, players: int = 5_000, periods: int = 50):
+    import random
+
+    rng = random.Random(7)
+    strength = [rng.gauss(DEFAULT_RATING, 200) for _ in range(players)]
+    segments = []
+    per_period = matches // periods
+    for index in range(periods):
+        chosen = {}
+        rows_p, rows_o, rows_d, rows_s = [], [], [], []
+        for _ in range(per_period):
+            a, b = rng.randrange(players), rng.randrange(players)
+            position = chosen.setdefault(str(a), len(chosen))
+            rows_p.append(position)
+            rows_o.append(strength[b])
+            rows_d.append(80.0)
+            rows_s.append(1.0 if rng.random() < elo_expected(strength[a], strength[b]) else 0.0)
+        segments.append({
+            'index': index, 'players': list(chosen),
+            'r': [DEFAULT_RATING] * len(chosen), 'rd': [DEFAULT_RD] * len(chosen),
+            'vol': [DEFAULT_VOLATILITY] * len(chosen),
+            'p': rows_p, 'o': rows_o, 'd': rows_d, 's': rows_s
+        })
+
+    start = time.perf_counter()
+    ratings = replay(segments)
+    elapsed = time.perf_counter() - start
+
+    # How well the replayed ratings recover the hidden strengths
+    xs = [strength[int(user_id)] for user_id in ratings]
+    ys = [ratings[user_id][0] for user_id in ratings]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    spread = math.sqrt(sum((x - mean_x) ** 2 for x in xs) * sum((y - mean_y) ** 2 for y in ys))
+    print(f"Replayed {matches:,} matches over {periods} periods for {len(ratings):,} players in {elapsed:.2f}s "
+          f"({'NumPy' if NUMPY_AVAILABLE else 'pure Python'})")
+    print(f"Correlation with true strength: {cov / spread:.3f}")
+
+if __name__ == "__main__":
+    _benchmark()
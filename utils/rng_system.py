@@ -8,10 +8,10 @@ from utils.constants import LUCK_LEVELS
 
 logger = logging.getLogger(__name__)
 
-def get_user_luck_points(user_id: str) -> int:
+async def get_user_luck_points(user_id: str) -> int:
     """Get user's current luck points."""
     try:
-        player_data = get_user_rpg_data(user_id)
+        player_data = await get_user_rpg_data(user_id)
         if player_data:
             return player_data.get('luck_points', 0)
         return 0
@@ -19,10 +19,10 @@ def get_user_luck_points(user_id: str) -> int:
         logger.error(f"Error getting luck points for {user_id}: {e}")
         return 0
 
-def add_luck_points(user_id: str, points: int) -> bool:
+async def add_luck_points(user_id: str, points: int) -> bool:
     """Add luck points to a user."""
     try:
-        player_data = get_user_rpg_data(user_id)
+        player_data = await get_user_rpg_data(user_id)
         if not player_data:
             return False
             
@@ -30,14 +30,14 @@ def add_luck_points(user_id: str, points: int) -> bool:
         new_luck = max(-1000, min(9999, current_luck + points))  # Clamp between -1000 and 9999
         
         player_data['luck_points'] = new_luck
-        return update_user_rpg_data(user_id, player_data)
+        return await update_user_rpg_data(user_id, player_data)
     except Exception as e:
         logger.error(f"Error adding luck points for {user_id}: {e}")
         return False
 
-def get_luck_status(user_id: str) -> Dict[str, Any]:
+async def get_luck_status(user_id: str) -> Dict[str, Any]:
     """Get user's luck status with level and bonus."""
-    luck_points = get_user_luck_points(user_id)
+    luck_points = await get_user_luck_points(user_id)
     
     # Determine luck level
     luck_level = 'normal'
@@ -55,10 +55,10 @@ def get_luck_status(user_id: str) -> Dict[str, Any]:
         'bonus_percent': luck_data['bonus_percent']
     }
 
-def roll_with_luck(user_id: str, base_chance: float) -> bool:
+async def roll_with_luck(user_id: str, base_chance: float) -> bool:
     """Roll with luck bonus applied."""
     try:
-        luck_status = get_luck_status(user_id)
+        luck_status = await get_luck_status(user_id)
         bonus_percent = luck_status['bonus_percent']
         
         # Apply luck bonus to chance
@@ -70,10 +70,10 @@ def roll_with_luck(user_id: str, base_chance: float) -> bool:
         logger.error(f"Error rolling with luck for {user_id}: {e}")
         return random.random() < base_chance
 
-def generate_loot_with_luck(user_id: str, base_loot: Dict[str, int]) -> Dict[str, int]:
+async def generate_loot_with_luck(user_id: str, base_loot: Dict[str, int]) -> Dict[str, int]:
     """Generate loot with luck bonuses applied."""
     try:
-        luck_status = get_luck_status(user_id)
+        luck_status = await get_luck_status(user_id)
         bonus_percent = luck_status['bonus_percent']
         
         enhanced_loot = {}
@@ -88,9 +88,9 @@ def generate_loot_with_luck(user_id: str, base_loot: Dict[str, int]) -> Dict[str
         logger.error(f"Error generating loot with luck for {user_id}: {e}")
         return base_loot
 
-def check_rare_event(user_id: str, base_chance: float = 0.01) -> bool:
+async def check_rare_event(user_id: str, base_chance: float = 0.01) -> bool:
     """Check if a rare event occurs with luck bonus."""
-    return roll_with_luck(user_id, base_chance)
+    return await roll_with_luck(user_id, base_chance)
 
 def weighted_random_choice(items: List[Dict[str, Any]], weight_key: str = 'weight') -> Optional[Dict[str, Any]]:
     """Choose a random item from a weighted list."""
@@ -115,10 +115,10 @@ def weighted_random_choice(items: List[Dict[str, Any]], weight_key: str = 'weigh
         logger.error(f"Error in weighted random choice: {e}")
         return random.choice(items) if items else None
 
-def calculate_critical_chance(user_id: str, base_chance: float = 0.1) -> float:
+async def calculate_critical_chance(user_id: str, base_chance: float = 0.1) -> float:
     """Calculate critical hit chance with luck bonus."""
     try:
-        luck_status = get_luck_status(user_id)
+        luck_status = await get_luck_status(user_id)
         bonus_percent = luck_status['bonus_percent']
         
         # Apply luck bonus to critical chance
@@ -128,15 +128,15 @@ def calculate_critical_chance(user_id: str, base_chance: float = 0.1) -> float:
         logger.error(f"Error calculating critical chance for {user_id}: {e}")
         return base_chance
 
-def roll_critical_hit(user_id: str, base_chance: float = 0.1) -> bool:
+async def roll_critical_hit(user_id: str, base_chance: float = 0.1) -> bool:
     """Roll for critical hit with luck bonus."""
-    critical_chance = calculate_critical_chance(user_id, base_chance)
+    critical_chance = await calculate_critical_chance(user_id, base_chance)
     return random.random() < critical_chance
 
-def decay_luck_daily(user_id: str, decay_rate: float = 0.95) -> bool:
+async def decay_luck_daily(user_id: str, decay_rate: float = 0.95) -> bool:
     """Apply daily luck decay."""
     try:
-        player_data = get_user_rpg_data(user_id)
+        player_data = await get_user_rpg_data(user_id)
         if not player_data:
             return False
             
@@ -146,7 +146,7 @@ def decay_luck_daily(user_id: str, decay_rate: float = 0.95) -> bool:
         if current_luck > 0:
             new_luck = int(current_luck * decay_rate)
             player_data['luck_points'] = new_luck
-            return update_user_rpg_data(user_id, player_data)
+            return await update_user_rpg_data(user_id, player_data)
             
         return True
     except Exception as e:
@@ -157,7 +157,7 @@ def random_weighted_choice(items: List[Dict[str, Any]], weight_key: str = 'weigh
     """Choose a random item from a weighted list - alias for weighted_random_choice."""
     return weighted_random_choice(items, weight_key)
 
-def generate_random_encounter(user_id: str, location: str) -> Optional[Dict[str, Any]]:
+async def generate_random_encounter(user_id: str, location: str) -> Optional[Dict[str, Any]]:
     """Generate a random encounter with luck affecting rarity."""
     try:
         # Base encounter chances
@@ -170,7 +170,7 @@ def generate_random_encounter(user_id: str, location: str) -> Optional[Dict[str,
         ]
         
         # Modify weights based on luck
-        luck_status = get_luck_status(user_id)
+        luck_status = await get_luck_status(user_id)
         bonus_percent = luck_status['bonus_percent']
         
         if bonus_percent > 0:
@@ -190,10 +190,10 @@ def generate_random_encounter(user_id: str, location: str) -> Optional[Dict[str,
         logger.error(f"Error generating random encounter for {user_id}: {e}")
         return None
 
-def apply_luck_effect(user_id: str, effect_type: str, base_value: Union[int, float]) -> Union[int, float]:
+async def apply_luck_effect(user_id: str, effect_type: str, base_value: Union[int, float]) -> Union[int, float]:
     """Apply luck effect to a value."""
     try:
-        luck_status = get_luck_status(user_id)
+        luck_status = await get_luck_status(user_id)
         bonus_percent = luck_status['bonus_percent']
         
         if effect_type == 'reward':
@@ -214,10 +214,10 @@ def apply_luck_effect(user_id: str, effect_type: str, base_value: Union[int, flo
         logger.error(f"Error applying luck effect for {user_id}: {e}")
         return base_value
 
-def get_luck_description(user_id: str) -> str:
+async def get_luck_description(user_id: str) -> str:
     """Get a description of user's current luck status."""
     try:
-        luck_status = get_luck_status(user_id)
+        luck_status = await get_luck_status(user_id)
         level = luck_status['level']
         points = luck_status['points']
         emoji = luck_status['emoji']
@@ -0,0 +1,150 @@
+"""
+Interactive session registry.
+Keeps every live combat, dungeon, PvP and shop-cart session in one min-heap of expiry deadlines,
+with a single reaper task that only wakes when the earliest deadline is due.
+"""
+
+import asyncio
+import heapq
+import inspect
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _Session:
+    __slots__ = ('deadline', 'on_expire')
+
+    def __init__(self, deadline: float, on_expire: Optional[Callable]):
+        self.deadline = deadline
+        self.on_expire = on_expire
+
+class SessionRegistry:
+    """Tracks sessions by (kind, key) and expires them when their TTL runs out."""
+
+    def __init__(self):
+        self._sessions: Dict[Tuple[str, str], _Session] = {}
+        # (deadline, kind, key); entries whose deadline no longer matches the session are stale
+        self._heap: List[Tuple[float, str, str]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'opened': 0, 'closed': 0, 'expired': 0}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def open(self, kind: str, key, ttl: float, on_expire: Optional[Callable] = None):
+        """Start (or restart) a session. on_expire(key) runs if it isn't touched or closed within ttl."""
+        key = str(key)
+        if (kind, key) not in self._sessions:
+            self.stats['opened'] += 1
+        self._sessions[(kind, key)] = _Session(0.0, on_expire)
+        self._schedule(kind, key, ttl)
+
+    def touch(self, kind: str, key, ttl: float) -> bool:
+        """Push a session's deadline back. Returns False if it isn't open."""
+        key = str(key)
+        if (kind, key) not in self._sessions:
+            return False
+        self._schedule(kind, key, ttl)
+        return True
+
+    def close(self, kind: str, key) -> bool:
+        """End a session without running its expiry callback. Returns whether it was open."""
+        if self._sessions.pop((kind, str(key)), None) is None:
+            return False
+        # Its heap entry is left behind and skipped once it surfaces
+        self.stats['closed'] += 1
+        return True
+
+    def is_open(self, kind: str, key) -> bool:
+        return (kind, str(key)) in self._sessions
+
+    def counts(self) -> Dict[str, int]:
+        """Live sessions per kind."""
+        counts: Dict[str, int] = {}
+        for kind, _ in self._sessions:
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    def _schedule(self, kind: str, key: str, ttl: float):
+        deadline = time.monotonic() + ttl
+        self._sessions[(kind, key)].deadline = deadline
+        # Only wake the reaper when this deadline comes before the one it is sleeping towards
+        wake = not self._heap or deadline < self._heap[0][0]
+        heapq.heappush(self._heap, (deadline, kind, key))
+        if wake and self._wakeup:
+            self._wakeup.set()
+
+        # Touching pushes a fresh entry each time, so compact once stale ones dominate
+        if len(self._heap) > 64 and len(self._heap) > 4 * len(self._sessions):
+            self._heap = [(session.deadline, kind, key) for (kind, key), session in self._sessions.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> List[Tuple[str, str, _Session]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, kind, key = heapq.heappop(self._heap)
+            session = self._sessions.get((kind, key))
+            if session is None or session.deadline != deadline:
+                continue
+            del self._sessions[(kind, key)]
+            due.append((kind, key, session))
+        return due
+
+    async def reap(self, now: Optional[float] = None) -> int:
+        """Expire every session whose deadline has passed. Returns how many expired."""
+        due = self._pop_due(time.monotonic() if now is None else now)
+        for kind, key, session in due:
+            self.stats['expired'] += 1
+            logger.info(f"Expired {kind} session for {key}")
+            if session.on_expire is None:
+                continue
+            try:
+                result = session.on_expire(key)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error expiring {kind} session for {key}: {e}")
+        return len(due)
+
+    def start(self):
+        """Start the reaper task."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._reaper())
+
+    async def stop(self):
+        """Stop the reaper task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _reaper(self):
+        while True:
+            try:
+                self._wakeup.clear()
+                if self._heap:
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay > 0:
+                        try:
+                            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                            continue
+                        except asyncio.TimeoutError:
+                            pass
+                    await self.reap()
+                else:
+                    await self._wakeup.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session reaper error: {e}")
+                await asyncio.sleep(1)
+
+# Global session registry
+session_registry = SessionRegistry()
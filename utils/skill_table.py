@@ -0,0 +1,89 @@
+"""
+Per-class skill index.
+Built once from TACTICAL_SKILLS so opening the skills menu is a lookup instead of a scan of every skill.
+"""
+
+import logging
+from bisect import bisect_right
+from typing import Any, Dict, List, Tuple
+
+from rpg_data.combat_data import TACTICAL_SKILLS
+from rpg_data.game_data import ITEMS
+
+logger = logging.getLogger(__name__)
+
+# Used when a class/level unlocks nothing, so the menu is never empty
+FALLBACK_SKILL = 'power_strike'
+
+class SkillTable:
+    """Maps (class, level bracket) to a presorted skill list and pre-resolves item requirements."""
+
+    def __init__(self):
+        # class -> ascending min_level thresholds, and the skill tuple unlocked at each threshold
+        self._thresholds: Dict[str, List[int]] = {}
+        self._brackets: Dict[str, List[Tuple[str, ...]]] = {}
+        # skill -> ((item_key, amount, display name), ...)
+        self._requirements: Dict[str, Tuple[Tuple[str, int, str], ...]] = {}
+        self._built = False
+
+    def build(self, skills: Dict[str, Dict[str, Any]] = None):
+        """(Re)build the index. Call again if the skill data changes at runtime."""
+        skills = TACTICAL_SKILLS if skills is None else skills
+
+        # Stable sort: unlock level, then SP cost, then the order skills are declared in
+        ordered = sorted(skills.items(), key=lambda kv: (kv[1].get('min_level', 1), kv[1].get('cost', 0)))
+
+        per_class: Dict[str, List[Tuple[int, str]]] = {}
+        for skill_key, skill_data in ordered:
+            for player_class in skill_data.get('classes', []):
+                per_class.setdefault(player_class, []).append((skill_data.get('min_level', 1), skill_key))
+
+        thresholds, brackets = {}, {}
+        for player_class, entries in per_class.items():
+            levels = sorted({level for level, _ in entries})
+            thresholds[player_class] = levels
+            brackets[player_class] = [
+                tuple(skill_key for level, skill_key in entries if level <= bracket)
+                for bracket in levels
+            ]
+
+        requirements = {
+            skill_key: tuple(
+                (item_key, amount, ITEMS.get(item_key, {}).get('name', item_key))
+                for item_key, amount in (skill_data.get('required_items') or {}).items()
+            )
+            for skill_key, skill_data in skills.items()
+        }
+
+        self._thresholds, self._brackets = thresholds, brackets
+        self._requirements = requirements
+        self._built = True
+        logger.info(f"Skill table built: {len(skills)} skills across {len(brackets)} classes")
+
+    def available(self, player_class: str, level: int) -> Tuple[str, ...]:
+        """Skills a class can use at a level, in menu order."""
+        if not self._built:
+            self.build()
+        thresholds = self._thresholds.get(player_class)
+        if thresholds:
+            index = bisect_right(thresholds, level) - 1
+            if index >= 0:
+                return self._brackets[player_class][index]
+        return (FALLBACK_SKILL,)
+
+    def for_player(self, player: Dict[str, Any]) -> Tuple[str, ...]:
+        return self.available(player.get('class', 'warrior'), player.get('level', 1))
+
+    def check_requirements(self, skill_key: str, inventory: Dict[str, int]) -> Dict[str, Any]:
+        """Whether the inventory covers a skill's item requirements, and what is missing if not."""
+        if not self._built:
+            self.build()
+        missing = [
+            f"{name} x{amount}"
+            for item_key, amount, name in self._requirements.get(skill_key, ())
+            if inventory.get(item_key, 0) < amount
+        ]
+        return {'can_use': not missing, 'missing': ', '.join(missing)}
+
+# Global skill table
+skill_table = SkillTable()
@@ -0,0 +1,197 @@
+"""
+Compiled status effects.
+STATUS_EFFECTS is compiled once into slotted handler objects, picked by each entry's 'effect' type from a
+dispatch table. Targets keep their effects as {effect_key: [remaining_turns, stacks]}, so ticking mutates
+small lists in place and the state stays JSON-safe for combat checkpoints.
+
+New effects that reuse an existing type only need a STATUS_EFFECTS entry. A new type needs a handler class
+registered with @effect_type('<type>').
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from rpg_data.combat_data import STATUS_EFFECTS
+from utils.combat_events import CombatEvent
+
+logger = logging.getLogger(__name__)
+
+# 'effect' type -> handler class
+EFFECT_TYPES: Dict[str, type] = {}
+
+def effect_type(*names: str):
+    """Register a handler class for one or more 'effect' types."""
+    def register(cls):
+        for name in names:
+            EFFECT_TYPES[name] = cls
+        return cls
+    return register
+
+class StatusEffect:
+    """A compiled effect. The base class only counts down; subclasses act on tick."""
+
+    __slots__ = ('key', 'name', 'emoji', 'kind', 'value', 'duration', 'max_stacks', 'trigger')
+
+    blocks_healing = False
+
+    def __init__(self, key: str, data: Dict[str, Any]):
+        self.key = key
+        self.name = data.get('name', key)
+        self.emoji = data.get('emoji', '')
+        self.kind = data.get('type', 'curse')
+        self.value = data.get('value', 0)
+        # None means the effect stays until it is removed or triggers
+        self.duration = data.get('duration')
+        self.max_stacks = data.get('max_stacks', 0)
+        self.trigger = data.get('trigger')
+
+    def tick(self, pool: Dict[str, Any], is_player: bool, events: list, healing_blocked: bool) -> bool:
+        """Act at the start of the target's turn. Return True if the target loses the turn."""
+        return False
+
+@effect_type('damage_over_time')
+class DamageOverTime(StatusEffect):
+    __slots__ = ()
+
+    def tick(self, pool, is_player, events, healing_blocked):
+        damage = int(pool['max_hp'] * self.value)
+        pool['hp'] = max(0, pool['hp'] - damage)
+        events.append(CombatEvent('damage_over_time', f"{self.emoji} {self.name}: {damage} damage", damage))
+        return False
+
+@effect_type('damage_over_time_no_heal')
+class Burn(DamageOverTime):
+    __slots__ = ()
+
+    blocks_healing = True
+
+@effect_type('heal_over_time')
+class HealOverTime(StatusEffect):
+    __slots__ = ()
+
+    def tick(self, pool, is_player, events, healing_blocked):
+        if healing_blocked:
+            events.append(CombatEvent('heal_blocked', f"{self.emoji} {self.name} is blocked!"))
+            return False
+        heal = int(pool['max_hp'] * self.value)
+        pool['hp'] = min(pool['max_hp'], pool['hp'] + heal)
+        events.append(CombatEvent('heal_over_time', f"💚 {self.name}: {heal} healing", heal))
+        return False
+
+@effect_type('skip_turn')
+class SkipTurn(StatusEffect):
+    __slots__ = ()
+
+    def tick(self, pool, is_player, events, healing_blocked):
+        if is_player:
+            events.append(CombatEvent('stunned', "🌟 You are stunned and skip your turn!"))
+        else:
+            events.append(CombatEvent('stunned', "🌟 Enemy is stunned and skips their turn!"))
+        return True
+
+def compile_status_effects(effects: Dict[str, Dict[str, Any]]) -> Dict[str, StatusEffect]:
+    """Build a handler for every effect. Types without a handler just count down."""
+    return {key: EFFECT_TYPES.get(data.get('effect'), StatusEffect)(key, data) for key, data in effects.items()}
+
+class StatusEffectPipeline:
+    """Applies, ticks and removes compiled effects on a target dict."""
+
+    def __init__(self, effects: Dict[str, Dict[str, Any]] = None):
+        self.handlers = compile_status_effects(STATUS_EFFECTS if effects is None else effects)
+
+    @staticmethod
+    def _active(target: Dict[str, Any]) -> Dict[str, list]:
+        active = target.setdefault('active_effects', {})
+        # Checkpoints from before compilation stored a copy of the whole effect dict
+        for key, entry in active.items():
+            if isinstance(entry, dict):
+                active[key] = [entry.get('duration'), entry.get('stacks', 0)]
+        return active
+
+    def apply(self, target: Dict[str, Any], effect_key: str, duration: Optional[int] = None,
+              events: Optional[list] = None) -> bool:
+        """Apply or refresh an effect. Stacking effects fire their trigger when they reach max_stacks."""
+        handler = self.handlers.get(effect_key)
+        if handler is None:
+            return False
+
+        active = self._active(target)
+        if handler.max_stacks:
+            entry = active.get(effect_key)
+            stacks = entry[1] + 1 if entry else 1
+            if stacks >= handler.max_stacks:
+                active.pop(effect_key, None)
+                if handler.trigger:
+                    self.apply(target, handler.trigger, 1, events)
+                if events is not None:
+                    events.append(CombatEvent('status', f"💥 {handler.name} triggered!"))
+            else:
+                active[effect_key] = [duration or handler.duration, stacks]
+        else:
+            active[effect_key] = [duration or handler.duration, 0]
+        return True
+
+    def tick(self, target: Dict[str, Any], pool: Optional[Dict[str, Any]] = None,
+             is_player: bool = False) -> tuple:
+        """Tick every effect on a target. pool holds hp/max_hp (the target itself for enemies).
+
+        Returns (events, skip_turn).
+        """
+        events = []
+        if not target.get('active_effects'):
+            return events, False
+
+        active = self._active(target)
+        handlers = self.handlers
+        pool = target if pool is None else pool
+        healing_blocked = self.healing_blocked(target)
+
+        skip_turn = False
+        expired = []
+        for key, entry in active.items():
+            handler = handlers.get(key)
+            if handler is None:
+                expired.append(key)
+                continue
+            if handler.tick(pool, is_player, events, healing_blocked):
+                skip_turn = True
+            if entry[0] is not None:
+                entry[0] -= 1
+                if entry[0] <= 0:
+                    expired.append(key)
+
+        for key in expired:
+            del active[key]
+        return events, skip_turn
+
+    def healing_blocked(self, target: Dict[str, Any]) -> bool:
+        """Whether an active effect (e.g. Burn) stops the target from healing."""
+        active = target.get('active_effects')
+        return bool(active) and any(key in self.handlers and self.handlers[key].blocks_healing for key in active)
+
+    def cleanse(self, target: Dict[str, Any], kind: str = 'curse') -> List[str]:
+        """Remove every effect of a kind. Returns the removed keys."""
+        active = target.get('active_effects')
+        if not active:
+            return []
+        removed = [key for key in active if key in self.handlers and self.handlers[key].kind == kind]
+        for key in removed:
+            del active[key]
+        return removed
+
+    def describe(self, target: Dict[str, Any]) -> List[str]:
+        """One display line per active effect."""
+        if not target.get('active_effects'):
+            return []
+        lines = []
+        for key, entry in self._active(target).items():
+            handler = self.handlers.get(key)
+            if handler is None:
+                continue
+            duration, stacks = entry
+            detail = f"{stacks}/{handler.max_stacks}" if handler.max_stacks else duration
+            lines.append(f"{handler.emoji} {handler.name} ({detail})")
+        return lines
+
+# Global status effect pipeline, compiled from STATUS_EFFECTS at import
+status_effects = StatusEffectPipeline()
@@ -0,0 +1,283 @@
+"""
+Asynchronous storage backends.
+Every database access goes through a Storage so the event loop never blocks on I/O.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def set_path(document: Dict[str, Any], path: str, value: Any):
+    """Set a dotted path inside a document, creating missing containers."""
+    *parents, leaf = path.split('.')
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[leaf] = value
+
+class Storage(ABC):
+    """Async key-value storage interface."""
+
+    # Whether patch_many writes paths in place; the default reads and rewrites whole documents
+    native_patch = False
+
+    @abstractmethod
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Get a value, or default if the key doesn't exist."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any):
+        """Set a value."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete a key. Returns whether it existed."""
+
+    @abstractmethod
+    async def keys(self, prefix: str = "") -> List[str]:
+        """List keys starting with prefix."""
+
+    async def exists(self, key: str) -> bool:
+        """Check whether a key exists."""
+        return await self.get(key) is not None
+
+    async def scan_prefix(self, prefix: str) -> Dict[str, Any]:
+        """Get every key/value pair whose key starts with prefix."""
+        return await self.get_many(await self.keys(prefix))
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values at once. Missing keys are left out."""
+        result = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    async def set_many(self, items: Dict[str, Any]):
+        """Set several values at once."""
+        for key, value in items.items():
+            await self.set(key, value)
+
+    async def patch_many(self, patches: Dict[str, Dict[str, Any]]):
+        """Set dotted paths inside existing documents ({key: {path: value}})."""
+        documents = await self.get_many(patches.keys())
+        for key, paths in patches.items():
+            if key not in documents:
+                logger.warning(f"Skipping patch for missing document {key}")
+                continue
+            for path, value in paths.items():
+                set_path(documents[key], path, value)
+        await self.set_many(documents)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys at once. Returns how many existed."""
+        deleted = 0
+        for key in keys:
+            if await self.delete(key):
+                deleted += 1
+        return deleted
+
+    async def close(self):
+        """Release any resources held by the backend."""
+
+
+class ReplitStorage(Storage):
+    """Replit DB backend; the blocking HTTP client runs in a thread pool."""
+
+    def __init__(self, max_workers: int = 8):
+        from replit import db
+        self._db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="replit-db")
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _get_sync(self, key: str) -> Any:
+        value = self._db.get(key)
+        if value is None:
+            return None
+        # Detach from replit's observed containers so edits don't write implicitly
+        return json.loads(json.dumps(value))
+
+    def _set_sync(self, key: str, value: Any):
+        self._db[key] = value
+
+    def _delete_sync(self, key: str) -> bool:
+        try:
+            del self._db[key]
+            return True
+        except KeyError:
+            return False
+
+    def _keys_sync(self, prefix: str) -> List[str]:
+        return list(self._db.prefix(prefix)) if prefix else list(self._db.keys())
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = await self._run(self._get_sync, key)
+        return default if value is None else value
+
+    async def set(self, key: str, value: Any):
+        await self._run(self._set_sync, key, value)
+
+    async def delete(self, key: str) -> bool:
+        return await self._run(self._delete_sync, key)
+
+    async def keys(self, prefix: str = "") -> List[str]:
+        return await self._run(self._keys_sync, prefix)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        values = await asyncio.gather(*(self._run(self._get_sync, key) for key in keys))
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, items: Dict[str, Any]):
+        await asyncio.gather(*(self._run(self._set_sync, key, value) for key, value in items.items()))
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        results = await asyncio.gather(*(self._run(self._delete_sync, key) for key in keys))
+        return sum(1 for existed in results if existed)
+
+    async def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class SQLiteStorage(Storage):
+    """Local SQLite backend using aiosqlite, with JSON-encoded values."""
+
+    native_patch = True
+
+    CHUNK_SIZE = 500
+
+    def __init__(self, path: str = "bot_data.db"):
+        self.path = path
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    async def _connection(self):
+        if self._conn is None:
+            import aiosqlite
+            async with self._lock:
+                if self._conn is None:
+                    conn = await aiosqlite.connect(self.path)
+                    await conn.execute("PRAGMA journal_mode=WAL")
+                    await conn.execute(
+                        "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                    )
+                    await conn.commit()
+                    self._conn = conn
+        return self._conn
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        conn = await self._connection()
+        async with conn.execute("SELECT value FROM kv WHERE key = ?", (key,)) as cursor:
+            row = await cursor.fetchone()
+        return json.loads(row[0]) if row else default
+
+    async def set(self, key: str, value: Any):
+        conn = await self._connection()
+        await conn.execute(
+            "INSERT INTO kv (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+        await conn.commit()
+
+    async def delete(self, key: str) -> bool:
+        conn = await self._connection()
+        cursor = await conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+        await conn.commit()
+        return cursor.rowcount > 0
+
+    async def keys(self, prefix: str = "") -> List[str]:
+        conn = await self._connection()
+        async with conn.execute(
+            "SELECT key FROM kv WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        ) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def scan_prefix(self, prefix: str) -> Dict[str, Any]:
+        conn = await self._connection()
+        async with conn.execute(
+            "SELECT key, value FROM kv WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        ) as cursor:
+            return {key: json.loads(value) for key, value in await cursor.fetchall()}
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        conn = await self._connection()
+        result = {}
+        # Chunk to stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), self.CHUNK_SIZE):
+            chunk = keys[start:start + self.CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            async with conn.execute(
+                f"SELECT key, value FROM kv WHERE key IN ({placeholders})", chunk
+            ) as cursor:
+                for key, value in await cursor.fetchall():
+                    result[key] = json.loads(value)
+        return result
+
+    async def set_many(self, items: Dict[str, Any]):
+        if not items:
+            return
+        conn = await self._connection()
+        await conn.executemany(
+            "INSERT INTO kv (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, json.dumps(value)) for key, value in items.items()]
+        )
+        await conn.commit()
+
+    async def patch_many(self, patches: Dict[str, Dict[str, Any]]):
+        if not patches:
+            return
+        conn = await self._connection()
+        # json_set rewrites only the changed paths inside the stored document
+        await conn.executemany(
+            "UPDATE kv SET value = json_set(value, ?, json(?)) WHERE key = ?",
+            [
+                ('$' + ''.join(f'."{part}"' for part in path.split('.')), json.dumps(value), key)
+                for key, paths in patches.items()
+                for path, value in paths.items()
+            ]
+        )
+        await conn.commit()
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        conn = await self._connection()
+        deleted = 0
+        for start in range(0, len(keys), self.CHUNK_SIZE):
+            chunk = keys[start:start + self.CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = await conn.execute(f"DELETE FROM kv WHERE key IN ({placeholders})", chunk)
+            deleted += cursor.rowcount
+        await conn.commit()
+        return deleted
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+_storage: Optional[Storage] = None
+
+def get_storage() -> Storage:
+    """Get the configured storage backend (STORAGE_BACKEND=replit|sqlite)."""
+    global _storage
+    if _storage is None:
+        backend = os.getenv('STORAGE_BACKEND', 'replit').lower()
+        if backend == 'sqlite':
+            _storage = SQLiteStorage(os.getenv('SQLITE_PATH', 'bot_data.db'))
+        else:
+            _storage = ReplitStorage()
+        logger.info(f"Using {type(_storage).__name__} storage backend")
+    return _storage